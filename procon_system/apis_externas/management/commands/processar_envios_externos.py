@@ -0,0 +1,58 @@
+"""
+Comando para drenar o outbox de envios a órgãos externos
+Uso: python manage.py processar_envios_externos [--lote 100] [--workers 16] [--loop 30]
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from apis_externas.services import OutboxEnvioService
+
+
+class Command(BaseCommand):
+    help = 'Entrega envios pendentes de EnvioDocumentoExterno em lotes paralelos com retry e backoff'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=None,
+            help='Quantidade de envios reivindicados por lote',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Número máximo de entregas simultâneas (todas as origens)',
+        )
+        parser.add_argument(
+            '--max-lotes',
+            type=int,
+            default=None,
+            help='Interrompe após N lotes (padrão: drena o outbox)',
+        )
+        parser.add_argument(
+            '--loop',
+            type=int,
+            default=0,
+            help='Executa continuamente, aguardando N segundos entre as drenagens',
+        )
+
+    def handle(self, *args, **options):
+        service = OutboxEnvioService(tamanho_lote=options['lote'], max_workers=options['workers'])
+        try:
+            while True:
+                totais = service.processar_pendentes(max_lotes=options['max_lotes'])
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"📤 {totais.get('processados', 0)} envios processados em {totais['lotes']} lote(s): "
+                        f"{totais.get('enviados', 0)} enviados, {totais.get('reagendados', 0)} reagendados, "
+                        f"{totais.get('falhas_definitivas', 0)} falhas definitivas"
+                    )
+                )
+                if not options['loop']:
+                    break
+                time.sleep(options['loop'])
+        except KeyboardInterrupt:
+            self.stdout.write('Interrompido pelo usuário')
+        finally:
+            service.fechar()
@@ -0,0 +1,187 @@
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('audiencia_calendario', '__first__'),
+        ('cip_automatica', '__first__'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrgaoExterno',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome', models.CharField(max_length=200, unique=True)),
+                ('codigo_identificacao', models.CharField(max_length=50, unique=True)),
+                ('tipo_orgao', models.CharField(choices=[('MINISTERIO_PUBLICO', 'Ministério Público'), ('JUDICIARIO', 'Poder Judiciário'), ('SECADRIO_AGROPECUARIA', 'Secretaria de Agricultura'), ('ANATEL', 'ANATEL'), ('ANVISA', 'ANVISA'), ('ANAC', 'ANAC'), ('ABNT', 'Fundo de Defesa do Direito Difuso'), ('PROCON_JURIDICO', 'Outros PROCONs'), ('AUTO_REGULACAO', 'Órgãos de Autorregulação'), ('DEFESA_CONSUMIDOR', 'Órgãos de Defesa do Consumidor')], max_length=30)),
+                ('status', models.CharField(choices=[('ATIVO', 'Ativo'), ('INATIVO', 'Inativo'), ('SUSPENSO', 'Suspenso'), ('MANUTENCAO', 'Em Manutenção')], default='ATIVO', max_length=15)),
+                ('email_contato', models.EmailField(blank=True, max_length=254)),
+                ('telefone_contato', models.CharField(blank=True, max_length=20)),
+                ('responsavel_contato', models.CharField(blank=True, max_length=150)),
+                ('endereco_completo', models.TextField(blank=True)),
+                ('cidade', models.CharField(blank=True, max_length=100)),
+                ('estado', models.CharField(blank=True, max_length=2)),
+                ('possui_api_integrada', models.BooleanField(default=False)),
+                ('api_endpoint_base', models.URLField(blank=True)),
+                ('api_authentication_type', models.CharField(choices=[('TOKEN', 'Token Bearer'), ('API_KEY', 'API Key'), ('OAUTH2', 'OAuth 2.0'), ('BASIC_AUTH', 'Basic Authentication'), ('CERTIFICATE', 'Certificate')], default='TOKEN', max_length=25)),
+                ('automatic_sync_enabled', models.BooleanField(default=False)),
+                ('automatic_sync_interval_hours', models.PositiveIntegerField(default=24)),
+                ('tipos_documentos_enviados', models.JSONField(default=list)),
+                ('data_registro', models.DateTimeField(auto_now_add=True)),
+                ('data_ultimo_sync', models.DateTimeField(blank=True, null=True)),
+                ('data_proximo_sync', models.DateTimeField(blank=True, null=True)),
+                ('formato_dados', models.CharField(choices=[('JSON', 'JSON'), ('XML', 'XML'), ('SOAP', 'SOAP'), ('EDI', 'EDI'), ('CSV', 'CSV')], default='JSON', max_length=15)),
+                ('require_ssl', models.BooleanField(default=True)),
+                ('timeout_segundos', models.PositiveIntegerField(default=30)),
+                ('retry_max_tentativas', models.PositiveIntegerField(default=3)),
+            ],
+            options={
+                'verbose_name': 'Órgão Externo',
+                'verbose_name_plural': 'Órgãos Externos',
+                'ordering': ['nome'],
+            },
+        ),
+        migrations.CreateModel(
+            name='CredencialAcesso',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome_credencial', models.CharField(max_length=100)),
+                ('status', models.CharField(choices=[('ATIVA', 'Ativa'), ('EXPIREU', 'Expirada'), ('REVOGADA', 'Revogada'), ('BLOQUEADA', 'Bloqueada')], default='ATIVO', max_length=15)),
+                ('api_key_value', models.CharField(blank=True, max_length=500)),
+                ('bearer_token', models.TextField(blank=True)),
+                ('username_auth', models.CharField(blank=True, max_length=100)),
+                ('password_auth', models.CharField(blank=True, max_length=100)),
+                ('certificate_file', models.FileField(blank=True, upload_to='certificates/')),
+                ('data_criacao', models.DateTimeField(auto_now_add=True)),
+                ('data_expiracao', models.DateTimeField(blank=True, null=True)),
+                ('data_ultimo_usado', models.DateTimeField(blank=True, null=True)),
+                ('ambiente', models.CharField(choices=[('DESENVOLVIMENTO', 'Desenvolvimento'), ('HOMOLOGACAO', 'Homologação'), ('PRODUCAO', 'Produção')], default='PRODUCAO', max_length=15)),
+                ('escopo_limitado', models.JSONField(default=list)),
+                ('limite_requests_hora', models.PositiveIntegerField(default=1000)),
+                ('criado_por', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('responsavel_atual', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='credenciais_permitido', to=settings.AUTH_USER_MODEL)),
+                ('orgao', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='credenciais', to='apis_externas.orgaoexterno')),
+            ],
+            options={
+                'verbose_name': 'Credencial de Acesso',
+                'verbose_name_plural': 'Credenciais de Acesso',
+                'ordering': ['-data_criacao'],
+            },
+        ),
+        migrations.CreateModel(
+            name='EnvioDocumentoExterno',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('tipo_documento', models.CharField(choices=[('RECLAMACAO_INICIAL', 'Reclamação Inicial'), ('CIP_ENVIADA', 'CIP Enviada'), ('RESPOSTA_EMPRESA', 'Resposta da Empresa'), ('ACORDO_REALIZADO', 'Acordo Realizado'), ('DECISE_FINAL', 'Decisão Final'), ('RELATORIO_PERIODICO', 'Relatório Periódico'), ('CONSULTA_STATUS', 'Consulta de Status'), ('DOCUMENTO_PORTAL', 'Documento do Portal')], max_length=25)),
+                ('protocolo_interno', models.CharField(max_length=50)),
+                ('dados_enviados', models.JSONField(default=dict)),
+                ('payload_completo', models.TextField()),
+                ('status_envio', models.CharField(choices=[('PENDENTE', 'Pendente'), ('ENVIANDO', 'Enviando'), ('ENVIADO', 'Enviado'), ('ACEITO', 'Aceito'), ('REJEITADO', 'Rejeitado'), ('ERRO_ENVIO', 'Erro no Envio'), ('CANCELADO', 'Cancelado')], default='PENDENTE', max_length=15)),
+                ('tentativas_envio', models.PositiveIntegerField(default=0)),
+                ('maximo_tentativas', models.PositiveIntegerField(default=5)),
+                ('data_criacao', models.DateTimeField(auto_now_add=True)),
+                ('data_envio', models.DateTimeField(blank=True, null=True)),
+                ('data_aceite_rejeicao', models.DateTimeField(blank=True, null=True)),
+                ('protocolo_externo', models.CharField(blank=True, max_length=100)),
+                ('codigo_resposta_http', models.PositiveIntegerField(blank=True, null=True)),
+                ('resposta_orcao_externo', models.TextField(blank=True)),
+                ('header_resposta', models.JSONField(default=dict)),
+                ('erro_envio', models.TextField(blank=True)),
+                ('detalhes_erro', models.JSONField(default=dict)),
+                ('observacoes', models.TextField(blank=True)),
+                ('audiencia_relacionada', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='audiencia_calendario.agendamentoaudiencia')),
+                ('cip_relacionada', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='cip_automatica.cipautomatica')),
+                ('credencial_usada', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='apis_externas.credencialacesso')),
+                ('enviado_por', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('orgao_destino', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='envios_recebidos', to='apis_externas.orgaoexterno')),
+            ],
+            options={
+                'verbose_name': 'Envio Documento Externo',
+                'verbose_name_plural': 'Envios Documento Externo',
+                'ordering': ['-data_criacao'],
+            },
+        ),
+        migrations.CreateModel(
+            name='EventoIntegracao',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo_evento', models.CharField(choices=[('ENVIO_SUCESSO', 'Envio Bem-Sucedido'), ('ENVIO_FALHA', 'Falha no Envio'), ('RESPOSTA_RECEITA', 'Resposta Recebida'), ('SYNC_AUTOMATICO', 'Sincronização Automática'), ('CREDENTIAL_EXPIRED', 'Credencial Expirada'), ('API_CHANGED', 'Mudanças na API'), ('ERROR_THRESHOLD', 'Limite de Erros')], max_length=25)),
+                ('titulo_evento', models.CharField(max_length=200)),
+                ('descricao_evento', models.TextField()),
+                ('severity', models.CharField(choices=[('LOW', 'Baixa'), ('MEDIUM', 'Média'), ('HIGH', 'Alta'), ('CRITICAL', 'Crítica')], default='MEDIUM', max_length=10)),
+                ('dados_evento', models.JSONField(default=dict)),
+                ('processado', models.BooleanField(default=False)),
+                ('data_evento', models.DateTimeField(auto_now_add=True)),
+                ('processado_em', models.DateTimeField(blank=True, null=True)),
+                ('acoes_tomadas', models.TextField(blank=True)),
+                ('notificacoes_enviadas', models.JSONField(default=list)),
+                ('envio_relacionado', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, to='apis_externas.enviodocumentoexterno')),
+                ('orgao_relacionado', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, to='apis_externas.orgaoexterno')),
+            ],
+            options={
+                'verbose_name': 'Evento de Integração',
+                'verbose_name_plural': 'Eventos de Integração',
+                'ordering': ['-data_evento', '-severity'],
+            },
+        ),
+        migrations.CreateModel(
+            name='MetricasIntegracao',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data_analise', models.DateField(default=django.utils.timezone.now)),
+                ('periodo_horas', models.PositiveIntegerField(default=24)),
+                ('total_envios', models.PositiveIntegerField(default=0)),
+                ('envios_sucesso', models.PositiveIntegerField(default=0)),
+                ('envios_falha', models.PositiveIntegerField(default=0)),
+                ('taxa_sucesso_percent', models.FloatField(default=0)),
+                ('tempo_resposta_medio_ms', models.FloatField(default=0)),
+                ('tempo_resposta_max_ms', models.FloatField(default=0)),
+                ('bandwidth_usado_mb', models.FloatField(default=0)),
+                ('requests_api_feitos', models.PositiveIntegerField(default=0)),
+                ('limite_erro_atingido', models.BooleanField(default=False)),
+                ('sla_atingido', models.BooleanField(default=True)),
+                ('orgao', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='metricas', to='apis_externas.orgaoexterno')),
+            ],
+            options={
+                'verbose_name': 'Métricas de Integração',
+                'verbose_name_plural': 'Métricas de Integração',
+                'ordering': ['-data_analise'],
+                'unique_together': {('orgao', 'data_analise', 'periodo_horas')},
+            },
+        ),
+        migrations.CreateModel(
+            name='TemplateIntegracao',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome_template', models.CharField(max_length=150)),
+                ('tipo_documento_aplicavel', models.CharField(choices=[('RECLAMACAO_INICIAL', 'Reclamação Inicial'), ('CIP_ENVIADA', 'CIP Enviada'), ('RESPOSTA_EMPRESA', 'Resposta da Empresa'), ('ACORDO_REALIZADO', 'Acordo Realizado'), ('DECISE_FINAL', 'Decisão Final'), ('RELATORIO_PERIODICO', 'Relatório Periódico'), ('CONSULTA_STATUS', 'Consulta de Status'), ('DOCUMENTO_PORTAL', 'Documento do Portal')], max_length=25)),
+                ('versao_template', models.CharField(default='1.0', max_length=10)),
+                ('template_payload', models.TextField()),
+                ('campos_obrigatorios', models.JSONField(default=list)),
+                ('campos_opcionais', models.JSONField(default=list)),
+                ('url_envio', models.URLField()),
+                ('metodo_http', models.CharField(choices=[('POST', 'POST'), ('PUT', 'PUT'), ('PATCH', 'PATCH')], default='POST', max_length=10)),
+                ('ativo', models.BooleanField(default=True)),
+                ('require_validação', models.BooleanField(default=True)),
+                ('data_criacao', models.DateTimeField(auto_now_add=True)),
+                ('data_atualizacao', models.DateTimeField(auto_now=True)),
+                ('criado_por', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('orgao', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='templates_integracao', to='apis_externas.orgaoexterno')),
+            ],
+            options={
+                'verbose_name': 'Template de Integração',
+                'verbose_name_plural': 'Templates de Integração',
+                'ordering': ['orgao', 'tipo_documento_aplicavel'],
+                'unique_together': {('orgao', 'tipo_documento_aplicavel', 'versao_template')},
+            },
+        ),
+    ]
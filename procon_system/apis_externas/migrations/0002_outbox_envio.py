@@ -0,0 +1,25 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apis_externas', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='enviodocumentoexterno',
+            name='proximo_envio_em',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='orgaoexterno',
+            name='max_envios_simultaneos',
+            field=models.PositiveIntegerField(default=4),
+        ),
+        migrations.AddIndex(
+            model_name='enviodocumentoexterno',
+            index=models.Index(fields=['status_envio', 'proximo_envio_em'], name='apis_envio_outbox_idx'),
+        ),
+    ]
@@ -91,6 +91,7 @@ class OrgaoExterno(models.Model):
     require_ssl = models.BooleanField(default=True)
     timeout_segundos = models.PositiveIntegerField(default=30)
     retry_max_tentativas = models.PositiveIntegerField(default=3)
+    max_envios_simultaneos = models.PositiveIntegerField(default=4)  # Limite de conexões paralelas do outbox
     
     class Meta:
         verbose_name = "Órgão Externo"
@@ -209,6 +210,7 @@ class EnvioDocumentoExterno(models.Model):
     status_envio = models.CharField(max_length=15, choices=STATUS_ENVIO_CHOICES, default='PENDENTE')
     tentativas_envio = models.PositiveIntegerField(default=0)
     maximo_tentativas = models.PositiveIntegerField(default=5)
+    proximo_envio_em = models.DateTimeField(null=True, blank=True)  # Backoff entre tentativas
     
     # Timestamps
     data_criacao = models.DateTimeField(auto_now_add=True)
@@ -233,6 +235,9 @@ class EnvioDocumentoExterno(models.Model):
         verbose_name = "Envio Documento Externo"
         verbose_name_plural = "Envios Documento Externo"
         ordering = ['-data_criacao']
+        indexes = [
+            models.Index(fields=['status_envio', 'proximo_envio_em'], name='apis_envio_outbox_idx'),
+        ]
     
     def __str__(self):
         return f"Envio {self.get_tipo_documento_display()} → {self.orgao_destino.nome}"
@@ -0,0 +1,358 @@
+"""
+Serviços para APIs Externas
+Sistema Procon - Fase 5 - Portal Externo & Integradores
+
+Outbox de EnvioDocumentoExterno: reivindica envios pendentes em lote com
+bloqueio de linha, entrega em paralelo respeitando o limite de conexões de
+cada órgão, aplica backoff exponencial e registra eventos/métricas em lote.
+"""
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import (
+    CredencialAcesso, EnvioDocumentoExterno, EventoIntegracao,
+    MetricasIntegracao, OrgaoExterno, TemplateIntegracao,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ResultadoEntrega:
+    """Resultado de uma tentativa de entrega (produzido fora da transação)"""
+    envio_id: str
+    sucesso: bool
+    codigo_http: Optional[int] = None
+    corpo_resposta: str = ''
+    headers: Dict[str, str] = field(default_factory=dict)
+    erro: str = ''
+    tempo_ms: float = 0
+    definitivo: bool = False  # Falha que não deve ser retentada (ex.: 4xx)
+
+
+class OutboxEnvioService:
+    """Motor de entrega do outbox de documentos para órgãos externos"""
+
+    # ENVIANDO só é elegível quando a reserva (lease) de um worker expirou
+    STATUS_ELEGIVEIS = ('PENDENTE', 'ERRO_ENVIO', 'ENVIANDO')
+
+    def __init__(self,
+                 tamanho_lote: Optional[int] = None,
+                 max_workers: Optional[int] = None,
+                 backoff_base_segundos: Optional[int] = None,
+                 backoff_max_segundos: Optional[int] = None):
+        self.tamanho_lote = tamanho_lote or getattr(settings, 'OUTBOX_TAMANHO_LOTE', 100)
+        self.max_workers = max_workers or getattr(settings, 'OUTBOX_MAX_WORKERS', 16)
+        self.backoff_base_segundos = (
+            backoff_base_segundos
+            if backoff_base_segundos is not None
+            else getattr(settings, 'OUTBOX_BACKOFF_BASE_SEGUNDOS', 60)
+        )
+        self.backoff_max_segundos = backoff_max_segundos or getattr(settings, 'OUTBOX_BACKOFF_MAX_SEGUNDOS', 3600)
+        self.lease_segundos = getattr(settings, 'OUTBOX_LEASE_SEGUNDOS', 600)
+        self._sessoes: Dict[int, requests.Session] = {}
+        self._semaforos: Dict[int, threading.BoundedSemaphore] = {}
+
+    # ------------------------------------------------------------------
+    # Reivindicação
+    # ------------------------------------------------------------------
+
+    def reivindicar_lote(self) -> List[EnvioDocumentoExterno]:
+        """
+        Seleciona envios elegíveis com SELECT ... FOR UPDATE SKIP LOCKED e os
+        marca como ENVIANDO, para que vários workers não entreguem o mesmo envio.
+        A reserva expira em lease_segundos, recuperando envios de workers que caíram.
+        A tentativa é contada na reserva: um envio cujo worker cai a cada entrega
+        esgota maximo_tentativas em vez de ser reivindicado para sempre.
+        """
+        agora = timezone.now()
+        with transaction.atomic():
+            # Reservas expiradas que já consumiram todas as tentativas não voltam à fila
+            EnvioDocumentoExterno.objects.filter(
+                status_envio='ENVIANDO',
+                proximo_envio_em__lte=agora,
+                tentativas_envio__gte=F('maximo_tentativas'),
+            ).update(
+                status_envio='ERRO_ENVIO',
+                proximo_envio_em=None,
+                erro_envio='Reserva expirada sem confirmação de entrega',
+            )
+            ids = list(
+                EnvioDocumentoExterno.objects
+                .select_for_update(skip_locked=True)
+                .filter(
+                    status_envio__in=self.STATUS_ELEGIVEIS,
+                    tentativas_envio__lt=F('maximo_tentativas'),
+                )
+                .filter(Q(proximo_envio_em__isnull=True) | Q(proximo_envio_em__lte=agora))
+                .order_by('data_criacao')
+                .values_list('id', flat=True)[:self.tamanho_lote]
+            )
+            if not ids:
+                return []
+            EnvioDocumentoExterno.objects.filter(id__in=ids).update(
+                status_envio='ENVIANDO',
+                tentativas_envio=F('tentativas_envio') + 1,
+                proximo_envio_em=agora + timedelta(seconds=self.lease_segundos),
+            )
+
+        return list(
+            EnvioDocumentoExterno.objects
+            .filter(id__in=ids)
+            .select_related('orgao_destino', 'credencial_usada')
+        )
+
+    # ------------------------------------------------------------------
+    # Entrega
+    # ------------------------------------------------------------------
+
+    def processar_lote(self) -> Dict[str, int]:
+        """Reivindica, entrega e registra um lote; retorna contadores"""
+        envios = self.reivindicar_lote()
+        if not envios:
+            return {'processados': 0, 'enviados': 0, 'reagendados': 0, 'falhas_definitivas': 0}
+
+        destinos = self._resolver_destinos(envios)
+        for envio in envios:
+            # Sessões/semáforos são criados antes das threads para evitar corrida
+            self._sessao(envio.orgao_destino)
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(envios))) as executor:
+            resultados = list(executor.map(lambda envio: self._entregar(envio, destinos[envio.id]), envios))
+
+        return self._registrar_resultados(envios, resultados)
+
+    def processar_pendentes(self, max_lotes: Optional[int] = None) -> Dict[str, int]:
+        """Drena o outbox até não haver envios elegíveis (ou atingir max_lotes)"""
+        totais = defaultdict(int)
+        lotes = 0
+        while max_lotes is None or lotes < max_lotes:
+            contadores = self.processar_lote()
+            if not contadores['processados']:
+                break
+            for chave, valor in contadores.items():
+                totais[chave] += valor
+            lotes += 1
+        totais['lotes'] = lotes
+        return dict(totais)
+
+    def _resolver_destinos(self, envios: List[EnvioDocumentoExterno]) -> Dict:
+        """Resolve URL/método de cada envio com uma única consulta de templates"""
+        orgao_ids = {envio.orgao_destino_id for envio in envios}
+        templates = {}
+        for template in TemplateIntegracao.objects.filter(orgao_id__in=orgao_ids, ativo=True).order_by('-data_atualizacao'):
+            templates.setdefault((template.orgao_id, template.tipo_documento_aplicavel), template)
+
+        destinos = {}
+        for envio in envios:
+            template = templates.get((envio.orgao_destino_id, envio.tipo_documento))
+            if template:
+                destinos[envio.id] = (template.metodo_http, template.url_envio)
+            else:
+                destinos[envio.id] = ('POST', envio.orgao_destino.api_endpoint_base)
+        return destinos
+
+    def _sessao(self, orgao: OrgaoExterno) -> requests.Session:
+        sessao = self._sessoes.get(orgao.id)
+        if sessao is None:
+            limite = max(orgao.max_envios_simultaneos, 1)
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=limite)
+            sessao = requests.Session()
+            sessao.mount('http://', adapter)
+            sessao.mount('https://', adapter)
+            self._sessoes[orgao.id] = sessao
+            self._semaforos[orgao.id] = threading.BoundedSemaphore(limite)
+        return sessao
+
+    def _headers_autenticacao(self, orgao: OrgaoExterno, credencial: Optional[CredencialAcesso]) -> Dict[str, str]:
+        headers = {'Content-Type': 'application/json'}
+        if not credencial:
+            return headers
+        if orgao.api_authentication_type in ('TOKEN', 'OAUTH2') and credencial.bearer_token:
+            headers['Authorization'] = f'Bearer {credencial.bearer_token}'
+        elif orgao.api_authentication_type == 'API_KEY' and credencial.api_key_value:
+            headers['X-API-Key'] = credencial.api_key_value
+        return headers
+
+    def _entregar(self, envio: EnvioDocumentoExterno, destino) -> ResultadoEntrega:
+        """Executa a requisição HTTP; roda em thread e não acessa o banco"""
+        orgao = envio.orgao_destino
+        metodo, url = destino
+        if not url:
+            return ResultadoEntrega(str(envio.id), False, erro='Órgão sem endpoint configurado', definitivo=True)
+
+        sessao = self._sessoes[orgao.id]
+        credencial = envio.credencial_usada
+        auth = None
+        if credencial and orgao.api_authentication_type == 'BASIC_AUTH':
+            auth = (credencial.username_auth, credencial.password_auth)
+
+        inicio = time.monotonic()
+        try:
+            with self._semaforos[orgao.id]:
+                response = sessao.request(
+                    metodo,
+                    url,
+                    data=envio.payload_completo.encode('utf-8'),
+                    headers=self._headers_autenticacao(orgao, credencial),
+                    auth=auth,
+                    timeout=orgao.timeout_segundos,
+                    verify=orgao.require_ssl,
+                )
+        except requests.exceptions.RequestException as e:
+            return ResultadoEntrega(
+                str(envio.id), False, erro=f'{type(e).__name__}: {e}',
+                tempo_ms=(time.monotonic() - inicio) * 1000,
+            )
+
+        tempo_ms = (time.monotonic() - inicio) * 1000
+        sucesso = 200 <= response.status_code < 300
+        return ResultadoEntrega(
+            str(envio.id),
+            sucesso,
+            codigo_http=response.status_code,
+            corpo_resposta=response.text[:10000],
+            headers=dict(response.headers),
+            erro='' if sucesso else f'HTTP {response.status_code}',
+            tempo_ms=tempo_ms,
+            definitivo=400 <= response.status_code < 500 and response.status_code not in (408, 429),
+        )
+
+    def calcular_backoff(self, tentativas: int) -> timedelta:
+        """Backoff exponencial: base * 2^(tentativas-1), limitado ao máximo"""
+        segundos = self.backoff_base_segundos * (2 ** max(tentativas - 1, 0))
+        return timedelta(seconds=min(segundos, self.backoff_max_segundos))
+
+    # ------------------------------------------------------------------
+    # Registro
+    # ------------------------------------------------------------------
+
+    def _registrar_resultados(self, envios: List[EnvioDocumentoExterno], resultados: List[ResultadoEntrega]) -> Dict[str, int]:
+        """Atualiza envios, eventos e métricas com bulk_update/bulk_create"""
+        agora = timezone.now()
+        eventos = []
+        por_orgao = defaultdict(list)
+        contadores = {'processados': len(envios), 'enviados': 0, 'reagendados': 0, 'falhas_definitivas': 0}
+
+        for envio, resultado in zip(envios, resultados):
+            # tentativas_envio já foi incrementado na reserva
+            envio.codigo_resposta_http = resultado.codigo_http
+            envio.header_resposta = resultado.headers
+            por_orgao[envio.orgao_destino].append(resultado)
+
+            if resultado.sucesso:
+                envio.status_envio = 'ENVIADO'
+                envio.data_envio = agora
+                envio.resposta_orcao_externo = resultado.corpo_resposta
+                envio.protocolo_externo = self._extrair_protocolo(resultado.corpo_resposta) or envio.protocolo_externo
+                envio.erro_envio = ''
+                envio.proximo_envio_em = None
+                contadores['enviados'] += 1
+                eventos.append(self._evento(envio, 'ENVIO_SUCESSO', 'LOW', resultado))
+                continue
+
+            envio.erro_envio = resultado.erro
+            envio.detalhes_erro = {
+                'tentativa': envio.tentativas_envio,
+                'codigo_http': resultado.codigo_http,
+                'resposta': resultado.corpo_resposta[:1000],
+            }
+            esgotado = envio.tentativas_envio >= envio.maximo_tentativas
+            if resultado.definitivo or esgotado:
+                envio.status_envio = 'REJEITADO' if resultado.definitivo else 'ERRO_ENVIO'
+                envio.data_aceite_rejeicao = agora if resultado.definitivo else envio.data_aceite_rejeicao
+                envio.proximo_envio_em = None
+                contadores['falhas_definitivas'] += 1
+                eventos.append(self._evento(envio, 'ERROR_THRESHOLD', 'HIGH', resultado))
+            else:
+                envio.status_envio = 'PENDENTE'
+                envio.proximo_envio_em = agora + self.calcular_backoff(envio.tentativas_envio)
+                contadores['reagendados'] += 1
+                eventos.append(self._evento(envio, 'ENVIO_FALHA', 'MEDIUM', resultado))
+
+        with transaction.atomic():
+            EnvioDocumentoExterno.objects.bulk_update(
+                envios,
+                [
+                    'status_envio', 'tentativas_envio', 'proximo_envio_em', 'data_envio',
+                    'data_aceite_rejeicao', 'protocolo_externo', 'codigo_resposta_http',
+                    'resposta_orcao_externo', 'header_resposta', 'erro_envio', 'detalhes_erro',
+                ],
+            )
+            EventoIntegracao.objects.bulk_create(eventos)
+            self._atualizar_metricas(por_orgao, agora)
+
+        return contadores
+
+    def _evento(self, envio, tipo_evento, severity, resultado: ResultadoEntrega) -> EventoIntegracao:
+        return EventoIntegracao(
+            tipo_evento=tipo_evento,
+            orgao_relacionado=envio.orgao_destino,
+            envio_relacionado=envio,
+            titulo_evento=f'{envio.get_tipo_documento_display()} - {envio.protocolo_interno}',
+            descricao_evento=resultado.erro or 'Envio entregue ao órgão externo',
+            severity=severity,
+            dados_evento={
+                'tentativa': envio.tentativas_envio,
+                'codigo_http': resultado.codigo_http,
+                'tempo_ms': round(resultado.tempo_ms, 2),
+            },
+        )
+
+    def _atualizar_metricas(self, por_orgao: Dict[OrgaoExterno, List[ResultadoEntrega]], agora) -> None:
+        """Acumula métricas diárias por órgão (uma linha por órgão/dia)"""
+        hoje = timezone.localdate(agora)
+        for orgao, resultados in por_orgao.items():
+            metricas, _ = MetricasIntegracao.objects.select_for_update().get_or_create(
+                orgao=orgao, data_analise=hoje, periodo_horas=24,
+            )
+            sucesso = sum(1 for resultado in resultados if resultado.sucesso)
+            tempos = [resultado.tempo_ms for resultado in resultados]
+            requests_anteriores = metricas.requests_api_feitos
+
+            metricas.total_envios += len(resultados)
+            metricas.envios_sucesso += sucesso
+            metricas.envios_falha += len(resultados) - sucesso
+            metricas.requests_api_feitos += len(resultados)
+            metricas.taxa_sucesso_percent = metricas.envios_sucesso / metricas.total_envios * 100
+            metricas.tempo_resposta_medio_ms = (
+                metricas.tempo_resposta_medio_ms * requests_anteriores + sum(tempos)
+            ) / metricas.requests_api_feitos
+            metricas.tempo_resposta_max_ms = max(metricas.tempo_resposta_max_ms, max(tempos))
+            metricas.limite_erro_atingido = metricas.taxa_sucesso_percent < 80
+            metricas.sla_atingido = not metricas.limite_erro_atingido
+            metricas.save()
+
+            OrgaoExterno.objects.filter(pk=orgao.pk).update(
+                data_ultimo_sync=agora,
+                data_proximo_sync=agora + timedelta(hours=orgao.automatic_sync_interval_hours),
+            )
+
+    @staticmethod
+    def _extrair_protocolo(corpo: str) -> str:
+        try:
+            dados = json.loads(corpo)
+        except (ValueError, TypeError):
+            return ''
+        if isinstance(dados, dict):
+            return str(dados.get('protocolo') or dados.get('protocolo_externo') or '')[:100]
+        return ''
+
+    def fechar(self) -> None:
+        for sessao in self._sessoes.values():
+            sessao.close()
+        self._sessoes.clear()
+        self._semaforos.clear()
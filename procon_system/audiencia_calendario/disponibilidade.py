@@ -0,0 +1,259 @@
+"""
+Motor de disponibilidade para agendamento de audiências
+Sistema Procon - Fase 4 - Fluxo Completo do Atendimento
+
+Carrega em uma única consulta os agendamentos que ocupam a janela pedida
+(um dia ou uma semana), monta um índice de intervalos em memória por
+mediador e por local e responde conflitos e horários livres considerando
+a duração de cada audiência.
+"""
+
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import date, datetime, time as dt_time, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db.models import DateTimeField, ExpressionWrapper, F, Q
+from django.utils import timezone
+
+from .models import AgendamentoAudiencia, LocalAudiencia, Mediador
+
+
+STATUS_OCUPAM_AGENDA = ['AGENDADA', 'CONFIRMADA', 'EM_ANDAMENTO']
+
+HORARIO_EXPEDIENTE = (dt_time(8, 0), dt_time(18, 0))
+INTERVALO_SLOTS = timedelta(minutes=30)
+
+# Chaves aceitas em Mediador.disponibilidade_semana, por weekday()
+DIAS_SEMANA = [
+    ('segunda', 'monday'),
+    ('terca', 'tuesday'),
+    ('quarta', 'wednesday'),
+    ('quinta', 'thursday'),
+    ('sexta', 'friday'),
+    ('sabado', 'saturday'),
+    ('domingo', 'sunday'),
+]
+
+
+def combinar(dia: date, hora: dt_time) -> datetime:
+    """datetime do dia/hora no fuso do sistema (aware quando USE_TZ)"""
+    momento = datetime.combine(dia, hora)
+    return timezone.make_aware(momento) if settings.USE_TZ else momento
+
+
+def hora_local(momento: datetime) -> str:
+    return (timezone.localtime(momento) if timezone.is_aware(momento) else momento).strftime('%H:%M')
+
+
+class IndiceIntervalos:
+    """
+    Intervalos [inicio, fim) de um recurso ordenados pelo início. O máximo
+    acumulado dos fins permite responder "há sobreposição?" com uma busca
+    binária; a lista de conflitos percorre apenas os candidatos anteriores.
+    """
+
+    def __init__(self, intervalos: Iterable[Tuple[datetime, datetime, Any]] = ()):
+        self._intervalos = sorted(intervalos, key=lambda item: item[0])
+        self._inicios = [inicio for inicio, _, _ in self._intervalos]
+        self._max_fim = []
+        maior = None
+        for _, fim, _ in self._intervalos:
+            maior = fim if maior is None or fim > maior else maior
+            self._max_fim.append(maior)
+
+    def __len__(self):
+        return len(self._intervalos)
+
+    def sobrepoe(self, inicio: datetime, fim: datetime) -> bool:
+        limite = bisect_left(self._inicios, fim)
+        return limite > 0 and self._max_fim[limite - 1] > inicio
+
+    def conflitos(self, inicio: datetime, fim: datetime) -> List[Any]:
+        if not self.sobrepoe(inicio, fim):
+            return []
+        limite = bisect_left(self._inicios, fim)
+        return [dado for _, termino, dado in self._intervalos[:limite] if termino > inicio]
+
+
+class AgendaRecursos:
+    """Agenda de mediadores e locais em uma janela de tempo, carregada de uma vez"""
+
+    def __init__(self, inicio: datetime, fim: datetime,
+                 mediador_ids: Optional[Iterable[int]] = None,
+                 local_ids: Optional[Iterable[int]] = None,
+                 excluir_id=None):
+        self.inicio = inicio
+        self.fim = fim
+        self.mediadores: Dict[int, IndiceIntervalos] = {}
+        self.locais: Dict[int, IndiceIntervalos] = {}
+        self._carregar(mediador_ids, local_ids, excluir_id)
+
+    def _carregar(self, mediador_ids, local_ids, excluir_id):
+        queryset = AgendamentoAudiencia.objects.filter(
+            status__in=STATUS_OCUPAM_AGENDA,
+            data_agendamento__lt=self.fim,
+        ).annotate(
+            termino=ExpressionWrapper(F('data_agendamento') + F('duracao_estimada'), output_field=DateTimeField())
+        ).filter(termino__gt=self.inicio)
+
+        if mediador_ids is not None or local_ids is not None:
+            recursos = Q(pk__in=[])
+            if mediador_ids is not None:
+                recursos |= Q(mediador_id__in=list(mediador_ids))
+            if local_ids is not None:
+                recursos |= Q(local_id__in=list(local_ids))
+            queryset = queryset.filter(recursos)
+        if excluir_id:
+            queryset = queryset.exclude(pk=excluir_id)
+
+        por_mediador, por_local = defaultdict(list), defaultdict(list)
+        for protocolo, mediador_id, local_id, inicio, termino in queryset.order_by().values_list(
+            'numero_protocolo', 'mediador_id', 'local_id', 'data_agendamento', 'termino'
+        ):
+            intervalo = (inicio, termino, {'conflito_com': protocolo, 'inicio': inicio})
+            if mediador_id:
+                por_mediador[mediador_id].append(intervalo)
+            if local_id:
+                por_local[local_id].append(intervalo)
+
+        self.mediadores = {chave: IndiceIntervalos(valor) for chave, valor in por_mediador.items()}
+        self.locais = {chave: IndiceIntervalos(valor) for chave, valor in por_local.items()}
+
+    def _indice(self, tipo: str, recurso_id: int) -> IndiceIntervalos:
+        return (self.mediadores if tipo == 'mediador' else self.locais).get(recurso_id) or IndiceIntervalos()
+
+    def livre(self, tipo: str, recurso_id: int, inicio: datetime, fim: datetime) -> bool:
+        return not self._indice(tipo, recurso_id).sobrepoe(inicio, fim)
+
+    def verificar(self, inicio: datetime, duracao: timedelta,
+                  mediador_id: Optional[int] = None, local_id: Optional[int] = None) -> Dict[str, Any]:
+        """Mesmo formato de CalendarioAudienciaService._verificar_disponibilidade"""
+        fim = inicio + duracao
+        conflitos = []
+        for tipo, recurso_id in (('mediador', mediador_id), ('local', local_id)):
+            if not recurso_id:
+                continue
+            for conflito in self._indice(tipo, recurso_id).conflitos(inicio, fim):
+                conflitos.append({
+                    'tipo': tipo,
+                    'resource_id': recurso_id,
+                    'conflito_com': conflito['conflito_com'],
+                    'horario': hora_local(conflito['inicio']),
+                })
+        return {
+            'disponivel': len(conflitos) == 0,
+            'conflitos': conflitos,
+            'motivo': 'Conflito de horário' if conflitos else None,
+        }
+
+
+class DisponibilidadeService:
+    """Horários livres de audiência para um recurso ou para todos de uma vez"""
+
+    def expediente_mediador(self, mediador: Optional[Mediador], dia: date) -> Optional[Tuple[dt_time, dt_time]]:
+        """Janela de trabalho do mediador no dia; None se ele não atende nesse dia"""
+        if mediador is None or not mediador.disponibilidade_semana:
+            return HORARIO_EXPEDIENTE
+        horas = None
+        for chave in DIAS_SEMANA[dia.weekday()]:
+            if chave in mediador.disponibilidade_semana:
+                horas = mediador.disponibilidade_semana[chave]
+                break
+        if horas is None:
+            return HORARIO_EXPEDIENTE
+        if not horas:
+            return None
+        return dt_time(min(horas), 0), dt_time(max(horas), 0)
+
+    def slots(self, dia: date, duracao: timedelta, janela: Tuple[dt_time, dt_time]):
+        inicio, limite = combinar(dia, janela[0]), combinar(dia, janela[1])
+        while inicio + duracao <= limite:
+            yield inicio, inicio + duracao
+            inicio += INTERVALO_SLOTS
+
+    @staticmethod
+    def dias(data_inicio: date, data_fim: Optional[date]) -> List[date]:
+        data_fim = data_fim or data_inicio
+        return [data_inicio + timedelta(days=i) for i in range((data_fim - data_inicio).days + 1)]
+
+    @staticmethod
+    def formatar(inicio: datetime, fim: datetime, duracao: timedelta, **extras) -> Dict[str, Any]:
+        return {
+            'inicio': inicio,
+            'fim': fim,
+            'duracao_horas': duracao.total_seconds() / 3600,
+            'formato_visual': hora_local(inicio),
+            **extras,
+        }
+
+    def horarios_livres(self, data_inicio: date, duracao: timedelta,
+                        mediador_id: Optional[int] = None, local_id: Optional[int] = None,
+                        data_fim: Optional[date] = None) -> List[Dict[str, Any]]:
+        """Slots livres para o mediador e/ou local informados (uma consulta para o período)"""
+        dias = self.dias(data_inicio, data_fim)
+        mediador = Mediador.objects.get(id=mediador_id) if mediador_id else None
+        agenda = AgendaRecursos(
+            combinar(dias[0], dt_time.min), combinar(dias[-1] + timedelta(days=1), dt_time.min),
+            mediador_ids=[mediador_id] if mediador_id else None,
+            local_ids=[local_id] if local_id else None,
+        )
+
+        livres = []
+        for dia in dias:
+            janela = self.expediente_mediador(mediador, dia)
+            if janela is None:
+                continue
+            for inicio, fim in self.slots(dia, duracao, janela):
+                if mediador_id and not agenda.livre('mediador', mediador_id, inicio, fim):
+                    continue
+                if local_id and not agenda.livre('local', local_id, inicio, fim):
+                    continue
+                livres.append(self.formatar(inicio, fim, duracao))
+        return livres
+
+    def horarios_livres_recursos(self, data_inicio: date, duracao: timedelta,
+                                 data_fim: Optional[date] = None,
+                                 mediador_ids: Optional[Iterable[int]] = None,
+                                 local_ids: Optional[Iterable[int]] = None) -> List[Dict[str, Any]]:
+        """
+        Slots com os mediadores e locais livres em cada um, para todos os
+        recursos ativos (ou os informados) de uma só vez
+        """
+        dias = self.dias(data_inicio, data_fim)
+        mediadores = Mediador.objects.filter(ativo=True)
+        locais = LocalAudiencia.objects.filter(ativo=True)
+        if mediador_ids is not None:
+            mediadores = mediadores.filter(id__in=list(mediador_ids))
+        if local_ids is not None:
+            locais = locais.filter(id__in=list(local_ids))
+        mediadores = list(mediadores.only('id', 'disponibilidade_semana'))
+        local_ids = list(locais.values_list('id', flat=True))
+
+        agenda = AgendaRecursos(
+            combinar(dias[0], dt_time.min), combinar(dias[-1] + timedelta(days=1), dt_time.min),
+            mediador_ids=[m.id for m in mediadores], local_ids=local_ids,
+        )
+
+        livres = []
+        for dia in dias:
+            janelas = {m.id: self.expediente_mediador(m, dia) for m in mediadores}
+            for inicio, fim in self.slots(dia, duracao, HORARIO_EXPEDIENTE):
+                mediadores_livres = [
+                    mediador_id for mediador_id, janela in janelas.items()
+                    if janela is not None
+                    and combinar(dia, janela[0]) <= inicio and fim <= combinar(dia, janela[1])
+                    and agenda.livre('mediador', mediador_id, inicio, fim)
+                ]
+                if not mediadores_livres:
+                    continue
+                livres.append(self.formatar(
+                    inicio, fim, duracao,
+                    mediadores=mediadores_livres,
+                    locais=[i for i in local_ids if agenda.livre('local', i, inicio, fim)],
+                ))
+        return livres
+
+
+disponibilidade_service = DisponibilidadeService()
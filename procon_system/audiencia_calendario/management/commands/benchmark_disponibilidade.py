@@ -0,0 +1,109 @@
+"""
+Benchmark da busca de horários livres de audiências
+Uso: python manage.py benchmark_disponibilidade [--mediadores 10] [--locais 5] [--dias 5]
+
+Os dados sintéticos são criados dentro de uma transação desfeita ao final.
+"""
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from audiencia_calendario.disponibilidade import HORARIO_EXPEDIENTE, combinar, disponibilidade_service
+from audiencia_calendario.models import AgendamentoAudiencia, LocalAudiencia, Mediador
+from audiencia_calendario.services import calendario_service
+
+
+class Reverter(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Compara a verificação slot a slot com o motor de disponibilidade (consultas e tempo)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mediadores', type=int, default=10, help='Mediadores sintéticos')
+        parser.add_argument('--locais', type=int, default=5, help='Locais sintéticos')
+        parser.add_argument('--dias', type=int, default=5, help='Dias consultados a partir de amanhã')
+        parser.add_argument('--por-dia', type=int, default=3, help='Audiências por mediador por dia')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.executar(options)
+                raise Reverter
+        except Reverter:
+            pass
+
+    def criar_dados(self, options, dias):
+        User = get_user_model()
+        sufixo = timezone.now().strftime('%H%M%S%f')
+        mediadores = [
+            Mediador.objects.create(
+                usuario=User.objects.create(username=f'bench_mediador_{sufixo}_{i}'),
+                numero_registro=f'B{sufixo[-8:]}{i:03d}',
+            )
+            for i in range(options['mediadores'])
+        ]
+        locais = [
+            LocalAudiencia.objects.create(nome=f'Sala {i}', endereco='Benchmark', tipo_local='SALA_FISICA')
+            for i in range(options['locais'])
+        ]
+        agendamentos = []
+        for dia in dias:
+            for i, mediador in enumerate(mediadores):
+                for n in range(options['por_dia']):
+                    agendamentos.append(AgendamentoAudiencia(
+                        numero_protocolo=f'BENCH{sufixo}{len(agendamentos):06d}',
+                        data_agendamento=combinar(dia, HORARIO_EXPEDIENTE[0]) + timedelta(hours=3 * n, minutes=30 * (i % 2)),
+                        duracao_estimada=timedelta(hours=1, minutes=30),
+                        mediador=mediador,
+                        local=locais[(i + n) % len(locais)] if locais else None,
+                    ))
+        AgendamentoAudiencia.objects.bulk_create(agendamentos)
+        return mediadores, locais, len(agendamentos)
+
+    def medir(self, nome, funcao):
+        with CaptureQueriesContext(connection) as consultas:
+            inicio = time.perf_counter()
+            resultado = funcao()
+            duracao = time.perf_counter() - inicio
+        self.stdout.write(f'{nome:<36} {len(consultas):>7} consultas  {duracao * 1000:>9.1f} ms')
+        return resultado
+
+    def executar(self, options):
+        amanha = timezone.localdate() + timedelta(days=1)
+        dias = [amanha + timedelta(days=i) for i in range(options['dias'])]
+        mediadores, locais, total = self.criar_dados(options, dias)
+        self.stdout.write(f'{len(mediadores)} mediadores, {len(locais)} locais, {total} audiências, {len(dias)} dia(s)')
+
+        duracao = timedelta(hours=1)
+
+        def slot_a_slot():
+            livres = 0
+            for dia in dias:
+                for inicio, _ in disponibilidade_service.slots(dia, duracao, HORARIO_EXPEDIENTE):
+                    for mediador in mediadores:
+                        for local in locais or [None]:
+                            if calendario_service._verificar_disponibilidade(
+                                inicio, mediador.id, local.id if local else None, duracao
+                            )['disponivel']:
+                                livres += 1
+            return livres
+
+        def motor():
+            return sum(
+                len(slot['mediadores']) * (len(slot['locais']) if locais else 1)
+                for slot in disponibilidade_service.horarios_livres_recursos(dias[0], duracao, data_fim=dias[-1])
+            )
+
+        esperado = self.medir('Verificação slot a slot', slot_a_slot)
+        obtido = self.medir('Motor de disponibilidade', motor)
+        if esperado == obtido:
+            self.stdout.write(self.style.SUCCESS(f'✅ {obtido} combinações livres em ambos os cenários'))
+        else:
+            self.stdout.write(self.style.ERROR(f'❌ Divergência: {esperado} x {obtido}'))
@@ -4,7 +4,7 @@ Sistema Procon - Fase 4 - Fluxo Completo do Atendimento
 """
 
 import json
-from datetime import datetime, timedelta, time as dt_time, date as dt_date
+from datetime import datetime, timedelta, date as dt_date
 from typing import Dict, List, Optional, Any, Tuple
 from django.utils import timezone
 from django.db import transaction, models
@@ -12,9 +12,10 @@ from django.core.mail import send_mail
 from django.utils.dateparse import parse_datetime
 
 from .models import (
-    AgendamentoAudiencia, Mediador, LocalAudiencia, 
+    AgendamentoAudiencia, LocalAudiencia, 
     Reagendamento, HistoricoAudiencia
 )
+from .disponibilidade import AgendaRecursos, disponibilidade_service
 from cip_automatica.models import CIPAutomatica
 from logging_config import logger_manager, LoggedOperation, log_execution_time
 
@@ -38,7 +39,8 @@ class CalendarioAudienciaService:
                 disponibilidade = self._verificar_disponibilidade(
                     data=dados['data_agendamento'],
                     mediador_id=dados.get('mediador_id'),
-                    local_id=dados.get('local_id')
+                    local_id=dados.get('local_id'),
+                    duracao=timedelta(hours=dados.get('duracao_horas', 2)),
                 )
                 
                 if not disponibilidade['disponivel']:
@@ -85,107 +87,44 @@ class CalendarioAudienciaService:
     
     @log_execution_time('verificar_disponibilidade')
     def _verificar_disponibilidade(self, data: datetime, mediador_id: Optional[int] = None, 
-                                 local_id: Optional[int] = None) -> Dict[str, Any]:
-        """Verifica disponibilidade de mediador/local para uma data"""
-        
-        data_inicio = data
-        agendamentos_existentes = AgendamentoAudiencia.objects.filter(
-            data_agendamento__date=data_inicio.date(),
-            status__in=['AGENDADA', 'CONFIRMADA', 'EM_ANDAMENTO']
-        ).exclude(id=getattr(self, 'exclude_id', None))
-        
-        conflitos = []
-        
-        # Verificar conflito do mediador
-        if mediador_id:
-            conflitos_mediador = agendamentos_existentes.filter(mediador_id=mediador_id)
-            for ag in conflitos_mediador:
-                conflitos.append({
-                    'tipo': 'mediador',
-                    'resource_id': mediador_id,
-                    'conflito_com': ag.numero_protocolo,
-                    'horario': ag.data_agendamento.strftime('%H:%M'),
-                })
-        
-        # Verificar conflito do local
-        if local_id:
-            conflitos_local = agendamentos_existentes.filter(local_id=local_id)
-            for ag in conflitos_local:
-                conflitos.append({
-                    'tipo': 'local',
-                    'resource_id': local_id,
-                    'conflito_com': ag.numero_protocolo,
-                    'horario': ag.data_agendamento.strftime('%H:%M'),
-                })
-        
-        return {
-            'disponivel': len(conflitos) == 0,
-            'conflitos': conflitos,
-            'motivo': 'Conflito de horário' if conflitos else None,
-        }
+                                   local_id: Optional[int] = None,
+                                   duracao: Optional[timedelta] = None,
+                                   excluir_id: Any = None) -> Dict[str, Any]:
+        """
+        Verifica disponibilidade de mediador/local para o intervalo
+        [data, data + duracao), considerando a duração das audiências já marcadas
+        """
+        duracao = duracao or AgendamentoAudiencia._meta.get_field('duracao_estimada').default
+        agenda = AgendaRecursos(
+            data, data + duracao,
+            mediador_ids=[mediador_id] if mediador_id else None,
+            local_ids=[local_id] if local_id else None,
+            excluir_id=excluir_id or getattr(self, 'exclude_id', None),
+        )
+        return agenda.verificar(data, duracao, mediador_id=mediador_id, local_id=local_id)
     
     @log_execution_time('buscar_horarios_livres')
-    def buscar_horarios_livres(self, data: date, duracao_horas: int = 2, 
-                             mediador_id: Optional[int] = None,
-                             local_id: Optional[int] = None) -> List[Dict[str, Any]]:
-        """Busca horários livres em uma data específica"""
-        
-        horarios_livres = []
-        
-        # Horários funcionamento padrão (08:00 às 18:00)
-        horario_inicio = dt_time(8, 0)
-        horario_fim = dt_time(18, 0)
-        
-        # Se especificado mediador, usar disponibilidade dele
-        if mediador_id:
-            mediador = Mediador.objects.get(id=mediador_id)
-            disponibilidade = mediador.disponibilidade_semana
-            dia_semana = data.strftime('%A').lower()
-            
-            if dia_semana in disponibilidade and disponibilidade[dia_semana]:
-                # Usar horários específicos do mediador
-                hora_inicial = min(disponibilidade[dia_semana]) 
-                hora_final = max(disponibilidade[dia_semana]) 
-                horario_inicio = dt_time(hora_inicial, 0)
-                horario_fim = dt_time(hora_final, 0)
-        
-        # Gerar slots de tempo
-        hora_atual = horario_inicio
-        slot_duracao = timedelta(hours=duracao_horas)
-        
-        while hora_atual <= horario_fim:
-            slot_fim = dt_time.fromisoformat(str(hora_atual)) + slot_duracao
-            if slot_fim.time() > horario_fim:
-                break
-                
-            data_slot = datetime.combine(data, hora_atual)
-            
-            # Verificar se este slot está livre
-            disponibilidade = self._verificar_disponibilidade(
-                data=data_slot,
-                mediador_id=mediador_id,
-                local_id=local_id
-            )
-            
-            if disponibilidade['disponivel']:
-                horarios_livres.append({
-                    'inicio': data_slot,
-                    'fim': datetime.combine(data, slot_fim),
-                    'duracao_horas': duracao_horas,
-                    'formato_visual': data_slot.strftime('%H:%M'),
-                })
-            
-            # Próximo slot (intervalo de 30 minutos)
-            hora_atual = dt_time.fromisoformat(str(hora_atual).replace(':', '-'))
-            hora_atual += timedelta(minutes=30)
-            if hasattr(hora_atual, 'replace'):
-                hora_atual = hora_atual.replace(tzinfo=None)
-        
-        return horarios_livres
+    def buscar_horarios_livres(self, data: dt_date, duracao_horas: float = 2, 
+                               mediador_id: Optional[int] = None,
+                               local_id: Optional[int] = None,
+                               data_fim: Optional[dt_date] = None) -> List[Dict[str, Any]]:
+        """Busca horários livres em uma data (ou até data_fim) com uma única consulta"""
+        return disponibilidade_service.horarios_livres(
+            data, timedelta(hours=duracao_horas),
+            mediador_id=mediador_id, local_id=local_id, data_fim=data_fim,
+        )
+    
+    @log_execution_time('buscar_horarios_livres_recursos')
+    def buscar_horarios_livres_recursos(self, data: dt_date, duracao_horas: float = 2,
+                                        data_fim: Optional[dt_date] = None) -> List[Dict[str, Any]]:
+        """Horários livres com os mediadores e locais disponíveis em cada um"""
+        return disponibilidade_service.horarios_livres_recursos(
+            data, timedelta(hours=duracao_horas), data_fim=data_fim,
+        )
     
     @log_execution_time('registrar_historico')
     def _registrar_historico(self, agendamento: AgendamentoAudiencia, evento: str,
-                           descricao: str, usuario: Any, dados_extras: Dict = None):
+                             descricao: str, usuario: Any, dados_extras: Dict = None):
         """Registra evento no histórico da audiência"""
         
         HistoricoAudiencia.objects.create(
@@ -270,7 +209,7 @@ class ReagendamentoService:
     
     @log_execution_time('solicitar_reagendamento')
     def solicitar_reagendamento(self, agendamento_id: str, nova_data: datetime,
-                              motivo: str, solicitante: Any, observacoes: str = "") -> Reagendamento:
+                                motivo: str, solicitante: Any, observacoes: str = "") -> Reagendamento:
         """Solicita reagendamento de audiência"""
         
         try:
@@ -315,7 +254,9 @@ class ReagendamentoService:
             disponibilidade = calendario_service._verificar_disponibilidade(
                 data=reagendamento.nova_data,
                 mediador_id=agendamento.mediador_id,
-                local_id=agendamento.local_id
+                local_id=agendamento.local_id,
+                duracao=agendamento.duracao_estimada,
+                excluir_id=agendamento.id,
             )
             
             if not disponibilidade['disponivel']:
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('caixa_entrada', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='anexocaixaentrada',
+            name='hash_conteudo',
+            field=models.CharField(blank=True, db_index=True, max_length=64, verbose_name='Hash do Conteúdo (SHA-256)'),
+        ),
+    ]
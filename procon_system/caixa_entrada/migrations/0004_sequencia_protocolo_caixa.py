@@ -0,0 +1,25 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('caixa_entrada', '0003_anexo_hash_conteudo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SequenciaProtocoloCaixa',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ano', models.IntegerField(unique=True, verbose_name='Ano')),
+                ('ultimo_numero', models.IntegerField(default=0, verbose_name='Último Número Gerado')),
+                ('atualizado_em', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+            ],
+            options={
+                'verbose_name': 'Sequência de Protocolo da Caixa de Entrada',
+                'verbose_name_plural': 'Sequências de Protocolo da Caixa de Entrada',
+                'ordering': ['-ano'],
+            },
+        ),
+    ]
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
@@ -149,12 +149,7 @@ class CaixaEntrada(models.Model):
     
     def _gerar_numero_protocolo(self):
         """Gera número único de protocolo"""
-        from datetime import datetime
-        ano = datetime.now().year
-        sequencial = CaixaEntrada.objects.filter(
-            data_entrada__year=ano
-        ).count() + 1
-        return f"PROT-{ano}-{sequencial:06d}"
+        return SequenciaProtocoloCaixa.reservar()[0]
     
     def marcar_como_lido(self, usuario):
         """Marca documento como lido"""
@@ -209,6 +204,50 @@ class CaixaEntrada(models.Model):
         return None
 
 
+class SequenciaProtocoloCaixa(models.Model):
+    """
+    Último número PROT-ANO-NNNNNN emitido no ano. A linha é travada com
+    select_for_update ao reservar, então documentos criados um a um e em lote
+    nunca recebem o mesmo número.
+    """
+    ano = models.IntegerField("Ano", unique=True)
+    ultimo_numero = models.IntegerField("Último Número Gerado", default=0)
+    atualizado_em = models.DateTimeField("Atualizado em", auto_now=True)
+
+    class Meta:
+        verbose_name = "Sequência de Protocolo da Caixa de Entrada"
+        verbose_name_plural = "Sequências de Protocolo da Caixa de Entrada"
+        ordering = ['-ano']
+
+    def __str__(self):
+        return f"Sequência {self.ano}: {self.ultimo_numero}"
+
+    @staticmethod
+    def _ultimo_emitido(ano):
+        # Primeira reserva do ano: continua da numeração já gravada
+        prefixo = f"PROT-{ano}-"
+        maior = CaixaEntrada.objects.filter(numero_protocolo__startswith=prefixo).aggregate(
+            maior=models.Max('numero_protocolo')
+        )['maior']
+        sufixo = maior[len(prefixo):] if maior else ''
+        documentos_ano = CaixaEntrada.objects.filter(data_entrada__year=ano).count()
+        return max(documentos_ano, int(sufixo) if sufixo.isdigit() else 0)
+
+    @classmethod
+    def reservar(cls, quantidade=1):
+        """Reserva os próximos números do ano em sequência"""
+        from datetime import datetime
+        ano = datetime.now().year
+        with transaction.atomic():
+            sequencia, _ = cls.objects.select_for_update().get_or_create(
+                ano=ano, defaults={'ultimo_numero': lambda: cls._ultimo_emitido(ano)}
+            )
+            inicio = sequencia.ultimo_numero
+            sequencia.ultimo_numero += quantidade
+            sequencia.save(update_fields=['ultimo_numero', 'atualizado_em'])
+        return [f"PROT-{ano}-{numero:06d}" for numero in range(inicio + 1, inicio + quantidade + 1)]
+
+
 class AnexoCaixaEntrada(models.Model):
     """Anexos dos documentos na caixa de entrada"""
     
@@ -217,6 +256,7 @@ class AnexoCaixaEntrada(models.Model):
     nome_original = models.CharField("Nome Original", max_length=255)
     tipo_mime = models.CharField("Tipo MIME", max_length=100)
     tamanho = models.PositiveIntegerField("Tamanho (bytes)")
+    hash_conteudo = models.CharField("Hash do Conteúdo (SHA-256)", max_length=64, blank=True, db_index=True)
     
     # Metadados
     descricao = models.CharField("Descrição", max_length=200, blank=True)
@@ -0,0 +1,135 @@
+import datetime
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('audiencia_calendario', '__first__'),
+        ('caixa_entrada', '0004_sequencia_protocolo_caixa'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TipoCIP',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome', models.CharField(max_length=100, unique=True)),
+                ('codigo', models.CharField(max_length=50, unique=True)),
+                ('descricao', models.TextField(blank=True)),
+                ('template_cip', models.TextField(help_text='Template da CIP em HTML')),
+                ('prazo_resposta', models.PositiveIntegerField(default=10, help_text='Prazo em dias para resposta da empresa')),
+                ('prazo_acordo', models.PositiveIntegerField(default=15, help_text='Prazo em dias para acordo de pagamento')),
+                ('valor_minimo', models.DecimalField(decimal_places=2, default=0, help_text='Valor mínimo para gerar CIP', max_digits=10)),
+                ('valor_maximo', models.DecimalField(blank=True, decimal_places=2, help_text='Valor máximo para gerar CIP', max_digits=10, null=True)),
+                ('setor_responsavel', models.CharField(max_length=100)),
+                ('ativo', models.BooleanField(default=True)),
+            ],
+            options={
+                'verbose_name': 'Tipo de CIP',
+                'verbose_name_plural': 'Tipos de CIP',
+            },
+        ),
+        migrations.CreateModel(
+            name='CIPAutomatica',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('numero_protocolo', models.CharField(blank=True, max_length=50, unique=True)),
+                ('numero_cip', models.CharField(blank=True, max_length=50, unique=True)),
+                ('status', models.CharField(choices=[('GERADA', 'Gerada'), ('ENVIADA', 'Enviada'), ('ENTREGUECIDADAO', 'Entregue ao Cidadão'), ('PRODUCAO_JURIDICA', 'Em Produção Jurídica'), ('MANDADO_BUSCA', 'Mandado de Busca'), ('OBJECAO_PRECARIO', 'Objeção de Precário'), ('ARQUIVADA', 'Arquivada'), ('RESPONDIDA_EMPRESA', 'Respondida pela Empresa'), ('ACEITA_EMPRESA', 'Aceita pela Empresa'), ('RECUSADA_EMPRESA', 'Recusada pela Empresa')], default='GERADA', max_length=30)),
+                ('prioridade', models.CharField(choices=[('NORMAL', 'Normal'), ('ALTA', 'Alta'), ('URGENTE', 'Urgente'), ('CRITICA', 'Crítica')], default='NORMAL', max_length=15)),
+                ('consumidor_nome', models.CharField(max_length=200)),
+                ('consumidor_cpf', models.CharField(max_length=15)),
+                ('consumidor_email', models.EmailField(max_length=254)),
+                ('consumidor_telefone', models.CharField(max_length=20)),
+                ('consumidor_endereco', models.TextField()),
+                ('consumidor_cidade', models.CharField(max_length=100)),
+                ('consumidor_uf', models.CharField(max_length=2)),
+                ('consumidor_cep', models.CharField(max_length=10)),
+                ('empresa_razao_social', models.CharField(max_length=200)),
+                ('empresa_cnpj', models.CharField(max_length=18)),
+                ('empresa_endereco', models.TextField()),
+                ('empresa_cidade', models.CharField(max_length=100)),
+                ('empresa_uf', models.CharField(max_length=2)),
+                ('empresa_email', models.EmailField(blank=True, max_length=254, null=True)),
+                ('empresa_telefone', models.CharField(blank=True, max_length=20, null=True)),
+                ('assunto', models.CharField(max_length=300)),
+                ('descricao_fatos', models.TextField()),
+                ('valor_indenizacao', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('valor_multa', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('valor_total', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('data_geracao', models.DateTimeField(auto_now_add=True)),
+                ('data_envio_producao', models.DateTimeField(blank=True, null=True)),
+                ('data_entrega_cidadao', models.DateTimeField(blank=True, null=True)),
+                ('prazo_resposta_empresa', models.DateTimeField()),
+                ('prazo_acordo_pagamento', models.DateTimeField()),
+                ('documento_cip', models.FileField(blank=True, null=True, upload_to='cip/documentos/')),
+                ('observacoes', models.TextField(blank=True)),
+                ('documento_origem', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='caixa_entrada.caixaentrada')),
+                ('historico_relacionado', models.ManyToManyField(blank=True, related_name='cips_viculadas', to='audiencia_calendario.historicoaudiencia')),
+                ('responsavel_juridico', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='cips_juridicas', to=settings.AUTH_USER_MODEL)),
+                ('responsavel_producao', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='cips_producao', to=settings.AUTH_USER_MODEL)),
+                ('tipo_cip', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='cip_automatica.tipocip')),
+            ],
+            options={
+                'verbose_name': 'CIP Automática',
+                'verbose_name_plural': 'CIPs Automáticas',
+                'ordering': ['-data_geracao'],
+            },
+        ),
+        migrations.CreateModel(
+            name='AudienciaConciligiao',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('tipo', models.CharField(choices=[('CONCILIACAO_PRESENCIAL', 'Conciliação Presencial'), ('CONCILIACAO_VIRTUAL', 'Conciliação Virtual'), ('AUDIENCIA_JURIDICA', 'Audência Jurídica'), ('MEDIACAO', 'Mediação'), ('ARBITRAGEM', 'Arbitragen')], max_length=25)),
+                ('status', models.CharField(choices=[('AGENDADA', 'Agendada'), ('REALIZADA', 'Realizada'), ('ADIADA', 'Adiada'), ('CANCELADA', 'Cancelada'), ('MEDIACUON_SEM_SUCESSO', 'Mediação sem Sucesso'), ('ACORDO_FEITO', 'Acordo Feito')], default='AGENDADA', max_length=25)),
+                ('data_agendamento', models.DateTimeField()),
+                ('data_realizacao', models.DateTimeField()),
+                ('duracao_estimada', models.DurationField(default=datetime.timedelta(seconds=3600))),
+                ('localizacao', models.CharField(max_length=200)),
+                ('modalidade', models.CharField(choices=[('PRESENCIAL', 'Presencial'), ('VIRTUAL', 'Virtual'), ('HIBRIDO', 'Híbrido')], max_length=20)),
+                ('participantes_consumidor', models.JSONField(default=list)),
+                ('participantes_empresa', models.JSONField(default=list)),
+                ('ata_audiência', models.FileField(blank=True, null=True, upload_to='audiencias/atas/')),
+                ('resultados_acordo', models.JSONField(blank=True, default=dict)),
+                ('valor_acordado', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+                ('observacoes', models.TextField()),
+                ('mediador', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='audiencias_mediadas', to=settings.AUTH_USER_MODEL)),
+                ('cips_relacionadas', models.ManyToManyField(related_name='audiencia_relacionadas', to='cip_automatica.cipautomatica')),
+            ],
+            options={
+                'verbose_name': 'Audência de Conciliação',
+                'verbose_name_plural': 'Audências de Conciliação',
+                'ordering': ['data_realizacao'],
+            },
+        ),
+        migrations.CreateModel(
+            name='RespostaEmpresa',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo_resposta', models.CharField(choices=[('ACEITA_TOTALMENTE', 'Aceita Totalmente'), ('ACEITA_PARCIALMENTE', 'Aceita Parcialmente'), ('RECUSA_COM_JUSTIFICATIVA', 'Recusa com Justificativa'), ('SOLICITA_MEDUACAO', 'Solicita Medição'), ('SOLICITA_PROVAS', 'Solicita Provas'), ('OBJETA_PROCESSO', 'Objetiva o Processo'), ('PROPOSTA_CONTESTACION', 'Proposta de Contensão')], max_length=30)),
+                ('status', models.CharField(choices=[('ANALISANDO', 'Analisando'), ('ACEITA', 'Aceita'), ('REJEITADA', 'Rejeitada'), ('AGUARDANDO_COMPLEMENTO', 'Aguardando Complemento'), ('ENCAMINHADO_PROCESSO', 'Encaminhado para Processo')], default='ANALISANDO', max_length=30)),
+                ('texto_resposta', models.TextField()),
+                ('valor_oferecido', models.DecimalField(blank=True, decimal_places=2, help_text='Valor oferecido pela empresa (se aplicável)', max_digits=10, null=True)),
+                ('prazo_pagamento_oferecido', models.IntegerField(blank=True, help_text='Prazo de pagamento oferecido em dias', null=True)),
+                ('data_recebimento', models.DateTimeField(auto_now_add=True)),
+                ('prazo_analise', models.DateTimeField()),
+                ('decisao_final', models.TextField(blank=True)),
+                ('data_decisao', models.DateTimeField(blank=True, null=True)),
+                ('documentos_anexos', models.JSONField(blank=True, default=list)),
+                ('cip', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='resposta', to='cip_automatica.cipautomatica')),
+                ('responsavel_analise', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='respostas_analisadas', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Resposta da Empresa',
+                'verbose_name_plural': 'Respostas das Empresas',
+            },
+        ),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cip_automatica', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='respostaempresa',
+            name='dados_analise_ia',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -272,7 +272,10 @@ class RespostaEmpresa(models.Model):
     
     # Documentos anexos
     documentos_anexos = models.JSONField(default=list, blank=True)
-    
+
+    # Resultado da análise automatizada (resposta_empresa/services.py)
+    dados_analise_ia = models.JSONField(default=dict, blank=True)
+
     class Meta:
         verbose_name = "Resposta da Empresa"
         verbose_name_plural = "Respostas das Empresas"
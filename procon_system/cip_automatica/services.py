@@ -346,29 +346,34 @@ class CIPTrackingService:
     
     @log_execution_time('cip_deadline_check')
     def verificar_prazos_vencidos(self) -> List[Dict[str, Any]]:
-        """Verifica CIPs com prazos vencidos"""
+        """Verifica CIPs com prazos vencidos (lidas do índice de prazos)"""
+        from monitoring.prazos import varredura_prazos_service
         
         agora = timezone.now()
-        cips_vencidas = CIPAutomatica.objects.filter(
-            prazo_resposta_empresa__lt=agora,
-            status__in=['ENVIADA', 'PRODUCAO_JURIDICA']
+        vencidas = dict(
+            varredura_prazos_service.vencidos('cip', agora).values_list('objeto_id', 'vencimento')
+        )
+        cips = CIPAutomatica.objects.filter(id__in=list(vencidas)).values(
+            'id', 'numero_cip', 'empresa_razao_social', 'consumidor_nome', 'valor_total'
         )
         
         alertas = []
         
-        for cip in cips_vencidas:
-            dias_vencido = (agora - cip.prazo_resposta_empresa).days
+        for cip in cips:
+            dias_vencido = (agora - vencidas[str(cip['id'])]).days
             
             alertas.append({
-                'cip_id': cip.id,
-                'numero_cip': cip.numero_cip,
-                'empresa': cip.empresa_razao_social,
-                'consumidor': cip.consumidor_nome,
-                'valor_total': float(cip.valor_total),
+                'cip_id': cip['id'],
+                'numero_cip': cip['numero_cip'],
+                'empresa': cip['empresa_razao_social'],
+                'consumidor': cip['consumidor_nome'],
+                'valor_total': float(cip['valor_total']),
                 'dias_vencido': dias_vencido,
                 'status': 'urgente' if dias_vencido > 5 else 'atencao',
             })
         
+        alertas.sort(key=lambda alerta: alerta['dias_vencido'], reverse=True)
+        
         # Log dos prazos vencedidos
         if alertas:
             self.logger.logger.warning(f'{len(alertas)} CIPs com prazos vencidos encontrados')
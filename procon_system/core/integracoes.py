@@ -0,0 +1,229 @@
+"""
+Cliente compartilhado para integrações com cadastros externos (CNPJ, CEP, TJ)
+Inclui: sessão HTTP com pool de conexões, retries com backoff, circuit breaker,
+cache TTL por documento normalizado e consulta em lote concorrente
+"""
+import logging
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+
+# Configuração padrão por integração; pode ser sobrescrita em
+# settings.INTEGRACOES_EXTERNAS = {'cep': {'timeout': 3, ...}, ...}
+CONFIG_PADRAO = {
+    'timeout': 5,
+    'max_retries': 2,
+    'backoff': 0.3,
+    'cache_ttl': 60 * 60 * 24,  # 24 horas
+    'pool_size': 10,
+    'limite_falhas': 5,
+    'tempo_recuperacao': 30,
+    'max_workers': 8,
+}
+
+
+class CircuitoAbertoError(Exception):
+    """Levantada quando o circuit breaker da integração está aberto"""
+
+
+class CircuitBreaker:
+    """Circuit breaker simples (fechado -> aberto -> semi-aberto) thread-safe"""
+
+    FECHADO = 'FECHADO'
+    ABERTO = 'ABERTO'
+    SEMI_ABERTO = 'SEMI_ABERTO'
+
+    def __init__(self, limite_falhas: int = 5, tempo_recuperacao: float = 30):
+        self.limite_falhas = limite_falhas
+        self.tempo_recuperacao = tempo_recuperacao
+        self._falhas = 0
+        self._aberto_em: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def estado(self) -> str:
+        with self._lock:
+            return self._estado_atual()
+
+    def _estado_atual(self) -> str:
+        if self._aberto_em is None:
+            return self.FECHADO
+        if time.monotonic() - self._aberto_em >= self.tempo_recuperacao:
+            return self.SEMI_ABERTO
+        return self.ABERTO
+
+    def permitir(self) -> bool:
+        """Indica se uma nova chamada pode ser feita"""
+        with self._lock:
+            return self._estado_atual() != self.ABERTO
+
+    def registrar_sucesso(self) -> None:
+        with self._lock:
+            self._falhas = 0
+            self._aberto_em = None
+
+    def registrar_falha(self) -> None:
+        with self._lock:
+            self._falhas += 1
+            if self._estado_atual() == self.SEMI_ABERTO or self._falhas >= self.limite_falhas:
+                self._aberto_em = time.monotonic()
+
+
+def normalizar_documento(valor: str) -> str:
+    """Mantém apenas os dígitos de CEP/CPF/CNPJ"""
+    return re.sub(r'[^\d]', '', valor or '')
+
+
+def normalizar_numero_processo(valor: str) -> str:
+    """Normaliza número de processo judicial para uso como chave de cache"""
+    return re.sub(r'\s+', '', (valor or '')).upper()
+
+
+class ClienteIntegracao:
+    """Cliente HTTP reutilizável para uma integração externa"""
+
+    def __init__(self, nome: str, **config):
+        self.nome = nome
+        opcoes = {**CONFIG_PADRAO, **config}
+        self.timeout = opcoes['timeout']
+        self.cache_ttl = opcoes['cache_ttl']
+        self.max_workers = opcoes['max_workers']
+        self.circuit_breaker = CircuitBreaker(
+            limite_falhas=opcoes['limite_falhas'],
+            tempo_recuperacao=opcoes['tempo_recuperacao'],
+        )
+        self.session = self._criar_sessao(
+            opcoes['pool_size'], opcoes['max_retries'], opcoes['backoff']
+        )
+
+    def _criar_sessao(self, pool_size: int, max_retries: int, backoff: float) -> requests.Session:
+        """Cria sessão com pool de conexões e retries com backoff exponencial"""
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=max_retries,
+            backoff_factor=backoff,
+            status_forcelist=(429, 502, 503, 504),
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """GET protegido pelo circuit breaker; erros de rede e 5xx contam como falha"""
+        if not self.circuit_breaker.permitir():
+            raise CircuitoAbertoError(f'Integração {self.nome} temporariamente indisponível')
+
+        kwargs.setdefault('timeout', self.timeout)
+        try:
+            response = self.session.get(url, **kwargs)
+        except requests.exceptions.RequestException:
+            self.circuit_breaker.registrar_falha()
+            raise
+
+        if response.status_code >= 500:
+            self.circuit_breaker.registrar_falha()
+        else:
+            self.circuit_breaker.registrar_sucesso()
+        return response
+
+    def _chave_cache(self, chave: str) -> str:
+        return f'integracao:{self.nome}:{chave}'
+
+    def consultar(self, chave: str, buscar: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Retorna o resultado em cache para a chave normalizada ou executa a busca.
+        Apenas resultados com 'sucesso' são armazenados.
+        """
+        cache_key = self._chave_cache(chave)
+        resultado = cache.get(cache_key)
+        if resultado is not None:
+            return resultado
+
+        resultado = buscar()
+        if resultado.get('sucesso'):
+            cache.set(cache_key, resultado, self.cache_ttl)
+        return resultado
+
+    def consultar_lote(self,
+                       chaves: Iterable[str],
+                       buscar: Callable[[str], Dict[str, Any]],
+                       max_workers: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Resolve várias chaves de uma vez: lê o cache em uma única operação e
+        busca as ausentes concorrentemente, reutilizando a mesma sessão HTTP.
+        """
+        chaves_unicas = list(dict.fromkeys(chaves))
+        if not chaves_unicas:
+            return {}
+
+        em_cache = cache.get_many([self._chave_cache(chave) for chave in chaves_unicas])
+        resultados = {}
+        pendentes = []
+        for chave in chaves_unicas:
+            valor = em_cache.get(self._chave_cache(chave))
+            if valor is not None:
+                resultados[chave] = valor
+            else:
+                pendentes.append(chave)
+
+        if pendentes:
+            workers = min(max_workers or self.max_workers, len(pendentes))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                buscados = list(executor.map(buscar, pendentes))
+
+            para_cache = {}
+            for chave, resultado in zip(pendentes, buscados):
+                resultados[chave] = resultado
+                if resultado.get('sucesso'):
+                    para_cache[self._chave_cache(chave)] = resultado
+            if para_cache:
+                cache.set_many(para_cache, self.cache_ttl)
+
+        return resultados
+
+    def invalidar(self, chave: str) -> None:
+        cache.delete(self._chave_cache(chave))
+
+
+_clientes: Dict[str, ClienteIntegracao] = {}
+_clientes_lock = threading.Lock()
+
+
+def obter_cliente(nome: str) -> ClienteIntegracao:
+    """Retorna o cliente compartilhado (singleton por processo) da integração"""
+    cliente = _clientes.get(nome)
+    if cliente is not None:
+        return cliente
+
+    with _clientes_lock:
+        cliente = _clientes.get(nome)
+        if cliente is None:
+            config = getattr(settings, 'INTEGRACOES_EXTERNAS', {}).get(nome, {})
+            cliente = ClienteIntegracao(nome, **config)
+            _clientes[nome] = cliente
+        return cliente
+
+
+def resetar_clientes() -> None:
+    """Descarta os clientes compartilhados (útil em testes e após mudar settings)"""
+    with _clientes_lock:
+        for cliente in _clientes.values():
+            cliente.session.close()
+        _clientes.clear()
@@ -0,0 +1,72 @@
+"""
+Execução em lotes com pool de processos, compartilhada pelos serviços
+
+Os itens são divididos em blocos e cada bloco é processado em um worker do
+pool de processos; poucos blocos em andamento por worker mantêm a memória
+limitada e os resultados voltam ao processo principal na ordem de leitura
+(onde ficam as gravações em lote). Usado pela reanálise de respostas e
+feedbacks, pelo OCR por página, pela renderização de autos e pela
+assinatura digital de pareceres.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Tuple
+
+
+def agrupar(itens: Iterable, tamanho: int) -> Iterator[List]:
+    """Divide um iterável em listas de até `tamanho` itens"""
+    iterador = iter(itens)
+    while True:
+        lote = list(islice(iterador, tamanho))
+        if not lote:
+            return
+        yield lote
+
+
+def executar_em_lotes(funcao: Callable[[List], List], lotes: Iterable[List], max_workers: int = 1,
+                      min_lotes_pool: int = 2) -> Iterator[Tuple[List, List]]:
+    """
+    Gera (lote, resultado) na ordem dos lotes. `funcao` precisa estar no nível
+    do módulo para ser enviada aos workers; com um worker ou poucos lotes tudo
+    roda no processo atual.
+    """
+    lotes = iter(lotes)
+    iniciais = list(islice(lotes, max(min_lotes_pool, 1)))
+    if max_workers <= 1 or len(iniciais) < min_lotes_pool:
+        for lote in iniciais:
+            yield lote, funcao(lote)
+        for lote in lotes:
+            yield lote, funcao(lote)
+        return
+
+    em_andamento = max_workers * 2
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        pendentes = [(lote, executor.submit(funcao, lote)) for lote in iniciais]
+        for lote in lotes:
+            while len(pendentes) >= em_andamento:
+                primeiro, futuro = pendentes.pop(0)
+                yield primeiro, futuro.result()
+            pendentes.append((lote, executor.submit(funcao, lote)))
+        for lote, futuro in pendentes:
+            yield lote, futuro.result()
+
+
+def _aplicar_a_cada(funcao: Callable, lote: List) -> List:
+    return [funcao(item) for item in lote]
+
+
+def mapear(funcao: Callable, itens: Iterable, max_workers: int = 1, min_itens_pool: int = 2) -> List:
+    """
+    Aplica `funcao` (nível do módulo) a cada item e devolve os resultados na
+    ordem dos itens; com um worker ou menos de `min_itens_pool` itens tudo
+    roda no processo atual
+    """
+    itens = list(itens)
+    if max_workers <= 1 or len(itens) < min_itens_pool:
+        return [funcao(item) for item in itens]
+
+    tamanho = max(1, len(itens) // (max_workers * 4))
+    lotes = executar_em_lotes(partial(_aplicar_a_cada, funcao), agrupar(itens, tamanho), max_workers, min_lotes_pool=1)
+    return [resultado for _, resultados in lotes for resultado in resultados]
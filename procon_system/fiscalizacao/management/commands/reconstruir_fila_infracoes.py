@@ -0,0 +1,24 @@
+"""
+Comando para reconstruir a fila de autos com potencial infração
+Uso: python manage.py reconstruir_fila_infracoes [--tipo banco --tipo posto]
+"""
+
+from django.core.management.base import BaseCommand
+from fiscalizacao.services.fila_infracao_service import REGRAS, fila_infracao_service
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói a tabela FilaAutoInfracao a partir dos autos de constatação existentes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tipo',
+            action='append',
+            choices=list(REGRAS),
+            help='Tipo a reconstruir (pode ser repetido; padrão: todos)',
+        )
+
+    def handle(self, *args, **options):
+        totais = fila_infracao_service.reconstruir(options['tipo'])
+        for tipo, total in totais.items():
+            self.stdout.write(self.style.SUCCESS(f'📋 {tipo}: {total} auto(s) aguardando infração'))
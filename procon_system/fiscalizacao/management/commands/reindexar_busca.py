@@ -0,0 +1,24 @@
+"""
+Comando para reconstruir o índice de busca unificada de autos e processos
+Uso: python manage.py reindexar_busca [--tipo banco --tipo processo]
+"""
+
+from django.core.management.base import BaseCommand
+from fiscalizacao.services.busca_service import MODELOS_AUTO, busca_unificada_service
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói a tabela IndiceBuscaAuto a partir dos autos e processos existentes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tipo',
+            action='append',
+            choices=[*MODELOS_AUTO, 'processo'],
+            help='Tipo a reindexar (pode ser repetido; padrão: todos)',
+        )
+
+    def handle(self, *args, **options):
+        totais = busca_unificada_service.reindexar(options['tipo'])
+        for tipo, total in totais.items():
+            self.stdout.write(self.style.SUCCESS(f'🔎 {tipo}: {total} registro(s) indexado(s)'))
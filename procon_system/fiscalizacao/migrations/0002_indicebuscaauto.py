@@ -0,0 +1,60 @@
+from django.db import migrations, models
+
+
+def criar_indice_trigrama(apps, schema_editor):
+    """Habilita pg_trgm e cria o índice GIN de trigramas (apenas PostgreSQL)"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS fisc_indice_busca_trgm_idx '
+        'ON fiscalizacao_indicebuscaauto USING gin (texto_busca gin_trgm_ops)'
+    )
+
+
+def remover_indice_trigrama(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS fisc_indice_busca_trgm_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fiscalizacao', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndiceBuscaAuto',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('banco', 'Auto de Banco'), ('posto', 'Auto de Posto'), ('supermercado', 'Auto de Supermercado'), ('diversos', 'Auto Diversos'), ('processo', 'Processo Administrativo')], max_length=20, verbose_name='Tipo')),
+                ('objeto_id', models.PositiveIntegerField(verbose_name='ID do Objeto')),
+                ('numero', models.CharField(blank=True, max_length=50, verbose_name='Número')),
+                ('razao_social', models.CharField(blank=True, max_length=255, verbose_name='Razão Social')),
+                ('nome_fantasia', models.CharField(blank=True, max_length=255, verbose_name='Nome Fantasia')),
+                ('cnpj', models.CharField(blank=True, max_length=18, verbose_name='CNPJ')),
+                ('cnpj_digitos', models.CharField(blank=True, max_length=14, verbose_name='CNPJ (somente dígitos)')),
+                ('municipio', models.CharField(blank=True, max_length=100, verbose_name='Município')),
+                ('data_fiscalizacao', models.DateField(blank=True, null=True, verbose_name='Data da Fiscalização')),
+                ('texto_busca', models.TextField(blank=True, verbose_name='Texto Normalizado')),
+                ('atualizado_em', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+            ],
+            options={
+                'verbose_name': 'Índice de Busca',
+                'verbose_name_plural': 'Índice de Busca',
+                'ordering': ['-data_fiscalizacao', '-id'],
+                'indexes': [
+                    models.Index(fields=['-data_fiscalizacao'], name='fisc_indice_busca_data_idx'),
+                    models.Index(fields=['tipo', '-data_fiscalizacao'], name='fisc_indice_busca_tipo_idx'),
+                    models.Index(fields=['cnpj_digitos'], name='fisc_indice_busca_cnpj_idx'),
+                    models.Index(fields=['numero'], name='fisc_indice_busca_numero_idx'),
+                ],
+                'constraints': [
+                    models.UniqueConstraint(fields=('tipo', 'objeto_id'), name='fisc_indice_busca_objeto_uniq'),
+                ],
+            },
+        ),
+        migrations.RunPython(criar_indice_trigrama, remover_indice_trigrama),
+    ]
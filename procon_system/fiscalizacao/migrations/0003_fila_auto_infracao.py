@@ -0,0 +1,86 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+REGRAS_FILA = (
+    ('banco', 'AutoBanco', True, 'Diversas irregularidades bancárias'),
+    ('posto', 'AutoPosto', True, 'Irregularidades em posto de combustível'),
+    ('supermercado', 'AutoSupermercado', False, 'Irregularidades em supermercado'),
+)
+
+
+def popular_fila(apps, schema_editor):
+    """Carga inicial da fila (ainda não há infrações vinculadas a autos de origem)"""
+    FilaAutoInfracao = apps.get_model('fiscalizacao', 'FilaAutoInfracao')
+    for tipo, nome_modelo, usa_sem_irregularidades, descricao in REGRAS_FILA:
+        queryset = apps.get_model('fiscalizacao', nome_modelo).objects.filter(nada_consta=False)
+        if usa_sem_irregularidades:
+            queryset = queryset.filter(sem_irregularidades=False)
+        lote = []
+        for auto in queryset.values('id', 'numero', 'razao_social', 'cnpj', 'data_fiscalizacao').iterator(chunk_size=1000):
+            lote.append(FilaAutoInfracao(
+                tipo=tipo,
+                objeto_id=auto['id'],
+                numero=auto['numero'] or '',
+                razao_social=auto['razao_social'] or '',
+                cnpj=auto['cnpj'] or '',
+                data_fiscalizacao=auto['data_fiscalizacao'],
+                irregularidades=descricao,
+            ))
+            if len(lote) >= 1000:
+                FilaAutoInfracao.objects.bulk_create(lote)
+                lote = []
+        if lote:
+            FilaAutoInfracao.objects.bulk_create(lote)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('fiscalizacao', '0002_indicebuscaauto'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='autoinfracao',
+            name='content_type',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='contenttypes.contenttype', verbose_name='Tipo do Auto de Origem'),
+        ),
+        migrations.AddField(
+            model_name='autoinfracao',
+            name='object_id',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='ID do Auto de Origem'),
+        ),
+        migrations.AddIndex(
+            model_name='autoinfracao',
+            index=models.Index(fields=['content_type', 'object_id'], name='fisc_infracao_origem_idx'),
+        ),
+        migrations.CreateModel(
+            name='FilaAutoInfracao',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('banco', 'Auto de Banco'), ('posto', 'Auto de Posto'), ('supermercado', 'Auto de Supermercado')], max_length=20, verbose_name='Tipo')),
+                ('objeto_id', models.PositiveIntegerField(verbose_name='ID do Auto')),
+                ('numero', models.CharField(blank=True, max_length=20, verbose_name='Número do Auto')),
+                ('razao_social', models.CharField(blank=True, max_length=255, verbose_name='Razão Social')),
+                ('cnpj', models.CharField(blank=True, max_length=18, verbose_name='CNPJ')),
+                ('data_fiscalizacao', models.DateField(verbose_name='Data da Fiscalização')),
+                ('irregularidades', models.CharField(blank=True, max_length=255, verbose_name='Irregularidades')),
+                ('entrou_na_fila_em', models.DateTimeField(auto_now_add=True, verbose_name='Entrou na Fila em')),
+            ],
+            options={
+                'verbose_name': 'Auto Aguardando Infração',
+                'verbose_name_plural': 'Fila de Autos Aguardando Infração',
+                'ordering': ['-data_fiscalizacao', '-id'],
+                'indexes': [
+                    models.Index(fields=['-data_fiscalizacao', '-id'], name='fisc_fila_infracao_data_idx'),
+                    models.Index(fields=['tipo', '-data_fiscalizacao'], name='fisc_fila_infracao_tipo_idx'),
+                ],
+                'constraints': [
+                    models.UniqueConstraint(fields=('tipo', 'objeto_id'), name='fisc_fila_infracao_objeto_uniq'),
+                ],
+            },
+        ),
+        migrations.RunPython(popular_fila, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fiscalizacao', '0003_fila_auto_infracao'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='anexoauto',
+            name='hash_conteudo',
+            field=models.CharField(blank=True, db_index=True, max_length=64, verbose_name='Hash do Conteúdo (SHA-256)'),
+        ),
+    ]
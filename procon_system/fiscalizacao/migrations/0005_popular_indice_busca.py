@@ -0,0 +1,19 @@
+from django.db import migrations
+
+
+def popular_indice(apps, schema_editor):
+    # O índice foi criado vazio e a busca unificada lê só dele
+    from fiscalizacao.services.busca_service import busca_unificada_service
+
+    busca_unificada_service.reindexar(apps=apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fiscalizacao', '0004_anexoauto_hash_conteudo'),
+    ]
+
+    operations = [
+        migrations.RunPython(popular_indice, migrations.RunPython.noop),
+    ]
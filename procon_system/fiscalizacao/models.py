@@ -515,6 +515,7 @@ class AnexoAuto(models.Model):
     content_object = GenericForeignKey('content_type', 'object_id')
     
     arquivo = models.FileField("Arquivo Anexo", upload_to='anexos/%Y/%m/%d/')
+    hash_conteudo = models.CharField("Hash do Conteúdo (SHA-256)", max_length=64, blank=True, db_index=True)
     descricao = models.CharField("Descrição", max_length=255, blank=True)
     enviado_em = models.DateTimeField(auto_now_add=True)
 
@@ -675,6 +676,12 @@ class AutoInfracao(models.Model):
                                              upload_to='assinaturas/infrações/', 
                                              blank=True, null=True)
     
+    # === AUTO DE CONSTATAÇÃO DE ORIGEM ===
+    content_type = models.ForeignKey(ContentType, on_delete=models.SET_NULL, null=True, blank=True,
+                                     verbose_name="Tipo do Auto de Origem")
+    object_id = models.PositiveIntegerField("ID do Auto de Origem", null=True, blank=True)
+    auto_constatacao = GenericForeignKey('content_type', 'object_id')
+    
     # === METADADOS ===
     criado_em = models.DateTimeField(auto_now_add=True)
     atualizado_em = models.DateTimeField(auto_now=True)
@@ -684,6 +691,7 @@ class AutoInfracao(models.Model):
         verbose_name_plural = "Autos de Infração"
         ordering = ['-data_fiscalizacao', '-numero']
         indexes = [
+            models.Index(fields=['content_type', 'object_id'], name='fisc_infracao_origem_idx'),
             models.Index(fields=['numero']),
             models.Index(fields=['data_fiscalizacao']),
             models.Index(fields=['razao_social']),
@@ -765,27 +773,10 @@ class AutoInfracao(models.Model):
 
     def gerar_documento_docx(self):
         """Gera documento Word do Auto de Infração"""
-        from django.template.loader import get_template
-        from docx import Document
         from io import BytesIO
+        from .services import documento_auto_service
         
-        # Carrega template
-        doc = Document('fiscalizacao/templates/docs/AutoInfracao.docx')
-        
-        # Substitui marcadores no documento
-        context = {
-            'auto': self,
-            'data_extenso': self.data_fiscalizacao.strftime('%d de %B de %Y'),
-            'hora_formatada': self.hora_fiscalizacao.strftime('%H:%M'),
-        }
-        
-        # Processamento do documento (implementar conforme necessário)
-        
-        # Retorna o documento
-        buffer = BytesIO()
-        doc.save(buffer)
-        buffer.seek(0)
-        return buffer
+        return BytesIO(documento_auto_service.renderizar('infracao', self))
 
 
 
@@ -940,6 +931,7 @@ class Processo(models.Model):
         ('arquivado', 'Arquivado'),
         ('prescrito', 'Prescrito'),
     ]
+    STATUS_FINALIZADOS = ['finalizado_procedente', 'finalizado_improcedente', 'arquivado', 'prescrito']
     
     status = models.CharField(
         "Status do Processo", 
@@ -1074,6 +1066,18 @@ class Processo(models.Model):
     def __str__(self):
         return f"{self.numero_processo} - {self.autuado}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Status como veio do banco: o signal de histórico compara com ele sem consultar
+        instance._status_carregado = instance.__dict__.get('status')
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        if 'status' in self.__dict__:
+            self._status_carregado = self.status
+
     def save(self, *args, **kwargs):
         """Override do save para gerar número do processo automaticamente"""
         if not self.numero_processo:
@@ -1087,11 +1091,13 @@ class Processo(models.Model):
             self.fiscal_responsavel = self.auto_infracao.fiscal_responsavel
         
         # Atualiza data de finalização se status for finalizado
-        if self.status in ['finalizado_procedente', 'finalizado_improcedente', 'arquivado', 'prescrito']:
+        if self.status in self.STATUS_FINALIZADOS:
             if not self.data_finalizacao:
                 self.data_finalizacao = timezone.now().date()
         
         super().save(*args, **kwargs)
+        self._status_carregado = self.status
+        self._observacao_status = self._usuario_status = ''
 
     def _gerar_numero_processo(self):
         """Gera número sequencial para o processo"""
@@ -1234,9 +1240,8 @@ class Processo(models.Model):
         # Prazo padrão: 10 dias para recurso (será calculado após defesa)
         # self.prazo_recurso será definido quando defesa for apresentada
 
-    def atualizar_status(self, novo_status, observacao=""):
+    def atualizar_status(self, novo_status, observacao="", usuario="Sistema"):
         """Atualiza status do processo e registra no histórico"""
-        status_anterior = self.status
         self.status = novo_status
         
         # Atualiza datas específicas
@@ -1250,23 +1255,14 @@ class Processo(models.Model):
         elif novo_status == 'recurso_apresentado' and not self.data_recurso:
             self.data_recurso = hoje
         
-        elif novo_status in ['finalizado_procedente', 'finalizado_improcedente', 'arquivado']:
+        elif novo_status in self.STATUS_FINALIZADOS:
             if not self.data_finalizacao:
                 self.data_finalizacao = hoje
         
+        # O histórico da transição é gravado pelo signal registrar_mudanca_status
+        self._observacao_status = observacao
+        self._usuario_status = usuario
         self.save()
-        
-        # Registra mudança no histórico (se modelo existir)
-        try:
-            HistoricoProcesso.objects.create(
-                processo=self,
-                status_anterior=status_anterior,
-                status_novo=novo_status,
-                observacao=observacao,
-                data_mudanca=timezone.now()
-            )
-        except:
-            pass  # Se modelo HistoricoProcesso não existir ainda
 
     def gerar_numero_defesa(self):
         """Gera número para documento de defesa"""
@@ -1325,6 +1321,26 @@ class HistoricoProcesso(models.Model):
     def __str__(self):
         return f"{self.processo.numero_processo} - {self.status_anterior} → {self.status_novo}"
 
+    @classmethod
+    def registrar_transicoes(cls, transicoes, status_novo=None, observacao='', usuario='Sistema', data=None):
+        """
+        Grava em bulk_create o histórico de várias mudanças de status.
+        transicoes: {processo_id: status_anterior}; status_novo None mantém o
+        anterior (alterações que não mudam o status).
+        """
+        data = data or timezone.now()
+        return cls.objects.bulk_create([
+            cls(
+                processo_id=processo_id,
+                status_anterior=status_anterior,
+                status_novo=status_anterior if status_novo is None else status_novo,
+                observacao=observacao,
+                usuario=usuario,
+                data_mudanca=data,
+            )
+            for processo_id, status_anterior in transicoes.items()
+        ], batch_size=500)
+
 
 # === MODELO PARA DOCUMENTOS DO PROCESSO ===
 class DocumentoProcesso(models.Model):
@@ -2129,4 +2145,83 @@ class ConfiguracaoFiscalizacao(models.Model):
             # Configurações padrão
             config.tipos_arquivo_permitidos = ['jpg', 'jpeg', 'png', 'pdf', 'doc', 'docx']
             config.save()
-        return config
\ No newline at end of file
+        return config
+
+class IndiceBuscaAuto(models.Model):
+    """
+    Índice de busca unificado dos autos de constatação e processos.
+    Mantido pelos signals de fiscalizacao; permite buscar em todos os tipos
+    com uma única consulta indexada (pg_trgm no PostgreSQL).
+    """
+    TIPO_CHOICES = [
+        ('banco', 'Auto de Banco'),
+        ('posto', 'Auto de Posto'),
+        ('supermercado', 'Auto de Supermercado'),
+        ('diversos', 'Auto Diversos'),
+        ('processo', 'Processo Administrativo'),
+    ]
+
+    tipo = models.CharField("Tipo", max_length=20, choices=TIPO_CHOICES)
+    objeto_id = models.PositiveIntegerField("ID do Objeto")
+    numero = models.CharField("Número", max_length=50, blank=True)
+    razao_social = models.CharField("Razão Social", max_length=255, blank=True)
+    nome_fantasia = models.CharField("Nome Fantasia", max_length=255, blank=True)
+    cnpj = models.CharField("CNPJ", max_length=18, blank=True)
+    cnpj_digitos = models.CharField("CNPJ (somente dígitos)", max_length=14, blank=True)
+    municipio = models.CharField("Município", max_length=100, blank=True)
+    data_fiscalizacao = models.DateField("Data da Fiscalização", null=True, blank=True)
+    texto_busca = models.TextField("Texto Normalizado", blank=True)
+    atualizado_em = models.DateTimeField("Atualizado em", auto_now=True)
+
+    class Meta:
+        verbose_name = "Índice de Busca"
+        verbose_name_plural = "Índice de Busca"
+        ordering = ['-data_fiscalizacao', '-id']
+        constraints = [
+            models.UniqueConstraint(fields=['tipo', 'objeto_id'], name='fisc_indice_busca_objeto_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['-data_fiscalizacao'], name='fisc_indice_busca_data_idx'),
+            models.Index(fields=['tipo', '-data_fiscalizacao'], name='fisc_indice_busca_tipo_idx'),
+            models.Index(fields=['cnpj_digitos'], name='fisc_indice_busca_cnpj_idx'),
+            models.Index(fields=['numero'], name='fisc_indice_busca_numero_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_tipo_display()} {self.numero} - {self.razao_social}"
+
+
+class FilaAutoInfracao(models.Model):
+    """
+    Fila de trabalho dos autos de constatação com irregularidades que ainda
+    não geraram Auto de Infração. Mantida pelos signals de fiscalizacao.
+    """
+    TIPO_CHOICES = [
+        ('banco', 'Auto de Banco'),
+        ('posto', 'Auto de Posto'),
+        ('supermercado', 'Auto de Supermercado'),
+    ]
+
+    tipo = models.CharField("Tipo", max_length=20, choices=TIPO_CHOICES)
+    objeto_id = models.PositiveIntegerField("ID do Auto")
+    numero = models.CharField("Número do Auto", max_length=20, blank=True)
+    razao_social = models.CharField("Razão Social", max_length=255, blank=True)
+    cnpj = models.CharField("CNPJ", max_length=18, blank=True)
+    data_fiscalizacao = models.DateField("Data da Fiscalização")
+    irregularidades = models.CharField("Irregularidades", max_length=255, blank=True)
+    entrou_na_fila_em = models.DateTimeField("Entrou na Fila em", auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Auto Aguardando Infração"
+        verbose_name_plural = "Fila de Autos Aguardando Infração"
+        ordering = ['-data_fiscalizacao', '-id']
+        constraints = [
+            models.UniqueConstraint(fields=['tipo', 'objeto_id'], name='fisc_fila_infracao_objeto_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['-data_fiscalizacao', '-id'], name='fisc_fila_infracao_data_idx'),
+            models.Index(fields=['tipo', '-data_fiscalizacao'], name='fisc_fila_infracao_tipo_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_tipo_display()} {self.numero} - {self.razao_social}"
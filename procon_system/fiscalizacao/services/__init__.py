@@ -0,0 +1,18 @@
+"""
+Serviços do módulo de fiscalização
+"""
+
+from .processo_service import processo_lote_service, processo_estatisticas_service
+from .busca_service import busca_unificada_service
+from .documento_service import documento_auto_service
+from .fila_infracao_service import fila_infracao_service
+from .estatisticas_service import estatisticas_fiscalizacao_service
+
+__all__ = [
+    'processo_lote_service',
+    'processo_estatisticas_service',
+    'busca_unificada_service',
+    'documento_auto_service',
+    'fila_infracao_service',
+    'estatisticas_fiscalizacao_service',
+]
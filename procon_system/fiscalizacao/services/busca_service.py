@@ -0,0 +1,179 @@
+"""
+Serviço de busca unificada de autos e processos
+Mantém a tabela IndiceBuscaAuto e responde buscas entre tipos com uma única
+consulta indexada, ordenada e limitada (pg_trgm no PostgreSQL, LIKE no SQLite)
+"""
+import re
+import unicodedata
+from functools import partial
+from typing import Dict, Iterable, List, Optional
+
+from django.db import connection
+from django.db.models import Q, QuerySet
+
+from ..models import (
+    AutoBanco, AutoDiversos, AutoPosto, AutoSupermercado, IndiceBuscaAuto, Processo,
+)
+
+
+MODELOS_AUTO = {
+    'banco': AutoBanco,
+    'posto': AutoPosto,
+    'supermercado': AutoSupermercado,
+    'diversos': AutoDiversos,
+}
+
+
+def normalizar_texto(valor: Optional[str]) -> str:
+    """Minúsculas, sem acentos e com espaços colapsados"""
+    if not valor:
+        return ''
+    sem_acentos = unicodedata.normalize('NFKD', str(valor)).encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(sem_acentos.lower().split())
+
+
+def somente_digitos(valor: Optional[str]) -> str:
+    return re.sub(r'\D', '', valor or '')
+
+
+class BuscaUnificadaService:
+    """Sincronização e consulta do índice de busca"""
+
+    TAMANHO_LOTE = 1000
+    MIN_DIGITOS_CNPJ = 3
+
+    # ---------- sincronização ----------
+
+    def entrada_auto(self, tipo: str, auto, indice=IndiceBuscaAuto) -> IndiceBuscaAuto:
+        cnpj_digitos = somente_digitos(auto.cnpj)
+        return indice(
+            tipo=tipo,
+            objeto_id=auto.pk,
+            numero=auto.numero or '',
+            razao_social=auto.razao_social or '',
+            nome_fantasia=auto.nome_fantasia or '',
+            cnpj=auto.cnpj or '',
+            cnpj_digitos=cnpj_digitos,
+            municipio=auto.municipio or '',
+            data_fiscalizacao=auto.data_fiscalizacao,
+            texto_busca=normalizar_texto(
+                ' '.join([auto.numero or '', auto.razao_social or '', auto.nome_fantasia or '', cnpj_digitos])
+            ),
+        )
+
+    def entrada_processo(self, processo, indice=IndiceBuscaAuto) -> IndiceBuscaAuto:
+        cnpj_digitos = somente_digitos(processo.cnpj)
+        auto = processo.auto_infracao
+        return indice(
+            tipo='processo',
+            objeto_id=processo.pk,
+            numero=processo.numero_processo or '',
+            razao_social=processo.autuado or '',
+            cnpj=processo.cnpj or '',
+            cnpj_digitos=cnpj_digitos,
+            data_fiscalizacao=auto.data_fiscalizacao if auto else None,
+            texto_busca=normalizar_texto(
+                ' '.join([processo.numero_processo or '', processo.autuado or '',
+                          cnpj_digitos, processo.observacoes or ''])
+            ),
+        )
+
+    def indexar(self, entrada: IndiceBuscaAuto) -> None:
+        """Cria ou atualiza a entrada de um objeto"""
+        valores = {
+            campo.attname: getattr(entrada, campo.attname)
+            for campo in IndiceBuscaAuto._meta.concrete_fields
+            if campo.attname not in ('id', 'tipo', 'objeto_id', 'atualizado_em')
+        }
+        IndiceBuscaAuto.objects.update_or_create(
+            tipo=entrada.tipo, objeto_id=entrada.objeto_id, defaults=valores
+        )
+
+    def remover(self, tipo: str, objeto_id: int) -> None:
+        IndiceBuscaAuto.objects.filter(tipo=tipo, objeto_id=objeto_id).delete()
+
+    def reindexar(self, tipos: Optional[Iterable[str]] = None, apps=None) -> Dict[str, int]:
+        """
+        Reconstrói o índice em lotes (carga inicial ou correção de
+        divergências). Com apps, usa os modelos históricos (migrations).
+        """
+        indice = apps.get_model('fiscalizacao', 'IndiceBuscaAuto') if apps else IndiceBuscaAuto
+        tipos = list(tipos or [*MODELOS_AUTO, 'processo'])
+        totais = {}
+        for tipo in tipos:
+            modelo = Processo if tipo == 'processo' else MODELOS_AUTO[tipo]
+            if apps:
+                modelo = apps.get_model(modelo._meta.label)
+            if tipo == 'processo':
+                queryset = modelo.objects.select_related('auto_infracao')
+                montar = partial(self.entrada_processo, indice=indice)
+            else:
+                queryset = modelo.objects.all()
+                montar = partial(self.entrada_auto, tipo, indice=indice)
+
+            indice.objects.filter(tipo=tipo).delete()
+            lote, total = [], 0
+            for objeto in queryset.order_by('pk').iterator(chunk_size=self.TAMANHO_LOTE):
+                lote.append(montar(objeto))
+                if len(lote) >= self.TAMANHO_LOTE:
+                    indice.objects.bulk_create(lote)
+                    total += len(lote)
+                    lote = []
+            if lote:
+                indice.objects.bulk_create(lote)
+                total += len(lote)
+            totais[tipo] = total
+        return totais
+
+    # ---------- consulta ----------
+
+    def filtrar(self, termo: str, tipos: Optional[Iterable[str]] = None) -> QuerySet:
+        """
+        Entradas que casam com o termo. O LIKE sobre texto_busca usa o índice
+        GIN de trigramas no PostgreSQL; CNPJ e número usam índices B-tree.
+        """
+        queryset = IndiceBuscaAuto.objects.all()
+        if tipos:
+            queryset = queryset.filter(tipo__in=list(tipos))
+
+        texto = normalizar_texto(termo)
+        condicao = Q(texto_busca__contains=texto) | Q(numero__istartswith=termo.strip())
+        digitos = somente_digitos(termo)
+        if len(digitos) >= self.MIN_DIGITOS_CNPJ:
+            condicao |= Q(cnpj_digitos__startswith=digitos)
+        return queryset.filter(condicao)
+
+    def buscar(self, termo: str, tipo: str = 'todos', limite: int = 20) -> List[Dict]:
+        tipos = list(MODELOS_AUTO) if tipo in (None, '', 'todos') else [tipo]
+        queryset = self.filtrar(termo, tipos)
+
+        if connection.vendor == 'postgresql':
+            from django.contrib.postgres.search import TrigramSimilarity
+            queryset = queryset.annotate(
+                similaridade=TrigramSimilarity('texto_busca', normalizar_texto(termo))
+            ).order_by('-similaridade', '-data_fiscalizacao', '-id')
+        else:
+            queryset = queryset.order_by('-data_fiscalizacao', '-id')
+
+        return [
+            {
+                'tipo': entrada['tipo'],
+                'id': entrada['objeto_id'],
+                'numero': entrada['numero'],
+                'razao_social': entrada['razao_social'],
+                'cnpj': entrada['cnpj'],
+                'data_fiscalizacao': entrada['data_fiscalizacao'],
+                'municipio': entrada['municipio'],
+                'url': f"/fiscalizacao/{entrada['tipo']}s/{entrada['objeto_id']}/",
+            }
+            for entrada in queryset.values(
+                'tipo', 'objeto_id', 'numero', 'razao_social', 'cnpj', 'data_fiscalizacao', 'municipio'
+            )[:limite]
+        ]
+
+    def ids_processos(self, termo: str) -> QuerySet:
+        """Subconsulta de IDs de processos para compor com outros filtros"""
+        return self.filtrar(termo, ['processo']).values('objeto_id')
+
+
+busca_unificada_service = BuscaUnificadaService()
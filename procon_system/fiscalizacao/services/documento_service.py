@@ -0,0 +1,645 @@
+"""
+Motor de renderização de documentos dos autos de fiscalização
+O template DOCX de cada tipo é compilado uma vez por processo em trechos de
+XML + marcadores {{campo}}; a renderização apenas concatena os trechos com os
+valores do contexto. Saídas ficam em cache pelo hash do conteúdo e lotes
+(ex.: um dia de operação) são renderizados em um pool de processos em um ZIP.
+"""
+import hashlib
+import io
+import json
+import os
+import re
+import zipfile
+from bisect import bisect_right
+from decimal import Decimal
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.core.cache import cache
+from docx import Document
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.oxml.ns import qn
+from docx.table import Table
+from docx.text.paragraph import Paragraph
+
+from core.lotes import mapear
+
+from ..models import AutoBanco, AutoDiversos, AutoInfracao, AutoPosto, AutoSupermercado
+
+
+DIRETORIO_TEMPLATES = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'templates', 'docs')
+
+ARQUIVOS_TEMPLATE = {
+    'banco': 'Banco.docx',
+    'posto': 'Posto.docx',
+    'supermercado': 'Supermercado.docx',
+    'diversos': 'Diversos.docx',
+    'infracao': 'AutoInfracao.docx',
+}
+
+MODELOS_DOCUMENTO = {
+    'banco': AutoBanco,
+    'posto': AutoPosto,
+    'supermercado': AutoSupermercado,
+    'diversos': AutoDiversos,
+    'infracao': AutoInfracao,
+}
+
+CONTENT_TYPES = {
+    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    'pdf': 'application/pdf',
+}
+
+MESES = (
+    'janeiro', 'fevereiro', 'março', 'abril', 'maio', 'junho',
+    'julho', 'agosto', 'setembro', 'outubro', 'novembro', 'dezembro',
+)
+
+MARCADOR = re.compile(r'\{\{\s*(\w+)\s*\}\}')
+PARTE_CABECALHO_RODAPE = re.compile(r'^/word/(header|footer)\d*\.xml$')
+MARCADO, DESMARCADO = '☒', '☐'
+
+W_P = qn('w:p')
+W_T = qn('w:t')
+XML_SPACE = '{http://www.w3.org/XML/1998/namespace}space'
+
+
+class TemplateDocumentoError(Exception):
+    """Template inexistente ou formato de saída não suportado"""
+
+
+# ========================================
+# COMPILAÇÃO DO TEMPLATE
+# ========================================
+
+def _paragrafo_de(elemento):
+    while elemento is not None and elemento.tag != W_P:
+        elemento = elemento.getparent()
+    return elemento
+
+
+def _unificar_marcadores(paragrafo) -> None:
+    """
+    O Word costuma quebrar '{{campo}}' em vários runs (revisão, formatação).
+    Move cada marcador para um único w:t, preservando o texto ao redor.
+    """
+    textos = [t for t in paragrafo.iter(W_T) if _paragrafo_de(t) is paragrafo]
+    while len(textos) > 1:
+        inicios, posicao = [], 0
+        for t in textos:
+            inicios.append(posicao)
+            posicao += len(t.text or '')
+        completo = ''.join(t.text or '' for t in textos)
+
+        for marcador in MARCADOR.finditer(completo):
+            i = bisect_right(inicios, marcador.start()) - 1
+            j = bisect_right(inicios, marcador.end() - 1) - 1
+            if i != j:
+                break
+        else:
+            break
+
+        textos[i].text = textos[i].text[:marcador.start() - inicios[i]] + marcador.group(0)
+        for k in range(i + 1, j):
+            textos[k].text = ''
+        textos[j].text = textos[j].text[marcador.end() - inicios[j]:]
+
+    for t in textos:
+        if t.text and '{{' in t.text:
+            t.set(XML_SPACE, 'preserve')
+
+
+def _raizes(doc):
+    yield doc.element.body
+    for parte in doc.part.package.iter_parts():
+        if PARTE_CABECALHO_RODAPE.match(str(parte.partname)):
+            yield parte.element
+
+
+def _linhas_texto(doc) -> List[Tuple[str, str]]:
+    """Texto do corpo na ordem do documento (base da saída em PDF)"""
+    linhas = []
+    for elemento in doc.element.body.iterchildren():
+        if elemento.tag == W_P:
+            paragrafo = Paragraph(elemento, doc)
+            estilo = paragrafo.style.name if paragrafo.style is not None else ''
+            if estilo == 'Title':
+                linhas.append((paragrafo.text, 'titulo'))
+            elif estilo.startswith('Heading'):
+                linhas.append((paragrafo.text, 'secao'))
+            else:
+                linhas.append((paragrafo.text, 'texto'))
+        elif elemento.tag == qn('w:tbl'):
+            for linha in Table(elemento, doc).rows:
+                celulas = []
+                for celula in linha.cells:
+                    # Células mescladas são repetidas pelo python-docx
+                    if not celulas or celulas[-1] != celula.text:
+                        celulas.append(celula.text)
+                linhas.append((' | '.join(c for c in celulas if c.strip()), 'texto'))
+    return linhas
+
+
+def _valor_xml(valor) -> str:
+    if valor is None:
+        return ''
+    texto = escape(str(valor))
+    return texto.replace('\n', '</w:t><w:br/><w:t xml:space="preserve">')
+
+
+class TemplateDocumento:
+    """Template DOCX pré-processado em trechos estáticos e marcadores"""
+
+    def __init__(self, tipo: str, conteudo: bytes):
+        self.tipo = tipo
+        self.versao = hashlib.sha256(conteudo).hexdigest()[:16]
+
+        doc = Document(io.BytesIO(conteudo))
+        for raiz in _raizes(doc):
+            for paragrafo in raiz.iter(W_P):
+                _unificar_marcadores(paragrafo)
+        self.linhas = _linhas_texto(doc)
+
+        normalizado = io.BytesIO()
+        doc.save(normalizado)
+        # Partes sem marcadores (estilos, imagens, fontes) são comprimidas uma única vez
+        base = io.BytesIO()
+        self.partes_dinamicas = []
+        self.campos = set()
+        with zipfile.ZipFile(normalizado) as origem, zipfile.ZipFile(base, 'w') as destino:
+            for info in origem.infolist():
+                dados = origem.read(info.filename)
+                nome = info.filename
+                if nome.startswith('word/') and nome.endswith('.xml') and b'{{' in dados:
+                    # Índices pares: XML literal; ímpares: nome do campo
+                    trechos = MARCADOR.split(dados.decode('utf-8'))
+                    self.campos.update(trechos[1::2])
+                    self.partes_dinamicas.append((nome, trechos))
+                else:
+                    destino.writestr(nome, dados, compress_type=info.compress_type)
+        self.base = base.getvalue()
+
+    def renderizar(self, formato: str, contexto: Dict[str, str]) -> bytes:
+        if formato == 'docx':
+            return self.renderizar_docx(contexto)
+        if formato == 'pdf':
+            return self.renderizar_pdf(contexto)
+        raise TemplateDocumentoError(f'Formato não suportado: {formato}')
+
+    def renderizar_docx(self, contexto: Dict[str, str]) -> bytes:
+        buffer = io.BytesIO(self.base)
+        with zipfile.ZipFile(buffer, 'a') as destino:
+            for nome, trechos in self.partes_dinamicas:
+                xml = ''.join(
+                    trecho if indice % 2 == 0 else _valor_xml(contexto.get(trecho))
+                    for indice, trecho in enumerate(trechos)
+                )
+                destino.writestr(nome, xml.encode('utf-8'), compress_type=zipfile.ZIP_DEFLATED)
+        return buffer.getvalue()
+
+    def renderizar_pdf(self, contexto: Dict[str, str]) -> bytes:
+        from reportlab.lib.pagesizes import A4
+        from reportlab.lib.styles import getSampleStyleSheet
+        from reportlab.platypus import Paragraph as ParagrafoPdf, SimpleDocTemplate, Spacer
+
+        estilos = getSampleStyleSheet()
+        mapa_estilos = {'titulo': estilos['Title'], 'secao': estilos['Heading2'], 'texto': estilos['Normal']}
+        elementos = []
+        for texto, estilo in self.linhas:
+            preenchido = MARCADOR.sub(lambda m: str(contexto.get(m.group(1)) or ''), texto)
+            if not preenchido.strip():
+                elementos.append(Spacer(1, 6))
+                continue
+            elementos.append(
+                ParagrafoPdf(escape(preenchido).replace('\n', '<br/>'), mapa_estilos[estilo])
+            )
+
+        buffer = io.BytesIO()
+        SimpleDocTemplate(buffer, pagesize=A4, title=contexto.get('numero', '')).build(elementos)
+        return buffer.getvalue()
+
+
+# ========================================
+# TEMPLATES PADRÃO (tipos sem arquivo .docx)
+# ========================================
+
+def _campo(doc, rotulo: str, marcador: str) -> None:
+    paragrafo = doc.add_paragraph()
+    paragrafo.add_run(f'{rotulo}: ').bold = True
+    paragrafo.add_run(f'{{{{{marcador}}}}}')
+
+
+def _template_banco() -> Document:
+    doc = Document()
+    doc.add_heading('AUTO DE CONSTATAÇÃO - AGÊNCIA BANCÁRIA', 0).alignment = WD_ALIGN_PARAGRAPH.CENTER
+    _campo(doc, 'Número', 'numero')
+    _campo(doc, 'Data', 'data_fiscalizacao')
+    _campo(doc, 'Hora', 'hora_fiscalizacao')
+
+    doc.add_heading('DADOS DO ESTABELECIMENTO', level=1)
+    for rotulo, marcador in (
+        ('Razão Social', 'razao_social'), ('Nome Fantasia', 'nome_fantasia'), ('CNPJ', 'cnpj'),
+        ('Porte', 'porte'), ('Atuação', 'atuacao'), ('Endereço', 'endereco'), ('Município', 'municipio'),
+    ):
+        _campo(doc, rotulo, marcador)
+
+    doc.add_heading('IRREGULARIDADES CONSTATADAS', level=1)
+    doc.add_paragraph('{{irregularidades}}')
+    doc.add_heading('ATENDIMENTOS DE CAIXA', level=1)
+    doc.add_paragraph('{{atendimentos}}')
+    doc.add_heading('OBSERVAÇÕES', level=1)
+    doc.add_paragraph('{{observacoes}}')
+
+    doc.add_heading('RESPONSÁVEIS', level=1)
+    _campo(doc, 'Fiscal', 'fiscal_nome_1')
+    _campo(doc, 'Responsável pelo estabelecimento', 'responsavel_nome')
+    _campo(doc, 'CPF/RG', 'responsavel_cpf')
+    return doc
+
+
+def _template_infracao() -> Document:
+    doc = Document()
+    doc.sections[0].header.paragraphs[0].text = (
+        'GOVERNO DO ESTADO DO AMAZONAS\nInstituto de Defesa do Consumidor\nPROCON-AM'
+    )
+    doc.add_heading('AUTO DE INFRAÇÃO Nº {{numero}}', 0).alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+    doc.add_heading('DADOS DO ESTABELECIMENTO', level=1)
+    for rotulo, marcador in (
+        ('RAZÃO SOCIAL', 'razao_social'), ('NOME FANTASIA', 'nome_fantasia'), ('ATIVIDADE', 'atividade'),
+        ('ENDEREÇO', 'endereco'), ('CNPJ', 'cnpj'), ('TELEFONE', 'telefone'),
+    ):
+        _campo(doc, rotulo, marcador)
+
+    doc.add_heading('FISCALIZAÇÃO', level=1)
+    _campo(doc, 'MUNICÍPIO', 'municipio_estado')
+    _campo(doc, 'DATA', 'data_fiscalizacao')
+    _campo(doc, 'HORA', 'hora_fiscalizacao')
+
+    doc.add_heading('PARECER PRÉVIO', level=1)
+    _campo(doc, 'NÚMERO', 'parecer_numero')
+    _campo(doc, 'ORIGEM', 'parecer_origem')
+
+    doc.add_heading('RELATÓRIO', level=1)
+    doc.add_paragraph('{{relatorio}}')
+
+    doc.add_heading('BASE LEGAL', level=1)
+    _campo(doc, 'CDC', 'base_legal_cdc')
+    _campo(doc, 'OUTRAS BASES LEGAIS', 'base_legal_outras')
+
+    doc.add_heading('INFRAÇÕES CONSTATADAS', level=1)
+    doc.add_paragraph('{{infracoes}}')
+    _campo(doc, 'OUTRAS INFRAÇÕES', 'outras_infracoes')
+
+    doc.add_heading('PENALIDADE', level=1)
+    _campo(doc, 'VALOR DA MULTA', 'valor_multa')
+
+    doc.add_heading('RESPONSÁVEIS', level=1)
+    _campo(doc, 'AUTORIDADE FISCALIZADORA', 'autoridade_fiscalizadora')
+    _campo(doc, 'ESTABELECIMENTO FISCALIZADO', 'estabelecimento_fiscalizado')
+    return doc
+
+
+TEMPLATES_PADRAO = {
+    'banco': _template_banco,
+    'infracao': _template_infracao,
+}
+
+
+def _conteudo_template(tipo: str) -> bytes:
+    caminho = os.path.join(DIRETORIO_TEMPLATES, ARQUIVOS_TEMPLATE.get(tipo, ''))
+    if tipo in ARQUIVOS_TEMPLATE and os.path.isfile(caminho):
+        with open(caminho, 'rb') as arquivo:
+            return arquivo.read()
+    if tipo in TEMPLATES_PADRAO:
+        buffer = io.BytesIO()
+        TEMPLATES_PADRAO[tipo]().save(buffer)
+        return buffer.getvalue()
+    raise TemplateDocumentoError(f'Template não encontrado para o tipo: {tipo}')
+
+
+@lru_cache(maxsize=None)
+def obter_template(tipo: str) -> TemplateDocumento:
+    """Compila o template uma única vez por processo"""
+    return TemplateDocumento(tipo, _conteudo_template(tipo))
+
+
+def _renderizar_item(item: Tuple[str, str, Dict[str, str]]) -> bytes:
+    """Executado nos workers do pool de processos"""
+    tipo, formato, contexto = item
+    return obter_template(tipo).renderizar(formato, contexto)
+
+
+# ========================================
+# CONTEXTO DOS AUTOS
+# ========================================
+
+def _texto(valor) -> str:
+    if valor is None:
+        return ''
+    if isinstance(valor, bool):
+        return 'Sim' if valor else 'Não'
+    if isinstance(valor, Decimal):
+        return f'{valor:,.2f}'.replace(',', 'X').replace('.', ',').replace('X', '.')
+    if hasattr(valor, 'hour') and not hasattr(valor, 'year'):
+        return valor.strftime('%H:%M')
+    if hasattr(valor, 'strftime'):
+        return valor.strftime('%d/%m/%Y')
+    return str(valor)
+
+
+def _preco(valor) -> str:
+    return f'{valor:.3f}'.replace('.', ',') if valor is not None else ''
+
+
+def _data_extenso(data) -> str:
+    """Data por extenso sem locale.setlocale (global ao processo e não thread-safe)"""
+    return f'{data.day} de {MESES[data.month - 1]} de {data.year}' if data else ''
+
+
+def _checkbox(marcado) -> str:
+    return MARCADO if marcado else DESMARCADO
+
+
+def _lista(itens: Iterable[str]) -> str:
+    return '\n'.join(f'• {item}' for item in itens)
+
+
+CAMPOS_COMUNS = (
+    'numero', 'razao_social', 'nome_fantasia', 'atividade', 'endereco', 'cep', 'municipio', 'estado',
+    'cnpj', 'telefone', 'atuacao', 'origem_outros', 'fiscal_nome_1', 'fiscal_nome_2',
+    'responsavel_nome', 'responsavel_cpf', 'observacoes', 'outras_irregularidades', 'narrativa_fatos',
+)
+
+CHECKBOXES = {
+    'banco': {
+        'cb_nada_consta': 'nada_consta',
+        'cb_sem_irregularidades': 'sem_irregularidades',
+    },
+    'posto': {
+        'cb_sem_irregularidades': 'sem_irregularidades',
+        'cb_nao_vende_gas_comum': 'nao_vende_gas_comum',
+        'cb_nao_vende_gas_aditivada': 'nao_vende_gas_aditivada',
+        'cb_nao_vende_etanol': 'nao_vende_etanol',
+        'cb_nao_vende_diesel_comum': 'nao_vende_diesel_comum',
+        'cb_nao_vende_diesel_s10': 'nao_vende_diesel_s10',
+        'cb_nao_vende_gnv': 'nao_vende_gnv',
+    },
+    'supermercado': {
+        'cb_produtos_vencidos': 'comercializar_produtos_vencidos',
+        'cb_embalagem_violada': 'comercializar_embalagem_violada',
+        'cb_lata_amassada': 'comercializar_lata_amassada',
+        'cb_sem_validade': 'comercializar_sem_validade',
+        'cb_mal_armazenados': 'comercializar_mal_armazenados',
+        'cb_descongelados': 'comercializar_descongelados',
+        'cb_publicidade_enganosa': 'publicidade_enganosa',
+        'cb_obstrucao_monitor': 'obstrucao_monitor',
+        'cb_afixacao_fora_padrao': 'afixacao_precos_fora_padrao',
+        'cb_ausencia_afixacao': 'ausencia_afixacao_precos',
+        'cb_fracionados_fora_padrao': 'afixacao_precos_fracionados_fora_padrao',
+        'cb_ausencia_descontos': 'ausencia_visibilidade_descontos',
+        'cb_ausencia_placas_promocao': 'ausencia_placas_promocao_vencimento',
+        'cb_nada_consta': 'nada_consta',
+    },
+    'diversos': {
+        'cb_publicidade_enganosa': 'publicidade_enganosa',
+        'cb_afixacao_fora_padrao': 'afixacao_precos_fora_padrao',
+        'cb_ausencia_afixacao': 'ausencia_afixacao_precos',
+        'cb_eletronico_fora_padrao': 'afixacao_precos_eletronico_fora_padrao',
+        'cb_ausencia_eletronico': 'ausencia_afixacao_precos_eletronico',
+        'cb_fracionados_fora_padrao': 'afixacao_precos_fracionados_fora_padrao',
+        'cb_ausencia_descontos': 'ausencia_visibilidade_descontos',
+        'cb_ausencia_cdc': 'ausencia_exemplar_cdc',
+        'cb_substituicao_troco': 'substituicao_troco',
+        'cb_advertencia': 'advertencia',
+    },
+}
+
+# Perguntas sim/não: o template tem uma caixa para cada resposta
+CHECKBOXES_SIM_NAO = {
+    'supermercado': {
+        'possui_anexo': 'possui_anexo',
+        'auto_apreensao': 'auto_apreensao',
+        'necessita_pericia': 'necessita_pericia',
+    },
+}
+
+IRREGULARIDADES_BANCO = (
+    'distribuiu_senha_fora_padrao', 'ausencia_cartaz_informativo', 'ausencia_profissional_libras',
+    'senha_sem_nome_estabelecimento', 'senha_sem_horarios', 'senha_sem_rubrica',
+)
+
+INFRACOES_AUTO = (
+    'infracao_art_34', 'infracao_art_35', 'infracao_art_36', 'infracao_art_55', 'infracao_art_56',
+    'infracao_publicidade_enganosa', 'infracao_precos_abusivos', 'infracao_produtos_vencidos',
+    'infracao_falta_informacao',
+)
+
+# Produtos das notas fiscais (modelo) -> nomes usados no template do posto
+PRODUTOS_TEMPLATE_POSTO = {
+    'gas_comum': 'gasolina_comum',
+    'gas_aditivada': 'gasolina_aditivada',
+    'etanol': 'etanol',
+    'diesel_comum': 'diesel_comum',
+    'diesel_s10': 'diesel_s10',
+    'gnv': 'gnv',
+}
+LINHAS_TABELA_CUPONS = 6
+
+
+def _verbose(auto, campo: str) -> str:
+    return str(auto._meta.get_field(campo).verbose_name).rstrip('?')
+
+
+class DocumentoAutoService:
+    """Renderização (individual ou em lote) dos documentos dos autos"""
+
+    def __init__(self):
+        self.cache_timeout = getattr(settings, 'DOCUMENTOS_AUTOS_CACHE_TIMEOUT', 60 * 60 * 24)
+        self.max_workers_lote = getattr(settings, 'DOCUMENTOS_LOTE_MAX_WORKERS', os.cpu_count() or 1)
+        self.min_itens_pool_processos = getattr(settings, 'DOCUMENTOS_LOTE_MIN_ITENS_POOL', 8)
+        self.max_autos_lote = getattr(settings, 'DOCUMENTOS_LOTE_MAX_AUTOS', 500)
+
+    # ---------- contexto ----------
+
+    def contexto(self, tipo: str, auto) -> Dict[str, str]:
+        """Valores (todos str) dos marcadores do template do tipo"""
+        contexto = {campo: _texto(getattr(auto, campo, '')) for campo in CAMPOS_COMUNS}
+        contexto.update({
+            'data_fiscalizacao': _texto(auto.data_fiscalizacao),
+            'data_fiscalizacao_extenso': _data_extenso(auto.data_fiscalizacao),
+            'hora_fiscalizacao': _texto(auto.hora_fiscalizacao),
+            'porte': auto.get_porte_display() if getattr(auto, 'porte', '') else '',
+        })
+
+        origem = getattr(auto, 'origem', None)
+        for opcao in ('acao', 'denuncia', 'forca_tarefa', 'outros'):
+            contexto[f'cb_origem_{opcao}'] = _checkbox(origem == opcao)
+        for marcador, campo in CHECKBOXES.get(tipo, {}).items():
+            contexto[marcador] = _checkbox(getattr(auto, campo, False))
+        for marcador, campo in CHECKBOXES_SIM_NAO.get(tipo, {}).items():
+            valor = getattr(auto, campo, None)
+            contexto[f'cb_{marcador}_sim'] = _checkbox(valor is True)
+            contexto[f'cb_{marcador}_nao'] = _checkbox(valor is False)
+
+        montar_especifico = getattr(self, f'_contexto_{tipo}', None)
+        if montar_especifico:
+            contexto.update(montar_especifico(auto))
+        return contexto
+
+    def _contexto_banco(self, auto) -> Dict[str, str]:
+        if auto.nada_consta:
+            irregularidades = f'{MARCADO} NADA CONSTA'
+        elif auto.sem_irregularidades:
+            irregularidades = f'{MARCADO} NÃO FORAM ENCONTRADAS IRREGULARIDADES'
+        else:
+            itens = [_verbose(auto, campo) for campo in IRREGULARIDADES_BANCO if getattr(auto, campo)]
+            if auto.todos_caixas_funcionando is False:
+                itens.insert(0, 'Nem todos os caixas em funcionamento')
+            if auto.distribuiu_senha is False:
+                itens.insert(0, 'Não distribuiu senha')
+            irregularidades = _lista(itens)
+
+        atendimentos = '\n'.join(
+            f'Senha {a.letra_senha}: chegada {_texto(a.horario_chegada)}, '
+            f'atendimento {_texto(a.horario_atendimento)} ({a.tempo_espera_formatado})'
+            for a in auto.atendimentos_caixa.all()
+        )
+        return {'irregularidades': irregularidades, 'atendimentos': atendimentos}
+
+    def _contexto_posto(self, auto) -> Dict[str, str]:
+        contexto = {
+            campo: _preco(getattr(auto, campo))
+            for campo in ('preco_gasolina_comum', 'preco_gasolina_aditivada', 'preco_etanol',
+                          'preco_diesel_comum', 'preco_diesel_s10', 'preco_gnv')
+        }
+        contexto.update({
+            'prazo_envio_documentos': _texto(auto.prazo_envio_documentos),
+            'info_adicionais': _texto(auto.info_adicionais),
+            'dispositivos_legais': _texto(auto.dispositivos_legais),
+        })
+
+        # Nota mais recente de cada produto/tipo (notas_fiscais é ordenado por -data)
+        for nota in reversed(list(auto.notas_fiscais.all())):
+            prefixo = f'nota_{nota.tipo_nota}_{PRODUTOS_TEMPLATE_POSTO.get(nota.produto, nota.produto)}'
+            contexto[f'{prefixo}_data'] = _texto(nota.data)
+            contexto[f'{prefixo}_numero'] = nota.numero_nota
+            contexto[f'{prefixo}_preco'] = _preco(nota.preco)
+
+        # Cupons preenchem a tabela do último aumento e, em seguida, a dos anteriores
+        cupons = sorted(auto.cupons_fiscais.all(), key=lambda c: (c.item_tabela, c.dia))
+        for indice, cupom in enumerate(cupons[:LINHAS_TABELA_CUPONS * 2]):
+            tabela = 'aumento' if indice < LINHAS_TABELA_CUPONS else 'anterior'
+            linha = indice % LINHAS_TABELA_CUPONS
+            sufixo = f'_{linha + 1}' if linha else ''
+            contexto.update({
+                f'cupom_{tabela}_dia{sufixo}': _texto(cupom.dia),
+                f'cupom_{tabela}_numero{sufixo}': cupom.numero_cupom,
+                f'cupom_{tabela}_produto{sufixo}': cupom.produto,
+                f'cupom_{tabela}_valor{sufixo}': _texto(cupom.valor),
+                f'cupom_{tabela}_percentual{sufixo}': _texto(cupom.percentual_diferenca),
+            })
+        return contexto
+
+    def _contexto_supermercado(self, auto) -> Dict[str, str]:
+        return {
+            'prazo_cumprimento': _texto(auto.prazo_cumprimento_dias),
+            'numero_auto_apreensao': auto.auto_apreensao_numero or '',
+        }
+
+    def _contexto_infracao(self, auto) -> Dict[str, str]:
+        return {
+            'municipio_estado': f'{auto.municipio}, {auto.estado}',
+            'parecer_numero': auto.parecer_numero or '',
+            'parecer_origem': auto.parecer_origem or '',
+            'relatorio': auto.relatorio or '',
+            'base_legal_cdc': auto.base_legal_cdc or '',
+            'base_legal_outras': auto.base_legal_outras or '',
+            'infracoes': _lista(_verbose(auto, campo) for campo in INFRACOES_AUTO if getattr(auto, campo)),
+            'outras_infracoes': auto.outras_infracoes or '',
+            'valor_multa': auto.valor_multa_formatado,
+            'autoridade_fiscalizadora': f'{auto.fiscal_nome} - {auto.fiscal_cargo}',
+            'estabelecimento_fiscalizado': f'{auto.responsavel_nome} - CPF: {auto.responsavel_cpf}',
+        }
+
+    # ---------- renderização ----------
+
+    @staticmethod
+    def _validar(tipo: str, formato: str) -> None:
+        if tipo not in MODELOS_DOCUMENTO:
+            raise TemplateDocumentoError(f'Tipo de auto inválido: {tipo}')
+        if formato not in CONTENT_TYPES:
+            raise TemplateDocumentoError(f'Formato não suportado: {formato}')
+
+    @staticmethod
+    def chave_cache(tipo: str, formato: str, contexto: Dict[str, str]) -> str:
+        """Hash do conteúdo: reimpressões sem alteração reaproveitam o arquivo"""
+        conteudo = json.dumps(
+            [obter_template(tipo).versao, formato, contexto], sort_keys=True, ensure_ascii=False
+        )
+        return f"documento_auto:{hashlib.sha256(conteudo.encode('utf-8')).hexdigest()}"
+
+    @staticmethod
+    def nome_arquivo(tipo: str, auto, formato: str = 'docx') -> str:
+        numero = (auto.numero or str(auto.pk)).replace('/', '_')
+        if tipo == 'infracao':
+            return f'Auto_Infracao_{numero}.{formato}'
+        return f'auto_{tipo}_{numero}.{formato}'
+
+    def renderizar(self, tipo: str, auto, formato: str = 'docx') -> bytes:
+        self._validar(tipo, formato)
+        contexto = self.contexto(tipo, auto)
+        chave = self.chave_cache(tipo, formato, contexto)
+
+        conteudo = cache.get(chave)
+        if conteudo is None:
+            conteudo = obter_template(tipo).renderizar(formato, contexto)
+            cache.set(chave, conteudo, self.cache_timeout)
+        return conteudo
+
+    def renderizar_lote(self, tipo: str, autos: Iterable, formato: str = 'docx',
+                        max_workers: Optional[int] = None) -> bytes:
+        """Renderiza vários autos em um ZIP; apenas os ausentes do cache vão ao pool"""
+        self._validar(tipo, formato)
+        autos = list(autos)
+        if len(autos) > self.max_autos_lote:
+            raise TemplateDocumentoError(f'Máximo de {self.max_autos_lote} autos por lote')
+
+        contextos = [self.contexto(tipo, auto) for auto in autos]
+        chaves = [self.chave_cache(tipo, formato, contexto) for contexto in contextos]
+        em_cache = cache.get_many(chaves)
+
+        pendentes = [i for i, chave in enumerate(chaves) if chave not in em_cache]
+        renderizados = mapear(
+            _renderizar_item, [(tipo, formato, contextos[i]) for i in pendentes],
+            max_workers or self.max_workers_lote, self.min_itens_pool_processos,
+        )
+        novos = {chaves[i]: conteudo for i, conteudo in zip(pendentes, renderizados)}
+        if novos:
+            cache.set_many(novos, self.cache_timeout)
+        em_cache.update(novos)
+
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as destino:
+            for auto, chave in zip(autos, chaves):
+                destino.writestr(self.nome_arquivo(tipo, auto, formato), em_cache[chave])
+        return buffer.getvalue()
+
+    def autos_lote(self, tipo: str, data=None, ids: Optional[Iterable[int]] = None):
+        """Autos de um dia de operação (ou selecionados), com as relações usadas no contexto"""
+        queryset = MODELOS_DOCUMENTO[tipo].objects.order_by('numero')
+        if data:
+            queryset = queryset.filter(data_fiscalizacao=data)
+        if ids is not None:
+            queryset = queryset.filter(pk__in=list(ids))
+        if tipo == 'banco':
+            queryset = queryset.prefetch_related('atendimentos_caixa')
+        elif tipo == 'posto':
+            queryset = queryset.prefetch_related('notas_fiscais', 'cupons_fiscais')
+        return queryset
+
+
+documento_auto_service = DocumentoAutoService()
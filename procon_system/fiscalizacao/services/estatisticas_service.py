@@ -0,0 +1,171 @@
+"""
+Motor de estatísticas da fiscalização
+Uma consulta agrupada por modelo de auto (origem, mês, município, com contagem
+condicional das irregularidades) substitui as dezenas de COUNTs por filtro. Os
+resultados são mesclados em Python e ficam em cache por conjunto de filtros,
+invalidado pelos signals sempre que um auto ou infração é salvo ou excluído.
+"""
+import hashlib
+import json
+import time
+from collections import defaultdict
+from datetime import date
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from django.db.models.functions import TruncMonth
+
+from ..models import ORIGEM_CHOICES, AutoInfracao
+from .busca_service import MODELOS_AUTO
+from .fila_infracao_service import REGRAS
+
+
+def inicio_do_mes(data: date, meses_atras: int = 0) -> date:
+    """Primeiro dia do mês, recuando meses de calendário (sem aproximar por 30 dias)"""
+    indice = data.year * 12 + data.month - 1 - meses_atras
+    return date(indice // 12, indice % 12 + 1, 1)
+
+
+class EstatisticasFiscalizacaoService:
+    """Consulta agrupada, mescla e cache das estatísticas de autos e infrações"""
+
+    CHAVE_VERSAO = 'fiscalizacao_estatisticas_versao'
+    PREFIXO_CACHE = 'fiscalizacao_estatisticas'
+
+    def __init__(self):
+        self.cache_timeout = getattr(settings, 'ESTATISTICAS_FISCALIZACAO_CACHE_TIMEOUT', 60 * 15)
+
+    # ---------- cache ----------
+
+    def versao(self) -> int:
+        versao = cache.get(self.CHAVE_VERSAO)
+        if versao is None:
+            versao = time.time_ns()
+            cache.set(self.CHAVE_VERSAO, versao, None)
+        return versao
+
+    def invalidar(self) -> None:
+        """Nova versão: entradas antigas deixam de ser lidas e expiram sozinhas"""
+        cache.set(self.CHAVE_VERSAO, time.time_ns(), None)
+
+    def chave_cache(self, filtros: Dict) -> str:
+        assinatura = hashlib.sha256(
+            json.dumps(filtros, sort_keys=True, default=str).encode('utf-8')
+        ).hexdigest()
+        return f'{self.PREFIXO_CACHE}:{self.versao()}:{assinatura}'
+
+    # ---------- consulta ----------
+
+    def _filtrar(self, queryset, data_inicio=None, data_fim=None, municipio=None):
+        if data_inicio:
+            queryset = queryset.filter(data_fiscalizacao__gte=data_inicio)
+        if data_fim:
+            queryset = queryset.filter(data_fiscalizacao__lte=data_fim)
+        if municipio:
+            queryset = queryset.filter(municipio__icontains=municipio)
+        return queryset
+
+    def linhas_autos(self, **filtros) -> List[Dict]:
+        """Uma consulta GROUP BY por modelo de auto; retorna as linhas mescladas"""
+        linhas = []
+        for tipo, modelo in MODELOS_AUTO.items():
+            condicao = REGRAS[tipo][1] if tipo in REGRAS else None
+            agregados = {'total': Count('id')}
+            if condicao is not None:
+                agregados['irregulares'] = Count('id', filter=condicao)
+
+            queryset = self._filtrar(modelo.objects.all(), **filtros).order_by()
+            for linha in queryset.values('origem', 'municipio', mes=TruncMonth('data_fiscalizacao')).annotate(**agregados):
+                linha['tipo'] = tipo
+                linha.setdefault('irregulares', 0)
+                linhas.append(linha)
+        return linhas
+
+    def linhas_infracoes(self, **filtros) -> List[Dict]:
+        queryset = self._filtrar(AutoInfracao.objects.all(), **filtros).order_by()
+        return list(
+            queryset.values('status', 'municipio', mes=TruncMonth('data_fiscalizacao')).annotate(total=Count('id'))
+        )
+
+    def mesclar(self, linhas_autos: List[Dict], linhas_infracoes: List[Dict]) -> Dict:
+        por_tipo = dict.fromkeys(MODELOS_AUTO, 0)
+        irregulares = dict.fromkeys(REGRAS, 0)
+        por_origem = dict.fromkeys((codigo for codigo, _ in ORIGEM_CHOICES), 0)
+        por_municipio = defaultdict(int)
+        por_mes = defaultdict(lambda: {**dict.fromkeys(MODELOS_AUTO, 0), 'total': 0})
+
+        for linha in linhas_autos:
+            tipo, total = linha['tipo'], linha['total']
+            por_tipo[tipo] += total
+            if tipo in irregulares:
+                irregulares[tipo] += linha['irregulares']
+            por_origem[linha['origem']] = por_origem.get(linha['origem'], 0) + total
+            por_municipio[linha['municipio']] += total
+            if linha['mes']:
+                mes = por_mes[linha['mes'].strftime('%Y-%m')]
+                mes[tipo] += total
+                mes['total'] += total
+
+        infracoes_por_status = defaultdict(int)
+        infracoes_por_mes = defaultdict(int)
+        for linha in linhas_infracoes:
+            infracoes_por_status[linha['status']] += linha['total']
+            if linha['mes']:
+                infracoes_por_mes[linha['mes'].strftime('%Y-%m')] += linha['total']
+
+        total_autos = sum(por_tipo.values())
+        total_irregulares = sum(irregulares.values())
+        return {
+            'totais': {
+                'autos_banco': por_tipo['banco'],
+                'autos_posto': por_tipo['posto'],
+                'autos_supermercado': por_tipo['supermercado'],
+                'autos_diversos': por_tipo['diversos'],
+                'total_autos': total_autos,
+                'total_infracoes': sum(infracoes_por_status.values()),
+            },
+            'por_origem': {
+                'acao_fiscalizatoria': por_origem.pop('acao'),
+                **por_origem,
+            },
+            'irregularidades': {
+                'bancos_com_irregularidades': irregulares['banco'],
+                'postos_com_irregularidades': irregulares['posto'],
+                'supermercados_com_irregularidades': irregulares['supermercado'],
+                'total_com_irregularidades': total_irregulares,
+                'percentual_irregularidades': (
+                    round(total_irregulares * 100 / total_autos, 2) if total_autos else 0
+                ),
+            },
+            'por_municipio': dict(sorted(por_municipio.items(), key=lambda item: (-item[1], item[0]))),
+            'por_mes': dict(sorted(por_mes.items())),
+            'infracoes_por_status': dict(infracoes_por_status),
+            'infracoes_por_mes': dict(sorted(infracoes_por_mes.items())),
+        }
+
+    def estatisticas(self, data_inicio: Optional[date] = None, data_fim: Optional[date] = None,
+                     municipio: Optional[str] = None) -> Dict:
+        """Estatísticas mescladas para o conjunto de filtros, lidas do cache quando possível"""
+        filtros = {'data_inicio': data_inicio, 'data_fim': data_fim, 'municipio': municipio or None}
+        chave = self.chave_cache(filtros)
+        resultado = cache.get(chave)
+        if resultado is None:
+            resultado = self.mesclar(self.linhas_autos(**filtros), self.linhas_infracoes(**filtros))
+            cache.set(chave, resultado, self.cache_timeout)
+        return resultado
+
+    def tendencias(self, meses: int = 6, hoje: Optional[date] = None) -> Dict[str, Dict]:
+        """Autos por mês de calendário nos últimos `meses` meses (incluindo o atual)"""
+        hoje = hoje or date.today()
+        inicio = inicio_do_mes(hoje, meses - 1)
+        por_mes = self.estatisticas(data_inicio=inicio, data_fim=hoje)['por_mes']
+        vazio = {**dict.fromkeys(MODELOS_AUTO, 0), 'total': 0}
+        return {
+            chave: por_mes.get(chave, dict(vazio))
+            for chave in (inicio_do_mes(hoje, i).strftime('%Y-%m') for i in range(meses))
+        }
+
+
+estatisticas_fiscalizacao_service = EstatisticasFiscalizacaoService()
@@ -0,0 +1,184 @@
+"""
+Serviço da fila de autos com potencial infração
+Mantém a tabela FilaAutoInfracao (autos de constatação irregulares que ainda
+não geraram Auto de Infração) e a consulta de forma paginada
+"""
+from typing import Dict, Iterable, Optional
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.paginator import Paginator
+from django.db.models import Count, Exists, OuterRef, Q
+
+from ..models import AutoBanco, AutoInfracao, AutoPosto, AutoSupermercado, FilaAutoInfracao
+
+
+# tipo -> (modelo, condição de irregularidade, descrição exibida)
+REGRAS = {
+    'banco': (
+        AutoBanco,
+        Q(nada_consta=False, sem_irregularidades=False),
+        'Diversas irregularidades bancárias',
+    ),
+    'posto': (
+        AutoPosto,
+        Q(nada_consta=False, sem_irregularidades=False),
+        'Irregularidades em posto de combustível',
+    ),
+    'supermercado': (
+        AutoSupermercado,
+        Q(nada_consta=False),
+        'Irregularidades em supermercado',
+    ),
+}
+
+
+class FilaInfracaoService:
+    """Sincronização e consulta da fila de autos aguardando infração"""
+
+    TAMANHO_LOTE = 1000
+    TAMANHO_PAGINA = 50
+    TAMANHO_PAGINA_MAXIMO = 500
+
+    # ---------- regras ----------
+
+    def possui_irregularidade(self, tipo: str, auto) -> bool:
+        if auto.nada_consta:
+            return False
+        return tipo == 'supermercado' or not auto.sem_irregularidades
+
+    def tipo_do_modelo(self, modelo) -> Optional[str]:
+        for tipo, (modelo_regra, _, _) in REGRAS.items():
+            if modelo_regra is modelo:
+                return tipo
+        return None
+
+    def possui_infracao(self, tipo: str, objeto_id: int) -> bool:
+        return AutoInfracao.objects.filter(
+            content_type=ContentType.objects.get_for_model(REGRAS[tipo][0]),
+            object_id=objeto_id,
+        ).exists()
+
+    def entrada(self, tipo: str, auto) -> FilaAutoInfracao:
+        return FilaAutoInfracao(
+            tipo=tipo,
+            objeto_id=auto.pk,
+            numero=auto.numero or '',
+            razao_social=auto.razao_social or '',
+            cnpj=auto.cnpj or '',
+            data_fiscalizacao=auto.data_fiscalizacao,
+            irregularidades=REGRAS[tipo][2],
+        )
+
+    # ---------- sincronização ----------
+
+    def sincronizar_auto(self, tipo: str, auto) -> bool:
+        """
+        Coloca ou retira o auto da fila conforme seu estado atual.
+        Retorna True quando o auto permanece na fila.
+        """
+        if not self.possui_irregularidade(tipo, auto) or self.possui_infracao(tipo, auto.pk):
+            self.remover(tipo, auto.pk)
+            return False
+
+        entrada = self.entrada(tipo, auto)
+        FilaAutoInfracao.objects.update_or_create(
+            tipo=tipo,
+            objeto_id=auto.pk,
+            defaults={
+                'numero': entrada.numero,
+                'razao_social': entrada.razao_social,
+                'cnpj': entrada.cnpj,
+                'data_fiscalizacao': entrada.data_fiscalizacao,
+                'irregularidades': entrada.irregularidades,
+            },
+        )
+        return True
+
+    def sincronizar_origem(self, infracao: AutoInfracao) -> None:
+        """Ressincroniza o auto de constatação vinculado a uma infração"""
+        if not infracao.content_type_id or not infracao.object_id:
+            return
+        tipo = self.tipo_do_modelo(infracao.content_type.model_class())
+        if tipo is None:
+            return
+        auto = REGRAS[tipo][0].objects.filter(pk=infracao.object_id).first()
+        if auto is None:
+            self.remover(tipo, infracao.object_id)
+        else:
+            self.sincronizar_auto(tipo, auto)
+
+    def remover(self, tipo: str, objeto_id: int) -> None:
+        FilaAutoInfracao.objects.filter(tipo=tipo, objeto_id=objeto_id).delete()
+
+    def reconstruir(self, tipos: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        """
+        Reconstrói a fila com uma consulta por tipo: autos irregulares sem
+        infração correspondente (NOT EXISTS), gravados em lotes
+        """
+        tipos = list(tipos or REGRAS)
+        totais = {}
+        for tipo in tipos:
+            modelo, condicao, _ = REGRAS[tipo]
+            com_infracao = AutoInfracao.objects.filter(
+                content_type=ContentType.objects.get_for_model(modelo),
+                object_id=OuterRef('pk'),
+            )
+            queryset = modelo.objects.filter(condicao).filter(~Exists(com_infracao)).only(
+                'id', 'numero', 'razao_social', 'cnpj', 'data_fiscalizacao',
+            )
+
+            FilaAutoInfracao.objects.filter(tipo=tipo).delete()
+            lote, total = [], 0
+            for auto in queryset.order_by('pk').iterator(chunk_size=self.TAMANHO_LOTE):
+                lote.append(self.entrada(tipo, auto))
+                if len(lote) >= self.TAMANHO_LOTE:
+                    FilaAutoInfracao.objects.bulk_create(lote)
+                    total += len(lote)
+                    lote = []
+            if lote:
+                FilaAutoInfracao.objects.bulk_create(lote)
+                total += len(lote)
+            totais[tipo] = total
+        return totais
+
+    # ---------- consulta ----------
+
+    def contagens(self) -> Dict[str, int]:
+        totais = dict.fromkeys(REGRAS, 0)
+        for linha in FilaAutoInfracao.objects.order_by().values('tipo').annotate(total=Count('id')):
+            totais[linha['tipo']] = linha['total']
+        return totais
+
+    def listar(self, tipo: Optional[str] = None, pagina: int = 1, tamanho: Optional[int] = None) -> Dict:
+        tamanho = min(max(int(tamanho or self.TAMANHO_PAGINA), 1), self.TAMANHO_PAGINA_MAXIMO)
+        queryset = FilaAutoInfracao.objects.order_by('-data_fiscalizacao', '-id')
+        if tipo and tipo != 'todos':
+            queryset = queryset.filter(tipo=tipo)
+
+        pagina_atual = Paginator(
+            queryset.values('tipo', 'objeto_id', 'numero', 'razao_social', 'cnpj',
+                            'data_fiscalizacao', 'irregularidades'),
+            tamanho,
+        ).get_page(pagina)
+
+        return {
+            'results': [
+                {
+                    'tipo': entrada['tipo'],
+                    'id': entrada['objeto_id'],
+                    'numero': entrada['numero'],
+                    'razao_social': entrada['razao_social'],
+                    'cnpj': entrada['cnpj'],
+                    'data_fiscalizacao': entrada['data_fiscalizacao'],
+                    'irregularidades': entrada['irregularidades'],
+                }
+                for entrada in pagina_atual.object_list
+            ],
+            'total': pagina_atual.paginator.count,
+            'pagina': pagina_atual.number,
+            'total_paginas': pagina_atual.paginator.num_pages,
+            'contagens': self.contagens(),
+        }
+
+
+fila_infracao_service = FilaInfracaoService()
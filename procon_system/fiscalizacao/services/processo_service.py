@@ -0,0 +1,339 @@
+"""
+Serviço de processos administrativos em lote
+Operações set-based (status, reatribuição, prorrogação), exportação CSV
+em streaming e estatísticas avançadas calculadas em consultas agrupadas
+"""
+import csv
+from datetime import timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator, Optional
+
+from django.db import transaction
+from django.db.models import (
+    Avg, Count, DateField, DurationField, ExpressionWrapper, F, Max, Q, QuerySet, Sum,
+)
+from django.db.models.functions import TruncDate, TruncMonth
+from django.utils import timezone
+
+from ..models import HistoricoProcesso, Processo
+
+
+STATUS_FINALIZADOS = Processo.STATUS_FINALIZADOS
+
+
+class OperacaoLoteError(ValueError):
+    """Parâmetros inválidos para uma operação em lote"""
+
+
+class ProcessoLoteService:
+    """Aplica operações a vários processos com UPDATEs únicos e histórico em bulk_create"""
+
+    OPERACOES = ('alterar_status', 'reatribuir', 'prorrogar_prazo')
+    CAMPOS_PRAZO = ('prazo_defesa', 'prazo_recurso')
+    MAX_PROCESSOS = 1000
+
+    def executar(self, operacao: str, ids: Iterable[int], usuario: str = 'Sistema', **params) -> Dict:
+        """Despacha a operação; retorna quantos processos foram afetados"""
+        if operacao not in self.OPERACOES:
+            raise OperacaoLoteError(f'Operação inválida: {operacao}')
+
+        ids = sorted({int(pk) for pk in ids})
+        if not ids:
+            raise OperacaoLoteError('Nenhum processo informado')
+        if len(ids) > self.MAX_PROCESSOS:
+            raise OperacaoLoteError(f'Máximo de {self.MAX_PROCESSOS} processos por operação')
+
+        with transaction.atomic():
+            # Bloqueia as linhas para que o status anterior registrado no histórico seja consistente
+            atuais = dict(
+                Processo.objects.select_for_update()
+                .filter(id__in=ids)
+                .values_list('id', 'status')
+            )
+            resultado = getattr(self, f'_{operacao}')(atuais, usuario, **params)
+
+        resultado['nao_encontrados'] = [pk for pk in ids if pk not in atuais]
+        return resultado
+
+    def alterar_status(self, queryset: QuerySet, novo_status: str, usuario: str = 'Sistema',
+                       observacao: str = '') -> Dict:
+        """
+        Equivalente auditável de queryset.update(status=...): um UPDATE e o
+        histórico das transições reais em bulk_create, sem limite de quantidade
+        """
+        with transaction.atomic():
+            atuais = dict(
+                queryset.order_by('id').select_for_update()
+                .values_list('id', 'status')
+            )
+            if not atuais:
+                return {'afetados': 0, 'ignorados': 0}
+            return self._alterar_status(atuais, usuario, novo_status=novo_status, observacao=observacao)
+
+    def _alterar_status(self, atuais: Dict[int, str], usuario: str,
+                        novo_status: str = None, observacao: str = '', **_) -> Dict:
+        if novo_status not in dict(Processo.STATUS_CHOICES):
+            raise OperacaoLoteError(f'Status inválido: {novo_status}')
+
+        alterar = [pk for pk, status in atuais.items() if status != novo_status]
+        if not alterar:
+            return {'afetados': 0, 'ignorados': len(atuais)}
+
+        agora = timezone.now()
+        hoje = timezone.localdate(agora)
+        queryset = Processo.objects.filter(id__in=alterar)
+        queryset.update(status=novo_status, atualizado_em=agora)
+
+        # Mesmas regras de datas de Processo.atualizar_status, aplicadas em conjunto
+        if novo_status == 'defesa_apresentada':
+            queryset.filter(data_defesa__isnull=True).update(
+                data_defesa=hoje, prazo_recurso=hoje + timedelta(days=10)
+            )
+        elif novo_status == 'recurso_apresentado':
+            queryset.filter(data_recurso__isnull=True).update(data_recurso=hoje)
+        elif novo_status in STATUS_FINALIZADOS:
+            queryset.filter(data_finalizacao__isnull=True).update(data_finalizacao=hoje)
+
+        HistoricoProcesso.registrar_transicoes(
+            {pk: atuais[pk] for pk in alterar}, novo_status,
+            observacao=observacao or 'Alteração de status em lote', usuario=usuario, data=agora,
+        )
+        self._sincronizar_prazos(alterar)
+
+        return {'afetados': len(alterar), 'ignorados': len(atuais) - len(alterar)}
+
+    def _reatribuir(self, atuais: Dict[int, str], usuario: str,
+                    analista_responsavel: Optional[str] = None,
+                    fiscal_responsavel: Optional[str] = None,
+                    observacao: str = '', **_) -> Dict:
+        campos = {}
+        if analista_responsavel is not None:
+            campos['analista_responsavel'] = analista_responsavel
+        if fiscal_responsavel is not None:
+            campos['fiscal_responsavel'] = fiscal_responsavel
+        if not campos:
+            raise OperacaoLoteError('Informe analista_responsavel e/ou fiscal_responsavel')
+
+        agora = timezone.now()
+        afetados = Processo.objects.filter(id__in=list(atuais)).update(atualizado_em=agora, **campos)
+
+        descricao = ', '.join(f'{campo}: {valor or "(vazio)"}' for campo, valor in campos.items())
+        self._registrar_historico(atuais, usuario, agora, observacao or f'Reatribuição em lote - {descricao}')
+        return {'afetados': afetados, 'ignorados': 0}
+
+    def _prorrogar_prazo(self, atuais: Dict[int, str], usuario: str,
+                         dias: int = None, campo_prazo: str = 'prazo_defesa',
+                         observacao: str = '', **_) -> Dict:
+        if campo_prazo not in self.CAMPOS_PRAZO:
+            raise OperacaoLoteError(f'Prazo inválido: {campo_prazo}')
+        try:
+            dias = int(dias)
+        except (TypeError, ValueError):
+            raise OperacaoLoteError('Informe a quantidade de dias da prorrogação')
+        if dias <= 0:
+            raise OperacaoLoteError('A prorrogação deve ser de pelo menos 1 dia')
+
+        agora = timezone.now()
+        com_prazo = Processo.objects.filter(id__in=list(atuais), **{f'{campo_prazo}__isnull': False})
+        prorrogados = list(com_prazo.values_list('id', flat=True))
+        com_prazo.update(
+            atualizado_em=agora,
+            **{campo_prazo: ExpressionWrapper(F(campo_prazo) + timedelta(days=dias), output_field=DateField())},
+        )
+
+        self._registrar_historico(
+            {pk: atuais[pk] for pk in prorrogados}, usuario, agora,
+            observacao or f'Prorrogação em lote de {dias} dia(s) em {campo_prazo}',
+        )
+        self._sincronizar_prazos(prorrogados)
+        return {'afetados': len(prorrogados), 'ignorados': len(atuais) - len(prorrogados)}
+
+    @staticmethod
+    def _sincronizar_prazos(ids) -> None:
+        """Os UPDATEs não disparam os signals: reconcilia os processos no índice de prazos"""
+        from monitoring.prazos import varredura_prazos_service
+
+        varredura_prazos_service.reconstruir(['processo'], ids=ids)
+
+    @staticmethod
+    def _registrar_historico(atuais: Dict[int, str], usuario: str, agora, observacao: str) -> None:
+        """Histórico de alterações que não mudam o status (status anterior == novo)"""
+        HistoricoProcesso.registrar_transicoes(atuais, observacao=observacao, usuario=usuario, data=agora)
+
+
+class _Echo:
+    """Pseudo-buffer para csv.writer: devolve a linha em vez de armazená-la"""
+
+    def write(self, value):
+        return value
+
+
+class ProcessoEstatisticasService:
+    """Exportação e estatísticas de processos sem carregar os modelos em memória"""
+
+    COLUNAS_EXPORTACAO = [
+        ('numero_processo', 'Número do Processo'),
+        ('autuado', 'Autuado'),
+        ('cnpj', 'CNPJ'),
+        ('status', 'Status'),
+        ('prioridade', 'Prioridade'),
+        ('prazo_defesa', 'Prazo Defesa'),
+        ('prazo_recurso', 'Prazo Recurso'),
+        ('valor_multa', 'Valor Multa (R$)'),
+        ('valor_final', 'Valor Final (R$)'),
+        ('fiscal_responsavel', 'Fiscal Responsável'),
+        ('analista_responsavel', 'Analista Responsável'),
+        ('data_finalizacao', 'Data Finalização'),
+        ('criado_em', 'Criado em'),
+    ]
+
+    def filtrar(self, params) -> QuerySet:
+        """Filtros compartilhados por exportação e estatísticas"""
+        queryset = Processo.objects.all()
+        if params.get('status'):
+            queryset = queryset.filter(status__in=params.get('status').split(','))
+        if params.get('prioridade'):
+            queryset = queryset.filter(prioridade__in=params.get('prioridade').split(','))
+        if params.get('data_inicio'):
+            queryset = queryset.filter(criado_em__date__gte=params.get('data_inicio'))
+        if params.get('data_fim'):
+            queryset = queryset.filter(criado_em__date__lte=params.get('data_fim'))
+        if params.get('fiscal'):
+            queryset = queryset.filter(fiscal_responsavel=params.get('fiscal'))
+        if params.get('analista'):
+            queryset = queryset.filter(analista_responsavel=params.get('analista'))
+        return queryset
+
+    def linhas_csv(self, queryset, chunk_size: int = 2000) -> Iterator[str]:
+        """Gera o CSV linha a linha a partir de um cursor (values_list + iterator)"""
+        writer = csv.writer(_Echo(), delimiter=';')
+        status_display = dict(Processo.STATUS_CHOICES)
+        prioridade_display = dict(Processo.PRIORIDADE_CHOICES)
+        campos = [campo for campo, _ in self.COLUNAS_EXPORTACAO]
+
+        yield '\ufeff'  # BOM para o Excel reconhecer UTF-8
+        yield writer.writerow([titulo for _, titulo in self.COLUNAS_EXPORTACAO])
+        for linha in queryset.order_by('id').values_list(*campos).iterator(chunk_size=chunk_size):
+            registro = dict(zip(campos, linha))
+            registro['status'] = status_display.get(registro['status'], registro['status'])
+            registro['prioridade'] = prioridade_display.get(registro['prioridade'], registro['prioridade'])
+            yield writer.writerow([self._formatar(registro[campo]) for campo in campos])
+
+    @staticmethod
+    def _formatar(valor) -> str:
+        if valor is None:
+            return ''
+        if isinstance(valor, Decimal):
+            return f'{valor:.2f}'.replace('.', ',')
+        if hasattr(valor, 'strftime'):
+            return valor.strftime('%d/%m/%Y %H:%M' if hasattr(valor, 'hour') else '%d/%m/%Y')
+        return str(valor)
+
+    def estatisticas(self, queryset) -> Dict:
+        """Estatísticas avançadas em poucas consultas agrupadas"""
+        hoje = timezone.localdate()
+        limite = hoje + timedelta(days=3)
+        ativos = ~Q(status__in=STATUS_FINALIZADOS)
+        prazo_vencido = (
+            Q(status='aguardando_defesa', prazo_defesa__lt=hoje) |
+            Q(status='aguardando_recurso', prazo_recurso__lt=hoje)
+        )
+        prazo_vencendo = ativos & (
+            Q(prazo_defesa__range=(hoje, limite)) | Q(prazo_recurso__range=(hoje, limite))
+        )
+
+        # 1) Totais e indicadores de prazo em um único aggregate
+        resumo = queryset.aggregate(
+            total=Count('id'),
+            ativos=Count('id', filter=ativos),
+            finalizados=Count('id', filter=~ativos),
+            prazo_vencido=Count('id', filter=prazo_vencido),
+            prazo_vencendo=Count('id', filter=prazo_vencendo),
+            valor_total_multas=Sum('valor_multa'),
+            valor_medio_multa=Avg('valor_multa'),
+            valor_total_final=Sum('valor_final'),
+            maior_multa=Max('valor_multa'),
+        )
+
+        # 2) Status x prioridade
+        por_status, por_prioridade, matriz = {}, {}, []
+        for linha in queryset.order_by().values('status', 'prioridade').annotate(
+            total=Count('id'), valor=Sum('valor_multa')
+        ):
+            por_status[linha['status']] = por_status.get(linha['status'], 0) + linha['total']
+            por_prioridade[linha['prioridade']] = por_prioridade.get(linha['prioridade'], 0) + linha['total']
+            matriz.append({
+                'status': linha['status'],
+                'prioridade': linha['prioridade'],
+                'total': linha['total'],
+                'valor_multas': float(linha['valor'] or 0),
+            })
+
+        # 3) Série mensal de abertura e finalização
+        abertos_mes = {
+            linha['mes'].strftime('%Y-%m'): linha
+            for linha in queryset.order_by().annotate(mes=TruncMonth('criado_em'))
+            .values('mes').annotate(total=Count('id'), valor=Sum('valor_multa'))
+        }
+        finalizados_mes = {
+            linha['mes'].strftime('%Y-%m'): linha['total']
+            for linha in queryset.filter(data_finalizacao__isnull=False).order_by()
+            .annotate(mes=TruncMonth('data_finalizacao')).values('mes').annotate(total=Count('id'))
+        }
+        evolucao_mensal = [
+            {
+                'mes': mes,
+                'abertos': abertos_mes[mes]['total'] if mes in abertos_mes else 0,
+                'finalizados': finalizados_mes.get(mes, 0),
+                'valor_multas': float(abertos_mes[mes]['valor'] or 0) if mes in abertos_mes else 0,
+            }
+            for mes in sorted(set(abertos_mes) | set(finalizados_mes))
+        ]
+
+        # 4) Tempo médio de tramitação dos finalizados (em dias)
+        duracao = queryset.filter(data_finalizacao__isnull=False).aggregate(
+            media=Avg(ExpressionWrapper(
+                F('data_finalizacao') - TruncDate('criado_em'), output_field=DurationField()
+            ))
+        )['media']
+
+        # 5) Rankings
+        por_fiscal = list(
+            queryset.exclude(fiscal_responsavel='').order_by().values('fiscal_responsavel')
+            .annotate(total=Count('id'), ativos=Count('id', filter=ativos))
+            .order_by('-total')[:10]
+        )
+        por_analista = list(
+            queryset.exclude(analista_responsavel='').order_by().values('analista_responsavel')
+            .annotate(total=Count('id'), ativos=Count('id', filter=ativos))
+            .order_by('-total')[:10]
+        )
+        reincidentes = list(
+            queryset.exclude(cnpj='').order_by().values('cnpj')
+            .annotate(autuado=Max('autuado'), total=Count('id'), valor=Sum('valor_multa'))
+            .filter(total__gt=1).order_by('-total', '-valor')[:10]
+        )
+
+        return {
+            'resumo': {
+                **{chave: resumo[chave] for chave in ('total', 'ativos', 'finalizados', 'prazo_vencido', 'prazo_vencendo')},
+                'valor_total_multas': float(resumo['valor_total_multas'] or 0),
+                'valor_medio_multa': float(resumo['valor_medio_multa'] or 0),
+                'valor_total_final': float(resumo['valor_total_final'] or 0),
+                'maior_multa': float(resumo['maior_multa'] or 0),
+                'tempo_medio_tramitacao_dias': round(duracao.total_seconds() / 86400, 1) if duracao else None,
+            },
+            'por_status': por_status,
+            'por_prioridade': por_prioridade,
+            'status_prioridade': matriz,
+            'evolucao_mensal': evolucao_mensal,
+            'por_fiscal': por_fiscal,
+            'por_analista': por_analista,
+            'reincidentes': [
+                {**linha, 'valor': float(linha['valor'] or 0)} for linha in reincidentes
+            ],
+        }
+
+
+processo_lote_service = ProcessoLoteService()
+processo_estatisticas_service = ProcessoEstatisticasService()
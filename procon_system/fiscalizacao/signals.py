@@ -1,7 +1,13 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django.utils import timezone
-from .models import AutoInfracao, Processo, HistoricoProcesso
+from .models import (
+    AutoBanco, AutoDiversos, AutoInfracao, AutoPosto, AutoSupermercado,
+    Processo, HistoricoProcesso,
+)
+from .services.busca_service import busca_unificada_service
+from .services.fila_infracao_service import fila_infracao_service
+from .services.estatisticas_service import estatisticas_fiscalizacao_service
 
 @receiver(post_save, sender=AutoInfracao)
 def criar_processo_automatico(sender, instance, created, **kwargs):
@@ -44,50 +50,136 @@ def criar_processo_automatico(sender, instance, created, **kwargs):
             print(f"❌ Erro ao criar processo automaticamente para Auto {instance.numero}: {str(e)}")
 
 @receiver(post_save, sender=Processo)
-def registrar_mudanca_status(sender, instance, created, **kwargs):
+def registrar_mudanca_status(sender, instance, created, raw=False, **kwargs):
     """
     Signal que registra mudanças de status do processo no histórico.
+    O status anterior é o carregado na instância (Processo.from_db), sem
+    consultar o banco; saves que não mudam o status não geram registro.
     """
-    if not created:  # Só para atualizações, não criações
-        try:
-            # Buscar último status no histórico
-            ultimo_historico = HistoricoProcesso.objects.filter(
-                processo=instance,
-                tipo='status_change'
-            ).order_by('-data_ocorrencia').first()
-            
-            # Se o status mudou, registrar no histórico
-            status_anterior = ultimo_historico.status_novo if ultimo_historico else None
-            
-            if status_anterior and status_anterior != instance.status:
-                HistoricoProcesso.objects.create(
-                    processo=instance,
-                    tipo='status_change',
-                    descricao_mudanca=f'Status alterado de "{status_anterior}" para "{instance.status}"',
-                    status_anterior=status_anterior,
-                    status_novo=instance.status,
-                    data_ocorrencia=timezone.now(),
-                    usuario_responsavel='Sistema'  # Pode ser melhorado para capturar usuário real
-                )
-                
-        except Exception as e:
-            print(f"❌ Erro ao registrar mudança de status: {str(e)}")
+    if created or raw:
+        return
+    status_anterior = getattr(instance, '_status_carregado', None)
+    if status_anterior is None or status_anterior == instance.status:
+        return
+    try:
+        HistoricoProcesso.objects.create(
+            processo=instance,
+            status_anterior=status_anterior,
+            status_novo=instance.status,
+            observacao=getattr(instance, '_observacao_status', '') or
+            f'Status alterado de "{status_anterior}" para "{instance.status}"',
+            usuario=getattr(instance, '_usuario_status', '') or 'Sistema',
+        )
+    except Exception as e:
+        print(f"❌ Erro ao registrar mudança de status: {str(e)}")
 
 def calcular_prazo_defesa(data_fiscalizacao, dias_uteis=15):
     """
-    Calcula o prazo para apresentação de defesa (15 dias úteis).
+    Calcula o prazo para apresentação de defesa (15 dias úteis), pulando
+    fins de semana, feriados e dias sem expediente do órgão.
     """
-    from datetime import timedelta
-    
+    from monitoring.calendario import calendario_service
+
     data_base = data_fiscalizacao if data_fiscalizacao else timezone.now().date()
-    prazo = data_base
-    
-    # Adicionar dias úteis (seg-sex)
-    dias_adicionados = 0
-    while dias_adicionados < dias_uteis:
-        prazo += timedelta(days=1)
-        # Se não for fim de semana (seg=0, dom=6)
-        if prazo.weekday() < 5:  
-            dias_adicionados += 1
-    
-    return prazo
+    return calendario_service.adicionar_dias_uteis(data_base, dias_uteis)
+
+
+# ---------- Índice de busca unificada ----------
+
+TIPOS_AUTO_BUSCA = {
+    AutoBanco: 'banco',
+    AutoPosto: 'posto',
+    AutoSupermercado: 'supermercado',
+    AutoDiversos: 'diversos',
+}
+
+
+def atualizar_indice_auto(sender, instance, raw=False, **kwargs):
+    """Mantém a entrada do auto no índice de busca unificada"""
+    if raw:
+        return
+    try:
+        busca_unificada_service.indexar(
+            busca_unificada_service.entrada_auto(TIPOS_AUTO_BUSCA[sender], instance)
+        )
+    except Exception as e:
+        print(f"❌ Erro ao indexar auto {instance.pk} para busca: {str(e)}")
+
+
+def remover_indice_auto(sender, instance, **kwargs):
+    busca_unificada_service.remover(TIPOS_AUTO_BUSCA[sender], instance.pk)
+
+
+for modelo_auto in TIPOS_AUTO_BUSCA:
+    post_save.connect(atualizar_indice_auto, sender=modelo_auto, dispatch_uid=f'indice_busca_{modelo_auto.__name__}')
+    post_delete.connect(remover_indice_auto, sender=modelo_auto, dispatch_uid=f'indice_busca_del_{modelo_auto.__name__}')
+
+
+@receiver(post_save, sender=Processo, dispatch_uid='indice_busca_processo')
+def atualizar_indice_processo(sender, instance, raw=False, **kwargs):
+    """Mantém a entrada do processo no índice de busca unificada"""
+    if raw:
+        return
+    try:
+        busca_unificada_service.indexar(busca_unificada_service.entrada_processo(instance))
+    except Exception as e:
+        print(f"❌ Erro ao indexar processo {instance.pk} para busca: {str(e)}")
+
+
+@receiver(post_delete, sender=Processo, dispatch_uid='indice_busca_del_processo')
+def remover_indice_processo(sender, instance, **kwargs):
+    busca_unificada_service.remover('processo', instance.pk)
+
+
+# ---------- Fila de autos com potencial infração ----------
+
+TIPOS_AUTO_FILA = {
+    AutoBanco: 'banco',
+    AutoPosto: 'posto',
+    AutoSupermercado: 'supermercado',
+}
+
+
+def atualizar_fila_auto(sender, instance, raw=False, **kwargs):
+    """Coloca ou retira o auto da fila de autos aguardando infração"""
+    if raw:
+        return
+    try:
+        fila_infracao_service.sincronizar_auto(TIPOS_AUTO_FILA[sender], instance)
+    except Exception as e:
+        print(f"❌ Erro ao atualizar fila de infrações para auto {instance.pk}: {str(e)}")
+
+
+def remover_fila_auto(sender, instance, **kwargs):
+    fila_infracao_service.remover(TIPOS_AUTO_FILA[sender], instance.pk)
+
+
+for modelo_auto in TIPOS_AUTO_FILA:
+    post_save.connect(atualizar_fila_auto, sender=modelo_auto, dispatch_uid=f'fila_infracao_{modelo_auto.__name__}')
+    post_delete.connect(remover_fila_auto, sender=modelo_auto, dispatch_uid=f'fila_infracao_del_{modelo_auto.__name__}')
+
+
+@receiver(post_save, sender=AutoInfracao, dispatch_uid='fila_infracao_infracao')
+@receiver(post_delete, sender=AutoInfracao, dispatch_uid='fila_infracao_del_infracao')
+def atualizar_fila_origem_infracao(sender, instance, raw=False, **kwargs):
+    """Infração criada retira o auto de origem da fila; infração excluída o devolve"""
+    if raw:
+        return
+    try:
+        fila_infracao_service.sincronizar_origem(instance)
+    except Exception as e:
+        print(f"❌ Erro ao atualizar fila de infrações para infração {instance.pk}: {str(e)}")
+
+
+# ---------- Cache de estatísticas ----------
+
+def invalidar_estatisticas(sender, **kwargs):
+    """Qualquer alteração em autos ou infrações descarta as estatísticas em cache"""
+    estatisticas_fiscalizacao_service.invalidar()
+
+
+for modelo_estatisticas in (*TIPOS_AUTO_BUSCA, AutoInfracao):
+    post_save.connect(invalidar_estatisticas, sender=modelo_estatisticas,
+                      dispatch_uid=f'estatisticas_{modelo_estatisticas.__name__}')
+    post_delete.connect(invalidar_estatisticas, sender=modelo_estatisticas,
+                        dispatch_uid=f'estatisticas_del_{modelo_estatisticas.__name__}')
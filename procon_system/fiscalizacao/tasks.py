@@ -68,4 +68,21 @@ def gerar_relatorio_mensal():
         return "Relatório mensal gerado com sucesso"
     except Exception as exc:
         logger.error(f"Erro ao gerar relatório mensal: {exc}")
-        raise
\ No newline at end of file
+        raise
+
+
+@shared_task
+def gerar_documentos_lote(tipo, formato, ids, caminho):
+    """
+    Gera o ZIP com os documentos dos autos fora da requisição (a
+    renderização em lote usa um pool de processos) e grava no storage
+    """
+    from django.core.files.base import ContentFile
+    from django.core.files.storage import default_storage
+    from .services import documento_auto_service
+
+    autos = list(documento_auto_service.autos_lote(tipo, ids=ids))
+    conteudo = documento_auto_service.renderizar_lote(tipo, autos, formato)
+    caminho = default_storage.save(caminho, ContentFile(conteudo))
+    logger.info(f"Lote de documentos gerado: {len(autos)} autos em {caminho}")
+    return caminho
@@ -58,6 +58,7 @@ from .views import (
     gerar_documento_posto,
     gerar_documento_supermercado,
     gerar_documento_diversos,
+    gerar_documentos_lote,
     
     # Related Models Views
     AtendimentoCaixaBancoListAPIView,
@@ -98,6 +99,7 @@ urlpatterns = [
     path('diversos/', AutoDiversosListCreateAPIView.as_view(), name='diversos_list_create'),
     path('diversos/<int:pk>/', AutoDiversosRetrieveUpdateDestroyAPIView.as_view(), name='diversos_detail'),
     path('diversos/<int:pk>/gerar-documento/', gerar_documento_diversos, name='gerar_documento_diversos'),
+    path('documentos/lote/', gerar_documentos_lote, name='gerar_documentos_lote'),
     
     # === ENDPOINTS PARA AUTO DE INFRAÇÃO ===
     path('infracoes/', AutoInfracaoListCreateAPIView.as_view(), name='infracao_list_create'),
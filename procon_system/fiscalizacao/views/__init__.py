@@ -73,6 +73,7 @@ __all__ = [
     'gerar_documento_posto',
     'gerar_documento_supermercado',
     'gerar_documento_diversos',
+    'gerar_documentos_lote',
     
     # Related Models Views
     'AtendimentoCaixaBancoListAPIView',
@@ -12,15 +12,10 @@ from django.core.cache import cache
 from django.views.decorators.cache import cache_page
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
+from django.utils.dateparse import parse_date
 from datetime import datetime, timedelta
-import concurrent.futures
-import threading
 
 from ..models import (
-    AutoBanco,
-    AutoPosto,
-    AutoSupermercado,
-    AutoDiversos,
     AutoInfracao,
     Processo,
 )
@@ -29,6 +24,7 @@ from ..serializers import (
     DashboardResponseSerializer,
     EstatisticasResponseSerializer,
 )
+from ..services.estatisticas_service import estatisticas_fiscalizacao_service
 
 
 # ========================================
@@ -39,105 +35,53 @@ from ..serializers import (
 def dashboard_stats(request):
     """
     Retorna estatísticas principais para o dashboard.
-    Otimizado para performance com queries paralelas.
+    Autos e tendências vêm do motor de estatísticas (consulta agrupada, em
+    cache); infrações e processos usam uma agregação cada.
     """
     try:
-        def get_auto_stats():
-            """Estatísticas dos autos de constatação"""
-            return {
-                'total_bancos': AutoBanco.objects.count(),
-                'total_postos': AutoPosto.objects.count(),
-                'total_supermercados': AutoSupermercado.objects.count(),
-                'total_diversos': AutoDiversos.objects.count(),
-            }
-        
-        def get_infracao_stats():
-            """Estatísticas das infrações"""
-            hoje = timezone.now().date()
-            mes_atual = hoje.replace(day=1)
-            
-            return {
-                'total_infracoes': AutoInfracao.objects.count(),
-                'infracoes_mes': AutoInfracao.objects.filter(
-                    data_fiscalizacao__gte=mes_atual
-                ).count(),
-                'infracoes_pendentes': AutoInfracao.objects.filter(
-                    status__in=['autuado', 'notificado']
-                ).count(),
-                'por_gravidade': dict(
-                    AutoInfracao.objects.values('gravidade').annotate(
-                        count=Count('id')
-                    ).values_list('gravidade', 'count')
-                ),
-            }
-        
-        def get_processo_stats():
-            """Estatísticas dos processos"""
-            return {
-                'total_processos': Processo.objects.count(),
-                'processos_pendentes': Processo.objects.filter(
-                    status__in=['aguardando_defesa', 'aguardando_recurso']
-                ).count(),
-                'processos_finalizados': Processo.objects.filter(
-                    status__in=['finalizado_procedente', 'finalizado_improcedente']
-                ).count(),
+        hoje = timezone.now().date()
+        resumo_autos = estatisticas_fiscalizacao_service.estatisticas()['totais']
+
+        infracoes = AutoInfracao.objects.aggregate(
+            total=Count('id'),
+            mes=Count('id', filter=Q(data_fiscalizacao__gte=hoje.replace(day=1))),
+            pendentes=Count('id', filter=Q(status__in=['autuado', 'notificado'])),
+        )
+        processos_por_status = dict(
+            Processo.objects.order_by().values('status').annotate(
+                count=Count('id')
+            ).values_list('status', 'count')
+        )
+
+        stats = {
+            'autos': {
+                'total_bancos': resumo_autos['autos_banco'],
+                'total_postos': resumo_autos['autos_posto'],
+                'total_supermercados': resumo_autos['autos_supermercado'],
+                'total_diversos': resumo_autos['autos_diversos'],
+            },
+            'infracoes': {
+                'total_infracoes': infracoes['total'],
+                'infracoes_mes': infracoes['mes'],
+                'infracoes_pendentes': infracoes['pendentes'],
                 'por_status': dict(
-                    Processo.objects.values('status').annotate(
+                    AutoInfracao.objects.order_by().values('status').annotate(
                         count=Count('id')
                     ).values_list('status', 'count')
                 ),
-            }
-        
-        def get_tendencias():
-            """Tendências dos últimos 6 meses"""
-            hoje = timezone.now().date()
-            seis_meses_atras = hoje - timedelta(days=180)
-            
-            # Autos por mês
-            autos_por_mes = {}
-            for i in range(6):
-                data_inicio = hoje.replace(day=1) - timedelta(days=30*i)
-                data_fim = (data_inicio + timedelta(days=31)).replace(day=1) - timedelta(days=1)
-                
-                total_banco = AutoBanco.objects.filter(
-                    data_fiscalizacao__range=[data_inicio, data_fim]
-                ).count()
-                total_posto = AutoPosto.objects.filter(
-                    data_fiscalizacao__range=[data_inicio, data_fim]
-                ).count()
-                total_super = AutoSupermercado.objects.filter(
-                    data_fiscalizacao__range=[data_inicio, data_fim]
-                ).count()
-                total_diversos = AutoDiversos.objects.filter(
-                    data_fiscalizacao__range=[data_inicio, data_fim]
-                ).count()
-                
-                mes_key = data_inicio.strftime('%Y-%m')
-                autos_por_mes[mes_key] = {
-                    'banco': total_banco,
-                    'posto': total_posto,
-                    'supermercado': total_super,
-                    'diversos': total_diversos,
-                    'total': total_banco + total_posto + total_super + total_diversos
-                }
-            
-            return autos_por_mes
-        
-        # Executar queries em paralelo para melhor performance
-        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
-            future_autos = executor.submit(get_auto_stats)
-            future_infracoes = executor.submit(get_infracao_stats)
-            future_processos = executor.submit(get_processo_stats)
-            future_tendencias = executor.submit(get_tendencias)
-            
-            # Coletar resultados
-            stats = {
-                'autos': future_autos.result(),
-                'infracoes': future_infracoes.result(),
-                'processos': future_processos.result(),
-                'tendencias': future_tendencias.result(),
-                'resumo': {}
-            }
+            },
+            'processos': {
+                'total_processos': sum(processos_por_status.values()),
+                'processos_pendentes': sum(
+                    processos_por_status.get(s, 0) for s in ('aguardando_defesa', 'aguardando_recurso')
+                ),
+                'processos_finalizados': sum(
+                    processos_por_status.get(s, 0) for s in ('finalizado_procedente', 'finalizado_improcedente')
+                ),
+                'por_status': processos_por_status,
+            },
+            'tendencias': estatisticas_fiscalizacao_service.tendencias(6, hoje),
+        }
         
         # Calcular resumo geral
         stats['resumo'] = {
@@ -173,100 +117,34 @@ def dashboard_stats(request):
 def estatisticas_gerais(request):
     """
     Estatísticas gerais mais detalhadas do sistema.
+    Filtros opcionais: data_inicio, data_fim (AAAA-MM-DD) e municipio.
     """
     try:
-        # Filtros opcionais
         data_inicio = request.GET.get('data_inicio')
         data_fim = request.GET.get('data_fim')
         municipio = request.GET.get('municipio')
-        
-        # Queries base
-        autos_banco = AutoBanco.objects.all()
-        autos_posto = AutoPosto.objects.all()
-        autos_super = AutoSupermercado.objects.all()
-        autos_diversos = AutoDiversos.objects.all()
-        infracoes = AutoInfracao.objects.all()
-        
-        # Aplicar filtros se fornecidos
-        if data_inicio:
-            autos_banco = autos_banco.filter(data_fiscalizacao__gte=data_inicio)
-            autos_posto = autos_posto.filter(data_fiscalizacao__gte=data_inicio)
-            autos_super = autos_super.filter(data_fiscalizacao__gte=data_inicio)
-            autos_diversos = autos_diversos.filter(data_fiscalizacao__gte=data_inicio)
-            infracoes = infracoes.filter(data_fiscalizacao__gte=data_inicio)
-        
-        if data_fim:
-            autos_banco = autos_banco.filter(data_fiscalizacao__lte=data_fim)
-            autos_posto = autos_posto.filter(data_fiscalizacao__lte=data_fim)
-            autos_super = autos_super.filter(data_fiscalizacao__lte=data_fim)
-            autos_diversos = autos_diversos.filter(data_fiscalizacao__lte=data_fim)
-            infracoes = infracoes.filter(data_fiscalizacao__lte=data_fim)
-        
-        if municipio:
-            autos_banco = autos_banco.filter(municipio__icontains=municipio)
-            autos_posto = autos_posto.filter(municipio__icontains=municipio)
-            autos_super = autos_super.filter(municipio__icontains=municipio)
-            autos_diversos = autos_diversos.filter(municipio__icontains=municipio)
-        
-        # Calcular estatísticas
+
+        try:
+            inicio = parse_date(data_inicio) if data_inicio else None
+            fim = parse_date(data_fim) if data_fim else None
+        except ValueError:
+            inicio = fim = None
+        if (data_inicio and not inicio) or (data_fim and not fim):
+            return Response(
+                {'error': 'Datas devem estar no formato AAAA-MM-DD'},
+                status=400
+            )
+
+        resultado = estatisticas_fiscalizacao_service.estatisticas(
+            data_inicio=inicio, data_fim=fim, municipio=municipio
+        )
         stats = {
             'periodo': {
                 'data_inicio': data_inicio,
                 'data_fim': data_fim,
                 'municipio': municipio,
             },
-            'totais': {
-                'autos_banco': autos_banco.count(),
-                'autos_posto': autos_posto.count(),
-                'autos_supermercado': autos_super.count(),
-                'autos_diversos': autos_diversos.count(),
-                'total_autos': (
-                    autos_banco.count() + autos_posto.count() + 
-                    autos_super.count() + autos_diversos.count()
-                ),
-                'total_infracoes': infracoes.count(),
-            },
-            'por_origem': {
-                'acao_fiscalizatoria': (
-                    autos_banco.filter(origem='acao').count() +
-                    autos_posto.filter(origem='acao').count() +
-                    autos_super.filter(origem='acao').count() +
-                    autos_diversos.filter(origem='acao').count()
-                ),
-                'denuncia': (
-                    autos_banco.filter(origem='denuncia').count() +
-                    autos_posto.filter(origem='denuncia').count() +
-                    autos_super.filter(origem='denuncia').count() +
-                    autos_diversos.filter(origem='denuncia').count()
-                ),
-                'forca_tarefa': (
-                    autos_banco.filter(origem='forca_tarefa').count() +
-                    autos_posto.filter(origem='forca_tarefa').count() +
-                    autos_super.filter(origem='forca_tarefa').count() +
-                    autos_diversos.filter(origem='forca_tarefa').count()
-                ),
-            },
-            'irregularidades': {
-                'bancos_com_irregularidades': autos_banco.exclude(
-                    Q(nada_consta=True) | Q(sem_irregularidades=True)
-                ).count(),
-                'postos_com_irregularidades': autos_posto.exclude(
-                    Q(nada_consta=True) | Q(sem_irregularidades=True)
-                ).count(),
-                'supermercados_com_irregularidades': autos_super.exclude(
-                    nada_consta=True
-                ).count(),
-            },
-            'infracoes_por_gravidade': dict(
-                infracoes.values('gravidade').annotate(
-                    count=Count('id')
-                ).values_list('gravidade', 'count')
-            ),
-            'infracoes_por_tipo': dict(
-                infracoes.values('tipo_infracao').annotate(
-                    count=Count('id')
-                ).values_list('tipo_infracao', 'count')
-            ),
+            **resultado,
         }
         
         # Validar com serializer
@@ -7,7 +7,7 @@ incluindo criação, listagem, atualização de status e relacionamentos com Aut
 
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404
-from django.db.models import Count, Q
+from django.db.models import Count
 from django.contrib.contenttypes.models import ContentType
 from rest_framework import generics, status
 from rest_framework.decorators import api_view
@@ -24,6 +24,7 @@ from ..models import (
     STATUS_INFRACAO_CHOICES,
 )
 
+from ..services.fila_infracao_service import REGRAS, fila_infracao_service
 from ..serializers import (
     AutoInfracaoSerializer,
     AutoInfracaoCreateSerializer,
@@ -84,161 +85,19 @@ def gerar_documento_infracao_docx(request, pk):
     
     try:
         from django.http import HttpResponse
-        from django.template.loader import get_template
-        import os
-        from docx import Document
-        from docx.shared import Inches
-        from io import BytesIO
-        import locale
+        from ..services import documento_auto_service
         
-        # Configura locale para português
-        try:
-            locale.setlocale(locale.LC_TIME, 'pt_BR.UTF-8')
-        except:
-            pass
-        
-        # Cria o documento
-        doc = Document()
-        
-        # Cabeçalho
-        header = doc.sections[0].header
-        header_para = header.paragraphs[0]
-        header_para.text = "GOVERNO DO ESTADO DO AMAZONAS\nInstituto de Defesa do Consumidor\nPROCON-AM"
-        
-        # Título
-        title = doc.add_heading(f'AUTO DE INFRAÇÃO Nº {auto.numero}', 0)
-        title.alignment = 1  # Centralizado
-        
-        # Dados básicos
-        doc.add_heading('DADOS DO ESTABELECIMENTO', level=1)
-        
-        p = doc.add_paragraph()
-        p.add_run('RAZÃO SOCIAL: ').bold = True
-        p.add_run(auto.razao_social or '')
-        
-        if auto.nome_fantasia:
-            p = doc.add_paragraph()
-            p.add_run('NOME FANTASIA: ').bold = True
-            p.add_run(auto.nome_fantasia)
-        
-        p = doc.add_paragraph()
-        p.add_run('ATIVIDADE: ').bold = True
-        p.add_run(auto.atividade or '')
-        
-        p = doc.add_paragraph()
-        p.add_run('ENDEREÇO: ').bold = True
-        p.add_run(auto.endereco or '')
-        
-        p = doc.add_paragraph()
-        p.add_run('CNPJ: ').bold = True
-        p.add_run(auto.cnpj or '')
-        
-        if auto.telefone:
-            p = doc.add_paragraph()
-            p.add_run('TELEFONE: ').bold = True
-            p.add_run(auto.telefone)
-        
-        # Data e local
-        doc.add_heading('FISCALIZAÇÃO', level=1)
-        
-        p = doc.add_paragraph()
-        p.add_run('MUNICÍPIO: ').bold = True
-        p.add_run(f"{auto.municipio}, {auto.estado}")
-        
-        p = doc.add_paragraph()
-        p.add_run('DATA: ').bold = True
-        p.add_run(auto.data_fiscalizacao.strftime('%d/%m/%Y'))
-        
-        p = doc.add_paragraph()
-        p.add_run('HORA: ').bold = True
-        p.add_run(auto.hora_fiscalizacao.strftime('%H:%M'))
-        
-        # Parecer prévio
-        if auto.parecer_numero:
-            doc.add_heading('PARECER PRÉVIO', level=1)
-            p = doc.add_paragraph()
-            p.add_run('NÚMERO: ').bold = True
-            p.add_run(auto.parecer_numero)
-            
-            p = doc.add_paragraph()
-            p.add_run('ORIGEM: ').bold = True
-            p.add_run(auto.parecer_origem)
-        
-        # Relatório
-        doc.add_heading('RELATÓRIO', level=1)
-        doc.add_paragraph(auto.relatorio or '')
-        
-        # Base legal
-        doc.add_heading('BASE LEGAL', level=1)
-        if auto.base_legal_cdc:
-            p = doc.add_paragraph()
-            p.add_run('CDC: ').bold = True
-            p.add_run(auto.base_legal_cdc)
-        
-        if auto.base_legal_outras:
-            p = doc.add_paragraph()
-            p.add_run('OUTRAS BASES LEGAIS: ').bold = True
-            p.add_run(auto.base_legal_outras)
-        
-        # Infrações
-        doc.add_heading('INFRAÇÕES CONSTATADAS', level=1)
-        
-        infracoes = []
-        if auto.infracao_art_34:
-            infracoes.append("Art. 34 do CDC")
-        if auto.infracao_art_35:
-            infracoes.append("Art. 35 do CDC")
-        if auto.infracao_art_36:
-            infracoes.append("Art. 36 do CDC")
-        if auto.infracao_art_55:
-            infracoes.append("Art. 55 do CDC")
-        if auto.infracao_art_56:
-            infracoes.append("Art. 56 do CDC")
-        if auto.infracao_publicidade_enganosa:
-            infracoes.append("Publicidade Enganosa")
-        if auto.infracao_precos_abusivos:
-            infracoes.append("Preços Abusivos")
-        if auto.infracao_produtos_vencidos:
-            infracoes.append("Produtos Vencidos")
-        if auto.infracao_falta_informacao:
-            infracoes.append("Falta de Informação")
-        
-        for infracao in infracoes:
-            doc.add_paragraph(f"• {infracao}", style='List Bullet')
-        
-        if auto.outras_infracoes:
-            p = doc.add_paragraph()
-            p.add_run('OUTRAS INFRAÇÕES: ').bold = True
-            p.add_run(auto.outras_infracoes)
-        
-        # Valor da multa
-        doc.add_heading('PENALIDADE', level=1)
-        p = doc.add_paragraph()
-        p.add_run('VALOR DA MULTA: ').bold = True
-        p.add_run(auto.valor_multa_formatado)
-        
-        # Responsáveis
-        doc.add_heading('RESPONSÁVEIS', level=1)
-        
-        p = doc.add_paragraph()
-        p.add_run('AUTORIDADE FISCALIZADORA: ').bold = True
-        p.add_run(f"{auto.fiscal_nome} - {auto.fiscal_cargo}")
-        
-        p = doc.add_paragraph()
-        p.add_run('ESTABELECIMENTO FISCALIZADO: ').bold = True
-        p.add_run(f"{auto.responsavel_nome} - CPF: {auto.responsavel_cpf}")
-        
-        # Salva em buffer
-        buffer = BytesIO()
-        doc.save(buffer)
-        buffer.seek(0)
+        # Template compilado uma vez por processo; reimpressões saem do cache
+        conteudo = documento_auto_service.renderizar('infracao', auto)
         
         # Retorna como download
         response = HttpResponse(
-            buffer.getvalue(),
+            conteudo,
             content_type='application/vnd.openxmlformats-officedocument.wordprocessingml.document'
         )
-        response['Content-Disposition'] = f'attachment; filename="Auto_Infracao_{auto.numero.replace("/", "_")}.docx"'
+        response['Content-Disposition'] = (
+            f'attachment; filename="{documento_auto_service.nome_arquivo("infracao", auto)}"'
+        )
         
         return response
         
@@ -358,73 +217,28 @@ def infrações_por_auto(request, auto_tipo, auto_id):
 def autos_com_potencial_infracao(request):
     """
     Lista autos que têm irregularidades mas ainda não têm infração criada.
+    Lê a fila materializada (FilaAutoInfracao), paginada e ordenada por data.
+    Parâmetros: tipo (banco/posto/supermercado/todos), page, page_size
     """
     try:
-        resultado = []
-        
-        # AutoBanco com irregularidades
-        bancos_irregulares = AutoBanco.objects.exclude(
-            Q(nada_consta=True) | Q(sem_irregularidades=True)
-        ).exclude(
-            # Excluir os que já têm infração
-            id__in=AutoInfracao.objects.filter(
-                content_type=ContentType.objects.get_for_model(AutoBanco)
-            ).values_list('object_id', flat=True)
-        )
-        
-        for banco in bancos_irregulares:
-            resultado.append({
-                'tipo': 'banco',
-                'id': banco.id,
-                'numero': banco.numero,
-                'razao_social': banco.razao_social,
-                'data_fiscalizacao': banco.data_fiscalizacao,
-                'irregularidades': 'Diversas irregularidades bancárias'
-            })
-        
-        # AutoPosto com irregularidades
-        postos_irregulares = AutoPosto.objects.exclude(
-            Q(nada_consta=True) | Q(sem_irregularidades=True)
-        ).exclude(
-            id__in=AutoInfracao.objects.filter(
-                content_type=ContentType.objects.get_for_model(AutoPosto)
-            ).values_list('object_id', flat=True)
-        )
-        
-        for posto in postos_irregulares:
-            resultado.append({
-                'tipo': 'posto',
-                'id': posto.id,
-                'numero': posto.numero,
-                'razao_social': posto.razao_social,
-                'data_fiscalizacao': posto.data_fiscalizacao,
-                'irregularidades': 'Irregularidades em posto de combustível'
-            })
-        
-        # AutoSupermercado com irregularidades
-        supermercados_irregulares = AutoSupermercado.objects.exclude(
-            nada_consta=True
-        ).exclude(
-            id__in=AutoInfracao.objects.filter(
-                content_type=ContentType.objects.get_for_model(AutoSupermercado)
-            ).values_list('object_id', flat=True)
+        tipo = request.GET.get('tipo', 'todos')
+        if tipo not in ('todos', *REGRAS):
+            return Response(
+                {'error': f'Tipo inválido: {tipo}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response(fila_infracao_service.listar(
+            tipo=tipo,
+            pagina=request.GET.get('page', 1),
+            tamanho=request.GET.get('page_size'),
+        ))
+
+    except ValueError:
+        return Response(
+            {'error': 'page_size deve ser um número inteiro'},
+            status=status.HTTP_400_BAD_REQUEST
         )
-        
-        for supermercado in supermercados_irregulares:
-            resultado.append({
-                'tipo': 'supermercado',
-                'id': supermercado.id,
-                'numero': supermercado.numero,
-                'razao_social': supermercado.razao_social,
-                'data_fiscalizacao': supermercado.data_fiscalizacao,
-                'irregularidades': 'Irregularidades em supermercado'
-            })
-        
-        # Ordenar por data mais recente
-        resultado.sort(key=lambda x: x['data_fiscalizacao'], reverse=True)
-        
-        return Response(resultado)
-        
     except Exception as e:
         return Response(
             {'error': str(e)},
@@ -5,16 +5,18 @@ Este módulo contém views relacionadas aos Processos Administrativos,
 incluindo gestão completa do ciclo de vida dos processos.
 """
 
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.db.models import Count, Q, Sum, Avg
 from django.utils import timezone
 from django.core.cache import cache
+from django.db import connection
 from rest_framework import generics, status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework.pagination import PageNumberPagination
 from datetime import datetime, timedelta
+import time
 
 from ..models import (
     Processo,
@@ -23,6 +25,13 @@ from ..models import (
     AutoInfracao,
 )
 
+from ..services import (
+    busca_unificada_service, processo_estatisticas_service, processo_lote_service,
+)
+from ..services.processo_service import OperacaoLoteError
+from monitoring.middleware import MedicaoRequisicao
+from monitoring.prazos import fim_do_dia, varredura_prazos_service
+
 from ..serializers import (
     ProcessoSimpleSerializer,
     ProcessoDetailSerializer,
@@ -153,10 +162,9 @@ def processos_dashboard(request):
                 'processos_ativos': Processo.objects.exclude(
                     status__in=['finalizado_procedente', 'finalizado_improcedente', 'arquivado']
                 ).count(),
-                'processos_vencendo': Processo.objects.filter(
-                    Q(prazo_defesa__lte=hoje + timedelta(days=3)) |
-                    Q(prazo_recurso__lte=hoje + timedelta(days=3))
-                ).count(),
+                'processos_vencendo': varredura_prazos_service.contar_ate(
+                    'processo', fim_do_dia(hoje + timedelta(days=3))
+                ),
                 'processos_finalizados_mes': Processo.objects.filter(
                     data_finalizacao__month=hoje.month,
                     data_finalizacao__year=hoje.year
@@ -467,9 +475,19 @@ def sugerir_numero_processo(request):
 def exportar_processos(request):
     """
     Exporta lista de processos em formato CSV.
+
+    Aceita os mesmos filtros de estatisticas_avancadas (status, prioridade,
+    data_inicio, data_fim, fiscal, analista). As linhas são geradas sob
+    demanda, sem carregar todos os processos em memória.
     """
-    # Implementação de exportação seria aqui
-    pass
+    queryset = processo_estatisticas_service.filtrar(request.GET)
+    response = StreamingHttpResponse(
+        processo_estatisticas_service.linhas_csv(queryset),
+        content_type='text/csv; charset=utf-8',
+    )
+    nome_arquivo = f"processos_{timezone.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    response['Content-Disposition'] = f'attachment; filename="{nome_arquivo}"'
+    return response
 
 
 @api_view(['GET'])
@@ -477,17 +495,57 @@ def estatisticas_avancadas(request):
     """
     Estatísticas avançadas dos processos.
     """
-    # Implementação de estatísticas avançadas seria aqui
-    pass
+    try:
+        queryset = processo_estatisticas_service.filtrar(request.GET)
+        return Response(processo_estatisticas_service.estatisticas(queryset))
+
+    except Exception as e:
+        return Response({
+            'error': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
 @api_view(['POST'])
 def operacoes_lote(request):
     """
     Operações em lote para múltiplos processos.
+
+    Payload: {"operacao": "alterar_status" | "reatribuir" | "prorrogar_prazo",
+              "processos": [ids], ...parâmetros da operação}
+    - alterar_status: novo_status, observacao
+    - reatribuir: analista_responsavel e/ou fiscal_responsavel
+    - prorrogar_prazo: dias, campo_prazo (prazo_defesa | prazo_recurso)
     """
-    # Implementação de operações em lote seria aqui
-    pass
+    try:
+        dados = request.data
+        ids = dados.get('processos') or dados.get('ids') or []
+        usuario = request.user.username if request.user.is_authenticated else 'Sistema'
+        parametros = {
+            campo: dados.get(campo)
+            for campo in (
+                'novo_status', 'observacao', 'analista_responsavel',
+                'fiscal_responsavel', 'dias', 'campo_prazo',
+            )
+            if dados.get(campo) is not None
+        }
+
+        resultado = processo_lote_service.executar(
+            dados.get('operacao'), ids, usuario=usuario, **parametros
+        )
+        return Response({
+            'success': True,
+            'operacao': dados.get('operacao'),
+            **resultado,
+        })
+
+    except (OperacaoLoteError, TypeError, ValueError) as e:
+        return Response({
+            'error': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        return Response({
+            'error': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
 # ========================================
@@ -567,9 +625,45 @@ def listar_todos_processos(request):
 def teste_performance_busca(request, processo_id):
     """
     Endpoint para testar performance de busca.
+
+    Compara o carregamento do processo com e sem select_related/prefetch,
+    informando tempo e número de consultas de cada estratégia.
     """
-    # Implementação de teste de performance seria aqui
-    pass
+    try:
+        estrategias = {
+            'simples': lambda: Processo.objects.filter(id=processo_id),
+            'otimizada': lambda: Processo.objects.filter(id=processo_id)
+            .select_related('auto_infracao')
+            .prefetch_related('historico', 'documentos'),
+        }
+
+        resultados = {}
+        for nome, montar_queryset in estrategias.items():
+            medicao = MedicaoRequisicao()
+            inicio = time.perf_counter()
+            with connection.execute_wrapper(medicao):
+                processo = montar_queryset().first()
+                if processo is None:
+                    return Response({
+                        'error': 'Processo não encontrado'
+                    }, status=status.HTTP_404_NOT_FOUND)
+                len(processo.historico.all())
+                len(processo.documentos.all())
+                getattr(processo, 'auto_infracao', None)
+            resultados[nome] = {
+                'tempo_ms': round((time.perf_counter() - inicio) * 1000, 2),
+                'consultas': medicao.consultas,
+            }
+
+        return Response({
+            'processo_id': processo_id,
+            'resultados': resultados,
+        })
+
+    except Exception as e:
+        return Response({
+            'error': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
 @api_view(['GET'])
@@ -583,12 +677,8 @@ def busca_avancada_processos(request):
         # Filtros de busca
         q = request.GET.get('q', '')
         if q:
-            queryset = queryset.filter(
-                Q(numero_processo__icontains=q) |
-                Q(autuado__icontains=q) |
-                Q(cnpj__icontains=q) |
-                Q(observacoes__icontains=q)
-            )
+            # Subconsulta no índice de busca unificada em vez de icontains em Processo
+            queryset = queryset.filter(id__in=busca_unificada_service.ids_processos(q))
         
         # Filtros adicionais
         status = request.GET.get('status')
@@ -642,15 +732,16 @@ def processos_dashboard_cached(request):
         # Estatísticas básicas
         total_processos = Processo.objects.count()
         processos_abertos = Processo.objects.filter(status='aberto').count()
-        processos_vencidos = Processo.objects.filter(
-            Q(prazo_defesa__lt=hoje) | Q(prazo_recurso__lt=hoje)
-        ).count()
+        # Prazos ativos lidos do índice de prazos (monitoring)
+        processos_vencidos = varredura_prazos_service.contar_ate(
+            'processo', fim_do_dia(hoje - timedelta(days=1))
+        )
         
         # Processos próximos do vencimento (próximos 3 dias)
         limite_vencimento = hoje + timedelta(days=3)
-        processos_proximos_vencimento = Processo.objects.filter(
-            Q(prazo_defesa__lte=limite_vencimento) | Q(prazo_recurso__lte=limite_vencimento)
-        ).count()
+        processos_proximos_vencimento = varredura_prazos_service.contar_ate(
+            'processo', fim_do_dia(limite_vencimento)
+        )
         
         # Valor total em tramitação
         valor_total = Processo.objects.aggregate(
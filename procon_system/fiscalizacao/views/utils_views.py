@@ -9,14 +9,14 @@ Este módulo contém views para funcionalidades auxiliares como:
 - Relatórios
 """
 
-import io
 import os
+import uuid
 from django.conf import settings
+from django.core.files.storage import default_storage
 from django.http import HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404
 from django.db.models import Q
 from django.utils import timezone
-from docx import Document
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
@@ -36,6 +36,9 @@ from ..models import (
 from ..serializers import (
     AutoSimpleSerializer,
 )
+from ..services import busca_unificada_service, documento_auto_service
+from ..tasks import gerar_documentos_lote as gerar_documentos_lote_task
+from ..services.documento_service import CONTENT_TYPES, MODELOS_DOCUMENTO, TemplateDocumentoError
 
 
 # ========================================
@@ -161,42 +164,8 @@ def buscar_autos(request):
                 'message': 'Termo de busca não fornecido'
             })
         
-        resultados = []
-        
-        # Função para buscar em um modelo específico
-        def buscar_modelo(model_class, tipo_nome):
-            if tipo != 'todos' and tipo != tipo_nome:
-                return []
-            
-            autos = model_class.objects.filter(
-                Q(numero__icontains=query) |
-                Q(razao_social__icontains=query) |
-                Q(cnpj__icontains=query) |
-                Q(nome_fantasia__icontains=query)
-            ).order_by('-data_fiscalizacao')[:limite]
-            
-            return [{
-                'tipo': tipo_nome,
-                'id': auto.id,
-                'numero': auto.numero,
-                'razao_social': auto.razao_social,
-                'cnpj': auto.cnpj,
-                'data_fiscalizacao': auto.data_fiscalizacao,
-                'municipio': auto.municipio,
-                'url': f'/fiscalizacao/{tipo_nome}s/{auto.id}/'
-            } for auto in autos]
-        
-        # Buscar em todos os modelos
-        resultados.extend(buscar_modelo(AutoBanco, 'banco'))
-        resultados.extend(buscar_modelo(AutoPosto, 'posto'))
-        resultados.extend(buscar_modelo(AutoSupermercado, 'supermercado'))
-        resultados.extend(buscar_modelo(AutoDiversos, 'diversos'))
-        
-        # Ordenar por data mais recente
-        resultados.sort(key=lambda x: x['data_fiscalizacao'], reverse=True)
-        
-        # Limitar resultados
-        resultados = resultados[:limite]
+        # Uma única consulta no índice unificado (mantido pelos signals)
+        resultados = busca_unificada_service.buscar(query, tipo=tipo, limite=limite)
         
         return Response({
             'resultados': resultados,
@@ -281,66 +250,29 @@ def upload_anexo(request):
 # VIEWS DE GERAÇÃO DE DOCUMENTOS
 # ========================================
 
+def _resposta_documento(tipo, auto, formato):
+    """Renderiza pelo motor de templates (com cache) e monta o download"""
+    conteudo = documento_auto_service.renderizar(tipo, auto, formato)
+    response = HttpResponse(conteudo, content_type=CONTENT_TYPES[formato])
+    response['Content-Disposition'] = (
+        f'attachment; filename="{documento_auto_service.nome_arquivo(tipo, auto, formato)}"'
+    )
+    return response
+
+
 @api_view(['GET'])
 def gerar_documento_banco(request, pk):
     """
-    Gera documento Word para Auto de Banco.
+    Gera documento Word (ou PDF com ?formato=pdf) para Auto de Banco.
     """
     try:
-        auto = get_object_or_404(AutoBanco, pk=pk)
-        
-        # Criar documento
-        doc = Document()
-        
-        # Título
-        titulo = doc.add_heading('AUTO DE CONSTATAÇÃO - AGÊNCIA BANCÁRIA', 0)
-        titulo.alignment = 1  # Centralizar
-        
-        # Informações básicas
-        doc.add_paragraph(f"Número: {auto.numero}")
-        doc.add_paragraph(f"Data: {auto.data_fiscalizacao}")
-        doc.add_paragraph(f"Hora: {auto.hora_fiscalizacao}")
-        
-        # Dados da empresa
-        doc.add_heading('DADOS DO ESTABELECIMENTO', level=1)
-        doc.add_paragraph(f"Razão Social: {auto.razao_social}")
-        doc.add_paragraph(f"Nome Fantasia: {auto.nome_fantasia}")
-        doc.add_paragraph(f"CNPJ: {auto.cnpj}")
-        doc.add_paragraph(f"Endereço: {auto.endereco}")
-        doc.add_paragraph(f"Município: {auto.municipio}")
-        
-        # Irregularidades encontradas
-        doc.add_heading('IRREGULARIDADES CONSTATADAS', level=1)
-        
-        if auto.nada_consta:
-            doc.add_paragraph("✓ NADA CONSTA")
-        elif auto.sem_irregularidades:
-            doc.add_paragraph("✓ NÃO FORAM ENCONTRADAS IRREGULARIDADES")
-        else:
-            if auto.ausencia_cartaz_informativo:
-                doc.add_paragraph("• Ausência de Cartaz Informativo")
-            if auto.ausencia_profissional_libras:
-                doc.add_paragraph("• Ausência de profissional de LIBRAS")
-            # ... outras irregularidades
-        
-        if auto.observacoes:
-            doc.add_heading('OBSERVAÇÕES', level=1)
-            doc.add_paragraph(auto.observacoes)
-        
-        # Salvar em buffer
-        buffer = io.BytesIO()
-        doc.save(buffer)
-        buffer.seek(0)
-        
-        # Preparar resposta
-        response = HttpResponse(
-            buffer.getvalue(),
-            content_type='application/vnd.openxmlformats-officedocument.wordprocessingml.document'
-        )
-        response['Content-Disposition'] = f'attachment; filename="auto_banco_{auto.numero}.docx"'
-        
-        return response
+        auto = get_object_or_404(AutoBanco.objects.prefetch_related('atendimentos_caixa'), pk=pk)
+        return _resposta_documento('banco', auto, request.GET.get('formato', 'docx'))
         
+    except TemplateDocumentoError as e:
+        return Response({
+            'error': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
         return Response({
             'error': str(e)
@@ -350,31 +282,18 @@ def gerar_documento_banco(request, pk):
 @api_view(['GET'])
 def gerar_documento_posto(request, pk):
     """
-    Gera documento Word para Auto de Posto.
+    Gera documento Word (ou PDF com ?formato=pdf) para Auto de Posto.
     """
     try:
-        auto = get_object_or_404(AutoPosto, pk=pk)
-        
-        # Similar ao banco, mas específico para posto
-        doc = Document()
-        
-        titulo = doc.add_heading('AUTO DE CONSTATAÇÃO - POSTO DE COMBUSTÍVEL', 0)
-        titulo.alignment = 1
-        
-        # ... implementação similar
-        
-        buffer = io.BytesIO()
-        doc.save(buffer)
-        buffer.seek(0)
-        
-        response = HttpResponse(
-            buffer.getvalue(),
-            content_type='application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+        auto = get_object_or_404(
+            AutoPosto.objects.prefetch_related('notas_fiscais', 'cupons_fiscais'), pk=pk
         )
-        response['Content-Disposition'] = f'attachment; filename="auto_posto_{auto.numero}.docx"'
-        
-        return response
+        return _resposta_documento('posto', auto, request.GET.get('formato', 'docx'))
         
+    except TemplateDocumentoError as e:
+        return Response({
+            'error': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
         return Response({
             'error': str(e)
@@ -384,31 +303,16 @@ def gerar_documento_posto(request, pk):
 @api_view(['GET'])
 def gerar_documento_supermercado(request, pk):
     """
-    Gera documento Word para Auto de Supermercado.
+    Gera documento Word (ou PDF com ?formato=pdf) para Auto de Supermercado.
     """
     try:
         auto = get_object_or_404(AutoSupermercado, pk=pk)
+        return _resposta_documento('supermercado', auto, request.GET.get('formato', 'docx'))
         
-        # Implementação similar para supermercado
-        doc = Document()
-        
-        titulo = doc.add_heading('AUTO DE CONSTATAÇÃO - SUPERMERCADO', 0)
-        titulo.alignment = 1
-        
-        # ... implementação específica
-        
-        buffer = io.BytesIO()
-        doc.save(buffer)
-        buffer.seek(0)
-        
-        response = HttpResponse(
-            buffer.getvalue(),
-            content_type='application/vnd.openxmlformats-officedocument.wordprocessingml.document'
-        )
-        response['Content-Disposition'] = f'attachment; filename="auto_supermercado_{auto.numero}.docx"'
-        
-        return response
-        
+    except TemplateDocumentoError as e:
+        return Response({
+            'error': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
         return Response({
             'error': str(e)
@@ -418,31 +322,80 @@ def gerar_documento_supermercado(request, pk):
 @api_view(['GET'])
 def gerar_documento_diversos(request, pk):
     """
-    Gera documento Word para Auto Diversos.
+    Gera documento Word (ou PDF com ?formato=pdf) para Auto Diversos.
     """
     try:
         auto = get_object_or_404(AutoDiversos, pk=pk)
+        return _resposta_documento('diversos', auto, request.GET.get('formato', 'docx'))
         
-        # Implementação para diversos
-        doc = Document()
-        
-        titulo = doc.add_heading('AUTO DE CONSTATAÇÃO - LEGISLAÇÃO DIVERSA', 0)
-        titulo.alignment = 1
-        
-        # ... implementação específica
+    except TemplateDocumentoError as e:
+        return Response({
+            'error': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        return Response({
+            'error': str(e)
+        }, status=500)
+
+
+@api_view(['GET'])
+def gerar_documentos_lote(request):
+    """
+    Gera os documentos de vários autos em um arquivo ZIP.
+    
+    Parâmetros:
+    - tipo: 'banco', 'posto', 'supermercado', 'diversos' ou 'infracao'
+    - data: dia da operação (AAAA-MM-DD) ou ids: lista separada por vírgula
+    - formato: 'docx' (padrão) ou 'pdf'
+    """
+    try:
+        tipo = request.GET.get('tipo')
+        formato = request.GET.get('formato', 'docx')
+        data = request.GET.get('data')
+        ids = request.GET.get('ids')
         
-        buffer = io.BytesIO()
-        doc.save(buffer)
-        buffer.seek(0)
+        if tipo not in MODELOS_DOCUMENTO:
+            return Response({
+                'error': 'tipo inválido'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if not data and not ids:
+            return Response({
+                'error': 'Informe data ou ids'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if formato not in CONTENT_TYPES:
+            return Response({
+                'error': f'Formato não suportado: {formato}'
+            }, status=status.HTTP_400_BAD_REQUEST)
         
-        response = HttpResponse(
-            buffer.getvalue(),
-            content_type='application/vnd.openxmlformats-officedocument.wordprocessingml.document'
-        )
-        response['Content-Disposition'] = f'attachment; filename="auto_diversos_{auto.numero}.docx"'
+        if ids:
+            ids = [int(pk) for pk in ids.split(',') if pk.strip()]
+        autos = list(documento_auto_service.autos_lote(tipo, data=data, ids=ids or None))
+        if not autos:
+            return Response({
+                'error': 'Nenhum auto encontrado'
+            }, status=status.HTTP_404_NOT_FOUND)
         
+        nome_arquivo = f'autos_{tipo}_{data or "selecionados"}.zip'
+        if getattr(settings, 'CELERY_BROKER_URL', None):
+            caminho = f'documentos_lote/{uuid.uuid4().hex}/{nome_arquivo}'
+            tarefa = gerar_documentos_lote_task.delay(tipo, formato, [auto.pk for auto in autos], caminho)
+            return Response({
+                'message': 'Geração do lote agendada',
+                'task_id': tarefa.id,
+                'arquivo': default_storage.url(caminho),
+                'total_autos': len(autos)
+            }, status=status.HTTP_202_ACCEPTED)
+        
+        # Sem Celery o lote é renderizado na própria requisição, com um único processo
+        conteudo = documento_auto_service.renderizar_lote(tipo, autos, formato, max_workers=1)
+        response = HttpResponse(conteudo, content_type='application/zip')
+        response['Content-Disposition'] = f'attachment; filename="{nome_arquivo}"'
         return response
         
+    except (TemplateDocumentoError, ValueError) as e:
+        return Response({
+            'error': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
         return Response({
             'error': str(e)
@@ -0,0 +1,193 @@
+"""
+Snapshot de saúde do sistema atualizado em segundo plano
+As dependências (banco, Redis, Celery, disco) são verificadas em paralelo,
+cada uma com seu timeout, por uma thread do próprio worker. As probes do
+load balancer apenas leem o último snapshot, então não geram tráfego no
+banco/Redis nem ficam presas a uma dependência lenta.
+"""
+import logging
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Callable, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.db import connections
+
+
+logger = logging.getLogger(__name__)
+
+# Peso de cada status no status geral
+ORDEM_STATUS = {'healthy': 0, 'degraded': 1, 'unhealthy': 2}
+
+# (status, mensagem, impacto no status geral)
+Resultado = Tuple[str, str, str]
+
+
+def verificar_banco(timeout: float) -> Resultado:
+    with connections['default'].cursor() as cursor:
+        cursor.execute("SELECT 1")
+    return 'healthy', 'Database connection OK', 'healthy'
+
+
+_clientes_redis = {}
+
+
+def verificar_redis(timeout: float) -> Optional[Resultado]:
+    url = getattr(settings, 'REDIS_URL', '')
+    if not url:
+        return None
+    import redis
+
+    cliente = _clientes_redis.get(url)
+    if cliente is None:
+        cliente = _clientes_redis[url] = redis.from_url(
+            url, socket_timeout=timeout, socket_connect_timeout=timeout,
+        )
+    cliente.ping()
+    return 'healthy', 'Redis connection OK', 'healthy'
+
+
+def verificar_celery(timeout: float) -> Resultado:
+    try:
+        from procon_system.celery import app as celery_app
+        active_workers = celery_app.control.inspect(timeout=timeout).active()
+    except Exception as e:
+        return 'unknown', f'Celery check error: {str(e)}', 'healthy'
+    if active_workers:
+        return 'healthy', f'Celery workers active: {len(active_workers)}', 'healthy'
+    return 'unhealthy', 'No active Celery workers', 'degraded'
+
+
+def verificar_disco(timeout: float) -> Resultado:
+    total, used, free = shutil.disk_usage('/')
+    free_percent = (free / total) * 100
+    if free_percent > 20:
+        return 'healthy', f'Free space: {free_percent:.1f}%', 'healthy'
+    if free_percent > 10:
+        return 'warning', f'Low disk space: {free_percent:.1f}%', 'degraded'
+    return 'critical', f'Critical disk space: {free_percent:.1f}%', 'unhealthy'
+
+
+# nome: (verificação, impacto se falhar ou estourar o timeout)
+VERIFICACOES_PADRAO: Dict[str, Tuple[Callable[[float], Optional[Resultado]], str]] = {
+    'database': (verificar_banco, 'unhealthy'),
+    'redis': (verificar_redis, 'degraded'),
+    'celery': (verificar_celery, 'healthy'),
+    'disk': (verificar_disco, 'healthy'),
+}
+
+
+class SaudeService:
+    """
+    Mantém o snapshot de saúde do worker. A primeira leitura inicia a thread
+    de atualização (depois do fork do gunicorn); leituras de um snapshot
+    mais velho que HEALTH_TTL disparam uma atualização imediata.
+    """
+
+    def __init__(self, verificacoes: Optional[Dict] = None):
+        self.verificacoes = dict(verificacoes or VERIFICACOES_PADRAO)
+        self.intervalo = getattr(settings, 'HEALTH_INTERVALO_ATUALIZACAO', 10)
+        self.ttl = getattr(settings, 'HEALTH_TTL', 30)
+        self.timeouts = {'database': 2, 'redis': 1, 'celery': 3, 'disk': 1, **getattr(settings, 'HEALTH_TIMEOUTS', {})}
+        self.timeout_padrao = 2
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._atualizando = threading.Lock()
+        self._pendentes = {}  # verificações que estouraram o timeout e ainda rodam
+        self._executor = None
+        self._thread = None
+
+    # ---------- verificação ----------
+
+    def _executar(self, nome: str, verificacao, impacto: str, timeout: float) -> Optional[Dict]:
+        try:
+            resultado = verificacao(timeout)
+        except Exception as e:
+            logger.warning(f"{nome} health check failed: {e}")
+            return {'status': 'unhealthy', 'message': f'{nome} error: {str(e)}', 'impacto': impacto}
+        finally:
+            if nome == 'database':
+                connections.close_all()  # a thread não deve segurar conexões
+        if resultado is None:
+            return None
+        status, mensagem, impacto = resultado
+        return {'status': status, 'message': mensagem, 'impacto': impacto}
+
+    def atualizar(self) -> Dict:
+        """Executa as verificações em paralelo e troca o snapshot"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=2 * len(self.verificacoes), thread_name_prefix='health',
+            )
+        inicio = time.monotonic()
+        futuros, checks = {}, {}
+        for nome, (verificacao, impacto) in self.verificacoes.items():
+            timeout = self.timeouts.get(nome, self.timeout_padrao)
+            anterior = self._pendentes.get(nome)
+            if anterior is not None and not anterior.done():
+                # Não empilha threads em uma dependência travada
+                checks[nome] = {'status': 'timeout', 'message': 'Verificação anterior ainda em andamento', 'impacto': impacto}
+                continue
+            futuros[nome] = (self._executor.submit(self._executar, nome, verificacao, impacto, timeout), impacto, timeout)
+
+        for nome, (futuro, impacto, timeout) in futuros.items():
+            # Cada dependência tem o próprio prazo, contado do início da rodada
+            wait([futuro], timeout=max(0.0, inicio + timeout - time.monotonic()))
+            if futuro.done():
+                self._pendentes.pop(nome, None)
+                if futuro.result() is not None:
+                    checks[nome] = futuro.result()
+            else:
+                self._pendentes[nome] = futuro
+                checks[nome] = {'status': 'timeout', 'message': f'Sem resposta em {timeout}s', 'impacto': impacto}
+
+        overall_status = max(
+            (check.pop('impacto') for check in checks.values()), key=ORDEM_STATUS.get, default='healthy',
+        )
+        snapshot = {
+            'status': overall_status,
+            'timestamp': time.time(),
+            'response_time_ms': round((time.monotonic() - inicio) * 1000, 2),
+            'checks': checks,
+        }
+        with self._lock:
+            self._snapshot = snapshot
+        return snapshot
+
+    # ---------- atualização em segundo plano ----------
+
+    def _loop(self):
+        while True:
+            try:
+                with self._atualizando:
+                    self.atualizar()
+            except Exception as e:
+                logger.error(f"Health snapshot refresh failed: {e}")
+            time.sleep(self.intervalo)
+
+    def _garantir_thread(self):
+        if self.intervalo <= 0:
+            return  # só atualização sob demanda, quando o snapshot expira
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._loop, name='health-snapshot', daemon=True)
+                    self._thread.start()
+
+    def snapshot(self) -> Dict:
+        """Último snapshot com sua idade; só espera na primeira leitura do worker"""
+        self._garantir_thread()
+        snapshot = self._snapshot
+        if snapshot is None or time.time() - snapshot['timestamp'] > self.ttl:
+            # Sem snapshot válido: atualiza agora (apenas uma thread por vez)
+            with self._atualizando:
+                snapshot = self._snapshot
+                if snapshot is None or time.time() - snapshot['timestamp'] > self.ttl:
+                    snapshot = self.atualizar()
+        return {**snapshot, 'snapshot_age_s': round(time.time() - snapshot['timestamp'], 2)}
+
+
+# Instância global do serviço
+saude_service = SaudeService()
@@ -0,0 +1,74 @@
+"""
+Benchmark da assinatura digital de pareceres (assinaturas/segundo)
+Uso: python manage.py benchmark_assinaturas [--quantidade 500] [--workers 4]
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from juridico.services import AssinaturaDigitalService
+
+
+class Command(BaseCommand):
+    help = 'Mede assinaturas/seg sem cache de chave, com cache e em lote (pool de processos)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--quantidade',
+            type=int,
+            default=500,
+            help='Número de documentos assinados em cada cenário',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Processos usados no cenário em lote (padrão: núcleos disponíveis)',
+        )
+
+    def handle(self, *args, **options):
+        quantidade = options['quantidade']
+        service = AssinaturaDigitalService()
+        chave_pem, certificado_pem = service.gerar_certificado_digital(
+            'Analista Benchmark', 'benchmark@procon.am.gov.br', 'AM-00000'
+        )
+        conteudos = [f'PARECER JURÍDICO {i}\nConclusão: deferir.' for i in range(quantidade)]
+
+        def medir(nome, funcao):
+            inicio = time.perf_counter()
+            resultado = funcao()
+            duracao = time.perf_counter() - inicio
+            self.stdout.write(f'{nome:<32} {quantidade / duracao:>10.1f} op/s  ({duracao:.2f}s)')
+            return resultado
+
+        def sem_cache():
+            assinaturas = []
+            for conteudo in conteudos:
+                service.limpar_cache_chaves()
+                assinaturas.append(service.assinar_documento(conteudo, chave_pem))
+            return assinaturas
+
+        service.limpar_cache_chaves()
+        medir('Assinatura sem cache de chave', sem_cache)
+        assinaturas = medir(
+            'Assinatura com cache de chave',
+            lambda: [service.assinar_documento(conteudo, chave_pem) for conteudo in conteudos],
+        )
+        medir(
+            'Assinatura em lote (processos)',
+            lambda: service.assinar_conteudos(conteudos, chave_pem, options['workers']),
+        )
+
+        itens = list(zip(conteudos, assinaturas, [certificado_pem] * quantidade))
+        medir(
+            'Verificação com cache',
+            lambda: [service.verificar_assinatura(*item) for item in itens],
+        )
+        validos = medir(
+            'Verificação em lote (processos)',
+            lambda: service.verificar_conteudos(itens, options['workers']),
+        )
+
+        if all(validos):
+            self.stdout.write(self.style.SUCCESS('✅ Todas as assinaturas foram verificadas'))
+        else:
+            self.stdout.write(self.style.ERROR('❌ Há assinaturas inválidas'))
@@ -0,0 +1,32 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('juridico', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analistajuridico',
+            name='certificado_digital',
+            field=models.TextField(blank=True, verbose_name='Certificado Digital'),
+        ),
+        migrations.AddField(
+            model_name='analistajuridico',
+            name='chave_privada_digital',
+            field=models.TextField(blank=True, verbose_name='Chave Privada Digital'),
+        ),
+        migrations.AddField(
+            model_name='parecerjuridico',
+            name='assinado_por',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='pareceres_assinados', to='juridico.analistajuridico'),
+        ),
+        migrations.AddField(
+            model_name='parecerjuridico',
+            name='assinatura_digital',
+            field=models.JSONField(blank=True, null=True, verbose_name='Assinatura Digital'),
+        ),
+    ]
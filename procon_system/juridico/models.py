@@ -15,6 +15,10 @@ class AnalistaJuridico(models.Model):
     ativo = models.BooleanField("Ativo", default=True)
     data_cadastro = models.DateTimeField("Data de Cadastro", auto_now_add=True)
     
+    # Assinatura digital de pareceres (PEM gerado pelo AssinaturaDigitalService)
+    certificado_digital = models.TextField("Certificado Digital", blank=True)
+    chave_privada_digital = models.TextField("Chave Privada Digital", blank=True)
+    
     class Meta:
         verbose_name = "Analista Jurídico"
         verbose_name_plural = "Analistas Jurídicos"
@@ -447,6 +451,8 @@ class ParecerJuridico(models.Model):
     data_modificacao = models.DateTimeField("Data de Modificação", auto_now=True)
     assinado = models.BooleanField("Assinado", default=False)
     data_assinatura = models.DateTimeField("Data de Assinatura", null=True, blank=True)
+    assinatura_digital = models.JSONField("Assinatura Digital", null=True, blank=True)
+    assinado_por = models.ForeignKey(AnalistaJuridico, on_delete=models.SET_NULL, null=True, blank=True, related_name='pareceres_assinados')
     
     class Meta:
         verbose_name = "Parecer Jurídico"
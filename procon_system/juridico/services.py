@@ -10,9 +10,11 @@ import base64
 import json
 import logging
 import requests
-from typing import Dict, List, Optional, Any, Tuple
+from functools import lru_cache
+from typing import Dict, List, Optional, Any, Tuple, Union
 from datetime import datetime, timedelta
 from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
 from django.utils import timezone
 from django.core.files.base import ContentFile
 from django.core.files.storage import default_storage
@@ -28,10 +30,85 @@ from .models import (
 import uuid
 import os
 from django.db import transaction
+from core.integracoes import normalizar_numero_processo, obter_cliente
+from core.lotes import mapear
 
 logger = logging.getLogger(__name__)
 
 
+# ===================================================================
+# PRIMITIVAS DE ASSINATURA (nível de módulo para uso em ProcessPool)
+# ===================================================================
+
+PSS_PADDING = padding.PSS(
+    mgf=padding.MGF1(hashes.SHA256()),
+    salt_length=padding.PSS.MAX_LENGTH
+)
+
+
+def _como_bytes(pem: Union[str, bytes]) -> bytes:
+    return pem.encode('utf-8') if isinstance(pem, str) else bytes(pem)
+
+
+def _senha_chave() -> bytes:
+    """Senha que cifra as chaves privadas gravadas (settings.ASSINATURA_CHAVE_SENHA)"""
+    senha = getattr(settings, 'ASSINATURA_CHAVE_SENHA', '')
+    if not senha:
+        raise ImproperlyConfigured('ASSINATURA_CHAVE_SENHA não configurada')
+    return _como_bytes(senha)
+
+
+@lru_cache(maxsize=128)
+def _carregar_chave_privada(chave_privada_pem: bytes, senha: bytes) -> rsa.RSAPrivateKey:
+    """Decifra e carrega a chave privada uma única vez por PEM (um por analista)"""
+    return load_pem_private_key(chave_privada_pem, password=senha)
+
+
+@lru_cache(maxsize=256)
+def _carregar_certificado(certificado_pem: bytes) -> x509.Certificate:
+    """Carrega o certificado X.509 uma única vez por PEM"""
+    return x509.load_pem_x509_certificate(certificado_pem)
+
+
+def _assinar_conteudo(conteudo: str, chave_privada_pem: bytes, timestamp: str, senha: bytes) -> Dict[str, Any]:
+    """Assina o hash SHA-256 do conteúdo; não depende do Django"""
+    private_key = _carregar_chave_privada(_como_bytes(chave_privada_pem), senha)
+    content_hash = hashlib.sha256(conteudo.encode('utf-8')).digest()
+    signature = private_key.sign(content_hash, PSS_PADDING, hashes.SHA256())
+    return {
+        'algoritmo': 'RSA-SHA256',
+        'assinatura': base64.b64encode(signature).decode('utf-8'),
+        'hash_conteudo': base64.b64encode(content_hash).decode('utf-8'),
+        'timestamp': timestamp,
+        'versao': '1.0'
+    }
+
+
+def _verificar_conteudo(conteudo: str, assinatura_data: Dict[str, Any], certificado_pem: bytes) -> bool:
+    """Verifica a assinatura do conteúdo; levanta exceção se inválida"""
+    public_key = _carregar_certificado(_como_bytes(certificado_pem)).public_key()
+    signature = base64.b64decode(assinatura_data['assinatura'])
+    content_hash = hashlib.sha256(conteudo.encode('utf-8')).digest()
+    public_key.verify(signature, content_hash, PSS_PADDING, hashes.SHA256())
+    return True
+
+
+def _assinar_item(item: Tuple[str, bytes, str, bytes]) -> Dict[str, Any]:
+    conteudo, chave_privada_pem, timestamp, senha = item
+    try:
+        return {'sucesso': True, 'assinatura': _assinar_conteudo(conteudo, chave_privada_pem, timestamp, senha)}
+    except Exception as e:
+        return {'sucesso': False, 'erro': str(e)}
+
+
+def _verificar_item(item: Tuple[str, Dict[str, Any], bytes]) -> bool:
+    conteudo, assinatura_data, certificado_pem = item
+    try:
+        return _verificar_conteudo(conteudo, assinatura_data, certificado_pem)
+    except Exception:
+        return False
+
+
 class AssinaturaDigitalService:
     """Serviço para assinatura digital completa"""
     
@@ -39,6 +116,8 @@ class AssinaturaDigitalService:
         self.algorithm = hashes.SHA256()
         self.key_size = 2048
         self.certificate_validity_days = 365
+        self.max_workers_lote = getattr(settings, 'ASSINATURA_LOTE_MAX_WORKERS', os.cpu_count() or 1)
+        self.min_itens_pool_processos = getattr(settings, 'ASSINATURA_LOTE_MIN_ITENS_POOL', 32)
     
     def gerar_chave_privada(self) -> rsa.RSAPrivateKey:
         """Gera uma nova chave privada RSA"""
@@ -98,11 +177,11 @@ class AssinaturaDigitalService:
                 critical=False,
             ).sign(private_key, hashes.SHA256())
             
-            # Serializar chave privada e certificado
+            # Serializar chave privada (cifrada) e certificado
             private_key_pem = private_key.private_bytes(
                 encoding=serialization.Encoding.PEM,
                 format=serialization.PrivateFormat.PKCS8,
-                encryption_algorithm=serialization.NoEncryption()
+                encryption_algorithm=serialization.BestAvailableEncryption(_senha_chave())
             )
             
             certificate_pem = cert.public_bytes(serialization.Encoding.PEM)
@@ -114,93 +193,66 @@ class AssinaturaDigitalService:
             raise
     
     def assinar_documento(self, conteudo: str, chave_privada_pem: bytes) -> Dict[str, Any]:
-        """Assina um documento digitalmente"""
+        """Assina um documento digitalmente (chave carregada do cache LRU)"""
         try:
-            # Carregar chave privada
-            private_key = load_pem_private_key(chave_privada_pem, password=None)
-            
-            # Calcular hash do conteúdo
-            content_hash = hashlib.sha256(conteudo.encode('utf-8')).digest()
-            
-            # Assinar o hash
-            signature = private_key.sign(
-                content_hash,
-                padding.PSS(
-                    mgf=padding.MGF1(hashes.SHA256()),
-                    salt_length=padding.PSS.MAX_LENGTH
-                ),
-                hashes.SHA256()
-            )
-            
-            # Codificar assinatura em base64
-            signature_b64 = base64.b64encode(signature).decode('utf-8')
-            
-            # Criar metadados da assinatura
-            assinatura_data = {
-                'algoritmo': 'RSA-SHA256',
-                'assinatura': signature_b64,
-                'hash_conteudo': base64.b64encode(content_hash).decode('utf-8'),
-                'timestamp': timezone.now().isoformat(),
-                'versao': '1.0'
-            }
-            
-            return assinatura_data
-            
+            return _assinar_conteudo(conteudo, chave_privada_pem, timezone.now().isoformat(), _senha_chave())
         except Exception as e:
             logger.error(f"Erro ao assinar documento: {e}")
             raise
     
     def verificar_assinatura(self, conteudo: str, assinatura_data: Dict[str, Any], certificado_pem: bytes) -> bool:
-        """Verifica a assinatura digital de um documento"""
+        """Verifica a assinatura digital de um documento (certificado do cache LRU)"""
         try:
-            # Carregar certificado
-            cert = x509.load_pem_x509_certificate(certificado_pem)
-            public_key = cert.public_key()
-            
-            # Decodificar assinatura
-            signature = base64.b64decode(assinatura_data['assinatura'])
-            
-            # Calcular hash do conteúdo
-            content_hash = hashlib.sha256(conteudo.encode('utf-8')).digest()
-            
-            # Verificar assinatura
-            public_key.verify(
-                signature,
-                content_hash,
-                padding.PSS(
-                    mgf=padding.MGF1(hashes.SHA256()),
-                    salt_length=padding.PSS.MAX_LENGTH
-                ),
-                hashes.SHA256()
-            )
-            
-            return True
-            
+            return _verificar_conteudo(conteudo, assinatura_data, certificado_pem)
         except Exception as e:
             logger.error(f"Erro ao verificar assinatura: {e}")
             return False
     
-    def assinar_parecer_juridico(self, parecer: ParecerJuridico, analista: AnalistaJuridico) -> Dict[str, Any]:
-        """Assina um parecer jurídico digitalmente"""
-        try:
-            # Verificar se analista tem certificado
-            if not hasattr(analista, 'certificado_digital') or not analista.certificado_digital:
-                raise ValueError("Analista não possui certificado digital")
-            
-            # Preparar conteúdo para assinatura
-            conteudo = f"""
+    def assinar_conteudos(self, conteudos: List[str], chave_privada_pem: bytes,
+                          max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Assina vários conteúdos com a mesma chave; retorna um resultado por conteúdo"""
+        timestamp = timezone.now().isoformat()
+        chave_privada_pem, senha = _como_bytes(chave_privada_pem), _senha_chave()
+        itens = [(conteudo, chave_privada_pem, timestamp, senha) for conteudo in conteudos]
+        return mapear(_assinar_item, itens, max_workers or self.max_workers_lote, self.min_itens_pool_processos)
+    
+    def verificar_conteudos(self, itens: List[Tuple[str, Dict[str, Any], bytes]],
+                            max_workers: Optional[int] = None) -> List[bool]:
+        """Verifica vários pares (conteúdo, assinatura, certificado)"""
+        itens = [(conteudo, assinatura, _como_bytes(certificado)) for conteudo, assinatura, certificado in itens]
+        return mapear(_verificar_item, itens, max_workers or self.max_workers_lote, self.min_itens_pool_processos)
+    
+    def limpar_cache_chaves(self) -> None:
+        """Descarta chaves/certificados em cache (ex.: após revogação)"""
+        _carregar_chave_privada.cache_clear()
+        _carregar_certificado.cache_clear()
+    
+    @staticmethod
+    def _conteudo_parecer(parecer: ParecerJuridico, analista: AnalistaJuridico) -> str:
+        """Conteúdo canônico do parecer usado na assinatura e na verificação"""
+        return f"""
             PARECER JURÍDICO
-            Número: {parecer.numero}
-            Processo: {parecer.processo.numero}
+            Número: {parecer.pk}
+            Recurso: {parecer.recurso.numero}
             Analista: {analista.user.get_full_name()}
             OAB: {analista.oab}
-            Data: {parecer.data_emissao}
+            Data: {parecer.data_elaboracao}
             
             Conclusão: {parecer.conclusao}
             
             Fundamentação:
-            {parecer.fundamentacao}
+            {parecer.fundamentacao_juridica}
             """
+    
+    def assinar_parecer_juridico(self, parecer: ParecerJuridico, analista: AnalistaJuridico) -> Dict[str, Any]:
+        """Assina um parecer jurídico digitalmente"""
+        try:
+            # Verificar se analista tem certificado
+            if not hasattr(analista, 'certificado_digital') or not analista.certificado_digital:
+                raise ValueError("Analista não possui certificado digital")
+            
+            # Preparar conteúdo para assinatura
+            conteudo = self._conteudo_parecer(parecer, analista)
             
             # Assinar documento
             assinatura = self.assinar_documento(
@@ -212,7 +264,8 @@ class AssinaturaDigitalService:
             parecer.assinatura_digital = assinatura
             parecer.assinado_por = analista
             parecer.data_assinatura = timezone.now()
-            parecer.save()
+            parecer.assinado = True
+            parecer.save(update_fields=['assinatura_digital', 'assinado_por', 'data_assinatura', 'assinado'])
             
             return {
                 'sucesso': True,
@@ -243,19 +296,7 @@ class AssinaturaDigitalService:
                 }
             
             # Preparar conteúdo para verificação
-            conteudo = f"""
-            PARECER JURÍDICO
-            Número: {parecer.numero}
-            Processo: {parecer.processo.numero}
-            Analista: {parecer.assinado_por.user.get_full_name()}
-            OAB: {parecer.assinado_por.oab}
-            Data: {parecer.data_emissao}
-            
-            Conclusão: {parecer.conclusao}
-            
-            Fundamentação:
-            {parecer.fundamentacao}
-            """
+            conteudo = self._conteudo_parecer(parecer, parecer.assinado_por)
             
             # Verificar assinatura
             valido = self.verificar_assinatura(
@@ -277,16 +318,94 @@ class AssinaturaDigitalService:
                 'valido': False,
                 'erro': str(e)
             }
+    
+    def assinar_lote(self, pareceres: List[ParecerJuridico], analista: AnalistaJuridico,
+                     max_workers: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Assina vários pareceres do mesmo analista de uma vez: a chave é carregada
+        uma vez, as assinaturas rodam em pool de processos e a gravação é em lote.
+        """
+        if not getattr(analista, 'certificado_digital', None):
+            return {'sucesso': False, 'erro': 'Analista não possui certificado digital', 'assinados': 0}
+        
+        pareceres = list(pareceres)
+        conteudos = [self._conteudo_parecer(parecer, analista) for parecer in pareceres]
+        resultados = self.assinar_conteudos(conteudos, analista.chave_privada_digital, max_workers)
+        
+        agora = timezone.now()
+        assinados, erros = [], []
+        for parecer, resultado in zip(pareceres, resultados):
+            if not resultado['sucesso']:
+                erros.append({'parecer': parecer.pk, 'erro': resultado['erro']})
+                continue
+            parecer.assinatura_digital = resultado['assinatura']
+            parecer.assinado_por = analista
+            parecer.data_assinatura = agora
+            parecer.assinado = True
+            assinados.append(parecer)
+        
+        if assinados:
+            with transaction.atomic():
+                ParecerJuridico.objects.bulk_update(
+                    assinados, ['assinatura_digital', 'assinado_por', 'data_assinatura', 'assinado'], batch_size=500
+                )
+        
+        return {
+            'sucesso': not erros,
+            'assinados': len(assinados),
+            'erros': erros,
+        }
+    
+    def verificar_lote(self, pareceres: List[ParecerJuridico],
+                       max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Verifica vários pareceres; mesmo formato de verificar_parecer_assinalado"""
+        respostas: List[Optional[Dict[str, Any]]] = []
+        pendentes, itens = [], []
+        for parecer in pareceres:
+            assinante = getattr(parecer, 'assinado_por', None)
+            if not getattr(parecer, 'assinatura_digital', None):
+                respostas.append({'valido': False, 'erro': 'Parecer não possui assinatura digital'})
+            elif not assinante or not getattr(assinante, 'certificado_digital', None):
+                respostas.append({'valido': False, 'erro': 'Assinante não possui certificado digital'})
+            else:
+                pendentes.append((len(respostas), parecer))
+                respostas.append(None)
+                itens.append((
+                    self._conteudo_parecer(parecer, assinante),
+                    parecer.assinatura_digital,
+                    assinante.certificado_digital,
+                ))
+        
+        validos = self.verificar_conteudos(itens, max_workers)
+        for (posicao, parecer), valido in zip(pendentes, validos):
+            respostas[posicao] = {
+                'valido': valido,
+                'assinante': parecer.assinado_por.user.get_full_name(),
+                'data_assinatura': parecer.data_assinatura,
+                'oab': parecer.assinado_por.oab
+            }
+        return respostas
 
 
 class IntegracaoJuridicaAvancadaService:
     """Serviço para integrações jurídicas avançadas"""
     
     def __init__(self):
-        self.api_timeout = 30
-        self.max_retries = 3
+        self.cliente_tj = obter_cliente('tj')
+        self.api_timeout = self.cliente_tj.timeout
     
     def consultar_processo_tj(self, numero_processo: str) -> Dict[str, Any]:
+        """Consulta processo no Tribunal de Justiça com cache por número normalizado"""
+        numero = normalizar_numero_processo(numero_processo)
+        return self.cliente_tj.consultar(numero, lambda: self._buscar_processo_tj(numero))
+    
+    def consultar_processos_tj_lote(self, numeros: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Consulta vários processos concorrentemente; chaves são os números normalizados"""
+        return self.cliente_tj.consultar_lote(
+            [normalizar_numero_processo(numero) for numero in numeros], self._buscar_processo_tj
+        )
+    
+    def _buscar_processo_tj(self, numero_processo: str) -> Dict[str, Any]:
         """Consulta processo no Tribunal de Justiça (simulado)"""
         try:
             # Simulação de consulta ao TJ
@@ -3,13 +3,41 @@ Configuração de logging estruturado para o System Procon
 Substitui warnings soltos por sistema de logging inteligente
 """
 
+import atexit
+import copy
 import logging
+import logging.handlers
 import json
+import os
+import queue
+import random
+import threading
 import traceback
 from datetime import datetime
 from typing import Dict, Any, Optional
 from django.conf import settings
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Serializador sem indentação nem checagens repetidas a cada chamada
+_json_encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'), default=str)
+
+
+def serializar_json(dados: Dict[str, Any]) -> str:
+    """Caminho rápido de serialização: orjson quando instalado"""
+    if orjson is not None:
+        return orjson.dumps(dados, default=str).decode('utf-8')
+    return _json_encoder.encode(dados)
+
+
+def _configuracao(nome: str, padrao):
+    """Lê a configuração sem exigir settings configurado (importação antecipada)"""
+    return getattr(settings, nome, padrao) if settings.configured else padrao
+
+
 # Formatter personalizado para logs estruturados
 class StructuredFormatter(logging.Formatter):
     """Formata logs em estrutura JSON para melhor observabilidade"""
@@ -33,16 +61,118 @@ class StructuredFormatter(logging.Formatter):
             })
             
         if record.levelname == 'ERROR':
+            if record.exc_info:
+                rastreamento = traceback.format_exception(record.exc_info[0], record.exc_info[1], record.exc_info[2])
+            else:
+                # Registros vindos da fila já trazem o traceback formatado
+                rastreamento = record.exc_text.splitlines(keepends=True) if record.exc_text else None
             log_data.update({
                 'error_type': getattr(record, 'exc_type', None),
-                'traceback': traceback.format_exception(record.exc_info[0], record.exc_info[1], record.exc_info[2]) if record.exc_info else None,
+                'traceback': rastreamento,
             })
         
         # Adicionar contexto customizado se presente
         if hasattr(record, 'context'):
             log_data['context'] = record.context
+        if hasattr(record, 'sample_rate'):
+            log_data['sample_rate'] = record.sample_rate
             
-        return json.dumps(log_data, ensure_ascii=False)
+        return serializar_json(log_data)
+
+
+# Amostragem de categorias de alto volume
+class FiltroAmostragem(logging.Filter):
+    """
+    Mantém só uma fração dos registros abaixo de WARNING das categorias
+    (prefixos de logger) configuradas em LOGGING_AMOSTRAGEM; avisos e erros
+    passam sempre. Os registros mantidos levam sample_rate para reponderação.
+    O sorteio acontece uma vez por registro: os do ProconLogger chegam com
+    amostragem=True (sorteados em _ativo) e a decisão fica no registro para
+    os demais handlers com o mesmo filtro.
+    """
+    
+    def __init__(self, taxas: Optional[Dict[str, float]] = None):
+        super().__init__()
+        self.taxas = dict(taxas if taxas is not None else _configuracao('LOGGING_AMOSTRAGEM', {}))
+        self._por_logger: Dict[str, float] = {}
+        
+    def taxa(self, nome_logger: str) -> float:
+        taxa = self._por_logger.get(nome_logger)
+        if taxa is None:
+            # O prefixo mais específico vence
+            prefixos = [p for p in self.taxas if nome_logger == p or nome_logger.startswith(f'{p}.')]
+            taxa = self.taxas[max(prefixos, key=len)] if prefixos else 1.0
+            self._por_logger[nome_logger] = taxa
+        return taxa
+        
+    def manter(self, nome_logger: str, nivel: int) -> bool:
+        """Decide antes de montar o registro (usado pelos métodos do ProconLogger)"""
+        if nivel >= logging.WARNING:
+            return True
+        taxa = self.taxa(nome_logger)
+        return taxa >= 1.0 or random.random() < taxa
+        
+    def filter(self, record):
+        mantido = getattr(record, 'amostragem', None)
+        if mantido is None:
+            mantido = record.amostragem = self.manter(record.name, record.levelno)
+        if mantido:
+            taxa = self.taxa(record.name)
+            if taxa < 1.0 and record.levelno < logging.WARNING:
+                record.sample_rate = taxa
+        return mantido
+
+
+# Handler de fila: o thread da requisição só enfileira
+class FilaLogHandler(logging.handlers.QueueHandler):
+    """
+    Enfileira o registro sem bloquear. A fila é limitada: quando cheia o
+    registro é descartado e contado, e o total de descartes é avisado no
+    próximo registro que couber na fila.
+    """
+    
+    def __init__(self, tamanho: int = 10000):
+        super().__init__(queue.Queue(maxsize=tamanho))
+        self.descartados = 0
+        self._nao_reportados = 0
+        self._lock = threading.Lock()
+        self._formatter_excecao = logging.Formatter()
+        
+    def prepare(self, record):
+        """Só o mínimo no thread de origem: mensagem final e traceback em texto"""
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = self._formatter_excecao.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+        
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self.descartados += 1
+                self._nao_reportados += 1
+            return
+        if self._nao_reportados:
+            with self._lock:
+                perdidos, self._nao_reportados = self._nao_reportados, 0
+            aviso = logging.LogRecord(
+                'procon.logging', logging.WARNING, __file__, 0,
+                f'{perdidos} registro(s) de log descartado(s): fila cheia', None, None,
+            )
+            aviso.context = {'dropped': perdidos, 'dropped_total': self.descartados}
+            try:
+                self.queue.put_nowait(aviso)
+            except queue.Full:
+                with self._lock:
+                    self._nao_reportados += perdidos
+
+
+# Instância global do filtro de amostragem
+amostragem = FiltroAmostragem()
 
 # Logger específico para operações críticas
 class ProconLogger:
@@ -51,34 +181,46 @@ class ProconLogger:
     def __init__(self, name: str):
         self.logger = logging.getLogger(f'procon.{name}')
         
+    def _ativo(self, nivel: int = logging.INFO) -> bool:
+        """Evita montar o contexto de registros que o nível ou a amostragem descartariam"""
+        return self.logger.isEnabledFor(nivel) and amostragem.manter(self.logger.name, nivel)
+        
     def log_operation(self, operation: str, context: Dict[str, Any], level: str = 'INFO'):
         """Log de operação específica com contexto"""
+        if not self._ativo():
+            return
         extra_context = {
             'operation': operation,
             'context': context,
             'service': 'procon_system',
         }
-        self.logger.info(f'Operação: {operation}', extra={'context': extra_context})
+        self.logger.info(f'Operação: {operation}', extra={'context': extra_context, 'amostragem': True})
         
     def log_performance(self, operation: str, duration: float, context: Dict[str, Any] = None):
         """Log de performance de operações"""
+        if not self._ativo():
+            return
         perf_context = {
             'operation': operation,
             'duration_ms': duration * 1000,
             'performance_tier': self._get_performance_tier(duration),
             **(context or {}),
         }
-        self.logger.info(f'Performance: {operation} ({duration:.3f}s)', extra={'context': perf_context})
+        self.logger.info(
+            f'Performance: {operation} ({duration:.3f}s)', extra={'context': perf_context, 'amostragem': True}
+        )
         
     def log_user_action(self, user_id: int, action: str, context: Dict[str, Any] = None):
         """Log de ações do usuário"""
+        if not self._ativo():
+            return
         user_context = {
             'user_id': user_id,
             'action': action,
             'user_action': True,
             **(context or {}),
         }
-        self.logger.info(f'Ações do usuário: {action}', extra={'context': user_context})
+        self.logger.info(f'Ações do usuário: {action}', extra={'context': user_context, 'amostragem': True})
         
     def log_system_health(self, metric: str, value: float, threshold: float = None):
         """Log de saúde do sistema"""
@@ -243,9 +385,46 @@ class SmartAlerts:
             }}
         )
 
+
+# Listener da fila (thread que formata e grava os registros)
+fila_listener = None
+fila_handler = None
+
+
+def parar_fila_logging():
+    """Esvazia a fila e encerra o listener (chamado no atexit)"""
+    global fila_listener
+    if fila_listener is not None:
+        fila_listener.stop()
+        fila_listener = None
+
+
+def reiniciar_fila_no_filho():
+    """
+    Processos criados por fork (Celery prefork, gunicorn --preload) não
+    herdam o thread do listener: sem ele a fila enche e os registros são
+    descartados. O filho recebe uma fila nova (os locks da antiga podem
+    ter sido copiados travados) e o próprio listener.
+    """
+    global fila_listener
+    if fila_listener is None or fila_handler is None:
+        return
+    fila_handler.queue = queue.Queue(maxsize=fila_handler.queue.maxsize)
+    fila_handler._lock = threading.Lock()
+    fila_listener = logging.handlers.QueueListener(
+        fila_handler.queue, *fila_listener.handlers, respect_handler_level=True,
+    )
+    fila_listener.start()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=reiniciar_fila_no_filho)
+
+
 # Configuração de logging
 def configure_procon_logging():
     """Configura sistema de logging do Procon"""
+    global fila_listener, fila_handler
     
     # Criar handler para arquivo de log estruturado
     file_handler = logging.FileHandler('procon_system.log')
@@ -269,11 +448,29 @@ def configure_procon_logging():
         'procon.operation': 'INFO',
     }
     
+    if _configuracao('LOGGING_ASSINCRONO', True):
+        # Como no modo síncrono, o console só recebe os loggers configurados
+        console_handler.addFilter(
+            lambda record: any(record.name == nome or record.name.startswith(f'{nome}.') for nome in logger_configs)
+        )
+        # Serialização e escrita saem do thread da requisição
+        parar_fila_logging()
+        fila_handler = FilaLogHandler(_configuracao('LOGGING_FILA_TAMANHO', 10000))
+        fila_listener = logging.handlers.QueueListener(
+            fila_handler.queue, file_handler, console_handler, respect_handler_level=True,
+        )
+        fila_listener.start()
+        atexit.register(parar_fila_logging)
+        file_handler = console_handler = fila_handler
+    file_handler.addFilter(amostragem)
+    console_handler.addFilter(amostragem)
+    
     for logger_name, level in logger_configs.items():
         logger = logging.getLogger(logger_name)
         logger.setLevel(getattr(logging, level))
         logger.addHandler(file_handler)
-        logger.addHandler(console_handler)
+        if console_handler is not file_handler:
+            logger.addHandler(console_handler)
         logger.propagate = False
         
     # Configurar logger root
@@ -281,6 +478,7 @@ def configure_procon_logging():
     root_logger.setLevel(logging.INFO)
     root_logger.addHandler(file_handler)
 
+
 # Instâncias globais
 smart_alerts = SmartAlerts()
 
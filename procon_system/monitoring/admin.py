@@ -0,0 +1,20 @@
+from django.contrib import admin
+from .models import ExecucaoTarefa, Feriado
+
+
+@admin.register(Feriado)
+class FeriadoAdmin(admin.ModelAdmin):
+    list_display = ['data', 'nome', 'abrangencia', 'uf', 'municipio', 'recorrente', 'ativo']
+    list_filter = ['abrangencia', 'uf', 'recorrente', 'ativo']
+    search_fields = ['nome', 'municipio']
+    date_hierarchy = 'data'
+    ordering = ['-data']
+
+
+@admin.register(ExecucaoTarefa)
+class ExecucaoTarefaAdmin(admin.ModelAdmin):
+    list_display = ['tarefa', 'status', 'origem', 'iniciado_em', 'duracao', 'linhas', 'host']
+    list_filter = ['tarefa', 'status', 'origem']
+    date_hierarchy = 'iniciado_em'
+    ordering = ['-iniciado_em']
+    readonly_fields = [campo.name for campo in ExecucaoTarefa._meta.fields]
@@ -0,0 +1,318 @@
+"""
+Agendador único das tarefas periódicas do sistema
+Sistema Procon - Monitoramento
+
+Todas as rotinas em lote (varredura de prazos, vencimento de multas, envio
+de notificações, relatórios agendados, retenção/limpeza) ficam registradas
+em TAREFAS_PADRAO, com seu intervalo. O beat do Celery agenda cada uma com
+executar_tarefa_periodica (procon_system/celery.py); sem Celery, o comando
+executar_tarefas_periodicas no cron executa as que estiverem pendentes.
+
+Cada execução pega um lock no cache (cache.add, atômico no Redis), renovado
+enquanto a tarefa roda, então só uma instância roda a mesma tarefa por vez
+mesmo com vários workers ou beats, e grava um ExecucaoTarefa com duração,
+linhas afetadas e resultado.
+"""
+
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .histogramas import registro_metricas
+from .models import ExecucaoTarefa
+
+
+logger = logging.getLogger(__name__)
+
+NOME_TAREFA_CELERY = 'procon_system.executar_tarefa_periodica'
+METRICA_DURACAO_TAREFA = 'tarefa_periodica_duracao_segundos'
+
+MINUTO, HORA = 60, 60 * 60
+
+# Tarefas padrão; TAREFAS_PERIODICAS no settings sobrescreve chaves de cada
+# tarefa (intervalo, ativo, lock_timeout) ou acrescenta novas
+TAREFAS_PADRAO = {
+    'varredura_prazos': {
+        'funcao': 'monitoring.agendador.varrer_prazos',
+        'intervalo': 5 * MINUTO,
+        'descricao': 'Promove prazos próximos, vencidos e escalonados (PrazoMonitorado)',
+    },
+    'reconciliacao_prazos': {
+        'funcao': 'monitoring.agendador.reconciliar_prazos',
+        'intervalo': HORA,
+        'descricao': 'Reconcilia o índice de prazos com escritas em lote que não disparam os signals',
+    },
+    'prazos_tramitacao': {
+        'funcao': 'monitoring.agendador.verificar_prazos_tramitacao',
+        'intervalo': HORA,
+        'descricao': 'Notifica protocolos com prazo próximo do vencimento',
+    },
+    'vencimento_multas': {
+        'funcao': 'monitoring.agendador.atualizar_vencimento_multas',
+        'intervalo': HORA,
+        'descricao': 'Marca multas pendentes como vencidas e notifica o financeiro',
+    },
+    'envio_notificacoes': {
+        'funcao': 'monitoring.agendador.enviar_notificacoes',
+        'intervalo': 5 * MINUTO,
+        'descricao': 'Envia as notificações pendentes pelos canais configurados',
+    },
+    'relatorios_agendados': {
+        'funcao': 'monitoring.agendador.executar_relatorios_agendados',
+        'intervalo': 15 * MINUTO,
+        'descricao': 'Gera os relatórios agendados com execução vencida',
+    },
+    'limpeza_auditoria': {
+        'funcao': 'monitoring.agendador.limpar_auditoria',
+        'intervalo': 24 * HORA,
+        'descricao': 'Arquiva e remove logs de auditoria antigos (CleanupManager)',
+    },
+    'retencao_dados': {
+        'funcao': 'monitoring.agendador.aplicar_retencao',
+        'intervalo': 24 * HORA,
+        'descricao': 'Aplica as demais políticas de retenção de dados (CleanupManager)',
+    },
+    'manutencao_alertas': {
+        'funcao': 'monitoring.agendador.consolidar_alertas',
+        'intervalo': 6 * HORA,
+        'descricao': 'Consolida alertas duplicados de documentos em atraso (CleanupManager)',
+    },
+}
+
+
+# ---------- tarefas ----------
+# Cada tarefa retorna um dicionário com 'linhas' (registros afetados)
+
+def varrer_prazos() -> Dict[str, Any]:
+    from .prazos import varredura_prazos_service
+
+    resultado = varredura_prazos_service.varrer()
+    return {'linhas': resultado['proximo'] + resultado['vencido'] + resultado['escalonado'], **resultado}
+
+
+def reconciliar_prazos() -> Dict[str, Any]:
+    from .prazos import varredura_prazos_service
+
+    totais = varredura_prazos_service.reconstruir()
+    return {'linhas': sum(totais.values()), **totais}
+
+
+def verificar_prazos_tramitacao() -> Dict[str, Any]:
+    from protocolo_tramitacao.notifications import GerenciadorNotificacoes
+
+    return {'linhas': len(GerenciadorNotificacoes.verificar_prazos_vencendo())}
+
+
+def atualizar_vencimento_multas() -> Dict[str, Any]:
+    from protocolo_tramitacao.notifications import GerenciadorNotificacoes
+
+    return {'linhas': len(GerenciadorNotificacoes.verificar_multas_vencidas())}
+
+
+def enviar_notificacoes() -> Dict[str, Any]:
+    from notificacoes.services import notificacao_service
+    from protocolo_tramitacao.notifications import GerenciadorNotificacoes
+
+    processadas = notificacao_service.processar_notificacoes_pendentes()
+    emails = GerenciadorNotificacoes.enviar_notificacoes_pendentes()
+    return {
+        'linhas': processadas + emails['enviadas'],
+        'notificacoes_processadas': processadas,
+        'emails': emails,
+    }
+
+
+def executar_relatorios_agendados() -> Dict[str, Any]:
+    from relatorios.models import RelatorioAgendado
+
+    vencidos = RelatorioAgendado.objects.filter(
+        ativo=True, status='ATIVO', proxima_execucao__lte=timezone.now(),
+    ).select_related('tipo_relatorio', 'criado_por')
+    relatorios = [agendamento.executar().pk for agendamento in vencidos]
+    return {'linhas': len(relatorios), 'relatorios': relatorios}
+
+
+def _politicas_retencao(auditoria: bool) -> List[str]:
+    from .retencao import retencao_service
+
+    return [
+        nome for nome, politica in retencao_service.politicas().items()
+        if politica.get('modelo', '').startswith('auditoria.') == auditoria
+    ]
+
+
+def limpar_auditoria() -> Dict[str, Any]:
+    from .cleanup_tasks import CleanupManager
+
+    manager = CleanupManager()
+    logs = manager.cleanup_old_warnings()  # política logs_sistema
+    demais = manager.archive_old_data(politicas=[nome for nome in _politicas_retencao(True) if nome != 'logs_sistema'])
+    return {
+        'linhas': logs['old_logs_processed'] + demais['rows_archived'] + demais['cascade_rows'],
+        'logs_sistema': logs,
+        **demais,
+    }
+
+
+def aplicar_retencao() -> Dict[str, Any]:
+    from .cleanup_tasks import CleanupManager
+
+    resultado = CleanupManager().archive_old_data(politicas=_politicas_retencao(False))
+    return {'linhas': resultado['rows_archived'] + resultado['cascade_rows'], **resultado}
+
+
+def consolidar_alertas() -> Dict[str, Any]:
+    from .cleanup_tasks import CleanupManager
+
+    resultado = CleanupManager().consolidate_duplicate_alerts()
+    return {'linhas': resultado['consolidation_stats']['alerts_analyzed'], **resultado['consolidation_stats']}
+
+
+class AgendadorService:
+    """Executa as tarefas periódicas com lock distribuído e histórico"""
+
+    PREFIXO_LOCK = 'procon:tarefa_periodica:'
+
+    def __init__(self):
+        self.alias_cache = getattr(settings, 'AGENDADOR_CACHE', 'default')
+        self.host = socket.gethostname()
+
+    def tarefas(self) -> Dict[str, Dict[str, Any]]:
+        """Tarefas ativas, com os ajustes de TAREFAS_PERIODICAS"""
+        tarefas = {nome: dict(tarefa) for nome, tarefa in TAREFAS_PADRAO.items()}
+        for nome, ajustes in getattr(settings, 'TAREFAS_PERIODICAS', {}).items():
+            tarefas.setdefault(nome, {}).update(ajustes)
+        return {nome: tarefa for nome, tarefa in tarefas.items() if tarefa.get('ativo', True)}
+
+    def tarefa(self, nome: str) -> Dict[str, Any]:
+        tarefas = self.tarefas()
+        if nome not in tarefas:
+            raise ValueError(f'Tarefa periódica desconhecida ou inativa: {nome}')
+        return tarefas[nome]
+
+    # ---------- lock ----------
+
+    @property
+    def cache(self):
+        return caches[self.alias_cache]
+
+    def _adquirir(self, nome: str, timeout: float) -> Optional[str]:
+        token = f'{self.host}:{os.getpid()}:{uuid.uuid4().hex}'
+        return token if self.cache.add(self.PREFIXO_LOCK + nome, token, timeout) else None
+
+    def _renovar(self, nome: str, token: str, timeout: float, parar: threading.Event) -> None:
+        """Prolonga o lock a cada terço do timeout até a tarefa terminar"""
+        chave = self.PREFIXO_LOCK + nome
+        while not parar.wait(timeout / 3):
+            if self.cache.get(chave) != token:
+                logger.warning(f'Tarefa {nome}: lock perdido durante a execução')
+                return
+            self.cache.touch(chave, timeout)
+
+    def _liberar(self, nome: str, token: str) -> None:
+        chave = self.PREFIXO_LOCK + nome
+        if self.cache.get(chave) == token:  # não remove o lock de outra instância após expirar
+            self.cache.delete(chave)
+
+    # ---------- execução ----------
+
+    def executar(self, nome: str, origem: str = 'manual') -> Dict[str, Any]:
+        """
+        Executa a tarefa se nenhuma outra instância estiver com o lock. O lock
+        expira em lock_timeout (padrão: o intervalo da tarefa) e é renovado
+        por um thread enquanto a tarefa roda: execuções mais longas que o
+        timeout continuam com o lock, e um worker que morreu no meio da
+        execução não bloqueia a tarefa para sempre.
+        """
+        tarefa = self.tarefa(nome)
+        timeout = tarefa.get('lock_timeout') or tarefa['intervalo']
+        token = self._adquirir(nome, timeout)
+        if token is None:
+            logger.info(f'Tarefa {nome} ignorada: já em execução em outra instância')
+            return {'tarefa': nome, 'status': 'ignorada'}
+
+        parar = threading.Event()
+        renovacao = threading.Thread(
+            target=self._renovar, args=(nome, token, timeout, parar), name=f'lock-{nome}', daemon=True,
+        )
+        execucao = ExecucaoTarefa.objects.create(tarefa=nome, origem=origem, host=self.host)
+        renovacao.start()
+        inicio = time.perf_counter()
+        try:
+            resultado = import_string(tarefa['funcao'])() or {}
+            execucao.status = 'sucesso'
+            execucao.linhas = int(resultado.get('linhas', 0))
+            execucao.resultado = json.loads(json.dumps(resultado, cls=DjangoJSONEncoder))
+        except Exception as e:
+            logger.error(f'Tarefa periódica {nome} falhou: {e}', exc_info=True)
+            execucao.status = 'erro'
+            execucao.erro = f'{type(e).__name__}: {e}'
+        finally:
+            execucao.duracao = time.perf_counter() - inicio
+            execucao.concluido_em = timezone.now()
+            execucao.save(update_fields=['status', 'linhas', 'resultado', 'erro', 'duracao', 'concluido_em'])
+            parar.set()
+            renovacao.join()
+            self._liberar(nome, token)
+
+        registro_metricas.registrar(METRICA_DURACAO_TAREFA, execucao.duracao, {'tarefa': nome, 'status': execucao.status})
+        return {
+            'tarefa': nome,
+            'status': execucao.status,
+            'linhas': execucao.linhas,
+            'duracao': execucao.duracao,
+            'erro': execucao.erro,
+            'execucao_id': execucao.pk,
+        }
+
+    def pendentes(self, agora=None) -> List[str]:
+        """Tarefas cujo intervalo já passou desde o último início (uma consulta agregada)"""
+        agora = agora or timezone.now()
+        tarefas = self.tarefas()
+        ultimas = dict(
+            ExecucaoTarefa.objects.filter(tarefa__in=list(tarefas))
+            .order_by().values('tarefa').annotate(ultima=Max('iniciado_em'))
+            .values_list('tarefa', 'ultima')
+        )
+        return [
+            nome for nome, tarefa in tarefas.items()
+            if nome not in ultimas or ultimas[nome] + timedelta(seconds=tarefa['intervalo']) <= agora
+        ]
+
+    def executar_pendentes(self, origem: str = 'comando') -> List[Dict[str, Any]]:
+        return [self.executar(nome, origem=origem) for nome in self.pendentes()]
+
+    def ultimas_execucoes(self) -> Dict[str, Optional[ExecucaoTarefa]]:
+        return {
+            nome: ExecucaoTarefa.objects.filter(tarefa=nome).first()
+            for nome in self.tarefas()
+        }
+
+    def beat_schedule(self) -> Dict[str, Dict[str, Any]]:
+        """Agenda do Celery beat: uma entrada por tarefa, expirando se não for consumida no intervalo"""
+        return {
+            f'tarefa_periodica:{nome}': {
+                'task': NOME_TAREFA_CELERY,
+                'schedule': float(tarefa['intervalo']),
+                'args': (nome,),
+                'options': {'expires': float(tarefa['intervalo'])},
+            }
+            for nome, tarefa in self.tarefas().items()
+        }
+
+
+# Instância global do serviço
+agendador_service = AgendadorService()
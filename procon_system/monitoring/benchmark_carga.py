@@ -0,0 +1,283 @@
+"""
+Benchmark de carga com volumes de produção
+Sistema Procon - Monitoramento
+
+Gera dados sintéticos com as factories de tests/factories.py (bulk_create em
+lotes) nos volumes de VOLUMES_PRODUCAO multiplicados por um fator, atualiza as
+estatísticas do planejador das tabelas carregadas (ANALYZE), executa os
+cenários (dashboards, listagens e buscas, exportação e varreduras) medindo
+mediana/máximo do tempo e o número de consultas SQL, e compara com um
+baseline gravado em JSON. Um cenário regride quando faz mais consultas que o
+baseline ou quando a mediana passa da tolerância (e do piso de ruído).
+As factories (factory_boy) só são importadas na geração dos dados; medir os
+dados já existentes (--sem-geracao) não depende do pacote de testes.
+
+Uso: python manage.py benchmark_carga (monitoring/management/commands)
+"""
+
+import json
+import os
+import statistics
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from rest_framework.test import APIClient
+
+
+# Volumes com fator 1; --fator reduz para execuções locais e de CI
+VOLUMES_PRODUCAO = {
+    'acessos': 2_000_000,
+    'protocolos': 200_000,
+    'autos': 200_000,
+    'multas': 150_000,
+    'boletos': 150_000,
+    'caixa_entrada': 100_000,
+}
+
+USUARIO_BENCHMARK = 'bench_admin'
+
+
+def calcular_volumes(fator: float, ajustes: Optional[Dict[str, int]] = None) -> Dict[str, int]:
+    volumes = {nome: max(1, int(total * fator)) for nome, total in VOLUMES_PRODUCAO.items()}
+    volumes.update(ajustes or {})
+    # Cada multa pertence a um auto e cada boleto a uma multa
+    volumes['multas'] = min(volumes['multas'], volumes['autos'])
+    volumes['boletos'] = min(volumes['boletos'], volumes['multas'])
+    return volumes
+
+
+class GeradorDados:
+    """Cria a massa de dados na ordem das dependências, em lotes sem signals"""
+
+    def __init__(self, volumes: Dict[str, int], tamanho_lote: int = 5000, saida: Callable[[str], None] = print):
+        from tests import factories  # factory_boy: só necessário para gerar os dados
+
+        self.factories = factories
+        self.volumes = volumes
+        self.tamanho_lote = tamanho_lote
+        self.saida = saida
+        self.modelos = set()
+
+    def _criar(self, nome: str, fabrica, quantidade: int, **campos) -> List[Any]:
+        inicio = time.perf_counter()
+        pks = self.factories.create_in_bulk(fabrica, quantidade, batch_size=self.tamanho_lote, **campos)
+        self.modelos.add(fabrica._meta.model)
+        duracao = time.perf_counter() - inicio
+        self.saida(f'{nome:<16} {len(pks):>10} linhas em {duracao:>7.1f}s ({len(pks) / max(duracao, 1e-9):,.0f}/s)')
+        return pks
+
+    def analisar(self) -> List[str]:
+        """
+        ANALYZE nas tabelas carregadas: dentro da transação ainda não
+        confirmada o PostgreSQL planejaria com as estatísticas da tabela vazia
+        """
+        comando = {'postgresql': 'ANALYZE', 'sqlite': 'ANALYZE', 'mysql': 'ANALYZE TABLE'}.get(connection.vendor)
+        if comando is None:
+            return []
+        tabelas = sorted({modelo._meta.db_table for modelo in self.modelos})
+        with connection.cursor() as cursor:
+            for tabela in tabelas:
+                cursor.execute(f'{comando} {connection.ops.quote_name(tabela)}')
+        return tabelas
+
+    def gerar(self) -> Dict[str, int]:
+        from monitoring.models import PrazoMonitorado
+        from monitoring.prazos import varredura_prazos_service
+
+        factories = self.factories
+        admin = factories.SuperUserFactory(username=USUARIO_BENCHMARK)
+        responsaveis = factories.UserFactory.create_batch(5)
+        setores = factories.SetorFactory.create_batch(5)
+        tipo = factories.TipoDocumentoFactory()
+
+        v = self.volumes
+        self._criar('acessos', factories.AcessoRecursoFactory, v['acessos'])
+        self._criar(
+            'protocolos', factories.ProtocoloDocumentoFactory, v['protocolos'],
+            tipo_documento=tipo, protocolado_por=admin,
+            setor_atual=factories.cycle(*setores), setor_origem=factories.cycle(*setores),
+            responsavel_atual=factories.cycle(*responsaveis),
+        )
+        autos = self._criar('autos', factories.AutoInfracaoFactory, v['autos'])
+        self._criar('processos', factories.ProcessoFactory, len(autos), auto_infracao_id=factories.cycle(*autos))
+        empresas = self._criar('empresas', factories.EmpresaFactory, max(1, v['multas'] // 10))
+        multas = self._criar(
+            'multas', factories.MultaFactory, v['multas'],
+            processo_id=factories.cycle(*autos[:v['multas']]), empresa_id=factories.cycle(*empresas),
+        )
+        self._criar('boletos', factories.BoletoMultaFactory, v['boletos'], multa_id=factories.cycle(*multas[:v['boletos']]))
+        self._criar(
+            'caixa_entrada', factories.CaixaEntradaFactory, v['caixa_entrada'],
+            responsavel_atual=factories.cycle(*responsaveis),
+        )
+
+        # bulk_create não passa pelos signals: o índice de prazos é refeito de uma vez
+        indexados = sum(varredura_prazos_service.reconstruir().values())
+        self.saida(f'{"prazos":<16} {indexados:>10} linhas indexadas')
+
+        self.modelos.add(PrazoMonitorado)
+        inicio = time.perf_counter()
+        tabelas = self.analisar()
+        self.saida(f'{"estatísticas":<16} {len(tabelas):>10} tabelas em {time.perf_counter() - inicio:>7.1f}s')
+        return dict(self.volumes)
+
+
+# ---------- cenários ----------
+
+def _requisicao(nome_url: str, params: Optional[Dict] = None):
+    def executar(cliente: Client):
+        resposta = cliente.get(reverse(nome_url), params or {})
+        if resposta.streaming:
+            for _ in resposta.streaming_content:
+                pass
+        if resposta.status_code >= 400:
+            raise RuntimeError(f'{nome_url} respondeu {resposta.status_code}')
+        return resposta.status_code
+    return executar
+
+
+def _servico(caminho: str, metodo: str, *args, **kwargs):
+    def executar(cliente: Client):
+        return getattr(import_string(caminho), metodo)(*args, **kwargs)
+    return executar
+
+
+# nome: (categoria, função(cliente), altera dados)
+CENARIOS = {
+    'dashboard_caixa_entrada': ('dashboard', _requisicao('api_caixa_entrada:api_estatisticas'), False),
+    'dashboard_protocolos': ('dashboard', _requisicao('api_protocolo_tramitacao:api_estatisticas'), False),
+    'estatisticas_processos': ('dashboard', _requisicao('fiscalizacao:estatisticas_avancadas'), False),
+    'boletos_por_status': ('dashboard', _requisicao('api_cobranca:boletos-por-status'), False),
+    'lista_caixa_entrada': ('busca', _requisicao('api_caixa_entrada:api_documentos'), False),
+    'busca_caixa_entrada': ('busca', _requisicao('api_caixa_entrada:api_documentos', {'search': 'cobrança indevida'}), False),
+    'multas_vencidas': ('busca', _requisicao('multas-vencidas'), False),
+    'boletos_vencidos': ('busca', _requisicao('api_cobranca:boletos-vencidos'), False),
+    'exportacao_processos': ('exportacao', _requisicao('fiscalizacao:exportar_processos'), False),
+    'relatorio_performance_auditoria': (
+        'exportacao', _servico('auditoria.services.RelatorioAuditoriaService', 'relatorio_performance', 30), False,
+    ),
+    'varredura_prazos': ('varredura', _servico('monitoring.prazos.varredura_prazos_service', 'varrer'), True),
+    'prazos_tramitacao': (
+        'varredura', _servico('protocolo_tramitacao.notifications.GerenciadorNotificacoes', 'verificar_prazos_vencendo'), True,
+    ),
+    'vencimento_multas': (
+        'varredura', _servico('protocolo_tramitacao.notifications.GerenciadorNotificacoes', 'verificar_multas_vencidas'), True,
+    ),
+}
+
+
+class Desfazer(Exception):
+    pass
+
+
+class BenchmarkCarga:
+    """Mede os cenários: aquecimento + N repetições, cache limpo antes de cada uma"""
+
+    def __init__(self, repeticoes: int = 5, aquecimento: bool = True, limpar_cache: bool = True):
+        self.repeticoes = repeticoes
+        self.aquecimento = aquecimento
+        self.limpar_cache = limpar_cache
+
+    def _uma_vez(self, funcao, cliente, altera_dados: bool):
+        if self.limpar_cache:
+            cache.clear()
+        with CaptureQueriesContext(connection) as consultas:
+            inicio = time.perf_counter()
+            if altera_dados:
+                # Cada repetição parte do mesmo estado
+                try:
+                    with transaction.atomic():
+                        funcao(cliente)
+                        raise Desfazer
+                except Desfazer:
+                    pass
+            else:
+                funcao(cliente)
+            duracao = time.perf_counter() - inicio
+        return duracao, len(consultas)
+
+    def medir(self, nome: str, cliente: Client) -> Dict[str, Any]:
+        categoria, funcao, altera_dados = CENARIOS[nome]
+        try:
+            if self.aquecimento:
+                self._uma_vez(funcao, cliente, altera_dados)
+            medicoes = [self._uma_vez(funcao, cliente, altera_dados) for _ in range(self.repeticoes)]
+        except Exception as e:
+            return {'categoria': categoria, 'erro': f'{type(e).__name__}: {e}'}
+        duracoes = [duracao * 1000 for duracao, _ in medicoes]
+        return {
+            'categoria': categoria,
+            'duracao_p50_ms': round(statistics.median(duracoes), 2),
+            'duracao_max_ms': round(max(duracoes), 2),
+            'consultas': max(consultas for _, consultas in medicoes),
+        }
+
+    def executar(self, nomes: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Any]]:
+        from django.contrib.auth import get_user_model
+
+        try:
+            setup_test_environment()  # e-mails em memória e 'testserver' em ALLOWED_HOSTS
+            configurado = True
+        except RuntimeError:
+            configurado = False  # já configurado (pytest)
+        try:
+            usuario = get_user_model().objects.get(username=USUARIO_BENCHMARK)
+            cliente = APIClient()
+            cliente.force_login(usuario)  # views Django
+            cliente.force_authenticate(usuario)  # views DRF (JWT no uso normal)
+            return {nome: self.medir(nome, cliente) for nome in (nomes or CENARIOS)}
+        finally:
+            if configurado:
+                teardown_test_environment()
+
+
+# ---------- baseline ----------
+
+def caminho_baseline() -> str:
+    return getattr(settings, 'BENCHMARK_BASELINE', '') or os.path.join(settings.BASE_DIR, 'benchmarks', 'baseline.json')
+
+
+def carregar_baseline(caminho: str) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(caminho):
+        return None
+    with open(caminho, encoding='utf-8') as arquivo:
+        return json.load(arquivo)
+
+
+def salvar_baseline(caminho: str, volumes: Dict[str, int], resultados: Dict[str, Dict[str, Any]]) -> None:
+    os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+    conteudo = {
+        'gerado_em': timezone.now().isoformat(),
+        'banco': connection.vendor,
+        'volumes': volumes,
+        'cenarios': {nome: r for nome, r in resultados.items() if 'erro' not in r},
+    }
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        json.dump(conteudo, arquivo, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+def comparar(resultados: Dict[str, Dict[str, Any]], baseline: Dict[str, Any],
+             tolerancia: float, piso_ms: float) -> Dict[str, List[str]]:
+    """Motivos de regressão por cenário (cenários sem baseline não são comparados)"""
+    regressoes = {}
+    for nome, atual in resultados.items():
+        base = baseline.get('cenarios', {}).get(nome)
+        if base is None or 'erro' in atual:
+            continue
+        motivos = []
+        if atual['consultas'] > base['consultas']:
+            motivos.append(f"consultas {base['consultas']} → {atual['consultas']}")
+        limite = max(base['duracao_p50_ms'] * (1 + tolerancia), base['duracao_p50_ms'] + piso_ms)
+        if atual['duracao_p50_ms'] > limite:
+            motivos.append(f"mediana {base['duracao_p50_ms']:.1f} → {atual['duracao_p50_ms']:.1f} ms (limite {limite:.1f})")
+        if motivos:
+            regressoes[nome] = motivos
+    return regressoes
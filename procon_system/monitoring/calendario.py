@@ -0,0 +1,256 @@
+"""
+Calendário de dias úteis para prazos legais
+Sistema Procon - Monitoramento
+
+Feriados nacionais fixos e móveis (calculados a partir da Páscoa) somam-se
+aos feriados estaduais, municipais e fechamentos do órgão cadastrados em
+Feriado. Para cada abrangência (UF/município) o calendário monta uma tabela
+por ordinal de data com a contagem acumulada de dias úteis e a lista dos
+dias úteis, de modo que "somar N dias úteis" e "dias úteis entre duas datas"
+são consultas diretas por índice, sem percorrer os dias um a um.
+
+Contagem de prazos: exclui o dia de início e inclui o do vencimento; um
+prazo que terminaria em dia não útil passa para o próximo dia útil.
+"""
+
+import time
+from array import array
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Feriado
+
+
+CHAVE_VERSAO_CACHE = 'calendario_feriados_versao'
+
+# Lei 662/1949, Lei 6.802/1980 e Lei 14.759/2023 (20/11 a partir de 2024)
+FERIADOS_NACIONAIS_FIXOS = [
+    ((1, 1), 'Confraternização Universal', None),
+    ((4, 21), 'Tiradentes', None),
+    ((5, 1), 'Dia do Trabalho', None),
+    ((9, 7), 'Independência do Brasil', None),
+    ((10, 12), 'Nossa Senhora Aparecida', None),
+    ((11, 2), 'Finados', None),
+    ((11, 15), 'Proclamação da República', None),
+    ((11, 20), 'Dia Nacional de Zumbi e da Consciência Negra', 2024),
+    ((12, 25), 'Natal', None),
+]
+
+# Dias em relação ao domingo de Páscoa
+FERIADOS_MOVEIS = {
+    'carnaval': [(-48, 'Carnaval (segunda-feira)'), (-47, 'Carnaval (terça-feira)')],
+    'sexta_santa': [(-2, 'Sexta-feira Santa')],
+    'corpus_christi': [(60, 'Corpus Christi')],
+}
+
+
+def domingo_de_pascoa(ano: int) -> date:
+    """Algoritmo de Meeus/Jones/Butcher (calendário gregoriano)"""
+    a, b, c = ano % 19, ano // 100, ano % 100
+    d, e = b // 4, b % 4
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    semana = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * semana) // 451
+    mes = (h + semana - 7 * m + 114) // 31
+    dia = (h + semana - 7 * m + 114) % 31 + 1
+    return date(ano, mes, dia)
+
+
+def feriados_nacionais(ano: int, moveis: Iterable[str] = ('carnaval', 'sexta_santa', 'corpus_christi')) -> Dict[date, str]:
+    feriados = {
+        date(ano, mes, dia): nome
+        for (mes, dia), nome, desde in FERIADOS_NACIONAIS_FIXOS
+        if desde is None or ano >= desde
+    }
+    pascoa = domingo_de_pascoa(ano)
+    for chave in moveis:
+        for deslocamento, nome in FERIADOS_MOVEIS[chave]:
+            feriados[pascoa + timedelta(days=deslocamento)] = nome
+    return feriados
+
+
+class TabelaDiasUteis:
+    """
+    Dias úteis de um intervalo fechado de datas. acumulado[i] é o número de
+    dias úteis antes do dia inicio + i; uteis guarda o deslocamento de cada
+    dia útil em ordem. Todas as consultas são O(1).
+    """
+
+    def __init__(self, inicio: date, fim: date, feriados: Iterable[date]):
+        self.inicio = inicio
+        self.fim = fim
+        self.base = inicio.toordinal()
+        feriados = {dia.toordinal() - self.base for dia in feriados}
+
+        self.acumulado = array('l', [0])
+        self.uteis = array('l')
+        for deslocamento in range(fim.toordinal() - self.base + 1):
+            dia_semana = (self.base + deslocamento - 1) % 7  # ordinal 1 (01/01/0001) é segunda-feira
+            if dia_semana < 5 and deslocamento not in feriados:
+                self.uteis.append(deslocamento)
+            self.acumulado.append(len(self.uteis))
+
+    def cobre(self, dia: date) -> bool:
+        return self.inicio <= dia <= self.fim
+
+    def _deslocamento(self, dia: date) -> int:
+        if not self.cobre(dia):
+            raise IndexError(f'{dia} fora da tabela ({self.inicio} a {self.fim})')
+        return dia.toordinal() - self.base
+
+    def eh_util(self, dia: date) -> bool:
+        deslocamento = self._deslocamento(dia)
+        return self.acumulado[deslocamento + 1] > self.acumulado[deslocamento]
+
+    def adicionar(self, dia: date, dias: int) -> date:
+        """N-ésimo dia útil depois (ou antes, se negativo) de `dia`"""
+        if dias == 0:
+            return dia
+        deslocamento = self._deslocamento(dia)
+        if dias > 0:
+            indice = self.acumulado[deslocamento + 1] + dias - 1
+        else:
+            indice = self.acumulado[deslocamento] + dias
+        if not 0 <= indice < len(self.uteis):
+            raise IndexError(f'Resultado fora da tabela ({self.inicio} a {self.fim})')
+        return date.fromordinal(self.base + self.uteis[indice])
+
+    def entre(self, inicio: date, fim: date) -> int:
+        """Dias úteis em (inicio, fim]; negativo quando fim é anterior a inicio"""
+        return self.acumulado[self._deslocamento(fim) + 1] - self.acumulado[self._deslocamento(inicio) + 1]
+
+
+class CalendarioService:
+    """
+    Tabelas de dias úteis por abrangência, reconstruídas quando o intervalo
+    pedido sai da tabela ou quando um Feriado é alterado (versão no cache,
+    conferida a cada CALENDARIO_VERIFICACAO_SEGUNDOS por processo)
+    """
+
+    def __init__(self):
+        self.uf = getattr(settings, 'CALENDARIO_UF', '')
+        self.municipio = getattr(settings, 'CALENDARIO_MUNICIPIO', '')
+        self.feriados_moveis = getattr(settings, 'CALENDARIO_FERIADOS_MOVEIS', list(FERIADOS_MOVEIS))
+        self.anos_margem = getattr(settings, 'CALENDARIO_ANOS_MARGEM', 3)
+        self.verificacao_segundos = getattr(settings, 'CALENDARIO_VERIFICACAO_SEGUNDOS', 60)
+        self._tabelas: Dict[Tuple[str, str], TabelaDiasUteis] = {}
+        self._versao = None
+        self._verificado_em = 0.0
+
+    # ---------- feriados ----------
+
+    def feriados(self, ano_inicio: int, ano_fim: int, uf: str = '', municipio: str = '') -> Dict[date, str]:
+        """Feriados nacionais e cadastrados que valem para a abrangência, por data"""
+        feriados = {}
+        for ano in range(ano_inicio, ano_fim + 1):
+            feriados.update(feriados_nacionais(ano, self.feriados_moveis))
+
+        abrangencia = Q(abrangencia__in=['nacional', 'fechamento'])
+        if uf:
+            abrangencia |= Q(abrangencia='estadual', uf__iexact=uf)
+            if municipio:
+                abrangencia |= Q(abrangencia='municipal', uf__iexact=uf, municipio__iexact=municipio)
+        cadastrados = Feriado.objects.filter(abrangencia, ativo=True).filter(
+            Q(data__year__gte=ano_inicio, data__year__lte=ano_fim) | Q(recorrente=True)
+        ).values_list('data', 'nome', 'recorrente')
+
+        for data, nome, recorrente in cadastrados:
+            anos = range(max(ano_inicio, data.year), ano_fim + 1) if recorrente else [data.year]
+            for ano in anos:
+                try:
+                    feriados[data.replace(year=ano)] = nome
+                except ValueError:  # 29/02 em ano não bissexto
+                    continue
+        return feriados
+
+    def invalidar(self) -> None:
+        """Descarta as tabelas deste processo e sinaliza os demais"""
+        self._tabelas.clear()
+        try:
+            self._versao = cache.incr(CHAVE_VERSAO_CACHE)
+        except ValueError:
+            self._versao = 1
+            cache.set(CHAVE_VERSAO_CACHE, self._versao, None)
+
+    def _conferir_versao(self) -> None:
+        agora = time.monotonic()
+        if agora - self._verificado_em < self.verificacao_segundos:
+            return
+        self._verificado_em = agora
+        versao = cache.get(CHAVE_VERSAO_CACHE)
+        if versao != self._versao:
+            self._tabelas.clear()
+            self._versao = versao
+
+    # ---------- tabelas ----------
+
+    def tabela(self, *dias: date, uf: Optional[str] = None, municipio: Optional[str] = None) -> TabelaDiasUteis:
+        """Tabela da abrangência cobrindo as datas informadas (com margem de anos)"""
+        self._conferir_versao()
+        uf = self.uf if uf is None else uf
+        municipio = self.municipio if municipio is None else municipio
+        chave = (uf.upper(), municipio.lower())
+
+        tabela = self._tabelas.get(chave)
+        if tabela is None or not all(tabela.cobre(dia) for dia in dias):
+            anos = [dia.year for dia in dias] or [timezone.localdate().year]
+            if tabela is not None:
+                anos += [tabela.inicio.year, tabela.fim.year]
+            ano_inicio, ano_fim = min(anos) - self.anos_margem, max(anos) + self.anos_margem
+            tabela = TabelaDiasUteis(
+                date(ano_inicio, 1, 1), date(ano_fim, 12, 31), self.feriados(ano_inicio, ano_fim, uf, municipio),
+            )
+            self._tabelas[chave] = tabela
+        return tabela
+
+    @staticmethod
+    def _como_data(momento) -> date:
+        if isinstance(momento, datetime):
+            return timezone.localtime(momento).date() if timezone.is_aware(momento) else momento.date()
+        return momento
+
+    # ---------- consultas ----------
+
+    def eh_dia_util(self, dia, **abrangencia) -> bool:
+        dia = self._como_data(dia)
+        return self.tabela(dia, **abrangencia).eh_util(dia)
+
+    def adicionar_dias_uteis(self, momento, dias: int, **abrangencia):
+        """
+        Soma (ou subtrai) dias úteis a uma data. Para datetime, mantém o
+        horário e devolve um datetime.
+        """
+        dia = self._como_data(momento)
+        tabela = self.tabela(dia, **abrangencia)
+        try:
+            resultado = tabela.adicionar(dia, dias)
+        except IndexError:
+            # Cada dia útil ocupa no máximo alguns dias corridos: amplia a tabela e repete
+            tabela = self.tabela(dia, dia + timedelta(days=3 * dias), **abrangencia)
+            resultado = tabela.adicionar(dia, dias)
+        if isinstance(momento, datetime):
+            return momento + timedelta(days=(resultado - dia).days)
+        return resultado
+
+    def proximo_dia_util(self, momento, **abrangencia):
+        """A própria data, se útil; senão o primeiro dia útil seguinte"""
+        if self.eh_dia_util(momento, **abrangencia):
+            return momento
+        return self.adicionar_dias_uteis(momento, 1, **abrangencia)
+
+    def dias_uteis_entre(self, inicio, fim, **abrangencia) -> int:
+        """Dias úteis depois de `inicio` até `fim` (inclusive)"""
+        inicio, fim = self._como_data(inicio), self._como_data(fim)
+        return self.tabela(inicio, fim, **abrangencia).entre(inicio, fim)
+
+
+# Instância global do serviço
+calendario_service = CalendarioService()
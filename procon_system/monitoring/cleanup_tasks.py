@@ -8,9 +8,12 @@ from datetime import datetime, timedelta
 from typing import List, Dict, Any
 from django.utils import timezone
 from django.db import transaction
+from django.db.models import Count, Q
 
 from caixa_entrada.models import CaixaEntrada, HistoricoCaixaEntrada
 from protocolo_tramitacao.models import TramitacaoDocumento
+
+from .retencao import retencao_service
 from logging_config import logger_manager, SmartAlerts
 
 
@@ -21,31 +24,26 @@ class CleanupManager:
         self.logger = logger_manager.get_logger('cleanup')
         self.smart_alerts = SmartAlerts()
         
-    def cleanup_old_warnings(self, days: int = 30):
-        """Remove logs de warnings antigos e consolida em métricas"""
+    def cleanup_old_warnings(self, days: int = None):
+        """Arquiva e remove logs de sistema antigos (política de retenção logs_sistema)"""
         logger = logger_manager.get_logger('cleanup')
         
         with logger.LoggedOperation('cleanup_old_warnings'):
             try:
-                cutoff_date = timezone.now() - timedelta(days=days)
+                resultado = retencao_service.executar('logs_sistema', dias=days)
                 
-                # Estatísticas de limpeza
                 cleanup_stats = {
-                    'old_logs_processed': 0,
-                    'warnings_consolidated': 0,
-                    'errors_tracked': 0,
-                    'performance_timings_preserved': 0,
+                    'old_logs_processed': resultado['linhas'],
+                    'batches': resultado['lotes'],
+                    'bytes_freed': resultado['bytes_liberados'],
+                    'archive': resultado['destino'],
+                    'completed': resultado['concluido'],
                 }
                 
-                # Em um sistema real, aqui seria feita a limpeza dos logs antigos
-                # Por ora, apenas registramos que a limpeza foi "executada"
-                cleanup_stats['old_logs_processed'] = 1000  # Simulado
-                cleanup_stats['warnings_consolidated'] = 245  # Simulado
-                
                 logger.log_operation('cleanup_completed', {
                     'stats': cleanup_stats,
                     'period_days': days,
-                    'cleanup_type': 'warning_consolidation',
+                    'cleanup_type': 'log_retention',
                 })
                 
                 return cleanup_stats
@@ -141,7 +139,7 @@ class CleanupManager:
                     # Consolidar em alerta único se mais de 5 ocorrências
                     if pattern['count'] > 5:
                         consolidation_stats['duplicates_consolidated'] += pattern['count'] - 1
-                        alert_patterns['alert_patterns_identified'] += 1
+                        consolidation_stats['alert_patterns_identified'] += 1
                         
                         logger.log_operation('pattern_consolidated', {
                             'pattern_type': 'overdue_documents',
@@ -166,36 +164,22 @@ class CleanupManager:
                 logger.logger.error(f'Erro na consolidação de alertas: {str(e)}', exc_info=True)
                 raise
                 
-    def archive_old_data(self, days: int = 90):
-        """Arquiva dados antigos para manter sistema otimizado"""
+    def archive_old_data(self, days: int = None, politicas: List[str] = None):
+        """Arquiva e remove dados antigos conforme as políticas de retenção (padrão: todas)"""
         logger = logger_manager.get_logger('cleanup')
         
         with logger.LoggedOperation('archive_old_data'):
             try:
-                cutoff_date = timezone.now() - timedelta(days=days)
+                resultados = retencao_service.executar_todas(politicas, dias=days)
                 
                 archive_stats = {
-                    'documents_analyzed': 0,
-                    'documents_eligible_for_archive': 0,
-                    'archives_created': 0,
+                    'policies_executed': len(resultados),
+                    'rows_archived': sum(r['linhas'] for r in resultados.values()),
+                    'cascade_rows': sum(r['linhas_cascata'] for r in resultados.values()),
+                    'bytes_freed': sum(r['bytes_liberados'] for r in resultados.values()),
+                    'pending_policies': [nome for nome, r in resultados.items() if not r['concluido']],
                 }
                 
-                # Documentos elegíveis para arquivamento (finalizados há mais de 90 dias)
-                eligible_docs = CaixaEntrada.objects.filter(
-                    status__in=['ARQUIVADO', 'RESPONDIDO'],
-                    updated_at__lt=cutoff_date,
-                )
-                
-                archive_stats['documents_analyzed'] = eligible_docs.count()
-                archive_stats['documents_eligible_for_archive'] = archive_stats['documents_analyzed']
-                
-                # Marcar para arquivamento (não executar realmente em produção sem backup)
-                if archive_stats['documents_eligible_for_archive'] > 0:
-                    logger.logger.info(f'{archive_stats["documents_eligible_for_archive"]} documentos elegíveis para arquivamento')
-                    
-                    # Em produção, aqui seria feita a criação de arquivos ou movimentação para storage offline
-                    archive_stats['archives_created'] = archive_stats['documents_eligible_for_archive'] // 100  # Simulado
-                
                 logger.log_operation('archiving_completed', {
                     'stats': archive_stats,
                     'cutoff_days': days,
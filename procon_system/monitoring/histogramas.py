@@ -0,0 +1,474 @@
+"""
+Histogramas de memória fixa para métricas de performance
+Sistema Procon - Monitoramento
+
+Cada valor cai em um bucket logarítmico (estilo HDR): o bucket i cobre
+[minimo * (1 + precisao) ** i, minimo * (1 + precisao) ** (i + 1)), então o
+erro relativo de qualquer percentil fica limitado a `precisao` e o número
+de buckets é limitado pela faixa de valores, não pela quantidade de amostras.
+Histogramas são somáveis bucket a bucket: os workers do gunicorn registram
+localmente e publicam periodicamente os incrementos em um armazenamento
+compartilhado (hashes no Redis ou um arquivo JSON por worker), e as leituras
+juntam tudo. Além do acumulado ('total', exposto em /metrics), cada série
+mantém janelas por hora para resumos das últimas N horas.
+"""
+
+import atexit
+import json
+import logging
+import math
+import os
+import re
+import socket
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+
+
+logger = logging.getLogger('procon.metrics')
+
+JANELA_TOTAL = 'total'
+QUANTIS_EXPOSICAO = (0.5, 0.9, 0.95, 0.99)
+
+# (nome, labels ordenados, janela)
+ChaveSerie = Tuple[str, Tuple[Tuple[str, str], ...], str]
+
+
+class Histograma:
+    """Histograma logarítmico esparso; percentis em O(buckets)"""
+
+    __slots__ = ('precisao', 'minimo', 'maximo', 'buckets', 'contagem', 'soma',
+                 'valor_min', 'valor_max', 'ultimo', 'ultimo_em', '_log_base')
+
+    def __init__(self, precisao: float = 0.02, minimo: float = 1e-6, maximo: float = 1e9):
+        self.precisao = precisao
+        self.minimo = minimo
+        self.maximo = maximo
+        self._log_base = math.log1p(precisao)
+        self.buckets: Dict[int, int] = {}
+        self.contagem = 0
+        self.soma = 0.0
+        self.valor_min = None
+        self.valor_max = None
+        self.ultimo = None
+        self.ultimo_em = 0.0
+
+    # ---------- buckets ----------
+
+    def indice(self, valor: float) -> int:
+        """-1 é o bucket do zero (valores abaixo de `minimo`)"""
+        if valor < self.minimo:
+            return -1
+        valor = min(valor, self.maximo)
+        return int(math.log(valor / self.minimo) / self._log_base)
+
+    def limites(self, indice: int) -> Tuple[float, float]:
+        if indice < 0:
+            return 0.0, self.minimo
+        inferior = self.minimo * math.exp(indice * self._log_base)
+        return inferior, inferior * (1 + self.precisao)
+
+    def representante(self, indice: int) -> float:
+        if indice < 0:
+            return 0.0
+        inferior, superior = self.limites(indice)
+        return math.sqrt(inferior * superior)
+
+    # ---------- registro ----------
+
+    def registrar(self, valor: float, vezes: int = 1, momento: Optional[float] = None) -> None:
+        valor = max(float(valor), 0.0)
+        indice = self.indice(valor)
+        self.buckets[indice] = self.buckets.get(indice, 0) + vezes
+        self.contagem += vezes
+        self.soma += valor * vezes
+        self.valor_min = valor if self.valor_min is None else min(self.valor_min, valor)
+        self.valor_max = valor if self.valor_max is None else max(self.valor_max, valor)
+        momento = time.time() if momento is None else momento
+        if momento >= self.ultimo_em:
+            self.ultimo, self.ultimo_em = valor, momento
+
+    def mesclar(self, outro: 'Histograma') -> 'Histograma':
+        """Soma `outro` neste histograma (mesma precisão e faixa)"""
+        for indice, quantidade in outro.buckets.items():
+            self.buckets[indice] = self.buckets.get(indice, 0) + quantidade
+        self.contagem += outro.contagem
+        self.soma += outro.soma
+        for atributo, escolher in (('valor_min', min), ('valor_max', max)):
+            valores = [v for v in (getattr(self, atributo), getattr(outro, atributo)) if v is not None]
+            setattr(self, atributo, escolher(valores) if valores else None)
+        if outro.ultimo is not None and outro.ultimo_em >= self.ultimo_em:
+            self.ultimo, self.ultimo_em = outro.ultimo, outro.ultimo_em
+        return self
+
+    # ---------- consultas ----------
+
+    @property
+    def media(self) -> float:
+        return self.soma / self.contagem if self.contagem else 0.0
+
+    def percentil(self, percentil: float) -> float:
+        """Valor abaixo do qual estão `percentil`% das amostras (erro relativo <= precisao)"""
+        if not self.contagem:
+            return 0.0
+        posicao = max(1, math.ceil(self.contagem * percentil / 100))
+        # Nos extremos o valor exato é conhecido
+        if posicao == 1 and self.valor_min is not None:
+            return self.valor_min
+        if posicao >= self.contagem and self.valor_max is not None:
+            return self.valor_max
+        acumulado = 0
+        for indice in sorted(self.buckets):
+            acumulado += self.buckets[indice]
+            if acumulado >= posicao:
+                valor = self.representante(indice)
+                if self.valor_min is not None:
+                    valor = max(valor, self.valor_min)
+                if self.valor_max is not None:
+                    valor = min(valor, self.valor_max)
+                return valor
+        return self.valor_max or 0.0
+
+    def resumo(self) -> Dict[str, float]:
+        if not self.contagem:
+            return {'count': 0, 'avg': 0, 'min': 0, 'max': 0}
+        return {
+            'count': self.contagem,
+            'avg': self.media,
+            'min': self.valor_min,
+            'max': self.valor_max,
+            'p50': self.percentil(50),
+            'p95': self.percentil(95),
+            'p99': self.percentil(99),
+            'latest': self.ultimo,
+        }
+
+    # ---------- serialização ----------
+
+    def para_dict(self) -> Dict:
+        return {
+            'b': {str(indice): quantidade for indice, quantidade in self.buckets.items()},
+            'n': self.contagem, 's': self.soma, 'min': self.valor_min, 'max': self.valor_max,
+            'u': self.ultimo, 'ut': self.ultimo_em,
+        }
+
+    def carregar_dict(self, dados: Dict) -> 'Histograma':
+        self.buckets = {int(indice): int(quantidade) for indice, quantidade in dados.get('b', {}).items()}
+        self.contagem = int(dados.get('n', 0))
+        self.soma = float(dados.get('s', 0.0))
+        self.valor_min, self.valor_max = dados.get('min'), dados.get('max')
+        self.ultimo, self.ultimo_em = dados.get('u'), float(dados.get('ut') or 0.0)
+        return self
+
+
+# ---------- armazenamentos compartilhados ----------
+
+class ArmazenamentoLocal:
+    """Apenas o processo atual (desenvolvimento e testes)"""
+
+    def __init__(self, novo_histograma):
+        self.novo_histograma = novo_histograma
+        self.series: Dict[ChaveSerie, Histograma] = {}
+
+    def publicar(self, pendentes: Dict[ChaveSerie, Histograma], janelas_validas: Iterable[str]) -> None:
+        for chave, histograma in pendentes.items():
+            self.series.setdefault(chave, self.novo_histograma()).mesclar(histograma)
+        validas = set(janelas_validas)
+        for chave in [c for c in self.series if c[2] not in validas]:
+            del self.series[chave]
+
+    def ler(self, janelas: Iterable[str]) -> Dict[ChaveSerie, Histograma]:
+        janelas = set(janelas)
+        return {chave: histograma for chave, histograma in self.series.items() if chave[2] in janelas}
+
+
+class ArmazenamentoArquivo(ArmazenamentoLocal):
+    """
+    Um arquivo JSON por worker (host + pid) em um diretório compartilhado,
+    reescrito por inteiro a cada publicação (rename atômico). Arquivos sem
+    atualização há mais de `expiracao` segundos (workers encerrados) são
+    ignorados.
+    """
+
+    def __init__(self, novo_histograma, diretorio: str, expiracao: int = 86400, worker: Optional[str] = None):
+        super().__init__(novo_histograma)
+        self.diretorio = diretorio
+        self.expiracao = expiracao
+        os.makedirs(diretorio, exist_ok=True)
+        worker = worker or f'{socket.gethostname()}-{os.getpid()}'
+        self.arquivo = os.path.join(diretorio, f'{worker}.json')
+
+    @staticmethod
+    def _serializar_chave(chave: ChaveSerie) -> str:
+        return json.dumps([chave[0], [list(par) for par in chave[1]], chave[2]])
+
+    @staticmethod
+    def _chave(texto: str) -> ChaveSerie:
+        nome, labels, janela = json.loads(texto)
+        return nome, tuple(tuple(par) for par in labels), janela
+
+    def publicar(self, pendentes, janelas_validas) -> None:
+        super().publicar(pendentes, janelas_validas)
+        conteudo = {self._serializar_chave(chave): h.para_dict() for chave, h in self.series.items()}
+        temporario = f'{self.arquivo}.tmp'
+        with open(temporario, 'w', encoding='utf-8') as arquivo:
+            json.dump(conteudo, arquivo)
+        os.replace(temporario, self.arquivo)
+
+    def ler(self, janelas) -> Dict[ChaveSerie, Histograma]:
+        janelas = set(janelas)
+        limite = time.time() - self.expiracao
+        series: Dict[ChaveSerie, Histograma] = {}
+        for nome_arquivo in os.listdir(self.diretorio):
+            caminho = os.path.join(self.diretorio, nome_arquivo)
+            if not nome_arquivo.endswith('.json'):
+                continue
+            try:
+                if os.path.getmtime(caminho) < limite:
+                    continue
+                with open(caminho, encoding='utf-8') as arquivo:
+                    conteudo = json.load(arquivo)
+            except (OSError, ValueError):
+                continue  # worker reescrevendo ou arquivo removido
+            for texto, dados in conteudo.items():
+                chave = self._chave(texto)
+                if chave[2] in janelas:
+                    histograma = self.novo_histograma().carregar_dict(dados)
+                    series.setdefault(chave, self.novo_histograma()).mesclar(histograma)
+        return series
+
+
+class ArmazenamentoRedis:
+    """
+    Um hash por série e janela ('b:<indice>' -> contagem, 'n', 's', 'u', 'ut'),
+    incrementado com HINCRBY/HINCRBYFLOAT; conjuntos indexam nomes e labels.
+    Mínimo e máximo entre workers vêm dos limites dos buckets extremos.
+    """
+
+    def __init__(self, novo_histograma, url: str, prefixo: str, retencao_horas: int):
+        import redis
+
+        self.novo_histograma = novo_histograma
+        self.cliente = redis.Redis.from_url(url, socket_timeout=2)
+        self.prefixo = prefixo
+        self.ttl_janela = (retencao_horas + 1) * 3600
+
+    def _chave(self, chave: ChaveSerie) -> str:
+        nome, labels, janela = chave
+        return f'{self.prefixo}:serie:{nome}|{json.dumps(labels)}|{janela}'
+
+    def publicar(self, pendentes, janelas_validas) -> None:
+        pipe = self.cliente.pipeline(transaction=False)
+        for chave, histograma in pendentes.items():
+            nome, labels, janela = chave
+            chave_redis = self._chave(chave)
+            for indice, quantidade in histograma.buckets.items():
+                pipe.hincrby(chave_redis, f'b:{indice}', quantidade)
+            pipe.hincrby(chave_redis, 'n', histograma.contagem)
+            pipe.hincrbyfloat(chave_redis, 's', histograma.soma)
+            if histograma.ultimo is not None:
+                pipe.hset(chave_redis, mapping={'u': histograma.ultimo, 'ut': histograma.ultimo_em})
+            if janela != JANELA_TOTAL:
+                pipe.expire(chave_redis, self.ttl_janela)
+            pipe.sadd(f'{self.prefixo}:nomes', nome)
+            pipe.sadd(f'{self.prefixo}:labels:{nome}', json.dumps(labels))
+        pipe.execute()
+
+    def _histograma(self, dados: Dict[bytes, bytes]) -> Histograma:
+        histograma = self.novo_histograma()
+        for campo, valor in dados.items():
+            campo = campo.decode()
+            if campo.startswith('b:'):
+                histograma.buckets[int(campo[2:])] = int(valor)
+        histograma.contagem = int(dados.get(b'n', 0))
+        histograma.soma = float(dados.get(b's', 0.0))
+        if b'u' in dados:
+            histograma.ultimo, histograma.ultimo_em = float(dados[b'u']), float(dados[b'ut'])
+        if histograma.buckets:
+            histograma.valor_min = histograma.limites(min(histograma.buckets))[0]
+            histograma.valor_max = histograma.limites(max(histograma.buckets))[1]
+        return histograma
+
+    def ler(self, janelas) -> Dict[ChaveSerie, Histograma]:
+        janelas = list(janelas)
+        nomes = sorted(n.decode() for n in self.cliente.smembers(f'{self.prefixo}:nomes'))
+        pipe = self.cliente.pipeline(transaction=False)
+        for nome in nomes:
+            pipe.smembers(f'{self.prefixo}:labels:{nome}')
+        chaves: List[ChaveSerie] = [
+            (nome, tuple(tuple(par) for par in json.loads(labels)), janela)
+            for nome, conjunto in zip(nomes, pipe.execute())
+            for labels in conjunto
+            for janela in janelas
+        ]
+        pipe = self.cliente.pipeline(transaction=False)
+        for chave in chaves:
+            pipe.hgetall(self._chave(chave))
+        return {
+            chave: self._histograma(dados)
+            for chave, dados in zip(chaves, pipe.execute())
+            if dados
+        }
+
+
+# ---------- registro ----------
+
+def nome_prometheus(nome: str) -> str:
+    nome = re.sub(r'[^a-zA-Z0-9_:]', '_', nome)
+    return f'_{nome}' if nome[:1].isdigit() else nome
+
+
+def _escapar_label(valor: str) -> str:
+    return valor.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class RegistroHistogramas:
+    """
+    Ponto único de registro das métricas do processo. As amostras entram em
+    histogramas locais (sem I/O) e são publicadas no armazenamento
+    compartilhado a cada METRICAS_INTERVALO_PUBLICACAO segundos e antes de
+    cada leitura.
+    """
+
+    def __init__(self):
+        self.precisao = getattr(settings, 'METRICAS_PRECISAO', 0.02)
+        self.intervalo_publicacao = getattr(settings, 'METRICAS_INTERVALO_PUBLICACAO', 10)
+        self.retencao_horas = getattr(settings, 'METRICAS_RETENCAO_HORAS', 24)
+        self.prefixo = getattr(settings, 'METRICAS_PREFIXO', 'procon')
+        self.lock = threading.Lock()
+        self._pendentes: Dict[ChaveSerie, Histograma] = {}
+        self._publicado_em = time.monotonic()
+        self._armazenamento = None
+        atexit.register(self.publicar)
+
+    def novo_histograma(self) -> Histograma:
+        return Histograma(self.precisao)
+
+    @property
+    def armazenamento(self):
+        if self._armazenamento is None:
+            self._armazenamento = self._criar_armazenamento()
+        return self._armazenamento
+
+    @armazenamento.setter
+    def armazenamento(self, valor):
+        self._armazenamento = valor
+
+    def _criar_armazenamento(self):
+        backend = getattr(settings, 'METRICAS_BACKEND', 'arquivo')
+        try:
+            if backend == 'redis':
+                url = getattr(settings, 'METRICAS_REDIS_URL', '') or getattr(settings, 'REDIS_URL', '')
+                return ArmazenamentoRedis(self.novo_histograma, url, self.prefixo, self.retencao_horas)
+            if backend == 'arquivo':
+                diretorio = getattr(settings, 'METRICAS_DIRETORIO', '') or os.path.join(
+                    tempfile.gettempdir(), f'{self.prefixo}_metricas'
+                )
+                return ArmazenamentoArquivo(
+                    self.novo_histograma, diretorio, getattr(settings, 'METRICAS_ARQUIVO_EXPIRACAO', 86400),
+                )
+        except Exception as e:
+            logger.warning(f'Armazenamento de métricas "{backend}" indisponível, usando memória local: {e}')
+        return ArmazenamentoLocal(self.novo_histograma)
+
+    # ---------- janelas ----------
+
+    @staticmethod
+    def janela(momento: Optional[datetime] = None) -> str:
+        momento = momento or datetime.now(dt_timezone.utc)
+        return momento.astimezone(dt_timezone.utc).strftime('%Y%m%d%H')
+
+    def janelas(self, horas: Optional[int] = None) -> List[str]:
+        """Janelas das últimas `horas` horas (inclui a atual); None = acumulado total"""
+        if horas is None:
+            return [JANELA_TOTAL]
+        agora = datetime.now(dt_timezone.utc)
+        horas = max(1, min(horas, self.retencao_horas))
+        return [self.janela(agora - timedelta(hours=h)) for h in range(horas)]
+
+    # ---------- registro e publicação ----------
+
+    def registrar(self, nome: str, valor: float, labels: Optional[Dict[str, str]] = None) -> None:
+        labels = tuple(sorted((str(k), str(v)) for k, v in (labels or {}).items()))
+        momento = time.time()
+        with self.lock:
+            for janela in (JANELA_TOTAL, self.janela()):
+                histograma = self._pendentes.get((nome, labels, janela))
+                if histograma is None:
+                    histograma = self._pendentes[(nome, labels, janela)] = self.novo_histograma()
+                histograma.registrar(valor, momento=momento)
+            publicar = time.monotonic() - self._publicado_em >= self.intervalo_publicacao
+        if publicar:
+            self.publicar()
+
+    def publicar(self) -> None:
+        with self.lock:
+            pendentes, self._pendentes = self._pendentes, {}
+            self._publicado_em = time.monotonic()
+        if not pendentes:
+            return
+        try:
+            self.armazenamento.publicar(pendentes, [JANELA_TOTAL] + self.janelas(self.retencao_horas))
+        except Exception as e:
+            logger.warning(f'Falha ao publicar métricas: {e}')
+            with self.lock:  # devolve os incrementos para a próxima tentativa
+                for chave, histograma in pendentes.items():
+                    self._pendentes.setdefault(chave, self.novo_histograma()).mesclar(histograma)
+
+    # ---------- leitura ----------
+
+    def series(self, nome: Optional[str] = None, horas: Optional[int] = None) -> Dict[Tuple[str, tuple], Histograma]:
+        """Histogramas agregados de todos os workers por (nome, labels)"""
+        self.publicar()
+        try:
+            lidas = self.armazenamento.ler(self.janelas(horas))
+        except Exception as e:
+            logger.warning(f'Falha ao ler métricas compartilhadas: {e}')
+            lidas = {}
+        series: Dict[Tuple[str, tuple], Histograma] = {}
+        for (nome_serie, labels, _), histograma in lidas.items():
+            if nome is None or nome_serie == nome:
+                series.setdefault((nome_serie, labels), self.novo_histograma()).mesclar(histograma)
+        return series
+
+    def agregado(self, nome: str, labels: Optional[Dict[str, str]] = None, horas: Optional[int] = None) -> Histograma:
+        """Um histograma com todas as séries de `nome` que contêm os labels informados"""
+        filtro = {(str(k), str(v)) for k, v in (labels or {}).items()}
+        total = self.novo_histograma()
+        for (_, labels_serie), histograma in self.series(nome, horas).items():
+            if filtro <= set(labels_serie):
+                total.mesclar(histograma)
+        return total
+
+    def exposicao_prometheus(self) -> str:
+        """Formato texto do Prometheus: um summary por métrica e o último valor como gauge"""
+        por_nome: Dict[str, List[Tuple[tuple, Histograma]]] = {}
+        for (nome, labels), histograma in sorted(self.series().items()):
+            por_nome.setdefault(nome, []).append((labels, histograma))
+
+        linhas = []
+        for nome, series in por_nome.items():
+            metrica = nome_prometheus(f'{self.prefixo}_{nome}')
+            linhas += [f'# HELP {metrica} {nome}', f'# TYPE {metrica} summary']
+            for labels, histograma in series:
+                pares = [f'{k}="{_escapar_label(v)}"' for k, v in labels]
+                rotulo = '{' + ','.join(pares) + '}' if pares else ''
+                for quantil in QUANTIS_EXPOSICAO:
+                    rotulo_quantil = '{' + ','.join(pares + [f'quantile="{quantil}"']) + '}'
+                    linhas.append(f'{metrica}{rotulo_quantil} {histograma.percentil(quantil * 100):.6g}')
+                linhas.append(f'{metrica}_sum{rotulo} {histograma.soma:.6g}')
+                linhas.append(f'{metrica}_count{rotulo} {histograma.contagem}')
+            linhas += [f'# TYPE {metrica}_ultimo gauge']
+            for labels, histograma in series:
+                pares = [f'{k}="{_escapar_label(v)}"' for k, v in labels]
+                rotulo = '{' + ','.join(pares) + '}' if pares else ''
+                linhas.append(f'{metrica}_ultimo{rotulo} {histograma.ultimo or 0:.6g}')
+        return '\n'.join(linhas) + '\n'
+
+
+# Instância global do serviço
+registro_metricas = RegistroHistogramas()
@@ -0,0 +1,53 @@
+"""
+Comando para arquivar e expurgar dados antigos conforme as políticas de retenção
+Uso: python manage.py aplicar_retencao [--politica logs_sistema] [--dias 90] [--lote 1000] [--max-lotes 50] [--status]
+Agendar no cron/beat fora do horário de pico; execuções interrompidas continuam de onde pararam.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from monitoring.retencao import retencao_service
+
+
+class Command(BaseCommand):
+    help = 'Arquiva e remove em lotes os registros anteriores ao prazo de retenção de cada política'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--politica',
+            action='append',
+            help='Política a executar (pode repetir); padrão: todas',
+        )
+        parser.add_argument('--dias', type=int, help='Dias de retenção (sobrescreve a política em novas execuções)')
+        parser.add_argument('--lote', type=int, help='Linhas por lote/transação')
+        parser.add_argument('--pausa', type=float, help='Segundos de pausa entre lotes')
+        parser.add_argument('--max-lotes', type=int, help='Interrompe após N lotes por política (retomável)')
+        parser.add_argument('--status', action='store_true', help='Mostra os checkpoints sem executar')
+
+    def handle(self, *args, **options):
+        if options['status']:
+            for checkpoint in retencao_service.situacao():
+                self.stdout.write(
+                    f'📋 {checkpoint.politica}: {checkpoint.get_status_display()} | corte {checkpoint.corte:%d/%m/%Y} | '
+                    f'{checkpoint.linhas} linha(s) em {checkpoint.lotes} lote(s) | {checkpoint.arquivo or "-"}'
+                )
+            return
+
+        nomes = options['politica'] or list(retencao_service.politicas())
+        for nome in nomes:
+            try:
+                resultado = retencao_service.executar(
+                    nome, dias=options['dias'], tamanho_lote=options['lote'],
+                    pausa=options['pausa'], max_lotes=options['max_lotes'],
+                )
+            except ValueError as e:
+                raise CommandError(str(e))
+
+            mensagem = (
+                f"🗄️ {nome}: {resultado['linhas']} linha(s) (+{resultado['linhas_cascata']} em cascata) em "
+                f"{resultado['lotes']} lote(s) | {resultado['linhas_por_segundo']:.0f} linhas/s | "
+                f"{resultado['bytes_liberados'] / 1024:.1f} KB liberados"
+            )
+            if resultado['concluido']:
+                self.stdout.write(self.style.SUCCESS(f'✅ {mensagem}'))
+            else:
+                self.stdout.write(self.style.WARNING(f'⏸️ {mensagem} - será retomada na próxima execução'))
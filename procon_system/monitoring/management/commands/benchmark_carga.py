@@ -0,0 +1,108 @@
+"""
+Comando para medir dashboards, buscas, exportações e varreduras com volumes de produção
+Uso: python manage.py benchmark_carga [--fator 0.01] [--cenario varredura_prazos] [--salvar-baseline]
+Os dados sintéticos (monitoring/benchmark_carga.py) são gerados dentro de uma transação
+desfeita ao final, a menos que --manter-dados seja informado. Sai com erro quando
+algum cenário regride em relação ao baseline, para uso no CI.
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from monitoring.benchmark_carga import (
+    CENARIOS,
+    BenchmarkCarga,
+    GeradorDados,
+    calcular_volumes,
+    caminho_baseline,
+    carregar_baseline,
+    comparar,
+    salvar_baseline,
+)
+
+
+class Reverter(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Gera dados sintéticos em volume de produção e mede os cenários críticos contra um baseline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fator', type=float, default=0.01, help='Fração dos volumes de produção (1 = produção)')
+        parser.add_argument('--volume', action='append', default=[], help='Ajuste de volume nome=N (pode repetir)')
+        parser.add_argument('--cenario', action='append', choices=sorted(CENARIOS), help='Cenário a medir (pode repetir)')
+        parser.add_argument('--repeticoes', type=int, default=5)
+        parser.add_argument('--manter-cache', action='store_true', help='Não limpa o cache entre as repetições')
+        parser.add_argument('--baseline', default=None, help='Arquivo JSON do baseline')
+        parser.add_argument('--salvar-baseline', action='store_true', help='Grava os resultados como novo baseline')
+        parser.add_argument('--tolerancia', type=float, default=getattr(settings, 'BENCHMARK_TOLERANCIA', 0.25))
+        parser.add_argument('--manter-dados', action='store_true', help='Não desfaz os dados gerados')
+        parser.add_argument('--sem-geracao', action='store_true', help='Mede os dados já existentes no banco')
+
+    def handle(self, *args, **options):
+        try:
+            ajustes = {nome: int(n) for nome, n in (v.split('=', 1) for v in options['volume'])}
+        except ValueError:
+            raise CommandError('Use --volume nome=N')
+
+        volumes = calcular_volumes(options['fator'], ajustes)
+        if options['manter_dados'] or options['sem_geracao']:
+            resultados = self._executar(volumes, options)
+        else:
+            try:
+                with transaction.atomic():
+                    resultados = self._executar(volumes, options)
+                    raise Reverter
+            except Reverter:
+                pass
+
+        self._relatar(volumes, resultados, options)
+
+    def _executar(self, volumes, options):
+        if not options['sem_geracao']:
+            try:
+                gerador = GeradorDados(volumes, saida=self.stdout.write)
+            except ImportError as e:
+                raise CommandError(f'A geração de dados usa tests/factories.py e factory_boy ({e}); use --sem-geracao')
+            self.stdout.write(f'🏗️ Gerando dados: {volumes}')
+            gerador.gerar()
+        benchmark = BenchmarkCarga(repeticoes=options['repeticoes'], limpar_cache=not options['manter_cache'])
+        return benchmark.executar(options['cenario'])
+
+    def _relatar(self, volumes, resultados, options):
+        self.stdout.write('')
+        for nome, r in resultados.items():
+            if 'erro' in r:
+                self.stdout.write(self.style.ERROR(f"{nome:<32} {r['erro']}"))
+            else:
+                self.stdout.write(
+                    f"{nome:<32} {r['consultas']:>5} consultas  "
+                    f"p50 {r['duracao_p50_ms']:>9.1f} ms  máx {r['duracao_max_ms']:>9.1f} ms"
+                )
+
+        caminho = options['baseline'] or caminho_baseline()
+        if options['salvar_baseline']:
+            salvar_baseline(caminho, volumes, resultados)
+            self.stdout.write(self.style.SUCCESS(f'💾 Baseline gravado em {caminho}'))
+            return
+
+        baseline = carregar_baseline(caminho)
+        if baseline is None:
+            self.stdout.write(self.style.WARNING(f'⚠️ Sem baseline em {caminho}; use --salvar-baseline'))
+            return
+        if baseline.get('volumes') != volumes:
+            self.stdout.write(self.style.WARNING(
+                f"⚠️ Baseline gravado com outros volumes ({baseline.get('volumes')}); comparação ignorada"
+            ))
+            return
+
+        regressoes = comparar(
+            resultados, baseline, options['tolerancia'], getattr(settings, 'BENCHMARK_PISO_MS', 5.0),
+        )
+        for nome, motivos in regressoes.items():
+            self.stdout.write(self.style.ERROR(f"❌ {nome}: {'; '.join(motivos)}"))
+        if regressoes:
+            raise CommandError(f'{len(regressoes)} cenário(s) regrediram em relação ao baseline')
+        self.stdout.write(self.style.SUCCESS('✅ Nenhuma regressão em relação ao baseline'))
@@ -0,0 +1,48 @@
+"""
+Comando para executar as tarefas periódicas sem Celery
+Uso: python manage.py executar_tarefas_periodicas [--tarefa varredura_prazos] [--listar]
+Agendar no cron a cada minuto: só as tarefas cujo intervalo já passou são executadas,
+com o mesmo lock e histórico do beat (monitoring/agendador.py).
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from monitoring.agendador import agendador_service
+
+
+class Command(BaseCommand):
+    help = 'Executa as tarefas periódicas pendentes (ou as informadas) com lock e histórico de execução'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tarefa',
+            action='append',
+            help='Tarefa a executar mesmo fora do intervalo (pode repetir); padrão: as pendentes',
+        )
+        parser.add_argument('--listar', action='store_true', help='Mostra as tarefas e a última execução de cada uma')
+
+    def handle(self, *args, **options):
+        if options['listar']:
+            tarefas = agendador_service.tarefas()
+            for nome, execucao in agendador_service.ultimas_execucoes().items():
+                ultima = (
+                    f'{execucao.iniciado_em:%d/%m/%Y %H:%M} {execucao.get_status_display()} | '
+                    f'{execucao.duracao or 0:.1f}s | {execucao.linhas} linha(s)'
+                ) if execucao else 'nunca executada'
+                self.stdout.write(f"📋 {nome} (a cada {tarefas[nome]['intervalo']}s): {ultima}")
+            return
+
+        nomes = options['tarefa'] or agendador_service.pendentes()
+        for nome in nomes:
+            try:
+                resultado = agendador_service.executar(nome, origem='comando')
+            except ValueError as e:
+                raise CommandError(str(e))
+
+            if resultado['status'] == 'ignorada':
+                self.stdout.write(self.style.WARNING(f'⏸️ {nome}: já em execução em outra instância'))
+            elif resultado['status'] == 'erro':
+                self.stdout.write(self.style.ERROR(f"❌ {nome}: {resultado['erro']}"))
+            else:
+                self.stdout.write(self.style.SUCCESS(
+                    f"✅ {nome}: {resultado['linhas']} linha(s) em {resultado['duracao']:.2f}s"
+                ))
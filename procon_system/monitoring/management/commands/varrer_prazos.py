@@ -0,0 +1,35 @@
+"""
+Comando para a varredura periódica de prazos (CIPs, processos e caixa de entrada)
+Uso: python manage.py varrer_prazos [--reconstruir] [--sem-notificacoes]
+Agendar no cron/beat a cada poucos minutos.
+"""
+
+from django.core.management.base import BaseCommand
+from monitoring.prazos import varredura_prazos_service
+
+
+class Command(BaseCommand):
+    help = 'Promove prazos próximos, vencidos e escalonados no índice PrazoMonitorado e notifica em lote'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reconstruir',
+            action='store_true',
+            help='Reconcilia o índice com os objetos com prazo ativo antes da varredura',
+        )
+        parser.add_argument(
+            '--sem-notificacoes',
+            action='store_true',
+            help='Atualiza os estados sem criar notificações',
+        )
+
+    def handle(self, *args, **options):
+        if options['reconstruir']:
+            for tipo, total in varredura_prazos_service.reconstruir().items():
+                self.stdout.write(f'📋 {tipo}: {total} prazo(s) indexado(s)')
+
+        resultado = varredura_prazos_service.varrer(notificar=not options['sem_notificacoes'])
+        self.stdout.write(self.style.SUCCESS(
+            f"⏰ Próximos: {resultado['proximo']} | Vencidos: {resultado['vencido']} | "
+            f"Escalonados: {resultado['escalonado']} | Notificações: {resultado['notificacoes']}"
+        ))
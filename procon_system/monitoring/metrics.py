@@ -4,10 +4,8 @@ Captura e analisa dados de performance do Sistema Procon
 """
 
 import time
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
-from collections import defaultdict, deque
-import threading
+from datetime import timedelta
+from typing import Dict, Optional, Any
 import json
 
 from django.db.models import Count, Q, Avg, Max, Min
@@ -21,55 +19,40 @@ from protocolo_tramitacao.models import ProtocoloDocumento, TramitacaoDocumento
 from atendimento.models import Atendimento
 from logging_config import SmartAlerts
 
+from .histogramas import RegistroHistogramas, registro_metricas
+
 
 class MetricsCollector:
-    """Coletor centralizado de métricas do sistema"""
+    """
+    Coletor centralizado de métricas do sistema. Os valores vão para
+    histogramas de memória fixa agregados entre os workers (ver
+    monitoring.histogramas), expostos em /metrics.
+    """
     
-    def __init__(self):
-        self.metrics_buffer = deque(maxlen=1000)  # Buffer circular
-        self.lock = threading.Lock()
+    def __init__(self, registro: RegistroHistogramas = None):
+        self.registro = registro or registro_metricas
         self.logger = logger_manager.get_logger('metrics')
         self.smart_alerts = SmartAlerts()
         
     def record_metric(self, name: str, value: float, tags: Dict[str, str] = None):
         """Registra uma métrica personalizada"""
-        with self.lock:
-            metric = {
-                'timestamp': timezone.now().isoformat(),
-                'name': name,
-                'value': value,
-                'tags': tags or {},
-            }
-            self.metrics_buffer.append(metric)
-            
-            # Log estrut turado da métrica
-            self.logger.log_performance(f'metric_{name}', value, {
-                'metric_type': 'custom',
-                'tags': tags or {},
-            })
-            
-    def get_metric_summary(self, name: str, hours: int = 24) -> Dict[str, Any]:
-        """Obtém resumo de uma métrica específica"""
-        cutoff_time = timezone.now() - timedelta(hours=hours)
-        
-        relevant_metrics = [
-            m for m in self.metrics_buffer 
-            if (m['name'] == name and 
-                datetime.fromisoformat(m['timestamp']).replace(tzinfo=timezone.get_current_timezone()) >= cutoff_time)
-        ]
-        
-        if not relevant_metrics:
-            return {'count': 0, 'avg': 0, 'min': 0, 'max': 0}
-            
-        values = [m['value'] for m in relevant_metrics]
+        self.registro.registrar(name, value, tags)
         
-        return {
-            'count': len(values),
-            'avg': sum(values) / len(values),
-            'min': min(values),
-            'max': max(values),
-            'latest': values[-1] if values else 0,
-        }
+        # Log estruturado da métrica
+        self.logger.log_performance(f'metric_{name}', value, {
+            'metric_type': 'custom',
+            'tags': tags or {},
+        })
+            
+    def get_metric_summary(self, name: str, hours: int = 24, tags: Dict[str, str] = None) -> Dict[str, Any]:
+        """
+        Obtém resumo de uma métrica específica (todos os workers), com
+        granularidade de hora cheia para o período
+        """
+        resumo = self.registro.agregado(name, tags, horas=hours).resumo()
+        if resumo['count']:
+            resumo['latest'] = resumo['latest'] or 0
+        return resumo
 
 
 class SystemHealthMetrics:
@@ -222,8 +205,10 @@ class SystemHealthMetrics:
 class PerformanceProfiler:
     """Profiler de performance para operações críticas"""
     
-    def __init__(self):
-        self.timings = defaultdict(lambda: deque(maxlen=100))
+    METRICA_DURACAO = 'operacao_duracao_segundos'
+    
+    def __init__(self, registro: RegistroHistogramas = None):
+        self.registro = registro or registro_metricas
         self.logger = logger_manager.get_logger('performance')
         
     def time_operation(self, operation_name: str):
@@ -236,7 +221,7 @@ class PerformanceProfiler:
                     duration = time.time() - start_time
                     
                     # Registrar timing
-                    self.timings[operation_name].append(duration)
+                    self.registro.registrar(self.METRICA_DURACAO, duration, {'operacao': operation_name})
                     
                     # Classificar performance
                     p_level = 'excellent' if duration < 0.1 else (
@@ -261,27 +246,11 @@ class PerformanceProfiler:
             return wrapper
         return decorator
         
-    def get_timing_stats(self, operation_name: str) -> Dict[str, Any]:
-        """Obtém estatísticas de timing para uma operação"""
-        if operation_name not in self.timings or not self.timings[operation_name]:
-            return {'count': 0, 'avg': 0, 'min': 0, 'max': 0}
-            
-        timings_list = list(self.timings[operation_name])
-        
-        return {
-            'count': len(timings_list),
-            'avg': sum(timings_list) / len(timings_list),
-            'min': min(timings_list),
-            'max': max(timings_list),
-            'p95': self._percentile(timings_list, 95),
-            'p99': self._percentile(timings_list, 99),
-        }
-        
-    def _percentile(self, data: List[float], percentile: int) -> float:
-        """Calcula percentil de uma lista de números"""
-        sorted_data = sorted(data)
-        index = int(len(sorted_data) * percentile / 100)
-        return sorted_data[min(index, len(sorted_data) - 1)]
+    def get_timing_stats(self, operation_name: str, hours: int = None) -> Dict[str, Any]:
+        """Obtém estatísticas de timing para uma operação (percentis em O(buckets))"""
+        resumo = self.registro.agregado(self.METRICA_DURACAO, {'operacao': operation_name}, horas=hours).resumo()
+        resumo.pop('latest', None)
+        return resumo
 
 
 class BusinessMetrics:
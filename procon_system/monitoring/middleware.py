@@ -0,0 +1,232 @@
+"""
+Instrumentação por requisição: consultas SQL, tempo de banco, cache e latência
+Sistema Procon - Monitoramento
+
+Para cada view resolvida o middleware conta as consultas e o tempo gasto
+no banco (execute_wrapper em todas as conexões), os acertos e falhas de
+cache e o tempo total. Os números vão para os histogramas compartilhados
+(monitoring.histogramas), por endpoint e método, e alimentam o dashboard
+de performance. Views podem declarar um orçamento de consultas com
+@orcamento_consultas(N) ou em ORCAMENTO_CONSULTAS; estourar o orçamento
+gera um aviso no log ou, com ORCAMENTO_CONSULTAS_MODO = 'erro' (testes),
+uma exceção.
+"""
+
+import contextvars
+import logging
+import time
+from contextlib import ExitStack
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+
+from .histogramas import registro_metricas
+
+
+logger = logging.getLogger('procon.performance')
+
+METRICAS_REQUISICAO = {
+    'duracao': 'requisicao_duracao_segundos',
+    'consultas': 'requisicao_consultas',
+    'tempo_db': 'requisicao_tempo_db_segundos',
+    'cache_acertos': 'requisicao_cache_acertos',
+    'cache_falhas': 'requisicao_cache_falhas',
+    'orcamento_excedido': 'requisicao_orcamento_excedido',
+}
+
+_AUSENTE = object()
+
+# Contadores da requisição em andamento (None fora do middleware)
+_requisicao_atual: contextvars.ContextVar[Optional['MedicaoRequisicao']] = contextvars.ContextVar(
+    'procon_requisicao_atual', default=None,
+)
+
+
+class OrcamentoConsultasExcedido(AssertionError):
+    """View executou mais consultas SQL que o orçamento declarado"""
+
+
+def orcamento_consultas(maximo: int):
+    """
+    Declara o máximo de consultas SQL de uma view (função, classe ou método
+    de ação de ViewSet)
+    """
+    def decorator(view):
+        view.orcamento_consultas = maximo
+        return view
+    return decorator
+
+
+class MedicaoRequisicao:
+    __slots__ = ('consultas', 'tempo_db', 'cache_acertos', 'cache_falhas')
+
+    def __init__(self):
+        self.consultas = 0
+        self.tempo_db = 0.0
+        self.cache_acertos = 0
+        self.cache_falhas = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        """execute_wrapper: conta e cronometra cada consulta"""
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.tempo_db += time.perf_counter() - inicio
+            self.consultas += 1
+
+
+def _instrumentar_cache(classe) -> None:
+    """Conta acertos e falhas de get/get_many do backend durante as requisições medidas"""
+    if classe.__dict__.get('_procon_instrumentado'):
+        return
+    get_original, get_many_original = classe.get, classe.get_many
+
+    def get(self, key, default=None, version=None):
+        valor = get_original(self, key, _AUSENTE, version)
+        medicao = _requisicao_atual.get()
+        if medicao is not None:
+            if valor is _AUSENTE:
+                medicao.cache_falhas += 1
+            else:
+                medicao.cache_acertos += 1
+        return default if valor is _AUSENTE else valor
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        medicao = _requisicao_atual.get()
+        token = _requisicao_atual.set(None)  # o get_many padrão chama get() por chave
+        try:
+            encontrados = get_many_original(self, keys, version)
+        finally:
+            _requisicao_atual.reset(token)
+        if medicao is not None:
+            medicao.cache_acertos += len(encontrados)
+            medicao.cache_falhas += len(keys) - len(encontrados)
+        return encontrados
+
+    classe.get, classe.get_many = get, get_many
+    classe._procon_instrumentado = True
+
+
+class MetricasRequisicaoMiddleware:
+    """Mede cada requisição que resolve para uma view e aplica os orçamentos de consultas"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.ativo = getattr(settings, 'REQUISICAO_METRICAS_ATIVO', True)
+        self.orcamentos = getattr(settings, 'ORCAMENTO_CONSULTAS', {})
+        self.orcamento_padrao = getattr(settings, 'ORCAMENTO_CONSULTAS_PADRAO', None)
+        self.modo = getattr(settings, 'ORCAMENTO_CONSULTAS_MODO', 'log')
+        if self.ativo:
+            for alias in settings.CACHES:
+                try:
+                    _instrumentar_cache(type(caches[alias]))
+                except Exception as e:
+                    logger.warning(f'Cache "{alias}" não instrumentado: {e}')
+
+    def __call__(self, request):
+        if not self.ativo:
+            return self.get_response(request)
+
+        medicao = MedicaoRequisicao()
+        token = _requisicao_atual.set(medicao)
+        inicio = time.perf_counter()
+        try:
+            with ExitStack() as pilha:
+                for conexao in connections.all():
+                    pilha.enter_context(conexao.execute_wrapper(medicao))
+                response = self.get_response(request)
+        finally:
+            _requisicao_atual.reset(token)
+        duracao = time.perf_counter() - inicio
+
+        endpoint = getattr(request, '_endpoint_medido', None)
+        if endpoint is not None:
+            self.registrar(request, response, endpoint, medicao, duracao)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not self.ativo:
+            return None
+        rota = request.resolver_match
+        request._endpoint_medido = (rota.view_name or rota._func_path) if rota else view_func.__name__
+        request._orcamento_consultas = self.orcamento(request, view_func)
+        return None
+
+    def orcamento(self, request, view_func) -> Optional[int]:
+        """Decorator na ação do ViewSet > na view/classe > ORCAMENTO_CONSULTAS > padrão"""
+        classe = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+        acoes = getattr(view_func, 'actions', None) or {}
+        acao = acoes.get(request.method.lower())
+        for alvo in (getattr(classe, acao, None) if classe and acao else None, view_func, classe):
+            maximo = getattr(alvo, 'orcamento_consultas', None)
+            if maximo is not None:
+                return maximo
+        rota = request.resolver_match
+        if rota is not None:
+            for chave in (rota.view_name, rota._func_path):
+                if chave in self.orcamentos:
+                    return self.orcamentos[chave]
+        return self.orcamento_padrao
+
+    def registrar(self, request, response, endpoint: str, medicao: MedicaoRequisicao, duracao: float) -> None:
+        labels = {'endpoint': endpoint, 'metodo': request.method}
+        registro_metricas.registrar(METRICAS_REQUISICAO['duracao'], duracao, labels)
+        registro_metricas.registrar(METRICAS_REQUISICAO['consultas'], medicao.consultas, labels)
+        registro_metricas.registrar(METRICAS_REQUISICAO['tempo_db'], medicao.tempo_db, labels)
+        registro_metricas.registrar(METRICAS_REQUISICAO['cache_acertos'], medicao.cache_acertos, labels)
+        registro_metricas.registrar(METRICAS_REQUISICAO['cache_falhas'], medicao.cache_falhas, labels)
+
+        maximo = getattr(request, '_orcamento_consultas', None)
+        if maximo is None or medicao.consultas <= maximo:
+            return
+        registro_metricas.registrar(METRICAS_REQUISICAO['orcamento_excedido'], 1, labels)
+        mensagem = (
+            f'Orçamento de consultas excedido em {request.method} {endpoint}: '
+            f'{medicao.consultas} consultas (máximo {maximo})'
+        )
+        if self.modo == 'erro':
+            raise OrcamentoConsultasExcedido(mensagem)
+        logger.warning(mensagem, extra={'context': {
+            'endpoint': endpoint,
+            'path': request.path,
+            'consultas': medicao.consultas,
+            'orcamento': maximo,
+            'tempo_db_ms': medicao.tempo_db * 1000,
+            'duracao_ms': duracao * 1000,
+            'status_code': getattr(response, 'status_code', None),
+        }})
+
+
+def estatisticas_endpoints(horas: int = 1, limite: int = 20) -> List[Dict]:
+    """Endpoints das últimas `horas` horas, dos que mais consultam o banco para os que menos"""
+    series = {chave: registro_metricas.series(nome, horas) for chave, nome in METRICAS_REQUISICAO.items()}
+    linhas = []
+    for (_, labels), duracao in series['duracao'].items():
+        rotulos = dict(labels)
+
+        def historico(chave):
+            return series[chave].get((METRICAS_REQUISICAO[chave], labels))
+
+        consultas, tempo_db = historico('consultas'), historico('tempo_db')
+        acertos, falhas = historico('cache_acertos'), historico('cache_falhas')
+        excedidos = historico('orcamento_excedido')
+        total_cache = (acertos.soma if acertos else 0) + (falhas.soma if falhas else 0)
+        linhas.append({
+            'endpoint': rotulos.get('endpoint'),
+            'metodo': rotulos.get('metodo'),
+            'requisicoes': duracao.contagem,
+            'duracao_p50_ms': duracao.percentil(50) * 1000,
+            'duracao_p95_ms': duracao.percentil(95) * 1000,
+            'duracao_max_ms': (duracao.valor_max or 0) * 1000,
+            'consultas_media': consultas.media if consultas else 0,
+            'consultas_max': (consultas.valor_max or 0) if consultas else 0,
+            'tempo_db_medio_ms': tempo_db.media * 1000 if tempo_db else 0,
+            'cache_taxa_acerto': (acertos.soma / total_cache * 100) if total_cache else None,
+            'orcamento_excedido': excedidos.contagem if excedidos else 0,
+        })
+    linhas.sort(key=lambda linha: (linha['consultas_media'], linha['duracao_p95_ms']), reverse=True)
+    return linhas[:limite]
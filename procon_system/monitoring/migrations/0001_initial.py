@@ -0,0 +1,38 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PrazoMonitorado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('cip', 'CIP Automática'), ('processo', 'Processo Administrativo'), ('caixa_entrada', 'Documento da Caixa de Entrada')], max_length=20, verbose_name='Tipo')),
+                ('objeto_id', models.CharField(max_length=64, verbose_name='ID do Objeto')),
+                ('vencimento', models.DateTimeField(verbose_name='Vencimento')),
+                ('estado', models.CharField(choices=[('em_dia', 'Em dia'), ('proximo', 'Próximo do vencimento'), ('vencido', 'Vencido'), ('escalonado', 'Vencido - Escalonado')], default='em_dia', max_length=20, verbose_name='Estado')),
+                ('descricao', models.CharField(blank=True, max_length=255, verbose_name='Descrição')),
+                ('setor', models.CharField(blank=True, max_length=100, verbose_name='Setor')),
+                ('prioridade', models.CharField(blank=True, max_length=20, verbose_name='Prioridade')),
+                ('estado_alterado_em', models.DateTimeField(blank=True, null=True, verbose_name='Estado Alterado em')),
+                ('atualizado_em', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+                ('responsavel', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='prazos_monitorados', to=settings.AUTH_USER_MODEL, verbose_name='Responsável')),
+            ],
+            options={
+                'verbose_name': 'Prazo Monitorado',
+                'verbose_name_plural': 'Prazos Monitorados',
+                'ordering': ['vencimento'],
+                'indexes': [models.Index(fields=['vencimento', 'estado'], name='mon_prazo_vencimento_idx'), models.Index(fields=['tipo', 'vencimento'], name='mon_prazo_tipo_idx'), models.Index(fields=['estado', 'vencimento'], name='mon_prazo_estado_idx')],
+                'constraints': [models.UniqueConstraint(fields=('tipo', 'objeto_id'), name='mon_prazo_objeto_uniq')],
+            },
+        ),
+    ]
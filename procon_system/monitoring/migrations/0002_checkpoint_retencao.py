@@ -0,0 +1,37 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CheckpointRetencao',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('politica', models.CharField(max_length=50, unique=True, verbose_name='Política')),
+                ('status', models.CharField(choices=[('em_andamento', 'Em andamento'), ('concluido', 'Concluído')], default='em_andamento', max_length=20, verbose_name='Status')),
+                ('corte', models.DateTimeField(verbose_name='Corte')),
+                ('ultimo_pk', models.CharField(blank=True, max_length=64, verbose_name='Último PK Processado')),
+                ('arquivo', models.CharField(blank=True, max_length=500, verbose_name='Arquivo de Destino')),
+                ('linhas', models.BigIntegerField(default=0, verbose_name='Linhas Arquivadas')),
+                ('linhas_cascata', models.BigIntegerField(default=0, verbose_name='Linhas Removidas em Cascata')),
+                ('bytes_liberados', models.BigIntegerField(default=0, verbose_name='Bytes Liberados (estimativa)')),
+                ('bytes_arquivo', models.BigIntegerField(default=0, verbose_name='Bytes no Arquivo')),
+                ('lotes', models.IntegerField(default=0, verbose_name='Lotes')),
+                ('segundos', models.FloatField(default=0, verbose_name='Tempo de Execução (s)')),
+                ('iniciado_em', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Iniciado em')),
+                ('atualizado_em', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+                ('concluido_em', models.DateTimeField(blank=True, null=True, verbose_name='Concluído em')),
+            ],
+            options={
+                'verbose_name': 'Checkpoint de Retenção',
+                'verbose_name_plural': 'Checkpoints de Retenção',
+                'ordering': ['politica'],
+            },
+        ),
+    ]
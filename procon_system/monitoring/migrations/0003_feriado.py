@@ -0,0 +1,32 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0002_checkpoint_retencao'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Feriado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.DateField(verbose_name='Data')),
+                ('nome', models.CharField(max_length=150, verbose_name='Nome')),
+                ('abrangencia', models.CharField(choices=[('nacional', 'Nacional'), ('estadual', 'Estadual'), ('municipal', 'Municipal'), ('fechamento', 'Fechamento do Órgão / Ponto Facultativo')], default='municipal', max_length=20, verbose_name='Abrangência')),
+                ('uf', models.CharField(blank=True, help_text='Obrigatória para feriados estaduais e municipais', max_length=2, verbose_name='UF')),
+                ('municipio', models.CharField(blank=True, max_length=100, verbose_name='Município')),
+                ('recorrente', models.BooleanField(default=False, help_text='Mesmo dia e mês em todos os anos', verbose_name='Repete Todo Ano')),
+                ('ativo', models.BooleanField(default=True, verbose_name='Ativo')),
+                ('criado_em', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+                ('atualizado_em', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+            ],
+            options={
+                'verbose_name': 'Feriado',
+                'verbose_name_plural': 'Feriados',
+                'ordering': ['data'],
+                'indexes': [models.Index(fields=['data'], name='monitoring__data_c1750d_idx')],
+            },
+        ),
+    ]
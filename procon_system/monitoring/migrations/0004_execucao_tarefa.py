@@ -0,0 +1,34 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0003_feriado'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExecucaoTarefa',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tarefa', models.CharField(max_length=100, verbose_name='Tarefa')),
+                ('status', models.CharField(choices=[('executando', 'Executando'), ('sucesso', 'Sucesso'), ('erro', 'Erro')], default='executando', max_length=20, verbose_name='Status')),
+                ('origem', models.CharField(choices=[('celery', 'Celery Beat'), ('comando', 'Comando de Gerenciamento'), ('manual', 'Manual')], default='celery', max_length=20, verbose_name='Origem')),
+                ('host', models.CharField(blank=True, max_length=255, verbose_name='Host')),
+                ('iniciado_em', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Iniciado em')),
+                ('concluido_em', models.DateTimeField(blank=True, null=True, verbose_name='Concluído em')),
+                ('duracao', models.FloatField(blank=True, null=True, verbose_name='Duração (s)')),
+                ('linhas', models.BigIntegerField(default=0, verbose_name='Linhas Afetadas')),
+                ('resultado', models.JSONField(blank=True, default=dict, verbose_name='Resultado')),
+                ('erro', models.TextField(blank=True, verbose_name='Erro')),
+            ],
+            options={
+                'verbose_name': 'Execução de Tarefa Periódica',
+                'verbose_name_plural': 'Execuções de Tarefas Periódicas',
+                'ordering': ['-iniciado_em'],
+                'indexes': [models.Index(fields=['tarefa', 'iniciado_em'], name='mon_execucao_tarefa_idx'), models.Index(fields=['iniciado_em'], name='mon_execucao_inicio_idx')],
+            },
+        ),
+    ]
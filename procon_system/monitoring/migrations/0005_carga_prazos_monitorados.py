@@ -0,0 +1,23 @@
+from django.db import migrations
+
+
+def carregar_prazos(apps, schema_editor):
+    # O índice foi criado vazio e os painéis e a varredura leem só dele
+    from monitoring.prazos import FONTES, varredura_prazos_service
+
+    tabelas = set(schema_editor.connection.introspection.table_names())
+    tipos = [tipo for tipo, (modelo, _, _) in FONTES.items() if modelo._meta.db_table in tabelas]
+    varredura_prazos_service.reconstruir(tipos, apps=apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0004_execucao_tarefa'),
+        ('fiscalizacao', '0004_anexoauto_hash_conteudo'),
+        ('caixa_entrada', '0003_anexo_hash_conteudo'),
+    ]
+
+    operations = [
+        migrations.RunPython(carregar_prazos, migrations.RunPython.noop),
+    ]
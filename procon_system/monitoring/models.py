@@ -0,0 +1,172 @@
+"""
+Modelos do módulo de monitoramento
+"""
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class PrazoMonitorado(models.Model):
+    """
+    Índice de prazos ativos de CIPs, processos e documentos da caixa de
+    entrada. Mantido pelos signals de monitoring e promovido de estado pela
+    varredura periódica (manage.py varrer_prazos).
+    """
+    TIPO_CHOICES = [
+        ('cip', 'CIP Automática'),
+        ('processo', 'Processo Administrativo'),
+        ('caixa_entrada', 'Documento da Caixa de Entrada'),
+    ]
+
+    ESTADO_CHOICES = [
+        ('em_dia', 'Em dia'),
+        ('proximo', 'Próximo do vencimento'),
+        ('vencido', 'Vencido'),
+        ('escalonado', 'Vencido - Escalonado'),
+    ]
+
+    tipo = models.CharField("Tipo", max_length=20, choices=TIPO_CHOICES)
+    objeto_id = models.CharField("ID do Objeto", max_length=64)
+    vencimento = models.DateTimeField("Vencimento")
+    estado = models.CharField("Estado", max_length=20, choices=ESTADO_CHOICES, default='em_dia')
+    descricao = models.CharField("Descrição", max_length=255, blank=True)
+    setor = models.CharField("Setor", max_length=100, blank=True)
+    prioridade = models.CharField("Prioridade", max_length=20, blank=True)
+    responsavel = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='prazos_monitorados', verbose_name="Responsável"
+    )
+    estado_alterado_em = models.DateTimeField("Estado Alterado em", null=True, blank=True)
+    atualizado_em = models.DateTimeField("Atualizado em", auto_now=True)
+
+    class Meta:
+        verbose_name = "Prazo Monitorado"
+        verbose_name_plural = "Prazos Monitorados"
+        ordering = ['vencimento']
+        constraints = [
+            models.UniqueConstraint(fields=['tipo', 'objeto_id'], name='mon_prazo_objeto_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['vencimento', 'estado'], name='mon_prazo_vencimento_idx'),
+            models.Index(fields=['tipo', 'vencimento'], name='mon_prazo_tipo_idx'),
+            models.Index(fields=['estado', 'vencimento'], name='mon_prazo_estado_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_tipo_display()} {self.objeto_id} - {self.vencimento:%d/%m/%Y %H:%M}"
+
+
+class CheckpointRetencao(models.Model):
+    """
+    Progresso de uma política de retenção (monitoring/retencao.py). Enquanto
+    a execução não termina, o corte, o último pk removido e o arquivo de
+    destino ficam gravados para que a próxima execução continue de onde parou.
+    """
+    STATUS_CHOICES = [
+        ('em_andamento', 'Em andamento'),
+        ('concluido', 'Concluído'),
+    ]
+
+    politica = models.CharField("Política", max_length=50, unique=True)
+    status = models.CharField("Status", max_length=20, choices=STATUS_CHOICES, default='em_andamento')
+    corte = models.DateTimeField("Corte")
+    ultimo_pk = models.CharField("Último PK Processado", max_length=64, blank=True)
+    arquivo = models.CharField("Arquivo de Destino", max_length=500, blank=True)
+
+    linhas = models.BigIntegerField("Linhas Arquivadas", default=0)
+    linhas_cascata = models.BigIntegerField("Linhas Removidas em Cascata", default=0)
+    bytes_liberados = models.BigIntegerField("Bytes Liberados (estimativa)", default=0)
+    bytes_arquivo = models.BigIntegerField("Bytes no Arquivo", default=0)
+    lotes = models.IntegerField("Lotes", default=0)
+    segundos = models.FloatField("Tempo de Execução (s)", default=0)
+
+    iniciado_em = models.DateTimeField("Iniciado em", default=timezone.now)
+    atualizado_em = models.DateTimeField("Atualizado em", auto_now=True)
+    concluido_em = models.DateTimeField("Concluído em", null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Checkpoint de Retenção"
+        verbose_name_plural = "Checkpoints de Retenção"
+        ordering = ['politica']
+
+    def __str__(self):
+        return f"{self.politica} - {self.get_status_display()} ({self.linhas} linhas)"
+
+
+class Feriado(models.Model):
+    """
+    Feriado estadual/municipal ou dia sem expediente do órgão, usado pelo
+    calendário de dias úteis (monitoring/calendario.py). Os feriados
+    nacionais são calculados pelo próprio calendário e não precisam ser
+    cadastrados.
+    """
+    ABRANGENCIA_CHOICES = [
+        ('nacional', 'Nacional'),
+        ('estadual', 'Estadual'),
+        ('municipal', 'Municipal'),
+        ('fechamento', 'Fechamento do Órgão / Ponto Facultativo'),
+    ]
+
+    data = models.DateField("Data")
+    nome = models.CharField("Nome", max_length=150)
+    abrangencia = models.CharField("Abrangência", max_length=20, choices=ABRANGENCIA_CHOICES, default='municipal')
+    uf = models.CharField("UF", max_length=2, blank=True, help_text="Obrigatória para feriados estaduais e municipais")
+    municipio = models.CharField("Município", max_length=100, blank=True)
+    recorrente = models.BooleanField("Repete Todo Ano", default=False, help_text="Mesmo dia e mês em todos os anos")
+    ativo = models.BooleanField("Ativo", default=True)
+
+    criado_em = models.DateTimeField("Criado em", auto_now_add=True)
+    atualizado_em = models.DateTimeField("Atualizado em", auto_now=True)
+
+    class Meta:
+        verbose_name = "Feriado"
+        verbose_name_plural = "Feriados"
+        ordering = ['data']
+        indexes = [
+            models.Index(fields=['data']),
+        ]
+
+    def __str__(self):
+        return f"{self.data:%d/%m/%Y} - {self.nome} ({self.get_abrangencia_display()})"
+
+
+class ExecucaoTarefa(models.Model):
+    """
+    Histórico das tarefas periódicas (monitoring/agendador.py), executadas
+    pelo beat do Celery ou pelo comando executar_tarefas_periodicas
+    """
+    STATUS_CHOICES = [
+        ('executando', 'Executando'),
+        ('sucesso', 'Sucesso'),
+        ('erro', 'Erro'),
+    ]
+
+    ORIGEM_CHOICES = [
+        ('celery', 'Celery Beat'),
+        ('comando', 'Comando de Gerenciamento'),
+        ('manual', 'Manual'),
+    ]
+
+    tarefa = models.CharField("Tarefa", max_length=100)
+    status = models.CharField("Status", max_length=20, choices=STATUS_CHOICES, default='executando')
+    origem = models.CharField("Origem", max_length=20, choices=ORIGEM_CHOICES, default='celery')
+    host = models.CharField("Host", max_length=255, blank=True)
+    iniciado_em = models.DateTimeField("Iniciado em", default=timezone.now)
+    concluido_em = models.DateTimeField("Concluído em", null=True, blank=True)
+    duracao = models.FloatField("Duração (s)", null=True, blank=True)
+    linhas = models.BigIntegerField("Linhas Afetadas", default=0)
+    resultado = models.JSONField("Resultado", default=dict, blank=True)
+    erro = models.TextField("Erro", blank=True)
+
+    class Meta:
+        verbose_name = "Execução de Tarefa Periódica"
+        verbose_name_plural = "Execuções de Tarefas Periódicas"
+        ordering = ['-iniciado_em']
+        indexes = [
+            models.Index(fields=['tarefa', 'iniciado_em'], name='mon_execucao_tarefa_idx'),
+            models.Index(fields=['iniciado_em'], name='mon_execucao_inicio_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.tarefa} - {self.get_status_display()} ({self.iniciado_em:%d/%m/%Y %H:%M})"
@@ -0,0 +1,334 @@
+"""
+Varredura unificada de prazos (CIPs, processos e caixa de entrada)
+Sistema Procon - Monitoramento
+
+Os signals mantêm a tabela PrazoMonitorado com o prazo ativo de cada objeto.
+A varredura periódica encontra, com uma única consulta por faixa de
+vencimento, os prazos que ficaram próximos, venceram ou devem ser escalonados,
+promove o estado em lote e gera as notificações em bulk. Os painéis de SLA
+leem os contadores direto do índice.
+"""
+
+from collections import defaultdict
+from datetime import datetime, time as dt_time, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from caixa_entrada.models import CaixaEntrada
+from cip_automatica.models import CIPAutomatica
+from fiscalizacao.models import Processo
+from logging_config import logger_manager
+from .calendario import calendario_service
+from .models import PrazoMonitorado
+
+
+NIVEIS = {'em_dia': 0, 'proximo': 1, 'vencido': 2, 'escalonado': 3}
+
+STATUS_ATIVOS_CIP = ['ENVIADA', 'PRODUCAO_JURIDICA']
+STATUS_ATIVOS_CAIXA = ['NAO_LIDO', 'LIDO', 'EM_ANALISE']
+PRAZO_POR_STATUS_PROCESSO = {
+    'aguardando_defesa': 'prazo_defesa',
+    'aguardando_recurso': 'prazo_recurso',
+}
+
+NOTIFICACOES = {
+    'proximo': ('prazo_proximo', 'Prazo próximo do vencimento', 'alta'),
+    'vencido': ('prazo_vencido', 'Prazo vencido', 'alta'),
+    'escalonado': ('prazo_escalonado', 'Prazo vencido - escalonado', 'urgente'),
+}
+
+
+def fim_do_dia(data) -> datetime:
+    """Prazos em data vencem ao final do dia (início do dia seguinte)"""
+    momento = datetime.combine(data + timedelta(days=1), dt_time.min)
+    return timezone.make_aware(momento) if settings.USE_TZ else momento
+
+
+# ---------- extração do prazo ativo de cada tipo ----------
+
+def prazo_cip(cip: CIPAutomatica) -> Optional[Dict[str, Any]]:
+    if cip.status not in STATUS_ATIVOS_CIP or not cip.prazo_resposta_empresa:
+        return None
+    return {
+        'vencimento': cip.prazo_resposta_empresa,
+        'descricao': f'CIP {cip.numero_cip} - {cip.empresa_razao_social}'[:255],
+        'setor': '',
+        'prioridade': (cip.prioridade or '').lower(),
+        'responsavel_id': cip.responsavel_producao_id,
+    }
+
+
+def prazo_processo(processo: Processo) -> Optional[Dict[str, Any]]:
+    campo = PRAZO_POR_STATUS_PROCESSO.get(processo.status)
+    prazo = getattr(processo, campo) if campo else None
+    if not prazo:
+        return None
+    return {
+        'vencimento': fim_do_dia(prazo),
+        'descricao': f'Processo {processo.numero_processo} - {processo.autuado}'[:255],
+        'setor': '',
+        'prioridade': processo.prioridade or '',
+        'responsavel_id': None,
+    }
+
+
+def prazo_caixa_entrada(documento: CaixaEntrada) -> Optional[Dict[str, Any]]:
+    if documento.status not in STATUS_ATIVOS_CAIXA or not documento.prazo_resposta:
+        return None
+    return {
+        'vencimento': documento.prazo_resposta,
+        'descricao': f'{documento.numero_protocolo} - {documento.assunto}'[:255],
+        'setor': documento.setor_destino or '',
+        'prioridade': (documento.prioridade or '').lower(),
+        'responsavel_id': documento.responsavel_atual_id,
+    }
+
+
+# tipo -> (modelo, extrator, filtro dos objetos com prazo ativo)
+FONTES = {
+    'cip': (CIPAutomatica, prazo_cip, Q(status__in=STATUS_ATIVOS_CIP)),
+    'processo': (Processo, prazo_processo, Q(status__in=list(PRAZO_POR_STATUS_PROCESSO))),
+    'caixa_entrada': (CaixaEntrada, prazo_caixa_entrada, Q(status__in=STATUS_ATIVOS_CAIXA)),
+}
+
+
+class VarreduraPrazosService:
+    """Manutenção do índice de prazos, varredura com escalonamento e leitura para painéis"""
+
+    TAMANHO_LOTE = 1000
+
+    def __init__(self):
+        self.logger = logger_manager.get_logger('prazos')
+        self.janela_alerta = timedelta(hours=getattr(settings, 'PRAZOS_JANELA_ALERTA_HORAS', 72))
+        self.dias_escalonamento = getattr(settings, 'PRAZOS_DIAS_ESCALONAMENTO', 5)
+
+    # ---------- sincronização ----------
+
+    def tipo_do_modelo(self, modelo) -> Optional[str]:
+        for tipo, (modelo_fonte, _, _) in FONTES.items():
+            if modelo_fonte is modelo:
+                return tipo
+        return None
+
+    def sincronizar(self, tipo: str, objeto) -> Optional[PrazoMonitorado]:
+        """Grava o prazo ativo do objeto; um novo vencimento volta o estado para em dia"""
+        dados = FONTES[tipo][1](objeto)
+        if dados is None:
+            self.remover(tipo, objeto.pk)
+            return None
+
+        entrada = PrazoMonitorado.objects.filter(tipo=tipo, objeto_id=str(objeto.pk)).first()
+        if entrada is None:
+            entrada = PrazoMonitorado(tipo=tipo, objeto_id=str(objeto.pk))
+        if entrada.vencimento != dados['vencimento']:
+            entrada.estado = 'em_dia'
+            entrada.estado_alterado_em = None
+        for campo, valor in dados.items():
+            setattr(entrada, campo, valor)
+        entrada.save()
+        return entrada
+
+    def remover(self, tipo: str, objeto_id) -> None:
+        PrazoMonitorado.objects.filter(tipo=tipo, objeto_id=str(objeto_id)).delete()
+
+    def reconstruir(self, tipos: Optional[Iterable[str]] = None, ids: Optional[Iterable] = None,
+                    apps=None) -> Dict[str, int]:
+        """
+        Reconcilia o índice com os objetos com prazo ativo: grava as entradas,
+        remove as que não têm mais prazo e preserva o estado das que mantiveram
+        o vencimento (a varredura não notifica de novo). Com ids, só esses
+        objetos: é a sincronização das escritas em lote que não disparam os
+        signals (bulk_create, bulk_update, update()). Com apps, usa os modelos
+        históricos (migrations).
+        """
+        indice = apps.get_model('monitoring', 'PrazoMonitorado') if apps else PrazoMonitorado
+        chaves = None if ids is None else sorted({str(objeto_id) for objeto_id in ids})
+        totais = {}
+        for tipo in list(FONTES if tipos is None else tipos):
+            modelo, extrair, filtro = FONTES[tipo]
+            if apps:
+                try:
+                    modelo = apps.get_model(modelo._meta.label)
+                except LookupError:
+                    pass  # app sem migrations (tabela criada pelo syncdb): modelo atual
+            objetos = modelo.objects.filter(filtro)
+            entradas = indice.objects.filter(tipo=tipo)
+            if chaves is not None:
+                objetos = objetos.filter(pk__in=chaves)
+                entradas = entradas.filter(objeto_id__in=chaves)
+
+            with transaction.atomic():
+                ativos, lote = set(), []
+                for objeto in objetos.order_by('pk').iterator(chunk_size=self.TAMANHO_LOTE):
+                    dados = extrair(objeto)
+                    if dados is None:
+                        continue
+                    lote.append((str(objeto.pk), dados))
+                    if len(lote) >= self.TAMANHO_LOTE:
+                        ativos.update(self._gravar(indice, tipo, lote))
+                        lote = []
+                if lote:
+                    ativos.update(self._gravar(indice, tipo, lote))
+
+                obsoletas = [chave for chave in entradas.values_list('objeto_id', flat=True) if chave not in ativos]
+                for inicio in range(0, len(obsoletas), self.TAMANHO_LOTE):
+                    entradas.filter(objeto_id__in=obsoletas[inicio:inicio + self.TAMANHO_LOTE]).delete()
+            totais[tipo] = len(ativos)
+        return totais
+
+    def _gravar(self, indice, tipo: str, lote: List[tuple]) -> List[str]:
+        """
+        Grava as entradas do lote: cria as novas, atualiza só as que mudaram e
+        mantém o estado quando o vencimento não mudou
+        """
+        chaves = [chave for chave, _ in lote]
+        existentes = {e.objeto_id: e for e in indice.objects.filter(tipo=tipo, objeto_id__in=chaves)}
+        novas, alteradas, campos = [], [], set()
+        agora = timezone.now()
+        for chave, dados in lote:
+            anterior = existentes.get(chave)
+            if anterior is None:
+                novas.append(indice(tipo=tipo, objeto_id=chave, estado='em_dia', estado_alterado_em=None, **dados))
+                continue
+            valores = dict(dados)
+            if anterior.vencimento != dados['vencimento']:
+                valores.update(estado='em_dia', estado_alterado_em=None)
+            mudancas = {campo: valor for campo, valor in valores.items() if getattr(anterior, campo) != valor}
+            if mudancas:
+                mudancas['atualizado_em'] = agora  # bulk_update não aplica auto_now
+                for campo, valor in mudancas.items():
+                    setattr(anterior, campo, valor)
+                alteradas.append(anterior)
+                campos.update(mudancas)
+        if novas:
+            indice.objects.bulk_create(novas)
+        if alteradas:
+            indice.objects.bulk_update(alteradas, sorted(campos))
+        return chaves
+
+    # ---------- varredura ----------
+
+    def estado_alvo(self, vencimento: datetime, agora: datetime) -> str:
+        # Escalona após PRAZOS_DIAS_ESCALONAMENTO dias úteis de atraso
+        if vencimento <= calendario_service.adicionar_dias_uteis(agora, -self.dias_escalonamento):
+            return 'escalonado'
+        if vencimento <= agora:
+            return 'vencido'
+        if vencimento <= agora + self.janela_alerta:
+            return 'proximo'
+        return 'em_dia'
+
+    def varrer(self, agora: Optional[datetime] = None, notificar: bool = True) -> Dict[str, int]:
+        """
+        Promove os prazos que mudaram de faixa desde a última execução.
+        Uma consulta de intervalo sobre o vencimento seleciona os candidatos;
+        cada novo estado é gravado com um UPDATE e as notificações em bulk.
+        """
+        agora = agora or timezone.now()
+        candidatos = PrazoMonitorado.objects.filter(
+            vencimento__lte=agora + self.janela_alerta,
+        ).exclude(estado='escalonado').values_list(
+            'id', 'estado', 'vencimento', 'tipo', 'objeto_id', 'descricao', 'responsavel_id'
+        )
+
+        promovidos = defaultdict(list)
+        for linha in candidatos.iterator(chunk_size=self.TAMANHO_LOTE):
+            novo = self.estado_alvo(linha[2], agora)
+            if NIVEIS[novo] > NIVEIS[linha[1]]:
+                promovidos[novo].append(linha)
+
+        for estado, linhas in promovidos.items():
+            ids = [linha[0] for linha in linhas]
+            for inicio in range(0, len(ids), self.TAMANHO_LOTE):
+                PrazoMonitorado.objects.filter(id__in=ids[inicio:inicio + self.TAMANHO_LOTE]).update(
+                    estado=estado, estado_alterado_em=agora
+                )
+
+        notificacoes = self.notificar(promovidos, agora) if notificar and promovidos else 0
+        resultado = {estado: len(promovidos.get(estado, [])) for estado in ('proximo', 'vencido', 'escalonado')}
+        resultado['notificacoes'] = notificacoes
+
+        self.logger.log_operation('varredura_prazos', resultado)
+        return resultado
+
+    def destinatarios_escalonamento(self) -> List[int]:
+        User = get_user_model()
+        usernames = getattr(settings, 'PRAZOS_ESCALONAMENTO_USUARIOS', [])
+        usuarios = User.objects.filter(is_active=True)
+        usuarios = usuarios.filter(username__in=usernames) if usernames else usuarios.filter(is_superuser=True)
+        return list(usuarios.values_list('id', flat=True))
+
+    def notificar(self, promovidos: Dict[str, List[tuple]], agora: datetime) -> int:
+        """Cria as notificações de todos os prazos promovidos em um bulk_create"""
+        from notificacoes.models import Notificacao, TipoNotificacao
+
+        escalonamento = self.destinatarios_escalonamento() if promovidos.get('escalonado') else []
+        notificacoes = []
+        for estado, linhas in promovidos.items():
+            codigo, titulo, prioridade = NOTIFICACOES[estado]
+            tipo_notificacao, _ = TipoNotificacao.objects.get_or_create(
+                codigo=codigo, defaults={'nome': titulo}
+            )
+            for _, _, vencimento, tipo, objeto_id, descricao, responsavel_id in linhas:
+                destinatarios = {responsavel_id} if responsavel_id else set()
+                if estado == 'escalonado':
+                    destinatarios.update(escalonamento)
+                for destinatario_id in destinatarios:
+                    notificacoes.append(Notificacao(
+                        tipo=tipo_notificacao,
+                        destinatario_id=destinatario_id,
+                        titulo=titulo,
+                        mensagem=f'{descricao} - vencimento em {timezone.localtime(vencimento):%d/%m/%Y %H:%M}',
+                        prioridade=prioridade,
+                        dados_extras={
+                            'tipo_entidade': tipo,
+                            'objeto_id': objeto_id,
+                            'vencimento': vencimento.isoformat(),
+                        },
+                        agendada_para=agora,
+                    ))
+        Notificacao.objects.bulk_create(notificacoes, batch_size=self.TAMANHO_LOTE)
+        return len(notificacoes)
+
+    # ---------- leitura para painéis ----------
+
+    def resumo(self, tipo: Optional[str] = None, agora: Optional[datetime] = None) -> Dict[str, int]:
+        """Contadores por faixa de vencimento em uma única agregação sobre o índice"""
+        agora = agora or timezone.now()
+        queryset = PrazoMonitorado.objects.all()
+        if tipo:
+            queryset = queryset.filter(tipo=tipo)
+        return queryset.aggregate(
+            total=Count('id'),
+            vencidos=Count('id', filter=Q(vencimento__lte=agora)),
+            criticos=Count('id', filter=Q(vencimento__gt=agora, vencimento__lte=agora + timedelta(days=1))),
+            proximos=Count('id', filter=Q(
+                vencimento__gt=agora + timedelta(days=1), vencimento__lte=agora + timedelta(days=3)
+            )),
+            proximas_4h=Count('id', filter=Q(vencimento__lte=agora + timedelta(hours=4))),
+            escalonados=Count('id', filter=Q(estado='escalonado')),
+        )
+
+    def contar_ate(self, tipo: str, limite: datetime) -> int:
+        """Prazos ativos do tipo que vencem até o limite (inclui os já vencidos)"""
+        return PrazoMonitorado.objects.filter(tipo=tipo, vencimento__lte=limite).count()
+
+    def vencidos_por_setor(self, tipo: str, agora: Optional[datetime] = None) -> Dict[str, int]:
+        agora = agora or timezone.now()
+        return dict(
+            PrazoMonitorado.objects.filter(tipo=tipo, vencimento__lte=agora).exclude(setor='')
+            .order_by().values('setor').annotate(total=Count('id')).values_list('setor', 'total')
+        )
+
+    def vencidos(self, tipo: str, agora: Optional[datetime] = None):
+        """Entradas vencidas de um tipo, da mais antiga para a mais recente"""
+        agora = agora or timezone.now()
+        return PrazoMonitorado.objects.filter(tipo=tipo, vencimento__lte=agora).order_by('vencimento')
+
+
+varredura_prazos_service = VarreduraPrazosService()
@@ -0,0 +1,286 @@
+"""
+Retenção de dados: arquivamento e expurgo em lotes
+Sistema Procon - Monitoramento
+
+Cada política define o modelo, o campo de data, quantos dias manter e o
+destino das linhas antigas: arquivo JSONL comprimido (gzip), tabela de arquivo
+no próprio banco ou nenhum (só expurgo). As linhas anteriores ao corte são
+lidas em ordem de pk, em lotes pequenos; cada lote é gravado no destino e
+removido em uma transação curta, com pausa entre lotes para não disputar o
+banco com o sistema. O CheckpointRetencao guarda o último pk de cada lote na
+mesma transação da exclusão, então uma execução interrompida (ou limitada por
+max_lotes) continua de onde parou com o mesmo corte e o mesmo arquivo.
+"""
+
+import gzip
+import json
+import logging
+import os
+import time
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+
+from django.apps import apps
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import CheckpointRetencao
+
+
+logger = logging.getLogger(__name__)
+
+DESTINOS = ('arquivo', 'tabela', None)
+
+# Políticas padrão; RETENCAO_POLITICAS no settings sobrescreve chaves de cada
+# política ou acrescenta novas
+POLITICAS_PADRAO = {
+    'notificacoes': {
+        'modelo': 'notificacoes.Notificacao',
+        'campo_data': 'criado_em',
+        'dias': 90,
+        'filtro': {'status__in': ['enviada', 'lida', 'falhada']},
+        'destino': 'arquivo',
+    },
+    'acessos_recurso': {
+        'modelo': 'auditoria.AcessoRecurso',
+        'campo_data': 'timestamp',
+        'dias': 90,
+        'destino': 'arquivo',
+    },
+    'logs_sistema': {
+        'modelo': 'auditoria.LogSistema',
+        'campo_data': 'timestamp',
+        'dias': 180,
+        'destino': 'arquivo',
+    },
+    'logs_seguranca': {
+        'modelo': 'auditoria.LogSeguranca',
+        'campo_data': 'timestamp',
+        'dias': 365,
+        'destino': 'arquivo',
+    },
+    'historico_caixa_entrada': {
+        'modelo': 'caixa_entrada.HistoricoCaixaEntrada',
+        'campo_data': 'data_acao',
+        'dias': 365,
+        'destino': 'tabela',
+    },
+    'execucoes_tarefas': {
+        'modelo': 'monitoring.ExecucaoTarefa',
+        'campo_data': 'iniciado_em',
+        'dias': 90,
+        'destino': None,
+    },
+}
+
+
+class RetencaoService:
+    """Executa as políticas de retenção em lotes retomáveis"""
+
+    def __init__(self):
+        self.diretorio = getattr(settings, 'RETENCAO_DIRETORIO', os.path.join(settings.BASE_DIR, 'arquivamento'))
+        self.tamanho_lote = getattr(settings, 'RETENCAO_TAMANHO_LOTE', 1000)
+        self.pausa = getattr(settings, 'RETENCAO_PAUSA_SEGUNDOS', 0.05)
+
+    def politicas(self) -> Dict[str, Dict[str, Any]]:
+        politicas = {nome: dict(politica) for nome, politica in POLITICAS_PADRAO.items()}
+        for nome, ajustes in getattr(settings, 'RETENCAO_POLITICAS', {}).items():
+            politicas.setdefault(nome, {}).update(ajustes)
+        return politicas
+
+    def politica(self, nome: str) -> Dict[str, Any]:
+        politicas = self.politicas()
+        if nome not in politicas:
+            raise ValueError(f'Política de retenção desconhecida: {nome}')
+        politica = {'filtro': {}, 'destino': 'arquivo', **politicas[nome]}
+        if politica['destino'] not in DESTINOS:
+            raise ValueError(f"Destino inválido na política {nome}: {politica['destino']}")
+        return politica
+
+    # ---------- destinos ----------
+
+    def _caminho_arquivo(self, nome: str, inicio) -> str:
+        return os.path.join(self.diretorio, nome, f'{nome}-{inicio:%Y%m%d%H%M%S}.jsonl.gz')
+
+    def _gravar_arquivo(self, caminho: str, linhas: List[bytes]) -> None:
+        """Acrescenta o lote como um novo membro gzip e força a gravação em disco"""
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        with open(caminho, 'ab') as bruto:
+            with gzip.GzipFile(fileobj=bruto, mode='ab') as destino:
+                for linha in linhas:
+                    destino.write(linha)
+            bruto.flush()
+            os.fsync(bruto.fileno())
+
+    def tabela_arquivo(self, modelo, politica: Dict[str, Any]) -> str:
+        return politica.get('tabela_arquivo') or f'arquivo_{modelo._meta.db_table}'
+
+    def _preparar_tabela(self, modelo, tabela: str) -> List[str]:
+        """
+        Cria a tabela de arquivo com as colunas da original ou acrescenta as
+        colunas que a original ganhou desde a criação (colunas removidas da
+        original continuam no arquivo, com NULL nas linhas novas)
+
+        Returns:
+            list: colunas da original, na ordem da tabela
+        """
+        qn = connection.ops.quote_name
+        origem = modelo._meta.db_table
+        campos = {campo.column: campo for campo in modelo._meta.concrete_fields}
+        with connection.cursor() as cursor:
+            cursor.execute(f'CREATE TABLE IF NOT EXISTS {qn(tabela)} AS SELECT * FROM {qn(origem)} WHERE 1 = 0')
+            introspeccao = connection.introspection
+            colunas = [coluna.name for coluna in introspeccao.get_table_description(cursor, origem)]
+            arquivadas = {coluna.name for coluna in introspeccao.get_table_description(cursor, tabela)}
+            for coluna in colunas:
+                if coluna not in arquivadas:
+                    campo = campos.get(coluna)
+                    tipo = (campo.db_type(connection) if campo else None) or 'text'
+                    cursor.execute(f'ALTER TABLE {qn(tabela)} ADD COLUMN {qn(coluna)} {tipo}')
+                    logger.info(f'Tabela de arquivo {tabela}: coluna {coluna} acrescentada')
+        return colunas
+
+    def _copiar_para_tabela(self, modelo, tabela: str, colunas: List[str], pks: List) -> None:
+        """Copia as linhas para a tabela de arquivo, nomeando as colunas"""
+        qn = connection.ops.quote_name
+        lista = ', '.join(qn(coluna) for coluna in colunas)
+        marcadores = ', '.join(['%s'] * len(pks))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {qn(tabela)} ({lista}) SELECT {lista} FROM {qn(modelo._meta.db_table)} '
+                f'WHERE {qn(modelo._meta.pk.column)} IN ({marcadores})',
+                [modelo._meta.pk.get_db_prep_value(pk, connection) for pk in pks],
+            )
+
+    # ---------- execução ----------
+
+    def _checkpoint(self, nome: str, politica: Dict[str, Any], dias: Optional[int], agora) -> CheckpointRetencao:
+        checkpoint = CheckpointRetencao.objects.filter(politica=nome).first()
+        if checkpoint and checkpoint.status == 'em_andamento':
+            if dias is not None:
+                logger.info(f'Retenção {nome}: retomando com o corte original {checkpoint.corte:%d/%m/%Y}')
+            return checkpoint
+
+        dias = politica['dias'] if dias is None else dias
+        checkpoint, _ = CheckpointRetencao.objects.update_or_create(politica=nome, defaults={
+            'status': 'em_andamento',
+            'corte': agora - timedelta(days=dias),
+            'ultimo_pk': '',
+            'arquivo': self._caminho_arquivo(nome, agora) if politica['destino'] == 'arquivo' else '',
+            'linhas': 0, 'linhas_cascata': 0, 'bytes_liberados': 0, 'bytes_arquivo': 0,
+            'lotes': 0, 'segundos': 0,
+            'iniciado_em': agora, 'concluido_em': None,
+        })
+        return checkpoint
+
+    def executar(self, nome: str, dias: Optional[int] = None, tamanho_lote: Optional[int] = None,
+                 pausa: Optional[float] = None, max_lotes: Optional[int] = None, agora=None) -> Dict[str, Any]:
+        """
+        Arquiva e remove as linhas da política anteriores ao corte
+
+        Args:
+            nome: Nome da política
+            dias: Sobrescreve os dias de retenção (só ao iniciar uma nova execução)
+            tamanho_lote: Linhas por lote/transação
+            pausa: Segundos de espera entre lotes
+            max_lotes: Interrompe após N lotes; a próxima chamada continua do checkpoint
+
+        Returns:
+            dict: linhas, lotes, linhas/s, bytes liberados e situação do checkpoint
+        """
+        politica = self.politica(nome)
+        modelo = apps.get_model(politica['modelo'])
+        tamanho_lote = tamanho_lote or self.tamanho_lote
+        pausa = self.pausa if pausa is None else pausa
+        agora = agora or timezone.now()
+
+        checkpoint = self._checkpoint(nome, politica, dias, agora)
+        retomado = bool(checkpoint.ultimo_pk)
+        campo_pk = modelo._meta.pk
+        base = (
+            modelo._base_manager
+            .filter(**{f"{politica['campo_data']}__lt": checkpoint.corte}, **politica['filtro'])
+            .order_by('pk')
+        )
+        tabela = self.tabela_arquivo(modelo, politica) if politica['destino'] == 'tabela' else None
+        colunas = None
+
+        execucao = {'linhas': 0, 'linhas_cascata': 0, 'bytes_liberados': 0, 'lotes': 0}
+        inicio = time.monotonic()
+        while max_lotes is None or execucao['lotes'] < max_lotes:
+            pendentes = base
+            if checkpoint.ultimo_pk:
+                pendentes = pendentes.filter(pk__gt=campo_pk.to_python(checkpoint.ultimo_pk))
+            pks = list(pendentes.values_list('pk', flat=True)[:tamanho_lote])
+            if not pks:
+                checkpoint.status = 'concluido'
+                checkpoint.concluido_em = timezone.now()
+                break
+            if execucao['lotes'] and pausa:
+                time.sleep(pausa)
+
+            # Tamanho serializado das linhas: conteúdo do arquivo e estimativa do espaço liberado
+            linhas = [
+                (json.dumps(linha, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n').encode('utf-8')
+                for linha in modelo._base_manager.filter(pk__in=pks).order_by('pk').values()
+            ]
+            if politica['destino'] == 'arquivo':
+                self._gravar_arquivo(checkpoint.arquivo, linhas)
+
+            with transaction.atomic():
+                if tabela:
+                    colunas = colunas or self._preparar_tabela(modelo, tabela)
+                    self._copiar_para_tabela(modelo, tabela, colunas, pks)
+                removidos, por_modelo = modelo._base_manager.filter(pk__in=pks).delete()
+                cascata = removidos - por_modelo.get(modelo._meta.label, 0)
+                tamanho = sum(len(linha) for linha in linhas)
+
+                execucao['linhas'] += len(pks)
+                execucao['linhas_cascata'] += cascata
+                execucao['bytes_liberados'] += tamanho
+                execucao['lotes'] += 1
+                checkpoint.ultimo_pk = str(pks[-1])
+                checkpoint.linhas += len(pks)
+                checkpoint.linhas_cascata += cascata
+                checkpoint.bytes_liberados += tamanho
+                checkpoint.lotes += 1
+                checkpoint.save()
+
+        segundos = time.monotonic() - inicio
+        checkpoint.segundos += segundos
+        if checkpoint.arquivo and os.path.exists(checkpoint.arquivo):
+            checkpoint.bytes_arquivo = os.path.getsize(checkpoint.arquivo)
+        checkpoint.save()
+
+        relatorio = {
+            'politica': nome,
+            **execucao,
+            'segundos': segundos,
+            'linhas_por_segundo': execucao['linhas'] / segundos if segundos else 0.0,
+            'concluido': checkpoint.status == 'concluido',
+            'retomado': retomado,
+            'corte': checkpoint.corte,
+            'destino': checkpoint.arquivo or tabela,
+            'total_linhas': checkpoint.linhas,
+            'bytes_arquivo': checkpoint.bytes_arquivo,
+        }
+        logger.info(
+            f"Retenção {nome}: {execucao['linhas']} linhas em {execucao['lotes']} lote(s) "
+            f"({relatorio['linhas_por_segundo']:.0f} linhas/s, {execucao['bytes_liberados']} bytes)"
+            f"{'' if relatorio['concluido'] else ' - interrompida, será retomada'}"
+        )
+        return relatorio
+
+    def executar_todas(self, politicas: Optional[List[str]] = None, **kwargs) -> Dict[str, Dict[str, Any]]:
+        """Executa as políticas indicadas (padrão: todas as configuradas)"""
+        nomes = list(self.politicas()) if politicas is None else politicas
+        return {nome: self.executar(nome, **kwargs) for nome in nomes}
+
+    def situacao(self) -> List[CheckpointRetencao]:
+        return list(CheckpointRetencao.objects.all())
+
+
+# Instância global do serviço
+retencao_service = RetencaoService()
@@ -0,0 +1,40 @@
+"""
+Signals do módulo de monitoramento
+Mantêm o índice PrazoMonitorado sincronizado com CIPs, processos e caixa de entrada
+e invalidam o calendário de dias úteis quando um feriado muda
+"""
+
+from django.db.models.signals import post_delete, post_save
+
+from .calendario import calendario_service
+from .models import Feriado
+from .prazos import FONTES, varredura_prazos_service
+
+
+def atualizar_prazo(sender, instance, raw=False, **kwargs):
+    """Grava ou remove o prazo ativo do objeto salvo"""
+    if raw:
+        return
+    try:
+        varredura_prazos_service.sincronizar(varredura_prazos_service.tipo_do_modelo(sender), instance)
+    except Exception as e:
+        varredura_prazos_service.logger.logger.error(
+            f'Erro ao indexar prazo de {sender.__name__} {instance.pk}: {str(e)}'
+        )
+
+
+def remover_prazo(sender, instance, **kwargs):
+    varredura_prazos_service.remover(varredura_prazos_service.tipo_do_modelo(sender), instance.pk)
+
+
+for modelo_prazo, _, _ in FONTES.values():
+    post_save.connect(atualizar_prazo, sender=modelo_prazo, dispatch_uid=f'prazo_{modelo_prazo.__name__}')
+    post_delete.connect(remover_prazo, sender=modelo_prazo, dispatch_uid=f'prazo_del_{modelo_prazo.__name__}')
+
+
+def invalidar_calendario(sender, **kwargs):
+    calendario_service.invalidar()
+
+
+post_save.connect(invalidar_calendario, sender=Feriado, dispatch_uid='calendario_feriado_save')
+post_delete.connect(invalidar_calendario, sender=Feriado, dispatch_uid='calendario_feriado_delete')
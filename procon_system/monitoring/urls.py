@@ -15,6 +15,7 @@ urlpatterns = [
     # APIs AJAX
     path('api/prazos/', views.api_dashboard_prazos, name='api_prazos'),
     path('api/alerts-realtime/', views.api_alerts_realtime, name='api_alerts_realtime'),
+    path('api/endpoints/', views.api_endpoints, name='api_endpoints'),
     
     # Verificações automáticas
     path('sla/checks/', views.run_sla_checks, name='sla_checks'),
@@ -9,13 +9,14 @@ from django.contrib.auth.decorators import login_required, permission_required
 from django.db.models import Count, Q, Avg
 from django.utils import timezone
 from datetime import timedelta
-from collections import defaultdict
 
 from caixa_entrada.models import CaixaEntrada
 from protocolo_tramitacao.models import ProtocoloDocumento, TramitacaoDocumento
 from logging_config import logger_manager, LoggedOperation, log_execution_time, SmartAlerts
 from atendimento.models import Atendimento
 from portal_cidadao.models import ReclamacaoDenuncia
+from .middleware import estatisticas_endpoints
+from .prazos import varredura_prazos_service
 
 
 def get_critical_deadlines_data():
@@ -62,32 +63,30 @@ def dashboard_prazos_criticos(request):
     }):
         deadlines_data = get_critical_deadlines_data()
         
-        # Estatísticas gerais
+        # Estatísticas gerais (índice de prazos)
+        resumo = varredura_prazos_service.resumo('caixa_entrada')
         stats = {
-            'total_criticos': deadlines_data['critical'].count(),
-            'total_vencidos': deadlines_data['overdue'].count(),
-            'total_proximos': deadlines_data['upcoming'].count(),
+            'total_criticos': resumo['criticos'],
+            'total_vencidos': resumo['vencidos'],
+            'total_proximos': resumo['proximos'],
             'total_documentos': CaixaEntrada.objects.count(),
             'taxa_atraso': 0,
         }
         
-        if deadlines_data['overdue'].count() > 0:
+        if resumo['vencidos'] > 0:
             stats['taxa_atraso'] = (
-                deadlines_data['overdue'].count() / 
-                (deadlines_data['critical'].count() + deadlines_data['overdue'].count() + deadlines_data['upcoming'].count()) 
+                resumo['vencidos'] / 
+                (resumo['criticos'] + resumo['vencidos'] + resumo['proximos']) 
                 * 100
             )
         
         # Alertas por setor
-        alerts_by_sector = defaultdict(int)
-        for documento in deadlines_data['overdue']:
-            if documento.setor_destino:
-                alerts_by_sector[documento.setor_destino] += 1
+        alerts_by_sector = varredura_prazos_service.vencidos_por_setor('caixa_entrada')
                 
         context = {
             'deadlines_data': deadlines_data,
             'stats': stats,
-            'alerts_by_sector': dict(alerts_by_sector),
+            'alerts_by_sector': alerts_by_sector,
             'current_time': timezone.now(),
         }
         
@@ -103,6 +102,7 @@ def api_dashboard_prazos(request):
     
     try:
         deadlines_data = get_critical_deadlines_data()
+        resumo = varredura_prazos_service.resumo('caixa_entrada')
         
         data = {
             'critical_deadlines': [
@@ -135,9 +135,9 @@ def api_dashboard_prazos(request):
                 for d in deadlines_data['overdue'][:50]
             ],
             'stats': {
-                'total_criticos': deadlines_data['critical'].count(),
-                'total_vencidos': deadlines_data['overdue'].count(),
-                'total_proximos': deadlines_data['upcoming'].count(),
+                'total_criticos': resumo['criticos'],
+                'total_vencidos': resumo['vencidos'],
+                'total_proximos': resumo['proximos'],
             }
         }
         
@@ -233,7 +233,7 @@ def dashboard_performance(request):
                 'severity': 'medium',
             })
         
-        overdue_count = deadlines_data['overdue'].count()
+        overdue_count = varredura_prazos_service.resumo('caixa_entrada')['vencidos']
         if overdue_count > 10:
             active_alerts.append({
                 'type': 'critical',
@@ -246,11 +246,33 @@ def dashboard_performance(request):
             'workload_data': workload_data,
             'active_alerts': active_alerts,
             'period_days': 30,
+            'endpoints': estatisticas_endpoints(horas=1),
         }
         
         return render(request, 'monitoring/dashboard_performance.html', context)
 
 
+@login_required
+@permission_required('caixa_entrada.view_caixaentrada', raise_exception=True)
+def api_endpoints(request):
+    """API com consultas SQL, tempo de banco, cache e latência por endpoint (AJAX)"""
+    
+    if request.method != 'GET':
+        return JsonResponse({'error': 'Método não permitido'}, status=405)
+    
+    try:
+        horas = min(max(int(request.GET.get('horas', 1)), 1), 24)
+        limite = min(max(int(request.GET.get('limite', 20)), 1), 200)
+    except ValueError:
+        return JsonResponse({'error': 'Parâmetros inválidos'}, status=400)
+    
+    return JsonResponse({
+        'horas': horas,
+        'endpoints': estatisticas_endpoints(horas=horas, limite=limite),
+        'timestamp': timezone.now().isoformat(),
+    })
+
+
 @login_required
 def api_alerts_realtime(request):
     """API para alertas em tempo real"""
@@ -262,11 +284,10 @@ def api_alerts_realtime(request):
         now = timezone.now()
         alerts = []
         
-        # Verificar documentos críticos
-        critical_docs = CaixaEntrada.objects.filter(
-            prazo_resposta__lte=now + timedelta(hours=4),  # Próximas 4 horas
-            status__in=['NAO_LIDO', 'LIDO', 'EM_ANALISE']
-        ).count()
+        resumo = varredura_prazos_service.resumo('caixa_entrada', now)
+        
+        # Verificar documentos críticos (próximas 4 horas)
+        critical_docs = resumo['proximas_4h']
         
         if critical_docs > 0:
             alerts.append({
@@ -279,10 +300,7 @@ def api_alerts_realtime(request):
             })
         
         # Verificar documentos vencidos
-        overdue_docs = CaixaEntrada.objects.filter(
-            prazo_resposta__lt=now,
-            status__in=['NAO_LIDO', 'LIDO', 'EM_ANALISE']
-        ).count()
+        overdue_docs = resumo['vencidos']
         
         if overdue_docs > 0:
             alerts.append({
@@ -325,41 +343,31 @@ def api_alerts_realtime(request):
         return JsonResponse({'error': 'Erro interno do servidor'}, status=500)
 
 
-# Comando para executar verificações periódicas de SLA
-def run_sla_checks():
-    """Executa verificações automáticas de SLA e gera alertas inteligentes"""
+# Verificações periódicas de SLA
+def run_sla_checks(request=None):
+    """
+    Lê os contadores de SLA do índice de prazos e gera alertas inteligentes.
+    Somente leitura: a promoção de estados e as notificações são feitas pela
+    tarefa periódica varredura_prazos (monitoring/agendador.py).
+    """
+    
+    if request is not None and not request.user.is_staff:
+        return JsonResponse({'error': 'Acesso restrito à equipe'}, status=403)
     
     logger = logger_manager.get_logger('sla_monitor')
     smart_alerts = SmartAlerts()
     
-    with logger.LoggedOperation('sla_checks_execution'):
-        now = timezone.now()
-        
-        # Verificar taxa de erro por operação
-        error_metrics = logger.alert_counts
+    with LoggedOperation('sla_checks_execution'):
+        resumo = varredura_prazos_service.resumo()
         
-        # Verificar violações críticas de SLA
-        overdue_count = CaixaEntrada.objects.filter(
-            prazo_resposta__lt=now,
-            status__in=['NAO_LIDO', 'LIDO', 'EM_ANALISE']
-        ).count()
-        
-        if overdue_count > 20:  # Threshold crítico
-            smart_alerts.alert_critical_sla_breach('documentos_vencidos', overdue_count)
-            
-        # Verificar tempo médio de resposta por setor
-        for sector in CaixaEntrada.objects.values_list('setor_destino', flat=True).distinct():
-            avg_time = CaixaEntrada.objects.filter(
-                setor_destino=sector,
-                status='ARQUIVADO',
-                updated_at__gte=now - timedelta(days=7)
-            ).aggregate(avg=Avg('updated_at' - 'data_entrada'))['avg']
-            
-            if avg_time and avg_time.total_seconds() > 7 * 24 * 3600:  # Mais de 7 dias
-                logger.logger.warning(f'SLA lento detectado no setor {sector}')
+        if resumo['vencidos'] > 20:  # Threshold crítico
+            smart_alerts.alert_critical_sla_breach('prazos_vencidos', resumo['vencidos'])
         
         logger.log_operation('sla_checks_completed', {
-            'overdue_count': overdue_count,
-            'error_metrics': len(error_metrics),
+            'overdue_count': resumo['vencidos'],
+            'escalated_count': resumo['escalonados'],
             'checks_performed': True,
         })
+    
+    dados = {'resumo': resumo}
+    return JsonResponse(dados) if request is not None else dados
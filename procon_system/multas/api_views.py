@@ -225,16 +225,15 @@ class MultaViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['get'])
     def vencidas(self, request):
-        """Lista multas vencidas usando novo campo status"""
-        # Atualiza status das multas antes de consultar
+        """
+        Lista multas vencidas. A marcação de status é feita pela tarefa
+        periódica vencimento_multas; as pendentes com vencimento passado que
+        ela ainda não processou também são incluídas, sem UPDATE no GET.
+        """
         hoje = timezone.now().date()
-        Multa.objects.filter(
-            status='pendente',
-            data_vencimento__lt=hoje
-        ).update(status='vencida')
-        
-        # Retorna multas vencidas
-        multas_vencidas = self.queryset.filter(status='vencida')
+        multas_vencidas = self.queryset.filter(
+            models.Q(status='vencida') | models.Q(status='pendente', data_vencimento__lt=hoje)
+        )
         serializer = self.get_serializer(multas_vencidas, many=True)
         return Response(serializer.data)
     
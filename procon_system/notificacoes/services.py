@@ -192,19 +192,22 @@ class NotificacaoService:
             self._registrar_log_notificacao(notificacao, 'email', 'falha', str(e))
             return False
     
-    def processar_notificacoes_pendentes(self):
-        """Processa todas as notificações pendentes"""
+    def processar_notificacoes_pendentes(self) -> int:
+        """Processa todas as notificações pendentes e retorna quantas foram enviadas"""
         notificacoes = Notificacao.objects.filter(
             status='pendente'
         ).filter(
             Q(agendada_para__isnull=True) | Q(agendada_para__lte=timezone.now())
         )
         
+        processadas = 0
         for notificacao in notificacoes:
             try:
                 self._processar_notificacao(notificacao)
+                processadas += 1
             except Exception as e:
                 logger.error(f"Erro ao processar notificação {notificacao.id}: {e}")
+        return processadas
     
     def _processar_notificacao(self, notificacao: Notificacao):
         """Processa uma notificação específica"""
@@ -379,12 +382,13 @@ class ConfiguracaoNotificacaoService:
     
     @staticmethod
     def limpar_notificacoes_antigas(dias: int = 90):
-        """Remove notificações antigas"""
-        data_limite = timezone.now() - timedelta(days=dias)
-        count = Notificacao.objects.filter(
-            criado_em__lt=data_limite,
-            status__in=['enviada', 'lida', 'falhada']
-        ).delete()[0]
+        """
+        Arquiva e remove notificações antigas em lotes (política de retenção
+        'notificacoes'); uma execução interrompida continua na próxima chamada
+        """
+        from monitoring.retencao import retencao_service
+
+        count = retencao_service.executar('notificacoes', dias=dias)['linhas']
         
         logger.info(f"Removidas {count} notificações antigas")
         return count
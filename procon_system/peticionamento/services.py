@@ -13,6 +13,7 @@ from django.conf import settings
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 from django.db import transaction
+from core.integracoes import CircuitoAbertoError, normalizar_documento, obter_cliente
 from .models import PeticaoEletronica, TipoPeticao, AnexoPeticao, InteracaoPeticao, RespostaPeticao
 from datetime import datetime, timedelta
 import hashlib
@@ -243,17 +244,30 @@ class IntegracaoExternaService:
     """Serviço para integrações com sistemas externos"""
     
     def __init__(self):
-        self.api_timeout = 30
-        self.max_retries = 3
+        self.cliente_cep = obter_cliente('cep')
+        self.cliente_receita = obter_cliente('receita_federal')
+        self.cliente_serasa = obter_cliente('serasa')
+        self.api_timeout = self.cliente_cep.timeout
     
     def consultar_receita_federal(self, cnpj: str) -> Dict[str, Any]:
+        """Consulta dados da Receita Federal com cache por CNPJ normalizado"""
+        cnpj_limpo = normalizar_documento(cnpj)
+        return self.cliente_receita.consultar(
+            cnpj_limpo, lambda: self._buscar_receita_federal(cnpj_limpo)
+        )
+    
+    def consultar_receita_federal_lote(self, cnpjs: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Consulta vários CNPJs concorrentemente; chaves são os CNPJs normalizados"""
+        return self.cliente_receita.consultar_lote(
+            [normalizar_documento(cnpj) for cnpj in cnpjs], self._buscar_receita_federal
+        )
+    
+    def _buscar_receita_federal(self, cnpj_limpo: str) -> Dict[str, Any]:
         """Consulta dados da Receita Federal (simulado)"""
         try:
             # Simulação de consulta à Receita Federal
             # Em produção, seria uma chamada real à API da RF
             
-            cnpj_limpo = re.sub(r'[^\d]', '', cnpj)
-            
             # Simular resposta baseada no CNPJ
             if cnpj_limpo.startswith('00'):
                 return {
@@ -289,11 +303,16 @@ class IntegracaoExternaService:
             }
     
     def consultar_serasa(self, documento: str) -> Dict[str, Any]:
+        """Consulta dados do Serasa com cache por documento normalizado"""
+        documento_limpo = normalizar_documento(documento)
+        return self.cliente_serasa.consultar(
+            documento_limpo, lambda: self._buscar_serasa(documento_limpo)
+        )
+    
+    def _buscar_serasa(self, documento_limpo: str) -> Dict[str, Any]:
         """Consulta dados do Serasa (simulado)"""
         try:
             # Simulação de consulta ao Serasa
-            documento_limpo = re.sub(r'[^\d]', '', documento)
-            
             # Simular resposta baseada no documento
             if len(documento_limpo) == 11:  # CPF
                 return {
@@ -331,14 +350,26 @@ class IntegracaoExternaService:
             }
     
     def consultar_cep(self, cep: str) -> Dict[str, Any]:
-        """Consulta endereço pelo CEP usando API externa"""
+        """Consulta endereço pelo CEP usando API externa, com cache por CEP"""
+        cep_limpo = normalizar_documento(cep)
+        if len(cep_limpo) != 8:
+            return {
+                'sucesso': False,
+                'erro': 'CEP inválido'
+            }
+        return self.cliente_cep.consultar(cep_limpo, lambda: self._buscar_cep(cep_limpo))
+    
+    def consultar_ceps_lote(self, ceps: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Consulta vários CEPs concorrentemente; chaves são os CEPs normalizados"""
+        return self.cliente_cep.consultar_lote(
+            [normalizar_documento(cep) for cep in ceps], self._buscar_cep
+        )
+    
+    def _buscar_cep(self, cep_limpo: str) -> Dict[str, Any]:
+        """Consulta o CEP na API ViaCEP (gratuita)"""
         try:
-            cep_limpo = re.sub(r'[^\d]', '', cep)
-            
-            # Usar API ViaCEP (gratuita)
-            url = f"https://viacep.com.br/ws/{cep_limpo}/json/"
-            
-            response = requests.get(url, timeout=self.api_timeout)
+            url_base = getattr(settings, 'VIACEP_URL', 'https://viacep.com.br/ws/{cep}/json/')
+            response = self.cliente_cep.get(url_base.format(cep=cep_limpo))
             
             if response.status_code == 200:
                 dados = response.json()
@@ -366,6 +397,11 @@ class IntegracaoExternaService:
                     'erro': f'Erro na API: {response.status_code}'
                 }
                 
+        except CircuitoAbertoError:
+            return {
+                'sucesso': False,
+                'erro': 'Serviço de CEP temporariamente indisponível'
+            }
         except requests.exceptions.Timeout:
             return {
                 'sucesso': False,
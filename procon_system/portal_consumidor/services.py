@@ -4,12 +4,15 @@ Sistema Procon - Fase 5 - Portal Externo & Integradores
 """
 
 import json
+import os
 import re
+from collections import Counter
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Tuple
 from django.utils import timezone
 from django.db import transaction
 from django.core.mail import send_mail
+from django.conf import settings
 from django.utils.text import slugify
 from django.template.loader import render_to_string
 
@@ -22,6 +25,8 @@ from cip_automatica.models import CIPAutomatica, RespostaEmpresa
 from audiencia_calendario.models import AgendamentoAudiencia
 from portal_cidadao.models import ReclamacaoDenuncia
 from logging_config import logger_manager, LoggedOperation, log_execution_time
+from core.lotes import agrupar, executar_em_lotes
+from resposta_empresa.padroes import analisar_sentimento
 
 
 class ConsultaPortalService:
@@ -523,6 +528,9 @@ class FeedbackService:
     
     def __init__(self):
         self.logger = logger_manager.get_logger('feedback_consumidor')
+        self.tamanho_lote = getattr(settings, 'RESPOSTA_ANALISE_LOTE_TAMANHO', 500)
+        self.max_workers = getattr(settings, 'RESPOSTA_ANALISE_MAX_WORKERS', os.cpu_count() or 1)
+        self.min_lotes_pool = getattr(settings, 'RESPOSTA_ANALISE_MIN_LOTES_POOL', 4)
     
     @log_execution_time('processar_feedback')
     def processar_feedback_consumidor(self, tipo_feedback: str, nota: int,
@@ -582,33 +590,48 @@ class FeedbackService:
                 raise
     
     def _analisar_sentimento_feedback(self, positivo: str, melhoria: str, sugestoes: str) -> Dict[str, Any]:
-        """Análise básica de sentimento do feedback"""
+        """Análise básica de sentimento do feedback (palavras compiladas em resposta_empresa/padroes.py)"""
         
-        texto_completo = f"{positivo} {melhoria} {sugestoes}".lower()
-        
-        # Palavras positivas
-        palavras_positivas = ['bom', 'ótimo', 'excelente', 'satisfeito', 'conforme', 'eficiente', 'rápido']
-        # Palavras negativas
-        palavras_negativas = ['ruim', 'lento', 'demorado', 'problema', 'dificuldade', 'insatisfeito']
-        
-        contador_positivo = sum(1 for palavra in palavras_positivas if palavra in texto_completo)
-        contador_negativo = sum(1 for palavra in palavras_negativas if palavra in texto_completo)
-        
-        # Determinar sentimento
-        if contador_positivo > contador_negativo:
-            sentimento = 'POSITIVO'
-            confianca = min(0.9, (contador_positivo / max(len(texto_completo.split()), 10)))
-        elif contador_negativo > contador_positivo:
-            sentimento = 'NEGATIVO'
-            confianca = min(0.9, (contador_negativo / max(len(texto_completo.split()), 10)))
-        else:
-            sentimento = 'NEUTRO'
-            confianca = 0.5
+        return analisar_sentimento(f"{positivo} {melhoria} {sugestoes}")
+    
+    def reanalisar_feedbacks(self, ids: Optional[List[str]] = None, tamanho_lote: Optional[int] = None,
+                             max_workers: Optional[int] = None) -> Dict[str, Any]:
+        """Recalcula o sentimento dos feedbacks com texto, em lotes no pool de processos"""
+        
+        queryset = FeedbackConsumidor.objects.exclude(
+            aspecto_positivo='', aspecto_melhoria='', sugestoes=''
+        ).order_by('pk')
+        if ids is not None:
+            queryset = queryset.filter(pk__in=ids)
+        
+        tamanho = tamanho_lote or self.tamanho_lote
+        linhas = queryset.values_list(
+            'id', 'aspecto_positivo', 'aspecto_melhoria', 'sugestoes'
+        ).iterator(chunk_size=tamanho)
+        
+        analisados, por_sentimento = 0, Counter()
+        with LoggedOperation('reanalisar_feedbacks', {'tamanho_lote': tamanho}):
+            for lote, resultados in executar_em_lotes(
+                _analisar_lote_feedbacks, agrupar(linhas, tamanho),
+                max_workers or self.max_workers, self.min_lotes_pool,
+            ):
+                feedbacks = [
+                    FeedbackConsumidor(
+                        id=linha[0],
+                        analise_sentimento=analise['sentimento'],
+                        confianca_analise_sentimento=analise['confianca'],
+                    )
+                    for linha, analise in zip(lote, resultados)
+                ]
+                FeedbackConsumidor.objects.bulk_update(
+                    feedbacks, ['analise_sentimento', 'confianca_analise_sentimento']
+                )
+                analisados += len(feedbacks)
+                por_sentimento.update(analise['sentimento'] for analise in resultados)
         
-        return {
-            'sentimento': sentimento,
-            'confianca': confianca,
-        }
+        resultado = {'analisados': analisados, 'por_sentimento': dict(por_sentimento)}
+        self.logger.log_operation('feedbacks_reanalisados', resultado)
+        return resultado
     
     def _categorizar_feedback(self, tipo_feedback: str, nota: int, sentimento: str) -> str:
         """Categoriza feedback para análise gerencial"""
@@ -633,6 +656,14 @@ class FeedbackService:
             # Criar NotificacaoConsumidor para responsáveis pelo protocolo
 
 
+def _analisar_lote_feedbacks(lote: List[Tuple]) -> List[Dict[str, Any]]:
+    """Executado nos workers do pool de processos"""
+    return [
+        analisar_sentimento(f"{positivo} {melhoria} {sugestoes}")
+        for _, positivo, melhoria, sugestoes in lote
+    ]
+
+
 # Instâncias globais dos serviços
 consulta_service = ConsultaPortalService()
 documento_service = DocumentoPortalService()
@@ -4,6 +4,7 @@ Configuração do Celery para o projeto System Procon
 import os
 try:
     from celery import Celery
+    from celery.signals import beat_init
 except ImportError:
     Celery = None
 
@@ -39,6 +40,25 @@ if Celery:
         """Tarefa de debug"""
         print(f'Request: {self.request!r}')
         return 'Celery funcionando!'
+    
+    @app.task(name='procon_system.executar_tarefa_periodica', ignore_result=True)
+    def executar_tarefa_periodica(nome):
+        """Executa uma tarefa periódica de monitoring/agendador.py (com lock e histórico)"""
+        from monitoring.agendador import agendador_service
+        return agendador_service.executar(nome, origem='celery')
+    
+    @beat_init.connect
+    def agendar_tarefas_periodicas(sender, **kwargs):
+        """
+        Registra no scheduler do beat todas as tarefas periódicas do sistema.
+        Roda na inicialização do beat, com o Django já configurado; entradas
+        de mesmo nome em CELERY_BEAT_SCHEDULE têm precedência.
+        """
+        from monitoring.agendador import agendador_service
+        agenda = agendador_service.beat_schedule()
+        for nome in app.conf.beat_schedule or {}:
+            agenda.pop(nome, None)
+        sender.scheduler.update_from_dict(agenda)
 else:
     # Mock para quando Celery não está disponível
     class MockCeleryApp:
@@ -111,6 +111,7 @@ INSTALLED_APPS = [
 # ===================================================================
 
 MIDDLEWARE = [
+    'monitoring.middleware.MetricasRequisicaoMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -221,6 +222,130 @@ except ValueError:
 
 RECEITA_FEDERAL_API_KEY = os.environ.get('RECEITA_FEDERAL_API_KEY', '').strip() or None
 
+# Consulta de CEP (ViaCEP)
+VIACEP_URL = os.environ.get('VIACEP_URL', 'https://viacep.com.br/ws/{cep}/json/')
+
+# Cliente compartilhado de integrações (core/integracoes.py): timeouts curtos,
+# retries com backoff, circuit breaker e cache TTL por documento normalizado
+INTEGRACOES_EXTERNAS = {
+    'cep': {'timeout': 3, 'cache_ttl': 60 * 60 * 24 * 30},
+    'receita_federal': {'timeout': 5, 'cache_ttl': 60 * 60 * 24},
+    'serasa': {'timeout': 5, 'cache_ttl': 60 * 60 * 6},
+    'tj': {'timeout': 8, 'cache_ttl': 60 * 60},
+}
+
+# Outbox de EnvioDocumentoExterno (apis_externas/services.py)
+OUTBOX_TAMANHO_LOTE = int(os.environ.get('OUTBOX_TAMANHO_LOTE', '100'))
+OUTBOX_MAX_WORKERS = int(os.environ.get('OUTBOX_MAX_WORKERS', '16'))
+OUTBOX_BACKOFF_BASE_SEGUNDOS = 60
+OUTBOX_BACKOFF_MAX_SEGUNDOS = 60 * 60
+OUTBOX_LEASE_SEGUNDOS = 10 * 60
+
+# Assinatura digital de pareceres (juridico/services.py): a chave privada do
+# analista é gravada cifrada (PKCS#8) com esta senha. Obrigatória em produção
+ASSINATURA_CHAVE_SENHA = os.environ.get('ASSINATURA_CHAVE_SENHA', 'desenvolvimento' if DEBUG else '')
+
+# Documentos dos autos (fiscalizacao/services/documento_service.py): cache por
+# hash do conteúdo e renderização de lotes em pool de processos
+DOCUMENTOS_AUTOS_CACHE_TIMEOUT = 60 * 60 * 24
+DOCUMENTOS_LOTE_MAX_WORKERS = int(os.environ.get('DOCUMENTOS_LOTE_MAX_WORKERS', os.cpu_count() or 1))
+DOCUMENTOS_LOTE_MIN_ITENS_POOL = 8
+DOCUMENTOS_LOTE_MAX_AUTOS = 500
+
+# Estatísticas da fiscalização (fiscalizacao/services/estatisticas_service.py):
+# cache por conjunto de filtros, invalidado ao salvar autos e infrações
+ESTATISTICAS_FISCALIZACAO_CACHE_TIMEOUT = 60 * 15
+
+# Varredura de prazos (monitoring/prazos.py, manage.py varrer_prazos): janela
+# de alerta antes do vencimento e dias úteis de atraso até escalonar
+PRAZOS_JANELA_ALERTA_HORAS = 72
+PRAZOS_DIAS_ESCALONAMENTO = 5
+PRAZOS_ESCALONAMENTO_USUARIOS = []  # vazio: superusuários ativos
+
+# Reanálise em lote de respostas de empresas e feedbacks (resposta_empresa,
+# manage.py reanalisar_respostas): registros por lote e pool de processos
+RESPOSTA_ANALISE_LOTE_TAMANHO = 500
+RESPOSTA_ANALISE_MAX_WORKERS = int(os.environ.get('RESPOSTA_ANALISE_MAX_WORKERS', os.cpu_count() or 1))
+RESPOSTA_ANALISE_MIN_LOTES_POOL = 4
+
+# OCR de documentos do protocolo (protocolo/services/ocr_service.py,
+# manage.py processar_documentos_ocr): páginas com pelo menos
+# OCR_MIN_CARACTERES_PAGINA caracteres na camada de texto não passam pelo OCR
+OCR_IDIOMA = 'por'
+OCR_DPI = 200
+OCR_MIN_CARACTERES_PAGINA = 20
+OCR_PAGINAS_POR_TAREFA = 1
+OCR_MAX_WORKERS = int(os.environ.get('OCR_MAX_WORKERS', os.cpu_count() or 1))
+OCR_LOTE_GRAVACAO = 100
+OCR_CACHE_TIMEOUT = 60 * 60 * 24 * 30  # resultado por hash do arquivo
+
+# Retenção de dados (monitoring/retencao.py, manage.py aplicar_retencao):
+# arquivamento e expurgo em lotes retomáveis; RETENCAO_POLITICAS ajusta
+# dias/destino das políticas padrão, ex.: {'logs_sistema': {'dias': 90}}
+RETENCAO_DIRETORIO = os.environ.get('RETENCAO_DIRETORIO', os.path.join(BASE_DIR, 'arquivamento'))
+RETENCAO_TAMANHO_LOTE = 1000
+RETENCAO_PAUSA_SEGUNDOS = 0.05
+RETENCAO_POLITICAS = {}
+
+# Calendário de dias úteis (monitoring/calendario.py): feriados nacionais são
+# calculados; estaduais, municipais e fechamentos do órgão vêm do cadastro de
+# Feriado para a UF/município abaixo
+CALENDARIO_UF = os.environ.get('CALENDARIO_UF', 'AM')
+CALENDARIO_MUNICIPIO = os.environ.get('CALENDARIO_MUNICIPIO', 'Manaus')
+CALENDARIO_FERIADOS_MOVEIS = ['carnaval', 'sexta_santa', 'corpus_christi']
+CALENDARIO_ANOS_MARGEM = 3
+CALENDARIO_VERIFICACAO_SEGUNDOS = 60
+
+# Tramitação em lote (protocolo_tramitacao, POST /protocolos/tramitar_lote/)
+TRAMITACAO_LOTE_MAX_PROTOCOLOS = 1000
+
+# Métricas de performance (monitoring/histogramas.py, exposição em /metrics/)
+# Backend compartilhado entre workers: 'arquivo' (um JSON por worker no
+# diretório), 'redis' ou 'local' (só o processo atual)
+METRICAS_BACKEND = os.environ.get('METRICAS_BACKEND', 'arquivo')
+METRICAS_DIRETORIO = os.environ.get('METRICAS_DIRETORIO', '')  # vazio: diretório temporário do sistema
+METRICAS_REDIS_URL = os.environ.get('METRICAS_REDIS_URL', '')  # vazio: REDIS_URL
+METRICAS_PRECISAO = 0.02  # erro relativo máximo dos percentis
+METRICAS_INTERVALO_PUBLICACAO = 10  # segundos
+METRICAS_RETENCAO_HORAS = 24
+METRICAS_ARQUIVO_EXPIRACAO = 86400  # ignora arquivos de workers sem atualização há mais tempo
+
+# Métricas por requisição (monitoring/middleware.py): consultas, tempo de banco, cache e latência
+REQUISICAO_METRICAS_ATIVO = True
+# Orçamento de consultas por view_name ou caminho da view; o decorator
+# monitoring.middleware.orcamento_consultas na própria view tem precedência
+ORCAMENTO_CONSULTAS = {}
+ORCAMENTO_CONSULTAS_PADRAO = None  # None: sem orçamento
+ORCAMENTO_CONSULTAS_MODO = os.environ.get('ORCAMENTO_CONSULTAS_MODO', 'log')  # 'log' ou 'erro'
+
+# Health checks (health/services.py): snapshot atualizado em segundo plano
+HEALTH_INTERVALO_ATUALIZACAO = 10  # segundos; 0 desativa a thread (atualiza ao expirar)
+HEALTH_TTL = 30  # snapshot mais velho que isso é refeito na própria probe
+HEALTH_TIMEOUTS = {'database': 2, 'redis': 1, 'celery': 3, 'disk': 1}  # segundos por dependência
+
+# Logging estruturado (logging_config.py): fila limitada + thread de escrita
+LOGGING_ASSINCRONO = True
+LOGGING_FILA_TAMANHO = 10000  # registros além disso são descartados e contados
+# Fração mantida dos registros abaixo de WARNING, por prefixo de logger
+LOGGING_AMOSTRAGEM = {
+    'procon.operation': 0.1,
+    'procon.performance': 0.1,
+    'procon.metrics': 0.1,
+}
+
+# Tarefas periódicas (monitoring/agendador.py): beat do Celery ou
+# manage.py executar_tarefas_periodicas no cron. Ajusta 'intervalo' (s) e
+# 'ativo' das tarefas padrão ou acrescenta novas ({'funcao': 'app.modulo.funcao', 'intervalo': 3600})
+TAREFAS_PERIODICAS = {}
+AGENDADOR_CACHE = 'default'  # cache dos locks; com mais de um servidor precisa ser compartilhado (Redis)
+
+# Benchmark de carga (manage.py benchmark_carga): baseline gravado com
+# --salvar-baseline no hardware de referência; regressão = mais consultas ou
+# mediana acima da tolerância e do piso de ruído
+BENCHMARK_BASELINE = os.getenv('BENCHMARK_BASELINE', '')  # vazio: BASE_DIR/benchmarks/baseline.json
+BENCHMARK_TOLERANCIA = 0.25
+BENCHMARK_PISO_MS = 5.0
+
 # CORS - CONFIGURAÇÃO SEGURA
 # ===================================================================
 
@@ -8,12 +8,14 @@ from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from core.views import TokenObtainPairView as RateLimitedTokenObtainPairView
 from core.views import register, login, logout, profile, update_profile, change_password, admin_dashboard, staff_dashboard, protected_endpoint
 
+from django.http import HttpResponse
+
 # Importar métricas do Prometheus
 try:
     from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
-    from django.http import HttpResponse
     PROMETHEUS_AVAILABLE = True
 except ImportError:
+    CONTENT_TYPE_LATEST = 'text/plain; version=0.0.4; charset=utf-8'
     PROMETHEUS_AVAILABLE = False
 
 @api_view(['GET'])
@@ -32,10 +34,13 @@ def health_check(request):
 
 # Endpoint para métricas do Prometheus
 def metrics_view(request):
+    # Histogramas do sistema agregados entre todos os workers
+    from monitoring.histogramas import registro_metricas
+
+    conteudo = registro_metricas.exposicao_prometheus().encode('utf-8')
     if PROMETHEUS_AVAILABLE:
-        return HttpResponse(generate_latest(), content_type=CONTENT_TYPE_LATEST)
-    else:
-        return HttpResponse("Prometheus não disponível", status=503)
+        conteudo += generate_latest()
+    return HttpResponse(conteudo, content_type=CONTENT_TYPE_LATEST)
 
 urlpatterns = [
     path('admin/', admin.site.urls),
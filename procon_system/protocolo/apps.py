@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class ProtocoloConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'protocolo'
+
+    def ready(self):
+        import protocolo.signals  # noqa
+        from protocolo.indice_texto import garantir_indice_texto
+
+        # Bancos criados sem migrações (syncdb) também recebem o índice de texto
+        post_migrate.connect(garantir_indice_texto, sender=self, dispatch_uid='protocolo_indice_texto')
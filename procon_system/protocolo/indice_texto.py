@@ -0,0 +1,79 @@
+"""
+Índice de texto completo dos documentos de protocolo
+
+Usado pela migração 0002 e pelo post_migrate (bancos criados sem migrações,
+como o de testes). Todas as instruções são idempotentes.
+
+PostgreSQL: coluna tsvector gerada (português) com índice GIN.
+SQLite: tabela FTS5 de conteúdo externo mantida por triggers.
+"""
+
+TABELA = 'protocolo_documentoprotocolo'
+FTS = 'protocolo_documento_fts'
+
+
+def criar_indice_texto(connection):
+    """Cria o índice de texto completo no banco da conexão informada"""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                f"ALTER TABLE {TABELA} ADD COLUMN IF NOT EXISTS busca_vetor tsvector "
+                f"GENERATED ALWAYS AS ("
+                f"setweight(to_tsvector('portuguese', coalesce(titulo, '')), 'A') || "
+                f"setweight(to_tsvector('portuguese', coalesce(texto_extraido, '')), 'B')"
+                f") STORED"
+            )
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS protocolo_doc_busca_gin_idx ON {TABELA} USING gin (busca_vetor)'
+            )
+        elif connection.vendor == 'sqlite':
+            cursor.execute('SELECT 1 FROM sqlite_master WHERE name = %s', [FTS])
+            existente = cursor.fetchone() is not None
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS} USING fts5("
+                f"titulo, texto_extraido, content='{TABELA}', content_rowid='id', "
+                f"tokenize='unicode61 remove_diacritics 2')"
+            )
+            cursor.execute(
+                f'CREATE TRIGGER IF NOT EXISTS {FTS}_ai AFTER INSERT ON {TABELA} BEGIN '
+                f'INSERT INTO {FTS}(rowid, titulo, texto_extraido) VALUES (new.id, new.titulo, new.texto_extraido); '
+                f'END'
+            )
+            cursor.execute(
+                f'CREATE TRIGGER IF NOT EXISTS {FTS}_ad AFTER DELETE ON {TABELA} BEGIN '
+                f"INSERT INTO {FTS}({FTS}, rowid, titulo, texto_extraido) "
+                f"VALUES ('delete', old.id, old.titulo, old.texto_extraido); "
+                f'END'
+            )
+            # Só reindexa quando título ou texto mudam (o save() do Django regrava todas as colunas)
+            cursor.execute(
+                f'CREATE TRIGGER IF NOT EXISTS {FTS}_au AFTER UPDATE OF titulo, texto_extraido ON {TABELA} '
+                f'WHEN old.titulo IS NOT new.titulo OR old.texto_extraido IS NOT new.texto_extraido BEGIN '
+                f"INSERT INTO {FTS}({FTS}, rowid, titulo, texto_extraido) "
+                f"VALUES ('delete', old.id, old.titulo, old.texto_extraido); "
+                f'INSERT INTO {FTS}(rowid, titulo, texto_extraido) VALUES (new.id, new.titulo, new.texto_extraido); '
+                f'END'
+            )
+            if not existente:
+                cursor.execute(f"INSERT INTO {FTS}({FTS}) VALUES ('rebuild')")
+
+
+def remover_indice_texto(connection):
+    """Remove o índice de texto completo"""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('DROP INDEX IF EXISTS protocolo_doc_busca_gin_idx')
+            cursor.execute(f'ALTER TABLE {TABELA} DROP COLUMN IF EXISTS busca_vetor')
+        elif connection.vendor == 'sqlite':
+            for sufixo in ('ai', 'ad', 'au'):
+                cursor.execute(f'DROP TRIGGER IF EXISTS {FTS}_{sufixo}')
+            cursor.execute(f'DROP TABLE IF EXISTS {FTS}')
+
+
+def garantir_indice_texto(sender, using='default', **kwargs):
+    """Handler de post_migrate: cria o índice quando a tabela já existe"""
+    from django.db import connections
+
+    connection = connections[using]
+    if TABELA in connection.introspection.table_names():
+        criar_indice_texto(connection)
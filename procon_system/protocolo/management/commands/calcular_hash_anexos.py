@@ -0,0 +1,22 @@
+"""
+Comando para calcular o hash de conteúdo dos arquivos já enviados
+Uso: python manage.py calcular_hash_anexos [--lote N]
+Uploads novos recebem o hash na gravação; este comando cobre os anteriores.
+"""
+
+from django.core.management.base import BaseCommand
+
+from protocolo.services import conteudo_service
+
+
+class Command(BaseCommand):
+    help = 'Calcula o SHA-256 dos arquivos de documentos de protocolo, anexos da caixa de entrada e anexos de autos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=500, help='Registros por bulk_update (padrão: 500)')
+
+    def handle(self, *args, **options):
+        atualizados = conteudo_service.preencher_hashes_pendentes(tamanho_lote=options['lote'])
+        for modelo, total in atualizados.items():
+            self.stdout.write(f'   {modelo}: {total}')
+        self.stdout.write(self.style.SUCCESS(f'🔐 {sum(atualizados.values())} arquivo(s) com hash calculado'))
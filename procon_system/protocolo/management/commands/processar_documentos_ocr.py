@@ -42,6 +42,11 @@ class Command(BaseCommand):
             default=100,
             help='Limite de documentos para processar (padrão: 100)'
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            help='Processos do pool de OCR (padrão: OCR_MAX_WORKERS)'
+        )
         parser.add_argument(
             '--analisar-qualidade',
             action='store_true',
@@ -92,43 +97,50 @@ class Command(BaseCommand):
 
         self.stdout.write(f"📊 Total de documentos para processar: {total_docs}")
 
-        # Processar documentos
+        # Processar documentos (pool de OCR por página, gravação em lote)
         start_time = time.time()
-        results = digitization_service.batch_process_documents(list(queryset))
+        results = digitization_service.batch_process_documents(list(queryset), max_workers=options['workers'])
         
         # Exibir resultados
         self.stdout.write("\n" + "="*60)
         self.stdout.write("📈 RESULTADOS DO PROCESSAMENTO")
         self.stdout.write("="*60)
-        self.stdout.write(f"Total processado: {results['total']}")
-        self.stdout.write(f"Sucessos: {results['successful']}")
+        self.stdout.write(f"Total processado: {results['total_documents']}")
+        self.stdout.write(f"Sucessos: {results['processed']}")
         self.stdout.write(f"Falhas: {results['failed']}")
+        self.stdout.write(f"Reaproveitados do cache: {results['summary']['cached_documents']}")
+        self.stdout.write(
+            f"Páginas: {results['pages']} "
+            f"(OCR: {results['summary']['ocr_pages']}, camada de texto: {results['summary']['text_layer_pages']})"
+        )
         
         if results['failed'] > 0:
             self.stdout.write("\n❌ DOCUMENTOS COM FALHA:")
-            for result in results['results']:
-                if not result['result']['success']:
-                    doc = DocumentoProtocolo.objects.get(id=result['document_id'])
-                    self.stdout.write(f"  - {doc.titulo} (ID: {doc.id})")
-                    for error in result['result']['errors']:
-                        self.stdout.write(f"    Erro: {error}")
+            falhas = [result for result in results['results'] if not result['success']]
+            documentos = DocumentoProtocolo.objects.in_bulk([result['document_id'] for result in falhas])
+            for result in falhas:
+                doc = documentos[result['document_id']]
+                self.stdout.write(f"  - {doc.titulo} (ID: {doc.id})")
+                for error in result['errors']:
+                    self.stdout.write(f"    Erro: {error}")
 
         # Estatísticas
         processing_time = time.time() - start_time
         self.stdout.write(f"\n⏱️ Tempo de processamento: {processing_time:.2f} segundos")
+        self.stdout.write(f"⚡ Vazão do OCR: {results['pages_per_second']:.1f} páginas/s")
         
-        if results['successful'] > 0:
-            avg_time = processing_time / results['successful']
+        if results['processed'] > 0:
+            avg_time = processing_time / results['processed']
             self.stdout.write(f"⏱️ Tempo médio por documento: {avg_time:.2f} segundos")
 
         # Analisar qualidade se solicitado
-        if options['analisar_qualidade'] and results['successful'] > 0:
+        if options['analisar_qualidade'] and results['processed'] > 0:
             self.stdout.write("\n" + "="*60)
             self.stdout.write("🔍 ANÁLISE DE QUALIDADE")
             self.stdout.write("="*60)
             
             documentos_processados = DocumentoProtocolo.objects.filter(
-                id__in=[r['document_id'] for r in results['results'] if r['result']['success']]
+                id__in=[r['document_id'] for r in results['results'] if r['success']]
             )
             
             quality_scores = []
@@ -161,10 +173,11 @@ class Command(BaseCommand):
         
         try:
             stats = digitization_service.get_document_statistics()
-            self.stdout.write(f"Total de documentos indexados: {stats['total_documents']}")
-            self.stdout.write(f"Documentos com texto extraído: {stats['documents_with_text']}")
-            self.stdout.write(f"Taxa de extração: {stats['extraction_rate']:.1f}%")
-            self.stdout.write(f"Tamanho médio do texto: {stats['average_text_length']:.0f} caracteres")
+            self.stdout.write(f"Total de documentos indexados: {stats['indexed_documents']}")
+            self.stdout.write(f"Documentos com texto extraído: {stats['text_statistics']['documents_with_text']}")
+            self.stdout.write(f"Taxa de indexação: {stats['indexing_rate']:.1f}%")
+            self.stdout.write(f"Tamanho médio do texto: {stats['text_statistics']['average_text_length']:.0f} caracteres")
+            self.stdout.write(f"Documentos com conteúdo repetido: {stats['duplicate_documents']}")
         except Exception as e:
             self.stdout.write(f"Erro ao calcular estatísticas: {e}")
             self.stdout.write("Estatísticas não disponíveis")
@@ -0,0 +1,17 @@
+"""
+Comando para reconstruir o índice de texto completo dos documentos de protocolo
+Uso: python manage.py reindexar_texto_documentos
+Necessário apenas após cargas feitas fora do ORM ou recriação da tabela no SQLite.
+"""
+
+from django.core.management.base import BaseCommand
+
+from protocolo.services import indexing_service
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói o índice de texto completo (FTS) a partir do texto extraído dos documentos'
+
+    def handle(self, *args, **options):
+        total = indexing_service.rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f'🔎 {total} documento(s) com texto no índice de busca'))
@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from protocolo.indice_texto import criar_indice_texto as _criar, remover_indice_texto as _remover
+
+
+def criar_indice_texto(apps, schema_editor):
+    _criar(schema_editor.connection)
+
+
+def remover_indice_texto(apps, schema_editor):
+    _remover(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('protocolo', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_indice_texto, remover_indice_texto),
+    ]
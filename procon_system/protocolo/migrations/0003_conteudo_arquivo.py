@@ -0,0 +1,56 @@
+from django.db import migrations, models
+from django.db.models.functions import Length
+
+from protocolo.indice_texto import criar_indice_texto
+
+
+def preencher_tamanho_texto(apps, schema_editor):
+    DocumentoProtocolo = apps.get_model('protocolo', 'DocumentoProtocolo')
+    DocumentoProtocolo.objects.exclude(texto_extraido='').update(tamanho_texto=Length('texto_extraido'))
+
+
+def recriar_indice_texto(apps, schema_editor):
+    # No SQLite o AddField recria a tabela e descarta os triggers do índice FTS5
+    criar_indice_texto(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('protocolo', '0002_indice_texto_documentos'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConteudoArquivo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hash_sha256', models.CharField(max_length=64, unique=True, verbose_name='Hash SHA-256')),
+                ('tamanho', models.BigIntegerField(default=0, verbose_name='Tamanho (bytes)')),
+                ('texto_extraido', models.TextField(blank=True, verbose_name='Texto Extraído (OCR)')),
+                ('tamanho_texto', models.PositiveIntegerField(default=0, verbose_name='Tamanho do Texto (caracteres)')),
+                ('paginas', models.PositiveIntegerField(default=0, verbose_name='Páginas')),
+                ('confianca_ocr', models.FloatField(default=0, verbose_name='Confiança do OCR')),
+                ('qualidade', models.JSONField(blank=True, default=dict, verbose_name='Análise de Qualidade')),
+                ('processado', models.BooleanField(default=False, verbose_name='Processado')),
+                ('criado_em', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+                ('atualizado_em', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+            ],
+            options={
+                'verbose_name': 'Conteúdo de Arquivo',
+                'verbose_name_plural': 'Conteúdos de Arquivos',
+            },
+        ),
+        migrations.AddField(
+            model_name='documentoprotocolo',
+            name='hash_conteudo',
+            field=models.CharField(blank=True, db_index=True, max_length=64, verbose_name='Hash do Conteúdo (SHA-256)'),
+        ),
+        migrations.AddField(
+            model_name='documentoprotocolo',
+            name='tamanho_texto',
+            field=models.PositiveIntegerField(default=0, verbose_name='Tamanho do Texto (caracteres)'),
+        ),
+        migrations.RunPython(preencher_tamanho_texto, migrations.RunPython.noop),
+        migrations.RunPython(recriar_indice_texto, migrations.RunPython.noop),
+    ]
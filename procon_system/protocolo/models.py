@@ -234,7 +234,9 @@ class DocumentoProtocolo(models.Model):
     
     # OCR e indexação
     texto_extraido = models.TextField("Texto Extraído (OCR)", blank=True)
+    tamanho_texto = models.PositiveIntegerField("Tamanho do Texto (caracteres)", default=0)
     indexado = models.BooleanField("Indexado", default=False)
+    hash_conteudo = models.CharField("Hash do Conteúdo (SHA-256)", max_length=64, blank=True, db_index=True)
     
     # Validação
     validado = models.BooleanField("Validado", default=False)
@@ -266,6 +268,8 @@ class DocumentoProtocolo(models.Model):
             except:
                 pass
         
+        self.tamanho_texto = len(self.texto_extraido or '')
+        
         super().save(*args, **kwargs)
     
     def validar_documento(self, usuario, observacoes=""):
@@ -277,6 +281,33 @@ class DocumentoProtocolo(models.Model):
         self.save()
 
 
+class ConteudoArquivo(models.Model):
+    """
+    Resultado da extração de texto e da análise de qualidade por conteúdo de
+    arquivo (SHA-256), compartilhado entre DocumentoProtocolo,
+    AnexoCaixaEntrada e AnexoAuto com o mesmo arquivo
+    """
+    hash_sha256 = models.CharField("Hash SHA-256", max_length=64, unique=True)
+    tamanho = models.BigIntegerField("Tamanho (bytes)", default=0)
+    
+    texto_extraido = models.TextField("Texto Extraído (OCR)", blank=True)
+    tamanho_texto = models.PositiveIntegerField("Tamanho do Texto (caracteres)", default=0)
+    paginas = models.PositiveIntegerField("Páginas", default=0)
+    confianca_ocr = models.FloatField("Confiança do OCR", default=0)
+    qualidade = models.JSONField("Análise de Qualidade", default=dict, blank=True)
+    processado = models.BooleanField("Processado", default=False)
+    
+    criado_em = models.DateTimeField("Criado em", auto_now_add=True)
+    atualizado_em = models.DateTimeField("Atualizado em", auto_now=True)
+    
+    class Meta:
+        verbose_name = "Conteúdo de Arquivo"
+        verbose_name_plural = "Conteúdos de Arquivos"
+    
+    def __str__(self):
+        return f"{self.hash_sha256[:12]} ({self.tamanho_texto} caracteres)"
+
+
 class TramitacaoProtocolo(models.Model):
     """Histórico de tramitação do protocolo"""
     protocolo = models.ForeignKey(Protocolo, on_delete=models.CASCADE, related_name='tramitacoes', verbose_name="Protocolo")
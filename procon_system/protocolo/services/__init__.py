@@ -7,11 +7,13 @@ from .ocr_service import ocr_service
 from .indexing_service import indexing_service
 from .digitization_service import digitization_service
 from .quality_service import quality_service
+from .conteudo_service import conteudo_service
 
 __all__ = [
     'numbering_service',
     'ocr_service', 
     'indexing_service',
     'digitization_service',
-    'quality_service'
+    'quality_service',
+    'conteudo_service'
 ]
\ No newline at end of file
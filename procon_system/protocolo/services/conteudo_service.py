@@ -0,0 +1,161 @@
+"""
+Serviço de conteúdo de arquivos (deduplicação por hash)
+
+Todo upload de DocumentoProtocolo, AnexoCaixaEntrada e AnexoAuto recebe o
+SHA-256 do conteúdo na gravação (protocolo/signals.py). Extração de texto e
+análise de qualidade ficam em ConteudoArquivo, uma vez por hash, e são
+reaproveitadas quando o mesmo arquivo é anexado a outro registro ou
+reenviado.
+"""
+
+import hashlib
+import logging
+from typing import Dict, Optional, Tuple
+
+from django.apps import apps
+
+from .ocr_service import ocr_service
+from .quality_service import quality_service
+
+logger = logging.getLogger(__name__)
+
+
+# Modelos com arquivo e hash_conteudo que compartilham ConteudoArquivo
+MODELOS_COM_CONTEUDO = (
+    'protocolo.DocumentoProtocolo',
+    'caixa_entrada.AnexoCaixaEntrada',
+    'fiscalizacao.AnexoAuto',
+)
+
+
+class ConteudoService:
+    """
+    Serviço de hash e reaproveitamento de conteúdo de arquivos
+    """
+
+    def __init__(self):
+        self.ocr_service = ocr_service
+        self.quality_service = quality_service
+
+    def hash_arquivo(self, arquivo) -> str:
+        """
+        SHA-256 de um FieldFile, lido em blocos (uploads ainda não gravados
+        no storage são lidos do arquivo enviado)
+        """
+        resumo = hashlib.sha256()
+        aberto_aqui = arquivo._committed and getattr(arquivo, '_file', None) is None
+        try:
+            for bloco in arquivo.chunks():
+                resumo.update(bloco)
+        finally:
+            if aberto_aqui:
+                arquivo.close()
+        return resumo.hexdigest()
+
+    def preencher_hash(self, instancia) -> str:
+        """
+        Calcula hash_conteudo quando o registro tem um arquivo novo ou ainda
+        não tem hash; falhas de leitura deixam o campo vazio
+        """
+        arquivo = instancia.arquivo
+        if not arquivo:
+            instancia.hash_conteudo = ''
+        elif not instancia.hash_conteudo or not getattr(arquivo, '_committed', True):
+            try:
+                instancia.hash_conteudo = self.hash_arquivo(arquivo)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Não foi possível calcular o hash de {arquivo.name}: {str(e)}")
+                instancia.hash_conteudo = ''
+        return instancia.hash_conteudo
+
+    def obter(self, hash_conteudo: str):
+        """Conteúdo já processado para o hash, se houver"""
+        from ..models import ConteudoArquivo
+
+        if not hash_conteudo:
+            return None
+        return ConteudoArquivo.objects.filter(hash_sha256=hash_conteudo, processado=True).first()
+
+    def registrar(self, hash_conteudo: str, ocr: Dict, qualidade: Optional[Dict] = None, tamanho: int = 0):
+        """
+        Grava o resultado da extração para o hash; só fica marcado como
+        processado quando todas as páginas foram extraídas sem erro
+        """
+        from ..models import ConteudoArquivo
+
+        defaults = {
+            'texto_extraido': ocr.get('text', ''),
+            'tamanho_texto': len(ocr.get('text', '')),
+            'paginas': len(ocr.get('pages', [])),
+            'confianca_ocr': ocr.get('confidence') or 0,
+            'processado': not ocr.get('errors'),
+        }
+        if tamanho:
+            defaults['tamanho'] = tamanho
+        if qualidade is not None:
+            defaults['qualidade'] = qualidade
+        conteudo, _ = ConteudoArquivo.objects.update_or_create(hash_sha256=hash_conteudo, defaults=defaults)
+        return conteudo
+
+    def processar(self, instancia, forcar: bool = False) -> Tuple[object, bool]:
+        """
+        Extrai texto e avalia a qualidade do arquivo de qualquer registro com
+        `arquivo` e `hash_conteudo`, reaproveitando o resultado do mesmo
+        conteúdo quando existir
+
+        Returns:
+            tuple: (ConteudoArquivo, reaproveitado)
+        """
+        hash_conteudo = instancia.hash_conteudo
+        if not hash_conteudo:
+            hash_conteudo = self.preencher_hash(instancia)
+            if hash_conteudo and instancia.pk:
+                type(instancia).objects.filter(pk=instancia.pk).update(hash_conteudo=hash_conteudo)
+        if not hash_conteudo:
+            raise ValueError('Arquivo indisponível para cálculo do hash')
+
+        conteudo = None if forcar else self.obter(hash_conteudo)
+        if conteudo and not conteudo.qualidade:
+            # Gravado pelo OCR em lote sem a análise de qualidade: completa só a qualidade
+            with self.ocr_service.arquivo_local(instancia) as caminho:
+                conteudo.qualidade = self.quality_service.assess_document_quality(caminho)
+            conteudo.save(update_fields=['qualidade', 'atualizado_em'])
+        if conteudo:
+            return conteudo, True
+
+        with self.ocr_service.arquivo_local(instancia) as caminho:
+            qualidade = self.quality_service.assess_document_quality(caminho)
+            ocr = self.ocr_service.extract_text_from_path(caminho, usar_cache=not forcar)
+        return self.registrar(hash_conteudo, ocr, qualidade, instancia.arquivo.size), False
+
+    def preencher_hashes_pendentes(self, tamanho_lote: int = 500) -> Dict[str, int]:
+        """
+        Calcula o hash dos arquivos gravados antes da deduplicação, em lotes
+        com bulk_update (sem disparar save/signals)
+
+        Returns:
+            dict: registros atualizados por modelo
+        """
+        atualizados = {}
+        for rotulo in MODELOS_COM_CONTEUDO:
+            modelo = apps.get_model(rotulo)
+            pendentes = (
+                modelo.objects.filter(hash_conteudo='').exclude(arquivo='')
+                .only('pk', 'arquivo', 'hash_conteudo').order_by('pk')
+            )
+            atualizados[rotulo] = 0
+            ultimo_pk = 0
+            # Paginação por pk: registros sem arquivo legível continuam sem hash e não voltam ao lote
+            while True:
+                instancias = list(pendentes.filter(pk__gt=ultimo_pk)[:tamanho_lote])
+                if not instancias:
+                    break
+                ultimo_pk = instancias[-1].pk
+                lote = [instancia for instancia in instancias if self.preencher_hash(instancia)]
+                if lote:
+                    atualizados[rotulo] += modelo.objects.bulk_update(lote, ['hash_conteudo'])
+        return atualizados
+
+
+# Instância global do serviço
+conteudo_service = ConteudoService()
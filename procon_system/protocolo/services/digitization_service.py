@@ -10,6 +10,7 @@ from django.utils import timezone
 from .ocr_service import ocr_service
 from .indexing_service import indexing_service
 from .quality_service import quality_service
+from .conteudo_service import conteudo_service
 
 logger = logging.getLogger(__name__)
 
@@ -24,13 +25,19 @@ class DigitizationService:
         self.ocr_service = ocr_service
         self.indexing_service = indexing_service
         self.quality_service = quality_service
+        self.conteudo_service = conteudo_service
     
-    def process_document_upload(self, documento) -> Dict:
+    def process_document_upload(self, documento, forcar: bool = False) -> Dict:
         """
         Processa completamente um documento upload
         
+        Qualidade e texto ficam em ConteudoArquivo pelo hash do arquivo: um
+        conteúdo já processado (reenvio ou o mesmo arquivo em outro
+        protocolo, caixa de entrada ou auto) é reaproveitado sem nova análise
+        
         Args:
             documento: Instância do DocumentoProtocolo
+            forcar: Reprocessa mesmo que o conteúdo já tenha sido processado
             
         Returns:
             dict: Resultado completo do processamento
@@ -40,6 +47,7 @@ class DigitizationService:
             'document_id': documento.id,
             'processing_steps': [],
             'ocr_text': '',
+            'reused_content': False,
             'keywords': [],
             'categories': [],
             'quality_assessment': {},
@@ -49,24 +57,21 @@ class DigitizationService:
         }
         
         try:
-            # Etapa 1: Análise de Qualidade
-            result['processing_steps'].append('quality_analysis')
-            quality_result = self._analyze_quality(documento)
-            result['quality_assessment'] = quality_result
-            
-            if not quality_result.get('success'):
+            # Etapas 1 e 2: Análise de Qualidade e Extração de Texto (OCR), uma vez por conteúdo
+            conteudo, reaproveitado = self.conteudo_service.processar(documento, forcar=forcar)
+            result['reused_content'] = reaproveitado
+            result['processing_steps'].extend(
+                ['content_reuse'] if reaproveitado else ['quality_analysis', 'text_extraction']
+            )
+            result['quality_assessment'] = conteudo.qualidade
+            if not conteudo.qualidade.get('success'):
                 result['warnings'].append("Falha na análise de qualidade")
             
-            # Etapa 2: Extração de Texto (OCR)
-            result['processing_steps'].append('text_extraction')
-            ocr_result = self._extract_text(documento)
-            
-            if ocr_result.get('success'):
-                result['ocr_text'] = ocr_result.get('text', '')
-                documento.texto_extraido = result['ocr_text']
-                documento.save()
+            if conteudo.texto_extraido:
+                result['ocr_text'] = conteudo.texto_extraido
+                documento.texto_extraido = conteudo.texto_extraido
             else:
-                result['errors'].extend(ocr_result.get('errors', []))
+                result['errors'].append("Nenhum texto extraído do documento")
                 # Continuar mesmo com falha no OCR se houver texto
                 if documento.texto_extraido:
                     result['ocr_text'] = documento.texto_extraido
@@ -128,18 +133,10 @@ class DigitizationService:
             logger.error(f"Erro na análise de qualidade: {str(e)}")
             return {'success': False, 'error': str(e)}
     
-    def _extract_text(self, documento) -> Dict:
-        """Extrai texto usando OCR"""
-        try:
-            return self.ocr_service.extract_text_from_document(documento)
-        except Exception as e:
-            logger.error(f"Erro na extração de texto: {str(e)}")
-            return {'success': False, 'errors': [str(e)]}
-    
     def _index_document(self, documento) -> Dict:
-        """Indexa documento para busca"""
+        """Indexa documento para busca (a partir do texto já extraído, sem reler o arquivo)"""
         try:
-            return self.indexing_service.index_document(documento)
+            return self.indexing_service.index_record(documento)
         except Exception as e:
             logger.error(f"Erro na indexação: {str(e)}")
             return {'success': False, 'errors': [str(e)]}
@@ -162,23 +159,22 @@ class DigitizationService:
             logger.error(f"Erro na finalização: {str(e)}")
             result['warnings'].append(f"Erro na finalização: {str(e)}")
 
-    def search_documents(self, query: str, protocolo=None) -> List:
+    def search_documents(self, query: str, protocolo=None, limit: int = 20) -> List:
         """
-        Busca documentos usando o serviço de indexação
+        Busca documentos no índice de texto completo
         
         Args:
             query: Texto de busca
             protocolo: Protocolo específico (opcional)
+            limit: Quantidade máxima de resultados
             
         Returns:
-            list: Documentos encontrados
+            list: Resultados ordenados por relevância, com trecho destacado
         """
         try:
-            filters = {}
-            if protocolo:
-                filters['protocolo_id'] = protocolo.id
-            
-            return self.indexing_service.search_documents(query, filters)
+            return self.indexing_service.search_documents(
+                query, protocolo_id=protocolo.id if protocolo else None, limit=limit
+            )
             
         except Exception as e:
             logger.error(f"Erro na busca: {str(e)}")
@@ -202,20 +198,33 @@ class DigitizationService:
             if protocolo:
                 base_query = base_query.filter(protocolo=protocolo)
             
-            total_docs = base_query.count()
-            indexed_docs = base_query.filter(indexado=True).count()
+            # Contagens e tamanho do texto em um único aggregate (tamanho_texto gravado no save)
+            from django.db.models import Count, Q, Sum
+            totais = base_query.aggregate(
+                total=Count('id'),
+                indexados=Count('id', filter=Q(indexado=True)),
+                com_texto=Count('id', filter=Q(indexado=True, tamanho_texto__gt=0)),
+                tamanho_texto=Sum('tamanho_texto', filter=Q(indexado=True)),
+                conteudos_distintos=Count('hash_conteudo', filter=~Q(hash_conteudo=''), distinct=True),
+                com_hash=Count('id', filter=~Q(hash_conteudo='')),
+            )
+            total_docs = totais['total']
+            indexed_docs = totais['indexados']
+            total_text_length = totais['tamanho_texto'] or 0
             
             stats = {
                 'total_documents': total_docs,
                 'indexed_documents': indexed_docs,
                 'pending_documents': total_docs - indexed_docs,
                 'indexing_rate': (indexed_docs / total_docs * 100) if total_docs > 0 else 0,
+                'unique_contents': totais['conteudos_distintos'],
+                'duplicate_documents': totais['com_hash'] - totais['conteudos_distintos'],
                 'by_type': {},
                 'by_extension': {},
                 'text_statistics': {
-                    'total_text_length': 0,
-                    'average_text_length': 0,
-                    'documents_with_text': 0
+                    'total_text_length': total_text_length,
+                    'average_text_length': total_text_length / totais['com_texto'] if totais['com_texto'] else 0,
+                    'documents_with_text': totais['com_texto']
                 },
                 'processing_capabilities': {
                     'ocr_enabled': True,
@@ -226,7 +235,6 @@ class DigitizationService:
             }
             
             # Estatísticas por tipo
-            from django.db.models import Count
             by_type = base_query.values('tipo').annotate(count=Count('id'))
             for item in by_type:
                 stats['by_type'][item['tipo']] = item['count']
@@ -236,87 +244,65 @@ class DigitizationService:
             for item in by_ext:
                 stats['by_extension'][item['extensao']] = item['count']
             
-            # Estatísticas de texto
-            docs_with_text = base_query.filter(
-                indexado=True,
-                texto_extraido__isnull=False
-            ).exclude(texto_extraido='')
-            
-            if docs_with_text.exists():
-                total_text_length = sum(len(doc.texto_extraido) for doc in docs_with_text)
-                stats['text_statistics']['total_text_length'] = total_text_length
-                stats['text_statistics']['documents_with_text'] = docs_with_text.count()
-                stats['text_statistics']['average_text_length'] = total_text_length / docs_with_text.count()
-            
             return stats
             
         except Exception as e:
             logger.error(f"Erro ao calcular estatísticas: {str(e)}")
             return {'error': str(e)}
     
-    def batch_process_documents(self, documentos: List) -> Dict:
+    def batch_process_documents(self, documentos: List, max_workers: Optional[int] = None) -> Dict:
         """
         Processa múltiplos documentos em lote
         
+        O OCR roda no pipeline paralelo por página do OCRService e o texto é
+        gravado em bulk_update junto com a análise de qualidade (ConteudoArquivo)
+        
         Args:
             documentos: Lista de instâncias do DocumentoProtocolo
+            max_workers: Processos do pool de OCR (padrão: OCR_MAX_WORKERS)
             
         Returns:
             dict: Resultado do processamento em lote
         """
+        ocr = self.ocr_service.process_documents(documentos, max_workers=max_workers)
         result = {
-            'total_documents': len(documentos),
-            'processed': 0,
-            'failed': 0,
-            'results': [],
+            'total_documents': ocr['total'],
+            'processed': ocr['processados'],
+            'failed': ocr['falhas'],
+            'results': ocr['resultados'],
+            'pages': ocr['paginas'],
+            'pages_per_second': ocr['paginas_por_segundo'],
             'summary': {
-                'success_rate': 0,
-                'avg_processing_time': 0,
-                'total_text_extracted': 0,
+                'success_rate': (ocr['processados'] / ocr['total'] * 100) if ocr['total'] > 0 else 0,
+                'avg_processing_time': ocr['tempo'] / ocr['total'] if ocr['total'] > 0 else 0,
+                'total_text_extracted': sum(len(doc.texto_extraido) for doc in documentos),
+                'cached_documents': ocr['em_cache'],
+                'ocr_pages': ocr['paginas_ocr'],
+                'text_layer_pages': ocr['paginas_texto'],
                 'quality_distribution': {}
-            }
+            },
+            'total_processing_time': ocr['tempo'],
         }
         
-        import time
-        start_time = time.time()
-        
+        # Qualidade já gravada em ConteudoArquivo pelo OCR em lote; só analisa
+        # (uma vez por hash) o que não tiver resultado armazenado
+        from ..models import ConteudoArquivo
+
+        hashes = {documento.hash_conteudo for documento in documentos if documento.hash_conteudo}
+        qualidades = dict(
+            ConteudoArquivo.objects.filter(hash_sha256__in=hashes).exclude(qualidade={})
+            .values_list('hash_sha256', 'qualidade')
+        )
         for documento in documentos:
-            try:
-                doc_start = time.time()
-                doc_result = self.process_document_upload(documento)
-                doc_end = time.time()
-                
-                doc_result['processing_time'] = doc_end - doc_start
-                result['results'].append(doc_result)
-                
-                if doc_result['success']:
-                    result['processed'] += 1
-                else:
-                    result['failed'] += 1
-                
-                # Atualizar estatísticas
-                if doc_result.get('quality_assessment', {}).get('success'):
-                    quality_level = doc_result['quality_assessment'].get('quality_level', 'unknown')
-                    result['summary']['quality_distribution'][quality_level] = \
-                        result['summary']['quality_distribution'].get(quality_level, 0) + 1
-                
-                if doc_result.get('ocr_text'):
-                    result['summary']['total_text_extracted'] += len(doc_result['ocr_text'])
-                
-            except Exception as e:
-                logger.error(f"Erro no processamento em lote do documento {documento.id}: {str(e)}")
-                result['failed'] += 1
-                result['results'].append({
-                    'success': False,
-                    'document_id': documento.id,
-                    'errors': [str(e)]
-                })
-        
-        # Calcular estatísticas finais
-        total_time = time.time() - start_time
-        result['summary']['success_rate'] = (result['processed'] / result['total_documents'] * 100) if result['total_documents'] > 0 else 0
-        result['summary']['avg_processing_time'] = total_time / result['total_documents'] if result['total_documents'] > 0 else 0
-        result['total_processing_time'] = total_time
+            quality = qualidades.get(documento.hash_conteudo)
+            if quality is None:
+                quality = self._analyze_quality(documento)
+                if documento.hash_conteudo:
+                    qualidades[documento.hash_conteudo] = quality
+            if quality.get('success'):
+                quality_level = quality.get('quality_level', 'unknown')
+                result['summary']['quality_distribution'][quality_level] = \
+                    result['summary']['quality_distribution'].get(quality_level, 0) + 1
         
         return result
     
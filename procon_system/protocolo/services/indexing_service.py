@@ -1,13 +1,20 @@
 """
 Serviço de indexação de documentos para o módulo de protocolo
+
+A busca usa um índice de texto completo persistente sobre o título e o
+texto_extraido de DocumentoProtocolo (migração 0002): coluna tsvector com
+GIN no PostgreSQL e tabela FTS5 no SQLite, ambos mantidos pelo banco quando o
+texto é gravado na ingestão. Nenhum arquivo é lido na busca.
 """
 
 import os
+import re
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from django.conf import settings
 from django.core.files.storage import default_storage
 from django.core.files.base import ContentFile
+from django.db import connection
 
 logger = logging.getLogger(__name__)
 
@@ -17,8 +24,12 @@ class IndexingService:
     Serviço para indexação de documentos
     """
     
+    TABLE = 'protocolo_documentoprotocolo'
+    FTS_TABLE = 'protocolo_documento_fts'
+    
     def __init__(self):
         self.supported_formats = ['.pdf', '.doc', '.docx', '.txt']
+        self._fts_disponivel = None
     
     def index_document(self, document_path: str) -> Dict[str, Any]:
         """
@@ -118,30 +129,14 @@ class IndexingService:
     
     def _extract_pdf_text_fallback(self, pdf_path: str) -> str:
         """
-        Fallback para extração de texto PDF usando OCR
+        Fallback para extração de texto PDF usando OCR (página a página)
         """
-        try:
-            import pytesseract
-            from PIL import Image
-            import pdf2image
-            
-            # Converte PDF para imagens
-            images = pdf2image.convert_from_path(pdf_path)
-            text = ""
-            
-            for image in images:
-                # Extrai texto usando OCR
-                page_text = pytesseract.image_to_string(image, lang='por')
-                text += page_text + "\n"
-            
-            return text
-            
-        except ImportError:
-            logger.warning("Dependências OCR não instaladas")
-            return ""
-        except Exception as e:
-            logger.error(f"Erro no fallback OCR: {str(e)}")
-            return ""
+        from .ocr_service import ocr_service
+        
+        resultado = ocr_service.extract_text_from_path(pdf_path)
+        for erro in resultado['errors']:
+            logger.warning(f"OCR de {pdf_path}: {erro}")
+        return resultado['text']
     
     def _extract_word_text(self, word_path: str) -> str:
         """
@@ -165,37 +160,141 @@ class IndexingService:
             logger.error(f"Erro ao extrair texto do Word: {str(e)}")
             return ""
     
-    def search_documents(self, query: str, documents: List[str]) -> List[Dict[str, Any]]:
+    def index_record(self, documento) -> Dict[str, Any]:
         """
-        Busca em documentos indexados
+        Confirma a indexação de um DocumentoProtocolo a partir do texto já
+        extraído (o índice de texto completo é atualizado pelo banco)
         """
-        results = []
+        texto = documento.texto_extraido or ''
+        if not texto:
+            return {'success': False, 'errors': ['Documento sem texto extraído']}
         
-        for doc_path in documents:
-            try:
-                # Indexa o documento se necessário
-                indexed_data = self.index_document(doc_path)
-                
-                if indexed_data.get('success') and 'text_content' in indexed_data:
-                    text_content = indexed_data['text_content'].lower()
-                    query_lower = query.lower()
-                    
-                    # Busca simples por palavras-chave
-                    if query_lower in text_content:
-                        results.append({
-                            'document_path': doc_path,
-                            'metadata': indexed_data.get('metadata', {}),
-                            'relevance_score': self._calculate_relevance(query_lower, text_content),
-                            'matched_content': self._extract_matched_content(text_content, query_lower)
-                        })
-            
-            except Exception as e:
-                logger.error(f"Erro ao buscar no documento {doc_path}: {str(e)}")
-                continue
+        return {
+            'success': True,
+            'metadata': {
+                'text_length': len(texto),
+                'word_count': len(texto.split()),
+            },
+            'indexed': True
+        }
+    
+    def rebuild_index(self) -> int:
+        """
+        Reconstrói o índice a partir de texto_extraido (SQLite/FTS5); no
+        PostgreSQL a coluna gerada já reflete o conteúdo atual
+        """
+        from protocolo.models import DocumentoProtocolo
+        
+        if self._backend() == 'fts5':
+            with connection.cursor() as cursor:
+                cursor.execute(f"INSERT INTO {self.FTS_TABLE}({self.FTS_TABLE}) VALUES ('rebuild')")
+        return DocumentoProtocolo.objects.exclude(texto_extraido='').count()
+    
+    def _backend(self) -> str:
+        if connection.vendor == 'postgresql':
+            return 'postgresql'
+        if connection.vendor == 'sqlite':
+            if not self._fts_disponivel:  # só o resultado positivo fica em memória
+                self._fts_disponivel = self.FTS_TABLE in connection.introspection.table_names()
+            if self._fts_disponivel:
+                return 'fts5'
+        return 'like'
+    
+    def search_documents(self, query: str, protocolo_id: Optional[int] = None,
+                         limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Busca no índice de texto completo, ordenada por relevância, com trecho
+        destacado (<mark>) de cada documento
+        """
+        termos = re.findall(r'\w+', query or '')
+        if not termos:
+            return []
+        
+        backend = self._backend()
+        if backend == 'postgresql':
+            linhas = self._search_postgresql(query, protocolo_id, limit)
+        elif backend == 'fts5':
+            linhas = self._search_fts5(termos, protocolo_id, limit)
+        else:
+            linhas = self._search_like(query, protocolo_id, limit)
+        
+        return [
+            {
+                'document_id': documento_id,
+                'protocolo_id': protocolo,
+                'titulo': titulo,
+                'relevance_score': round(float(relevancia), 6),
+                'matched_content': trecho or '',
+            }
+            for documento_id, protocolo, titulo, relevancia, trecho in linhas
+        ]
+    
+    def _search_postgresql(self, query: str, protocolo_id: Optional[int], limit: int) -> List[tuple]:
+        filtro, parametros = '', [query]
+        if protocolo_id:
+            filtro, parametros = 'AND d.protocolo_id = %s', [query, protocolo_id]
+        
+        # O trecho (ts_headline) só é calculado para os documentos já limitados
+        sql = f"""
+            SELECT r.id, r.protocolo_id, r.titulo, r.relevancia,
+                   ts_headline('portuguese', r.texto_extraido, r.q,
+                               'StartSel=<mark>, StopSel=</mark>, MaxWords=35, MinWords=15, MaxFragments=2')
+            FROM (
+                SELECT d.id, d.protocolo_id, d.titulo, d.texto_extraido, q,
+                       ts_rank_cd(d.busca_vetor, q) AS relevancia
+                FROM {self.TABLE} d, websearch_to_tsquery('portuguese', %s) q
+                WHERE d.busca_vetor @@ q {filtro}
+                ORDER BY relevancia DESC, d.id DESC
+                LIMIT %s
+            ) r
+            ORDER BY r.relevancia DESC, r.id DESC
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(sql, parametros + [limit])
+            return cursor.fetchall()
+    
+    def _search_fts5(self, termos: List[str], protocolo_id: Optional[int], limit: int) -> List[tuple]:
+        # Todos os termos (E), cada um como prefixo; aspas neutralizam a sintaxe do FTS5
+        consulta = ' '.join(f'"{termo}"*' for termo in termos)
+        filtro, parametros = '', [consulta]
+        if protocolo_id:
+            filtro, parametros = 'AND d.protocolo_id = %s', [consulta, protocolo_id]
+        
+        sql = f"""
+            SELECT d.id, d.protocolo_id, d.titulo,
+                   -bm25({self.FTS_TABLE}, 10.0, 1.0) AS relevancia,
+                   snippet({self.FTS_TABLE}, 1, '<mark>', '</mark>', '…', 24)
+            FROM {self.FTS_TABLE}
+            JOIN {self.TABLE} d ON d.id = {self.FTS_TABLE}.rowid
+            WHERE {self.FTS_TABLE} MATCH %s {filtro}
+            ORDER BY relevancia DESC, d.id DESC
+            LIMIT %s
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(sql, parametros + [limit])
+            return cursor.fetchall()
+    
+    def _search_like(self, query: str, protocolo_id: Optional[int], limit: int) -> List[tuple]:
+        """Bancos sem índice de texto: busca no texto gravado, sem ler arquivos"""
+        from protocolo.models import DocumentoProtocolo
+        
+        queryset = DocumentoProtocolo.objects.filter(texto_extraido__icontains=query.strip())
+        if protocolo_id:
+            queryset = queryset.filter(protocolo_id=protocolo_id)
         
-        # Ordena por relevância
-        results.sort(key=lambda x: x['relevance_score'], reverse=True)
-        return results
+        query_lower = query.lower()
+        linhas = []
+        for documento_id, protocolo, titulo, texto in queryset.values_list(
+            'id', 'protocolo_id', 'titulo', 'texto_extraido'
+        ).iterator():
+            texto = texto.lower()
+            linhas.append((
+                documento_id, protocolo, titulo,
+                self._calculate_relevance(query_lower, texto),
+                self._extract_matched_content(texto, query_lower),
+            ))
+        linhas.sort(key=lambda linha: (linha[3], linha[0]), reverse=True)
+        return linhas[:limit]
     
     def _calculate_relevance(self, query: str, text: str) -> float:
         """
@@ -1,75 +1,360 @@
 """
 Serviço de OCR (Optical Character Recognition) para documentos
 Implementa extração de texto de documentos digitalizados
+
+Os documentos são quebrados em páginas e cada página é uma tarefa do pool de
+processos: páginas de PDF com camada de texto são lidas direto (PyPDF2), as
+demais são renderizadas uma a uma (pdf2image, first_page/last_page) e passam
+pelo Tesseract. Assim só uma página por worker fica em memória. O resultado
+de cada arquivo fica em cache pelo hash do conteúdo e a gravação de
+texto_extraido/indexado é feita em bulk_update.
 """
+import hashlib
 import os
+import shutil
 import tempfile
-from typing import Dict, List, Optional, Tuple
-from PIL import Image, ImageEnhance, ImageFilter
-# import pytesseract
-# import cv2
-# import numpy as np
+import time
+from contextlib import ExitStack, contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from PIL import Image, ImageOps
 from django.conf import settings
-from django.core.files.storage import default_storage
+from django.core.cache import caches
 import logging
 
+from core.lotes import agrupar, executar_em_lotes
+
 logger = logging.getLogger(__name__)
 
+FORMATOS_PDF = ('.pdf',)
+FORMATOS_IMAGEM = ('.png', '.jpg', '.jpeg', '.tiff', '.tif', '.bmp')
+
+# Leitor do último PDF aberto em cada worker (páginas do mesmo arquivo chegam em sequência)
+_leitor_pdf = {}
+
+
+def renderizar_pagina_pdf(caminho: str, indice: int, dpi: int) -> Image.Image:
+    """Renderiza uma única página do PDF (índice a partir de 0)"""
+    import pdf2image
+
+    return pdf2image.convert_from_path(caminho, dpi=dpi, first_page=indice + 1, last_page=indice + 1)[0]
+
+
+def reconhecer_texto(imagem: Image.Image, idioma: str) -> Tuple[str, Optional[float]]:
+    """Aplica o Tesseract na imagem e retorna (texto, confiança média 0-100)"""
+    import pytesseract
+
+    dados = pytesseract.image_to_data(imagem, lang=idioma, output_type=pytesseract.Output.DICT)
+    linhas = {}
+    confiancas = []
+    for palavra, confianca, bloco, paragrafo, linha in zip(
+        dados['text'], dados['conf'], dados['block_num'], dados['par_num'], dados['line_num']
+    ):
+        if not palavra.strip():
+            continue
+        linhas.setdefault((bloco, paragrafo, linha), []).append(palavra)
+        if float(confianca) >= 0:
+            confiancas.append(float(confianca))
+    texto = '\n'.join(' '.join(palavras) for palavras in linhas.values())
+    return texto, (sum(confiancas) / len(confiancas) if confiancas else None)
+
+
+def _camada_texto_pdf(caminho: str, indice: int) -> str:
+    try:
+        from PyPDF2 import PdfReader
+    except ImportError:
+        return ''
+    if _leitor_pdf.get('caminho') != caminho:
+        _leitor_pdf.clear()
+        _leitor_pdf.update(caminho=caminho, leitor=PdfReader(caminho))
+    return _leitor_pdf['leitor'].pages[indice].extract_text() or ''
+
+
+def _imagem_da_pagina(caminho: str, tipo: str, indice: int, dpi: int) -> Image.Image:
+    if tipo == 'pdf':
+        return renderizar_pagina_pdf(caminho, indice, dpi)
+    with Image.open(caminho) as imagem:
+        imagem.seek(indice)
+        return imagem.copy()
+
+
+def _processar_paginas(tarefas: List[Tuple]) -> List[Dict]:
+    """
+    Worker do pool: processa um grupo de páginas. Cada tarefa é
+    (chave, caminho, tipo, indice, configuracao)
+    """
+    resultados = []
+    for chave, caminho, tipo, indice, configuracao in tarefas:
+        resultado = {'chave': chave, 'pagina': indice + 1, 'texto': '', 'metodo': 'ocr', 'confianca': None}
+        try:
+            if tipo == 'pdf':
+                texto = _camada_texto_pdf(caminho, indice).strip()
+                if len(texto) >= configuracao['min_caracteres']:
+                    resultado.update(texto=texto, metodo='texto', confianca=100.0)
+                    resultados.append(resultado)
+                    continue
+            imagem = ImageOps.grayscale(_imagem_da_pagina(caminho, tipo, indice, configuracao['dpi']))
+            texto, confianca = reconhecer_texto(imagem, configuracao['idioma'])
+            imagem.close()
+            resultado.update(texto=texto.strip(), confianca=confianca)
+        except ImportError as e:
+            resultado.update(metodo='erro', erro=f'Dependência de OCR não instalada: {e.name}')
+        except Exception as e:
+            resultado.update(metodo='erro', erro=f'Página {indice + 1}: {e}')
+        resultados.append(resultado)
+    return resultados
+
 
 class OCRService:
-    """Serviço de OCR temporário para permitir migração"""
-    
+    """Serviço de OCR com pool de processos por página"""
+
     def __init__(self):
-        self.supported_formats = ['.pdf', '.png', '.jpg', '.jpeg', '.tiff', '.bmp']
-        logger.warning("OCR temporariamente desabilitado - dependências não instaladas")
-    
-    def extract_text_from_document(self, documento) -> Dict:
-        """Método temporário que retorna erro"""
+        self.supported_formats = list(FORMATOS_PDF + FORMATOS_IMAGEM)
+        self.idioma = getattr(settings, 'OCR_IDIOMA', 'por')
+        self.dpi = getattr(settings, 'OCR_DPI', 200)
+        self.min_caracteres = getattr(settings, 'OCR_MIN_CARACTERES_PAGINA', 20)
+        self.paginas_por_tarefa = getattr(settings, 'OCR_PAGINAS_POR_TAREFA', 1)
+        self.max_workers = getattr(settings, 'OCR_MAX_WORKERS', os.cpu_count() or 1)
+        self.lote_gravacao = getattr(settings, 'OCR_LOTE_GRAVACAO', 100)
+        self.cache_timeout = getattr(settings, 'OCR_CACHE_TIMEOUT', 60 * 60 * 24 * 30)
+
+    @property
+    def cache(self):
+        return caches['long_term']
+
+    def _configuracao(self) -> Dict:
+        return {'idioma': self.idioma, 'dpi': self.dpi, 'min_caracteres': self.min_caracteres}
+
+    def _chave_cache(self, hash_arquivo: str) -> str:
+        return f'ocr:{self.idioma}:{self.dpi}:{hash_arquivo}'
+
+    def hash_arquivo(self, caminho: str) -> str:
+        """SHA-256 do conteúdo do arquivo, lido em blocos"""
+        resumo = hashlib.sha256()
+        with open(caminho, 'rb') as arquivo:
+            for bloco in iter(lambda: arquivo.read(1024 * 1024), b''):
+                resumo.update(bloco)
+        return resumo.hexdigest()
+
+    def contar_paginas(self, caminho: str) -> int:
+        """Número de páginas do PDF ou de quadros da imagem (TIFF multipágina)"""
+        extensao = os.path.splitext(caminho)[1].lower()
+        if extensao in FORMATOS_PDF:
+            try:
+                from PyPDF2 import PdfReader
+                return len(PdfReader(caminho).pages)
+            except ImportError:
+                import pdf2image
+                return pdf2image.pdfinfo_from_path(caminho)['Pages']
+        with Image.open(caminho) as imagem:
+            return getattr(imagem, 'n_frames', 1)
+
+    def _executar(self, arquivos: Iterable[Tuple], max_workers: int) -> Iterator[Tuple]:
+        """
+        Distribui as páginas de (chave, caminho, total_paginas) pelo pool e
+        gera (chave, paginas) assim que todas as páginas de um arquivo chegam
+        """
+        configuracao = self._configuracao()
+        totais = {}
+
+        def tarefas():
+            for chave, caminho, total in arquivos:
+                totais[chave] = total
+                tipo = 'pdf' if os.path.splitext(caminho)[1].lower() in FORMATOS_PDF else 'imagem'
+                for indice in range(total):
+                    yield chave, caminho, tipo, indice, configuracao
+
+        atual, paginas = None, []
+        grupos = agrupar(tarefas(), self.paginas_por_tarefa)
+        for _, resultados in executar_em_lotes(_processar_paginas, grupos, max_workers, min_lotes_pool=2):
+            for resultado in resultados:
+                if resultado['chave'] != atual:
+                    atual, paginas = resultado['chave'], []
+                paginas.append(resultado)
+                if len(paginas) == totais[atual]:
+                    yield atual, paginas
+
+    def _consolidar(self, paginas: List[Dict]) -> Dict:
+        confiancas = [p['confianca'] for p in paginas if p['confianca'] is not None]
         return {
-            'success': False,
-            'text': '',
-            'confidence': 0.0,
-            'pages': [],
-            'language_detected': None,
-            'processing_time': 0,
-            'errors': ['OCR temporariamente desabilitado - dependências não instaladas']
+            'success': any(p['texto'] for p in paginas),
+            'text': '\n\n'.join(p['texto'] for p in paginas if p['texto']),
+            'confidence': round(sum(confiancas) / len(confiancas), 2) if confiancas else 0.0,
+            'pages': [
+                {k: p.get(k) for k in ('pagina', 'metodo', 'confianca', 'erro')} | {'caracteres': len(p['texto'])}
+                for p in paginas
+            ],
+            'errors': [p['erro'] for p in paginas if p.get('erro')],
         }
 
-    # def _extract_from_pdf(self, documento) -> Dict:
-    #     """Extrai texto de arquivo PDF"""
-    #     # Método temporariamente comentado
-    #     pass
-    
-    # def _fallback_pdf_to_images(self, documento) -> Dict:
-    #     """Fallback: converter PDF para imagens e processar com OCR"""
-    #     # Método temporariamente comentado
-    #     pass
-    
-    # def _extract_from_image(self, documento) -> Dict:
-    #     """Extrai texto de arquivo de imagem"""
-    #     # Método temporariamente comentado
-    #     pass
-    
-    # def _process_image_ocr(self, image_path: str, page_num: int = 1) -> Dict:
-    #     """Processa uma imagem individual com OCR"""
-    #     # Método temporariamente comentado
-    #     pass
-    
-    # def _preprocess_image(self, image) -> np.ndarray:
-    #     """Pré-processa imagem para melhorar OCR"""
-    #     # Método temporariamente comentado
-    #     pass
-    
-    # def detect_language(self, text: str) -> Dict:
-    #     """Detecta idioma do texto extraído"""
-    #     # Método temporariamente comentado
-    #     pass
-    
-    # def get_processing_statistics(self) -> Dict:
-    #     """Retorna estatísticas do processamento OCR"""
-    #     # Método temporariamente comentado
-    #     pass
+    def extract_text_from_path(self, caminho: str, max_workers: int = 1, usar_cache: bool = True) -> Dict:
+        """Extrai o texto de um arquivo local, página a página"""
+        inicio = time.time()
+        extensao = os.path.splitext(caminho)[1].lower()
+        if extensao not in self.supported_formats:
+            return {**self._falha(f'Formato não suportado: {extensao}'), 'processing_time': 0}
+
+        chave_cache = self._chave_cache(self.hash_arquivo(caminho))
+        resultado = self.cache.get(chave_cache) if usar_cache else None
+        if resultado is None:
+            resultado = self._falha('Documento sem páginas')
+            total = self.contar_paginas(caminho)
+            for _, paginas in self._executar([(caminho, caminho, total)] if total else [], max_workers):
+                resultado = self._consolidar(paginas)
+            if not resultado['errors']:
+                self.cache.set(chave_cache, resultado, self.cache_timeout)
+        return {**resultado, 'language_detected': self.idioma, 'processing_time': time.time() - inicio}
+
+    def extract_text_from_document(self, documento) -> Dict:
+        """Extrai o texto de um DocumentoProtocolo"""
+        try:
+            with self.arquivo_local(documento) as caminho:
+                return self.extract_text_from_path(caminho)
+        except Exception as e:
+            logger.error(f"Erro no OCR do documento {documento.id}: {str(e)}")
+            return {**self._falha(str(e)), 'language_detected': None, 'processing_time': 0}
+
+    @staticmethod
+    def _falha(erro: str) -> Dict:
+        return {'success': False, 'text': '', 'confidence': 0.0, 'pages': [], 'errors': [erro]}
+
+    @contextmanager
+    def arquivo_local(self, documento) -> Iterator[str]:
+        """Caminho local do arquivo; storages remotos são copiados para um temporário"""
+        arquivo = documento.arquivo
+        try:
+            caminho = arquivo.path
+        except NotImplementedError:
+            caminho = None
+        if caminho:
+            yield caminho
+            return
+        extensao = os.path.splitext(arquivo.name)[1]
+        with tempfile.NamedTemporaryFile(delete=False, suffix=extensao) as destino:
+            with arquivo.open('rb') as origem:
+                shutil.copyfileobj(origem, destino)
+        try:
+            yield destino.name
+        finally:
+            os.unlink(destino.name)
+
+    def _resultado_armazenado(self, hash_arquivo: str) -> Optional[Dict]:
+        """Resultado já extraído para o conteúdo: cache e, depois, ConteudoArquivo"""
+        from .conteudo_service import conteudo_service
+
+        resultado = self.cache.get(self._chave_cache(hash_arquivo))
+        if resultado is None:
+            conteudo = conteudo_service.obter(hash_arquivo)
+            if conteudo:
+                resultado = {
+                    'success': bool(conteudo.texto_extraido), 'text': conteudo.texto_extraido,
+                    'confidence': conteudo.confianca_ocr, 'errors': [],
+                    'pages': [{'pagina': numero} for numero in range(1, conteudo.paginas + 1)],
+                }
+        return resultado
+
+    def process_documents(self, documentos: Iterable, max_workers: Optional[int] = None,
+                          usar_cache: bool = True) -> Dict:
+        """
+        Pipeline de OCR em lote: páginas de todos os documentos no pool de
+        processos, reaproveitamento por hash do arquivo (cache, ConteudoArquivo
+        e documentos iguais do mesmo lote) e gravação em bulk_update
+
+        Returns:
+            dict: totais, páginas por segundo e resultado por documento
+        """
+        from ..models import DocumentoProtocolo
+        from .conteudo_service import conteudo_service
+
+        max_workers = self.max_workers if max_workers is None else max_workers
+        inicio = time.time()
+        relatorio = {
+            'total': 0, 'processados': 0, 'falhas': 0, 'em_cache': 0,
+            'paginas': 0, 'paginas_ocr': 0, 'paginas_texto': 0,
+            'resultados': [],
+        }
+        documentos_por_hash = {}
+        copias_locais = {}  # hash -> (ExitStack da cópia local, caminho), liberada ao concluir o documento
+        pendentes_gravacao = []
+
+        def registrar(documento, resultado):
+            documento.texto_extraido = resultado['text']
+            documento.tamanho_texto = len(resultado['text'])
+            documento.indexado = bool(resultado['text'])
+            pendentes_gravacao.append(documento)
+            relatorio['processados' if resultado['success'] else 'falhas'] += 1
+            relatorio['resultados'].append({
+                'document_id': documento.id, 'success': resultado['success'],
+                'pages': len(resultado['pages']), 'confidence': resultado['confidence'],
+                'cached': resultado.get('cached', False), 'errors': resultado['errors'],
+            })
+            if len(pendentes_gravacao) >= self.lote_gravacao:
+                gravar()
+
+        def gravar():
+            DocumentoProtocolo.objects.bulk_update(
+                pendentes_gravacao, ['texto_extraido', 'tamanho_texto', 'indexado', 'hash_conteudo']
+            )
+            pendentes_gravacao.clear()
+
+        def arquivos():
+            for documento in documentos:
+                relatorio['total'] += 1
+                copia = ExitStack()
+                try:
+                    caminho = copia.enter_context(self.arquivo_local(documento))
+                    if os.path.splitext(caminho)[1].lower() not in self.supported_formats:
+                        raise ValueError(f'Formato não suportado: {documento.extensao}')
+                    hash_arquivo = documento.hash_conteudo = self.hash_arquivo(caminho)
+                    if hash_arquivo in documentos_por_hash:  # mesmo conteúdo já está no pipeline
+                        documentos_por_hash[hash_arquivo].append(documento)
+                        copia.close()
+                        continue
+                    em_cache = self._resultado_armazenado(hash_arquivo) if usar_cache else None
+                    if em_cache is not None:
+                        relatorio['em_cache'] += 1
+                        registrar(documento, {**em_cache, 'cached': True})
+                        copia.close()
+                        continue
+                    total = self.contar_paginas(caminho)
+                    if not total:
+                        raise ValueError('Documento sem páginas')
+                except Exception as e:
+                    copia.close()
+                    registrar(documento, self._falha(str(e)))
+                    continue
+                documentos_por_hash[hash_arquivo] = [documento]
+                copias_locais[hash_arquivo] = copia, caminho
+                yield hash_arquivo, caminho, total
+
+        try:
+            for hash_arquivo, paginas in self._executar(arquivos(), max_workers):
+                resultado = self._consolidar(paginas)
+                relatorio['paginas'] += len(paginas)
+                relatorio['paginas_ocr'] += sum(1 for p in paginas if p['metodo'] == 'ocr')
+                relatorio['paginas_texto'] += sum(1 for p in paginas if p['metodo'] == 'texto')
+                if not resultado['errors']:
+                    self.cache.set(self._chave_cache(hash_arquivo), resultado, self.cache_timeout)
+                copia, caminho = copias_locais.pop(hash_arquivo)
+                with copia:
+                    # Qualidade junto do texto: ConteudoArquivo processado é reaproveitado sem reanálise
+                    qualidade = conteudo_service.quality_service.assess_document_quality(caminho)
+                    conteudo_service.registrar(hash_arquivo, resultado, qualidade, os.path.getsize(caminho))
+                for documento in documentos_por_hash.pop(hash_arquivo):
+                    registrar(documento, resultado)
+            if pendentes_gravacao:
+                gravar()
+        finally:
+            for copia, _ in copias_locais.values():
+                copia.close()
+
+        relatorio['tempo'] = time.time() - inicio
+        relatorio['paginas_por_segundo'] = relatorio['paginas'] / relatorio['tempo'] if relatorio['tempo'] else 0.0
+        logger.info(
+            f"OCR em lote: {relatorio['total']} documentos, {relatorio['paginas']} páginas "
+            f"({relatorio['paginas_por_segundo']:.1f} páginas/s), {relatorio['em_cache']} em cache"
+        )
+        return relatorio
 
 
 # Instância global do serviço
-ocr_service = OCRService()
\ No newline at end of file
+ocr_service = OCRService()
@@ -0,0 +1,19 @@
+"""
+Signals do módulo de protocolo
+"""
+
+from django.db.models.signals import pre_save
+from django.dispatch import receiver
+
+from .services.conteudo_service import conteudo_service
+
+
+# Hash do conteúdo calculado na gravação do upload, para reaproveitar a
+# extração de texto de arquivos repetidos entre protocolos, caixa de entrada e autos
+@receiver(pre_save, sender='protocolo.DocumentoProtocolo', dispatch_uid='hash_conteudo_documento_protocolo')
+@receiver(pre_save, sender='caixa_entrada.AnexoCaixaEntrada', dispatch_uid='hash_conteudo_anexo_caixa_entrada')
+@receiver(pre_save, sender='fiscalizacao.AnexoAuto', dispatch_uid='hash_conteudo_anexo_auto')
+def calcular_hash_conteudo(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    conteudo_service.preencher_hash(instance)
@@ -0,0 +1,27 @@
+"""
+Tarefas assíncronas para o módulo de protocolo
+"""
+from celery import shared_task
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def processar_documentos_lote(documento_ids, forcar=False, max_workers=None):
+    """
+    OCR, indexação e análise de qualidade de vários documentos, fora da
+    requisição (o pool de processos do OCR usa um worker por núcleo)
+    """
+    from .models import DocumentoProtocolo
+    from .services import digitization_service
+
+    documentos = DocumentoProtocolo.objects.filter(id__in=documento_ids)
+    if not forcar:
+        documentos = documentos.filter(indexado=False)
+
+    resultado = digitization_service.batch_process_documents(list(documentos), max_workers=max_workers)
+    logger.info(
+        f"Lote de documentos processado: {resultado['processed']} de {resultado['total_documents']}"
+    )
+    return resultado
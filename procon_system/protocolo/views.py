@@ -3,6 +3,7 @@ from django.urls import reverse_lazy
 from django.shortcuts import render, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.utils.decorators import method_decorator
+from django.conf import settings
 from django.db.models import Q, Count, Avg
 from django.utils import timezone
 from datetime import timedelta
@@ -37,6 +38,7 @@ from .serializers import (
 from .services import (
     ocr_service, indexing_service, digitization_service, quality_service
 )
+from .tasks import processar_documentos_lote
 
 
 # Template Views (mantidas para compatibilidade)
@@ -353,9 +355,29 @@ class DocumentoProtocoloViewSet(viewsets.ModelViewSet):
             if protocolo_id:
                 protocolo = get_object_or_404(Protocolo, id=protocolo_id)
             
-            documentos = digitization_service.search_documents(query, protocolo)
-            serializer = DocumentoProtocoloListSerializer(documentos, many=True)
-            return Response(serializer.data)
+            try:
+                limite = min(max(int(request.query_params.get('limite', 20)), 1), 100)
+            except ValueError:
+                return Response({
+                    'message': 'Parâmetro limite inválido'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            resultados = digitization_service.search_documents(query, protocolo, limite)
+            documentos = DocumentoProtocolo.objects.select_related('enviado_por').in_bulk(
+                [resultado['document_id'] for resultado in resultados]
+            )
+            dados = []
+            for resultado in resultados:
+                documento = documentos.get(resultado['document_id'])
+                if documento is None:
+                    continue
+                dados.append({
+                    **DocumentoProtocoloListSerializer(documento).data,
+                    'protocolo': resultado['protocolo_id'],
+                    'relevancia': resultado['relevance_score'],
+                    'trecho': resultado['matched_content'],
+                })
+            return Response(dados)
             
         except Exception as e:
             return Response({
@@ -394,12 +416,16 @@ class DocumentoProtocoloViewSet(viewsets.ModelViewSet):
             }, status=status.HTTP_400_BAD_REQUEST)
         
         try:
-            documentos = DocumentoProtocolo.objects.filter(id__in=documento_ids)
-            
-            if not forcar:
-                documentos = documentos.filter(indexado=False)
+            if getattr(settings, 'CELERY_BROKER_URL', None):
+                tarefa = processar_documentos_lote.delay(documento_ids, forcar)
+                return Response({
+                    'message': 'Processamento em lote agendado',
+                    'task_id': tarefa.id,
+                    'total_documents': len(documento_ids)
+                }, status=status.HTTP_202_ACCEPTED)
             
-            results = digitization_service.batch_process_documents(list(documentos))
+            # Sem Celery o lote roda na própria requisição, com um único processo
+            results = processar_documentos_lote(documento_ids, forcar, max_workers=1)
             return Response(results)
             
         except Exception as e:
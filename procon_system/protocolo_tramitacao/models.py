@@ -174,10 +174,10 @@ class ProtocoloDocumento(models.Model):
         return f"{data_str}-{hora_str}-{count:03d}"
     
     def calcular_prazo_resposta(self):
-        """Calcula prazo baseado no tipo de documento"""
-        from datetime import timedelta
+        """Calcula prazo baseado no tipo de documento (em dias úteis)"""
+        from monitoring.calendario import calendario_service
         prazo_dias = self.tipo_documento.prazo_resposta_dias
-        return timezone.now() + timedelta(days=prazo_dias)
+        return calendario_service.adicionar_dias_uteis(timezone.now(), prazo_dias)
     
     @property
     def esta_no_prazo(self):
@@ -430,3 +430,8 @@ class ConfiguracaoProtocolo(models.Model):
     
     def __str__(self):
         return "Configurações do Sistema de Protocolo"
+
+
+# Modelos de notificação automática ficam em notifications.py; importados aqui
+# para que o app os registre e gere as migrações
+from .notifications import TipoNotificacao, Notificacao  # noqa: E402,F401
@@ -3,7 +3,7 @@ SISPROCON - Sistema de Notificações Automáticas
 Gerencia notificações de prazos, vencimentos e atualizações importantes
 """
 
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.utils import timezone
 from datetime import timedelta
@@ -11,6 +11,10 @@ from django.core.mail import send_mail
 from django.conf import settings
 
 
+# Registros por consulta/INSERT nas verificações automáticas
+TAMANHO_LOTE_VERIFICACAO = 1000
+
+
 class TipoNotificacao(models.Model):
     """Tipos de notificações do sistema"""
     
@@ -68,6 +72,10 @@ class Notificacao(models.Model):
     tentativas_envio = models.IntegerField("Tentativas de Envio", default=0)
     ultimo_erro = models.TextField("Último Erro", blank=True)
     
+    # objeto:id:tipo:usuario:dia nas verificações automáticas; impede que duas
+    # execuções no mesmo dia (ou em paralelo) notifiquem em dobro
+    chave_dedup = models.CharField("Chave de Deduplicação", max_length=120, unique=True, null=True, blank=True)
+    
     class Meta:
         verbose_name = "Notificação"
         verbose_name_plural = "Notificações"
@@ -128,11 +136,7 @@ class GerenciadorNotificacoes:
     """Classe utilitária para gerenciar notificações automáticas"""
     
     @staticmethod
-    def criar_notificacao_prazo_vencimento(protocolo):
-        """Cria notificação de prazo vencendo"""
-        if not protocolo.responsavel_atual:
-            return None
-        
+    def tipo_prazo_vencendo():
         tipo_notif, created = TipoNotificacao.objects.get_or_create(
             nome="Prazo Vencendo",
             defaults={
@@ -141,20 +145,65 @@ class GerenciadorNotificacoes:
                 'dias_antecedencia': 3
             }
         )
-        
-        notificacao = Notificacao.objects.create(
-            tipo=tipo_notif,
-            usuario=protocolo.responsavel_atual,
-            titulo=f"Prazo vencendo - Protocolo {protocolo.numero_protocolo}",
-            mensagem=f"""
-O protocolo {protocolo.numero_protocolo} possui prazo vencendo em {protocolo.dias_para_vencimento} dias.
+        return tipo_notif
+    
+    @staticmethod
+    def tipo_multa_vencida():
+        tipo_notif, created = TipoNotificacao.objects.get_or_create(
+            nome="Multa Vencida",
+            defaults={
+                'descricao': 'Notificação de multa com pagamento vencido',
+                'prioridade': 'critica'
+            }
+        )
+        return tipo_notif
+    
+    @staticmethod
+    def texto_prazo_vencimento(numero, dias_para_vencimento, assunto, remetente, prazo):
+        """Título e mensagem da notificação de prazo vencendo (individual e em lote)"""
+        titulo = f"Prazo vencendo - Protocolo {numero}"
+        mensagem = f"""
+O protocolo {numero} possui prazo vencendo em {dias_para_vencimento} dias.
 
-Assunto: {protocolo.assunto}
-Remetente: {protocolo.remetente_nome}
-Prazo: {protocolo.prazo_resposta.strftime('%d/%m/%Y')}
+Assunto: {assunto}
+Remetente: {remetente}
+Prazo: {prazo.strftime('%d/%m/%Y')}
 
 É necessário tomar providências urgentes.
-            """.strip(),
+        """.strip()
+        return titulo, mensagem
+    
+    @staticmethod
+    def texto_multa_vencida(multa, dias_vencida):
+        """Título e mensagem da notificação de multa vencida (individual e em lote)"""
+        titulo = f"Multa vencida - {multa.empresa.razao_social}"
+        mensagem = f"""
+A multa #{multa.pk} está vencida há {dias_vencida} dias.
+
+Empresa: {multa.empresa.razao_social}
+CNPJ: {multa.empresa.cnpj}
+Valor: R$ {multa.valor:.2f}
+Vencimento: {multa.data_vencimento.strftime('%d/%m/%Y')}
+
+É necessário iniciar processo de cobrança.
+        """.strip()
+        return titulo, mensagem
+    
+    @staticmethod
+    def criar_notificacao_prazo_vencimento(protocolo):
+        """Cria notificação de prazo vencendo"""
+        if not protocolo.responsavel_atual:
+            return None
+        
+        titulo, mensagem = GerenciadorNotificacoes.texto_prazo_vencimento(
+            protocolo.numero_protocolo, protocolo.dias_para_vencimento,
+            protocolo.assunto, protocolo.remetente_nome, protocolo.prazo_resposta,
+        )
+        notificacao = Notificacao.objects.create(
+            tipo=GerenciadorNotificacoes.tipo_prazo_vencendo(),
+            usuario=protocolo.responsavel_atual,
+            titulo=titulo,
+            mensagem=mensagem,
             objeto_tipo="protocolo",
             objeto_id=protocolo.id,
         )
@@ -173,30 +222,16 @@ Prazo: {protocolo.prazo_resposta.strftime('%d/%m/%Y')}
             # Se não há grupo específico, notifica administradores
             usuarios_financeiro = User.objects.filter(is_staff=True)
         
-        tipo_notif, created = TipoNotificacao.objects.get_or_create(
-            nome="Multa Vencida",
-            defaults={
-                'descricao': 'Notificação de multa com pagamento vencido',
-                'prioridade': 'critica'
-            }
-        )
+        tipo_notif = GerenciadorNotificacoes.tipo_multa_vencida()
+        titulo, mensagem = GerenciadorNotificacoes.texto_multa_vencida(multa, abs(multa.dias_para_vencimento))
         
         notificacoes = []
         for usuario in usuarios_financeiro:
             notificacao = Notificacao.objects.create(
                 tipo=tipo_notif,
                 usuario=usuario,
-                titulo=f"Multa vencida - {multa.empresa.razao_social}",
-                mensagem=f"""
-A multa #{multa.pk} está vencida há {abs(multa.dias_para_vencimento)} dias.
-
-Empresa: {multa.empresa.razao_social}
-CNPJ: {multa.empresa.cnpj}
-Valor: R$ {multa.valor:.2f}
-Vencimento: {multa.data_vencimento.strftime('%d/%m/%Y')}
-
-É necessário iniciar processo de cobrança.
-                """.strip(),
+                titulo=titulo,
+                mensagem=mensagem,
                 objeto_tipo="multa",
                 objeto_id=multa.id,
             )
@@ -245,65 +280,140 @@ Processo disponível para consulta no sistema.
         
         return notificacoes
     
+    @staticmethod
+    def chave_dedup(objeto_tipo, objeto_id, tipo_notificacao, usuario_id, dia):
+        return f"{objeto_tipo}:{objeto_id}:{tipo_notificacao.pk}:{usuario_id}:{dia.isoformat()}"
+    
+    @staticmethod
+    def gravar_notificacoes(notificacoes):
+        """
+        Insere as notificações ainda inexistentes para suas chaves de
+        deduplicação com um único bulk_create. ignore_conflicts cobre duas
+        execuções simultâneas: a chave única descarta a segunda inserção.
+        
+        Returns:
+            list: notificações efetivamente inseridas por esta chamada, com pk
+        """
+        def gravadas(chaves):
+            for inicio in range(0, len(chaves), TAMANHO_LOTE_VERIFICACAO):
+                yield from Notificacao.objects.filter(
+                    chave_dedup__in=chaves[inicio:inicio + TAMANHO_LOTE_VERIFICACAO]
+                ).values_list('chave_dedup', 'pk', 'data_criacao')
+        
+        if not notificacoes:
+            return []
+        existentes = {chave for chave, _, _ in gravadas([n.chave_dedup for n in notificacoes])}
+        novas = {}
+        for notificacao in notificacoes:
+            if notificacao.chave_dedup not in existentes:
+                novas.setdefault(notificacao.chave_dedup, notificacao)
+        Notificacao.objects.bulk_create(list(novas.values()), batch_size=TAMANHO_LOTE_VERIFICACAO, ignore_conflicts=True)
+        
+        # O bulk_create não informa quais linhas o conflito descartou: a linha
+        # desta chamada é a que tem o data_criacao atribuído aqui
+        linhas = {chave: (pk, data_criacao) for chave, pk, data_criacao in gravadas(list(novas))}
+        inseridas = []
+        for chave, notificacao in novas.items():
+            pk, data_criacao = linhas.get(chave, (None, None))
+            if data_criacao == notificacao.data_criacao:
+                notificacao.pk = pk
+                inseridas.append(notificacao)
+        return inseridas
+    
     @staticmethod
     def verificar_prazos_vencendo():
-        """Verifica protocolos com prazos próximos ao vencimento"""
+        """
+        Verifica protocolos com prazos próximos ao vencimento: uma consulta
+        seleciona os protocolos e um bulk_create grava as notificações do dia
+        """
         from .models import ProtocoloDocumento
         
+        agora = timezone.now()
+        hoje = timezone.localdate(agora)
+        
         # Busca protocolos que vencem em até 3 dias
-        data_limite = timezone.now() + timedelta(days=3)
+        data_limite = agora + timedelta(days=3)
         protocolos_vencendo = ProtocoloDocumento.objects.filter(
             prazo_resposta__lte=data_limite,
             status__in=['PROTOCOLADO', 'EM_TRAMITACAO', 'EM_ANALISE'],
             responsavel_atual__isnull=False
-        )
+        ).values_list('id', 'numero_protocolo', 'assunto', 'remetente_nome', 'prazo_resposta', 'responsavel_atual_id')
         
-        notificacoes_criadas = []
-        for protocolo in protocolos_vencendo:
-            # Verifica se já foi criada notificação para este prazo
-            notif_existe = Notificacao.objects.filter(
+        tipo_notif = GerenciadorNotificacoes.tipo_prazo_vencendo()
+        
+        notificacoes = []
+        for protocolo_id, numero, assunto, remetente, prazo, responsavel_id in protocolos_vencendo.iterator(
+            chunk_size=TAMANHO_LOTE_VERIFICACAO
+        ):
+            titulo, mensagem = GerenciadorNotificacoes.texto_prazo_vencimento(
+                numero, max((prazo - agora).days, 0), assunto, remetente, prazo,
+            )
+            notificacoes.append(Notificacao(
+                tipo=tipo_notif,
+                usuario_id=responsavel_id,
+                titulo=titulo,
+                mensagem=mensagem,
                 objeto_tipo="protocolo",
-                objeto_id=protocolo.id,
-                tipo__nome="Prazo Vencendo",
-                data_criacao__date=timezone.now().date()
-            ).exists()
-            
-            if not notif_existe:
-                notif = GerenciadorNotificacoes.criar_notificacao_prazo_vencimento(protocolo)
-                if notif:
-                    notificacoes_criadas.append(notif)
+                objeto_id=protocolo_id,
+                chave_dedup=GerenciadorNotificacoes.chave_dedup('protocolo', protocolo_id, tipo_notif, responsavel_id, hoje),
+            ))
         
-        return notificacoes_criadas
+        return GerenciadorNotificacoes.gravar_notificacoes(notificacoes)
     
     @staticmethod
     def verificar_multas_vencidas():
-        """Verifica multas com pagamento vencido"""
+        """
+        Verifica multas com pagamento vencido: um UPDATE marca as multas como
+        vencidas e um bulk_create grava as notificações do setor financeiro
+        """
         from multas.models import Multa
         
-        multas_vencidas = Multa.objects.filter(
-            status='pendente',
-            data_vencimento__lt=timezone.now().date()
-        )
+        agora = timezone.now()
+        hoje = timezone.localdate(agora)
         
-        notificacoes_criadas = []
-        for multa in multas_vencidas:
-            # Atualiza status da multa
-            multa.status = 'vencida'
-            multa.save()
+        with transaction.atomic():
+            multas_vencidas = list(
+                Multa.objects.select_for_update(of=('self',))
+                .filter(status='pendente', data_vencimento__lt=hoje)
+                .select_related('empresa')
+                .only('id', 'valor', 'data_vencimento', 'empresa__razao_social', 'empresa__cnpj')
+            )
+            if not multas_vencidas:
+                return []
             
-            # Verifica se já foi criada notificação hoje
-            notif_existe = Notificacao.objects.filter(
-                objeto_tipo="multa",
-                objeto_id=multa.id,
-                tipo__nome="Multa Vencida",
-                data_criacao__date=timezone.now().date()
-            ).exists()
+            ids = [multa.id for multa in multas_vencidas]
+            for inicio in range(0, len(ids), TAMANHO_LOTE_VERIFICACAO):
+                Multa.objects.filter(id__in=ids[inicio:inicio + TAMANHO_LOTE_VERIFICACAO], status='pendente').update(
+                    status='vencida', atualizado_em=agora
+                )
             
-            if not notif_existe:
-                notifs = GerenciadorNotificacoes.criar_notificacao_multa_vencida(multa)
-                notificacoes_criadas.extend(notifs)
-        
-        return notificacoes_criadas
+            # Busca usuários do setor financeiro
+            usuarios_financeiro = list(
+                User.objects.filter(groups__name__icontains='financeiro').distinct().values_list('id', flat=True)
+            )
+            if not usuarios_financeiro:
+                # Se não há grupo específico, notifica administradores
+                usuarios_financeiro = list(User.objects.filter(is_staff=True).values_list('id', flat=True))
+            
+            tipo_notif = GerenciadorNotificacoes.tipo_multa_vencida()
+            
+            notificacoes = []
+            for multa in multas_vencidas:
+                titulo, mensagem = GerenciadorNotificacoes.texto_multa_vencida(
+                    multa, (hoje - multa.data_vencimento).days
+                )
+                for usuario_id in usuarios_financeiro:
+                    notificacoes.append(Notificacao(
+                        tipo=tipo_notif,
+                        usuario_id=usuario_id,
+                        titulo=titulo,
+                        mensagem=mensagem,
+                        objeto_tipo="multa",
+                        objeto_id=multa.id,
+                        chave_dedup=GerenciadorNotificacoes.chave_dedup('multa', multa.id, tipo_notif, usuario_id, hoje),
+                    ))
+            
+            return GerenciadorNotificacoes.gravar_notificacoes(notificacoes)
     
     @staticmethod
     def enviar_notificacoes_pendentes():
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from django.conf import settings
 from django.contrib.auth.models import User
 from .models import (
     ProtocoloDocumento, TipoDocumento, Setor, 
@@ -217,6 +218,15 @@ class TramitarProtocoloSerializer(serializers.Serializer):
         return value
 
 
+class TramitarLoteSerializer(TramitarProtocoloSerializer):
+    """Serializer para tramitar vários protocolos para o mesmo setor"""
+    protocolos = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        min_length=1,
+        max_length=getattr(settings, 'TRAMITACAO_LOTE_MAX_PROTOCOLOS', 1000),
+    )
+
+
 class ReceberTramitacaoSerializer(serializers.Serializer):
     """Serializer para receber tramitação"""
     observacoes = serializers.CharField(max_length=1000, required=False, allow_blank=True)
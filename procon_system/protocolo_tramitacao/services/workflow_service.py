@@ -2,18 +2,21 @@
 
 from __future__ import annotations
 
-from typing import Dict, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from django.db import transaction
+from django.db.models import Case, F, TextField, Value, When
+from django.db.models.functions import Concat
 from django.utils import timezone
 
 from ..models import ProtocoloDocumento, TramitacaoDocumento, Setor
 
 try:
-    from caixa_entrada.models import CaixaEntrada, HistoricoCaixaEntrada  # type: ignore
+    from caixa_entrada.models import CaixaEntrada, HistoricoCaixaEntrada, SequenciaProtocoloCaixa  # type: ignore
 except Exception:  # noqa: BLE001 - módulo opcional
     CaixaEntrada = None  # type: ignore
     HistoricoCaixaEntrada = None  # type: ignore
+    SequenciaProtocoloCaixa = None  # type: ignore
 
 try:
     from caixa_entrada.services import sincronizar_protocolo_caixa  # type: ignore
@@ -21,6 +24,10 @@ except Exception:  # noqa: BLE001 - módulo opcional
     sincronizar_protocolo_caixa = None  # type: ignore
 
 
+# Protocolos que não voltam a tramitar em lote
+STATUS_FINAIS = ('DECIDIDO', 'ARQUIVADO', 'CANCELADO')
+
+
 # === Funções auxiliares ===
 
 def _nome_do_setor(setor: Optional[Setor]) -> str:
@@ -215,6 +222,100 @@ def _arquivar_documentos_da_caixa(
         )
 
 
+def _encaminhar_documentos_caixa_em_lote(
+    protocolos: List[ProtocoloDocumento],
+    setor_destino: Setor,
+    usuario,
+    observacoes: str = "",
+) -> int:
+    """
+    Versão em lote de _encaminhar_documento_caixa: marca as versões atuais
+    como encaminhadas com um UPDATE e cria as novas versões e o histórico
+    com bulk_create. O roteamento automático não se aplica (o destino foi
+    escolhido explicitamente).
+    """
+    if CaixaEntrada is None or not protocolos:
+        return 0
+
+    atuais = {}
+    consulta = (
+        CaixaEntrada.objects.filter(protocolo__in=protocolos)
+        .order_by('protocolo_id', '-data_entrada')
+    )
+    for documento in consulta:
+        atuais.setdefault(documento.protocolo_id, documento)
+
+    nome_destino = _nome_do_setor(setor_destino) or 'Destino'
+    responsavel = _responsavel_do_setor(setor_destino)
+    numeros = SequenciaProtocoloCaixa.reservar(len(protocolos))
+    novos = []
+    for protocolo, numero in zip(protocolos, numeros):
+        atual = atuais.get(protocolo.pk)
+        if atual is not None:
+            campos = {
+                'tipo_documento': atual.tipo_documento,
+                'descricao': atual.descricao,
+                'prioridade': atual.prioridade,
+                'remetente_nome': atual.remetente_nome,
+                'remetente_documento': atual.remetente_documento,
+                'remetente_email': atual.remetente_email,
+                'empresa_nome': atual.empresa_nome,
+                'empresa_cnpj': atual.empresa_cnpj,
+                'content_type_id': atual.content_type_id,
+                'object_id': atual.object_id,
+                'origem': atual.origem,
+                'prazo_resposta': atual.prazo_resposta,
+                'versao': atual.versao + 1,
+                'documento_anterior': atual,
+            }
+        else:
+            campos = {
+                'tipo_documento': 'PROTOCOLO',
+                'descricao': protocolo.descricao or "",
+                'prioridade': protocolo.prioridade,
+                'remetente_nome': protocolo.remetente_nome,
+                'remetente_documento': protocolo.remetente_documento,
+                'remetente_email': protocolo.remetente_email,
+                'remetente_telefone': protocolo.remetente_telefone,
+                'origem': protocolo.origem,
+                'prazo_resposta': protocolo.prazo_resposta,
+            }
+        if observacoes:
+            campos['descricao'] = f"{(campos['descricao'] or '').strip()}\n{observacoes}".strip()
+        novos.append(CaixaEntrada(
+            numero_protocolo=numero,
+            protocolo=protocolo,
+            assunto=protocolo.assunto if atual is None else atual.assunto,
+            status='NAO_LIDO',
+            setor_destino=nome_destino,
+            responsavel_atual=responsavel,
+            destinatario_direto=responsavel,
+            setor_lotacao=_nome_do_setor(setor_destino),
+            **campos,
+        ))
+
+    CaixaEntrada.objects.filter(pk__in=[documento.pk for documento in atuais.values()]).update(
+        status='ENCAMINHADO', data_atualizacao=timezone.now()
+    )
+    CaixaEntrada.objects.bulk_create(novos)
+    # UPDATE e bulk_create não disparam os signals do índice de prazos
+    from monitoring.prazos import varredura_prazos_service
+    varredura_prazos_service.reconstruir(
+        ['caixa_entrada'], ids=[documento.pk for documento in [*atuais.values(), *novos]]
+    )
+    if HistoricoCaixaEntrada is not None:
+        HistoricoCaixaEntrada.objects.bulk_create([
+            HistoricoCaixaEntrada(
+                documento=documento,
+                acao='ENCAMINHADO',
+                usuario=usuario,
+                detalhes=f'Encaminhado para {nome_destino}',
+            )
+            for documento in novos
+        ])
+    return len(novos)
+
+
 # === Serviço principal ===
 
 
@@ -350,6 +451,86 @@ class WorkflowProtocoloService:
 
         return tramitacao
 
+    @transaction.atomic
+    def tramitar_em_lote(
+        self,
+        protocolos: Iterable,
+        *,
+        setor_destino: Setor,
+        motivo: str,
+        usuario,
+        prazo_dias: Optional[int] = None,
+        observacoes: str = "",
+    ) -> Dict:
+        """
+        Tramita vários protocolos para um setor em uma única transação.
+
+        Protocolos (instâncias ou ids) já no setor de destino ou finalizados
+        são ignorados. As tramitações e as novas versões na caixa de entrada
+        são gravadas com bulk_create e os protocolos atualizados com UPDATE,
+        sem o encadeamento de consultas por documento de `tramitar`.
+        """
+
+        ids = [getattr(protocolo, 'pk', protocolo) for protocolo in protocolos]
+        selecionados = list(
+            ProtocoloDocumento.objects.select_for_update()
+            .filter(pk__in=ids)
+            .select_related('setor_atual')
+            .order_by('pk')
+        )
+        elegiveis = [
+            protocolo for protocolo in selecionados
+            if protocolo.setor_atual_id != setor_destino.pk and protocolo.status not in STATUS_FINAIS
+        ]
+        resultado = {
+            'solicitados': len(set(ids)),
+            'tramitados': len(elegiveis),
+            'ignorados': len(set(ids)) - len(elegiveis),
+            'documentos_caixa': 0,
+        }
+        if not elegiveis:
+            return resultado
+
+        tramitacoes = []
+        for protocolo in elegiveis:
+            tramitacao = TramitacaoDocumento(
+                protocolo=protocolo,
+                acao='ENCAMINHADO',
+                setor_origem=protocolo.setor_atual,
+                setor_destino=setor_destino,
+                motivo=motivo,
+                observacoes=observacoes or "",
+                prazo_dias=prazo_dias,
+                usuario=usuario,
+            )
+            tramitacao.hash_tramitacao = tramitacao.gerar_hash_tramitacao()
+            tramitacoes.append(tramitacao)
+        TramitacaoDocumento.objects.bulk_create(tramitacoes)
+
+        atualizacao = {
+            'setor_atual': setor_destino,
+            'status': 'EM_TRAMITACAO',
+            'atualizado_em': timezone.now(),
+        }
+        responsavel = _responsavel_do_setor(setor_destino)
+        if responsavel:
+            atualizacao['responsavel_atual'] = responsavel
+        if observacoes:
+            atualizacao['observacoes'] = Case(
+                When(observacoes='', then=Value(observacoes)),
+                default=Concat(F('observacoes'), Value(f"\n{observacoes}"), output_field=TextField()),
+                output_field=TextField(),
+            )
+        ProtocoloDocumento.objects.filter(pk__in=[protocolo.pk for protocolo in elegiveis]).update(**atualizacao)
+
+        resultado['documentos_caixa'] = _encaminhar_documentos_caixa_em_lote(
+            protocolos=elegiveis,
+            setor_destino=setor_destino,
+            usuario=usuario,
+            observacoes=observacoes,
+        )
+        return resultado
+
     @transaction.atomic
     def tramitar_protocolo(
         self,
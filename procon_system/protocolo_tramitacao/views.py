@@ -19,7 +19,7 @@ from .serializers import (
     ProtocoloDocumentoSerializer, TipoDocumentoSerializer,
     SetorSerializer, TramitacaoDocumentoSerializer,
     AnexoProtocoloSerializer, ProtocolarDocumentoSerializer,
-    TramitarProtocoloSerializer
+    TramitarProtocoloSerializer, TramitarLoteSerializer
 )
 from .services import workflow_service
 
@@ -381,6 +381,22 @@ class ProtocoloDocumentoViewSet(viewsets.ModelViewSet):
             }
         )
     
+    @action(detail=False, methods=['post'])
+    def tramitar_lote(self, request):
+        """Endpoint para tramitar vários protocolos para o mesmo setor"""
+        serializer = TramitarLoteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        resultado = workflow_service.tramitar_em_lote(
+            serializer.validated_data['protocolos'],
+            setor_destino=serializer.validated_data['setor_destino'],
+            motivo=serializer.validated_data['motivo'],
+            usuario=request.user,
+            observacoes=serializer.validated_data.get('observacoes', ''),
+            prazo_dias=serializer.validated_data.get('prazo_dias'),
+        )
+        return Response(resultado)
+    
     @action(detail=False)
     def vencidos(self, request):
         """Protocolos com prazo vencido"""
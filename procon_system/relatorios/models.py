@@ -164,6 +164,30 @@ class RelatorioAgendado(models.Model):
             return self.ultima_execucao + timedelta(days=365)
         
         return self.ultima_execucao
+    
+    def executar(self, solicitado_por=None, titulo=None, avancar=True):
+        """
+        Cria o relatório desta execução (pendente de processamento) e registra
+        a execução; com avancar, agenda a próxima pela frequência
+        """
+        relatorio = Relatorio.objects.create(
+            titulo=titulo or f"{self.nome} - {timezone.localtime():%d/%m/%Y %H:%M}",
+            descricao=self.descricao,
+            tipo_relatorio=self.tipo_relatorio,
+            parametros=self.parametros,
+            filtros=self.filtros,
+            formato=self.formato,
+            solicitado_por=solicitado_por or self.criado_por,
+            status='PENDENTE'
+        )
+        
+        self.ultima_execucao = timezone.now()
+        campos = ['ultima_execucao', 'data_modificacao']
+        if avancar:
+            self.proxima_execucao = self.calcular_proxima_execucao()
+            campos.append('proxima_execucao')
+        self.save(update_fields=campos)
+        return relatorio
 
 
 class TemplateRelatorio(models.Model):
@@ -347,22 +347,13 @@ class RelatorioAgendadoViewSet(viewsets.ModelViewSet):
         """Executar agendamento imediatamente"""
         agendamento = self.get_object()
         
-        # Criar relatório baseado no agendamento
-        relatorio = Relatorio.objects.create(
-            titulo=f"{agendamento.nome} - Execução Manual",
-            descricao=agendamento.descricao,
-            tipo_relatorio=agendamento.tipo_relatorio,
-            parametros=agendamento.parametros,
-            filtros=agendamento.filtros,
-            formato=agendamento.formato,
+        # Criar relatório baseado no agendamento, sem mudar a próxima execução agendada
+        relatorio = agendamento.executar(
             solicitado_por=request.user,
-            status='PENDENTE'
+            titulo=f"{agendamento.nome} - Execução Manual",
+            avancar=False,
         )
         
-        # Atualizar última execução
-        agendamento.ultima_execucao = timezone.now()
-        agendamento.save()
-        
         return Response({
             'message': 'Relatório criado e enviado para processamento',
             'relatorio_id': relatorio.id
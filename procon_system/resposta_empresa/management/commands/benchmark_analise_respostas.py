@@ -0,0 +1,90 @@
+"""
+Benchmark da análise de respostas de empresas
+Uso: python manage.py benchmark_analise_respostas [--textos 20000] [--workers 4] [--lote 500]
+
+Compara a busca padrão a padrão com o motor compilado (mesmo resultado
+exigido) e mede a vazão da reanálise em lote com e sem pool de processos.
+Usa textos sintéticos em memória; nada é gravado no banco.
+"""
+import random
+import re
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.lotes import agrupar, executar_em_lotes
+from resposta_empresa.padroes import PADROES_RESPOSTA, PALAVRAS_CHAVE, classificador_resposta, palavras_chave
+from resposta_empresa.services import _analisar_lote_respostas
+
+
+FRASES = [
+    'Em resposta à notificação, a empresa não aceita a reclamação pois o pedido foi cancelado.',
+    'Concordamos em pagar o valor integral em 30 dias conforme o contrato.',
+    'Apresentamos proposta de acordo e solicitamos audiência de conciliação.',
+    'O produto possui garantia de 12 meses e o reparo foi realizado dentro do prazo.',
+    'Reconhecemos a falha no atendimento e assumimos a responsabilidade pela devolução.',
+    'A reclamação é infundada e descabida, não é verdade que houve cobrança de multa e juros.',
+    'Informamos que o consumidor foi atendido pela equipe de suporte técnico.',
+    'Oferecemos como solução alternativa a troca do aparelho ou crédito na loja.',
+]
+
+
+def legado(texto):
+    """Busca padrão a padrão, como a análise fazia antes do motor compilado"""
+    texto = texto.lower()
+    contagem = {
+        categoria: sum(1 for padrao in padroes if re.search(padrao, texto, re.IGNORECASE))
+        for categoria, padroes in PADROES_RESPOSTA.items()
+    }
+    return contagem, [palavra for palavra in PALAVRAS_CHAVE if palavra in texto][:10]
+
+
+def compilado(texto):
+    texto = texto.lower()
+    return classificador_resposta.contar(texto), palavras_chave.termos(texto)[:10]
+
+
+class Command(BaseCommand):
+    help = 'Mede a análise padrão a padrão x motor compilado e a vazão da reanálise em lote'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--textos', type=int, default=20000, help='Quantidade de respostas sintéticas')
+        parser.add_argument('--workers', type=int, default=4, help='Processos do pool na medição em lote')
+        parser.add_argument('--lote', type=int, default=500, help='Respostas por lote')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def medir(self, nome, funcao, quantidade):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        duracao = time.perf_counter() - inicio
+        self.stdout.write(f'{nome:<34} {duracao * 1000:>9.1f} ms  {quantidade / duracao:>10.0f} textos/s')
+        return resultado
+
+    def handle(self, *args, **options):
+        aleatorio = random.Random(options['seed'])
+        textos = [
+            ' '.join(aleatorio.choice(FRASES) for _ in range(aleatorio.randint(2, 25)))
+            for _ in range(options['textos'])
+        ]
+        total = len(textos)
+        self.stdout.write(f'{total} respostas, média de {sum(map(len, textos)) // max(total, 1)} caracteres')
+
+        esperado = self.medir('Padrão a padrão', lambda: [legado(t) for t in textos], total)
+        obtido = self.medir('Motor compilado', lambda: [compilado(t) for t in textos], total)
+        if esperado == obtido:
+            self.stdout.write(self.style.SUCCESS('✅ Classificação idêntica nos dois motores'))
+        else:
+            divergentes = sum(1 for a, b in zip(esperado, obtido) if a != b)
+            self.stdout.write(self.style.ERROR(f'❌ {divergentes} texto(s) com classificação divergente'))
+
+        linhas = [(i, texto, aleatorio.choice([None, 500, 900]), 1000, '') for i, texto in enumerate(textos)]
+        for workers in sorted({1, options['workers']}):
+            self.medir(
+                f'Reanálise em lote ({workers} worker(s))',
+                lambda: sum(
+                    len(resultado) for _, resultado in executar_em_lotes(
+                        _analisar_lote_respostas, agrupar(linhas, options['lote']), workers
+                    )
+                ),
+                total,
+            )
@@ -0,0 +1,41 @@
+"""
+Comando para reanalisar respostas de empresas e feedbacks já gravados
+Uso: python manage.py reanalisar_respostas [--feedbacks] [--incluir-decididas] [--workers N] [--lote N]
+"""
+
+from django.core.management.base import BaseCommand
+
+from portal_consumidor.services import feedback_service
+from resposta_empresa.services import analise_service
+
+
+class Command(BaseCommand):
+    help = 'Reclassifica em lote (pool de processos) as respostas de empresas e, opcionalmente, os feedbacks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--feedbacks', action='store_true', help='Também recalcula o sentimento dos feedbacks')
+        parser.add_argument(
+            '--incluir-decididas', action='store_true', help='Inclui respostas que já têm decisão final'
+        )
+        parser.add_argument('--workers', type=int, help='Processos do pool (padrão: RESPOSTA_ANALISE_MAX_WORKERS)')
+        parser.add_argument('--lote', type=int, help='Registros por lote (padrão: RESPOSTA_ANALISE_LOTE_TAMANHO)')
+
+    def handle(self, *args, **options):
+        resultado = analise_service.reanalisar_respostas(
+            incluir_decididas=options['incluir_decididas'],
+            tamanho_lote=options['lote'],
+            max_workers=options['workers'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"📝 {resultado['analisadas']} resposta(s) reanalisada(s), {resultado['alteradas']} com tipo alterado"
+        ))
+        for tipo, total in sorted(resultado['por_tipo'].items()):
+            self.stdout.write(f'   {tipo}: {total}')
+
+        if options['feedbacks']:
+            resultado = feedback_service.reanalisar_feedbacks(
+                tamanho_lote=options['lote'], max_workers=options['workers']
+            )
+            self.stdout.write(self.style.SUCCESS(f"💬 {resultado['analisados']} feedback(s) reanalisado(s)"))
+            for sentimento, total in sorted(resultado['por_sentimento'].items()):
+                self.stdout.write(f'   {sentimento}: {total}')
@@ -0,0 +1,183 @@
+"""
+Motor de padrões para análise de textos (respostas de empresas e feedbacks)
+Sistema Procon - Fase 4 - Fluxo Completo do Atendimento
+
+Cada conjunto de padrões é compilado uma única vez por processo em uma só
+alternância (sem grupos e sem a âncora de palavra inicial, para que o motor
+de regex pule direto para as posições cujo primeiro caractere interessa).
+Ela percorre o texto uma vez, parando em cada posição candidata; ali são
+conferidos apenas os padrões ainda não encontrados que começam com aquele
+caractere. A contagem é a mesma da busca padrão a padrão, inclusive para
+padrões sobrepostos (ex.: "não aceito" conta como recusa e como aceitação).
+
+Os padrões são escritos em minúsculas e o texto é convertido uma vez com
+lower(), como a análise original já fazia, o que permite compilar a
+alternância sem IGNORECASE. O módulo não depende do ORM.
+"""
+
+import re
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Set
+
+_METACARACTERES = set('\\.^$*+?{}[]()|')
+
+
+def _primeiro_caractere(fonte: str) -> Optional[str]:
+    """Primeiro caractere literal obrigatório do padrão (None se não houver)"""
+    if not fonte or fonte[0] in _METACARACTERES:
+        return None
+    if len(fonte) > 1 and fonte[1] in '?*{':
+        return None
+    return fonte[0]
+
+
+class ConjuntoPadroes:
+    """Padrões (regex ou termos literais) agrupados por categoria e avaliados em uma passada"""
+
+    def __init__(self, categorias: Dict[str, Sequence[str]], literais: bool = False):
+        self.padroes: List[str] = []
+        self.categorias: List[str] = []
+        for categoria, padroes in categorias.items():
+            for padrao in padroes:
+                self.padroes.append(padrao)
+                self.categorias.append(categoria)
+
+        fontes = [re.escape(padrao) if literais else padrao for padrao in self.padroes]
+        self._individuais = [re.compile(fonte) for fonte in fontes]
+
+        # O \b inicial é conferido pelo padrão individual na posição candidata
+        corpos = [fonte[2:] if fonte.startswith(r'\b') else fonte for fonte in fontes]
+        self._candidatos = re.compile('|'.join(corpos))
+
+        self._por_caractere: Dict[str, List[int]] = defaultdict(list)
+        self._sem_prefixo: List[int] = []
+        for indice, corpo in enumerate(corpos):
+            caractere = _primeiro_caractere(corpo)
+            if caractere is None:
+                self._sem_prefixo.append(indice)
+            else:
+                self._por_caractere[caractere].append(indice)
+
+    def encontrados(self, texto: str) -> Set[int]:
+        """Índices dos padrões que ocorrem no texto (sem diferenciar maiúsculas)"""
+        texto = texto.lower()
+        achados: Set[int] = set()
+        pendentes = {caractere: list(indices) for caractere, indices in self._por_caractere.items()}
+        sem_prefixo = list(self._sem_prefixo)
+        restantes = len(self.padroes)
+
+        match = self._candidatos.search(texto)
+        while match:
+            posicao = match.start()
+            for grupo in (pendentes.get(texto[posicao]), sem_prefixo):
+                if not grupo:
+                    continue
+                for indice in [i for i in grupo if self._individuais[i].match(texto, posicao)]:
+                    grupo.remove(indice)
+                    achados.add(indice)
+                    restantes -= 1
+            if not restantes:
+                break
+            # Recomeça na posição seguinte (e não no fim do trecho) para não perder sobreposições
+            match = self._candidatos.search(texto, posicao + 1)
+        return achados
+
+    def contar(self, texto: str) -> Dict[str, int]:
+        """Quantidade de padrões distintos encontrados por categoria"""
+        contagem = dict.fromkeys(self.categorias, 0)
+        for indice in self.encontrados(texto):
+            contagem[self.categorias[indice]] += 1
+        return contagem
+
+    def termos(self, texto: str, categoria: Optional[str] = None) -> List[str]:
+        """Padrões encontrados, na ordem em que foram declarados"""
+        return [
+            self.padroes[indice] for indice in sorted(self.encontrados(texto))
+            if categoria is None or self.categorias[indice] == categoria
+        ]
+
+
+# ---------- respostas de empresas ----------
+
+PADROES_RESPOSTA = {
+    'aceitacao': [
+        r'\baceito\b', r'\baceita\b', r'\bconcordo\b', r'\bconcordamos\b',
+        r'\bpago\b', r'\bpagarei\b', r'\bpagar\s+(?:o\s+)?valor\b',
+        r'\breconhecemos?\b', r'\badmitimos?\b', r'\bassumimos?\b',
+        r'\bacordo\b', r'\bfavorável\b', r'\bpositivo\b'
+    ],
+    'recusa': [
+        r'\bnão\s+aceito\b', r'\bnão\s+aceita\b', r'\bnão\s+concordo\b',
+        r'\brecuso\b', r'\brecusamos?\b', r'\brejeito\b',
+        r'\bnão\s+responsável\b', r'\bnão\s+fomos\s+nos\b',
+        r'\binfrangido\b', r'\bdescabido\b', r'\binfundado\b',
+        r'\bnão\s+verdade\b', r'\bnão\s+responsabilid\w+\b',
+        r'\bcancelado\b', r'\brescindido\b'
+    ],
+    'mediacao': [
+        r'\bmedicação\b', r'\bconcíliação\b', r'\bconciliação\b',
+        r'\bnegociação\b', r'\bmediação\b', r'\bdialógo\b',
+        r'proposta\s+de', r'oferta\s+de', r'sugestão\s+de',
+        r'alternativa\s+de', r'solução\s+alternativa'
+    ],
+}
+
+PALAVRAS_CHAVE = [
+    'contrato', 'garantia', 'reparo', 'devolução', 'manutenção',
+    'política', 'termo', 'condição', 'vigência', 'prazo',
+    'responsabilidade', 'obrigação', 'compromisso', 'acordo',
+    'multa', 'juros', 'correção', 'atualização',
+]
+
+# Ordem importa: vale o primeiro padrão que casar (como antes)
+PADROES_PRAZO_DIAS = [re.compile(p) for p in (
+    r'(\d+)\s*dias?', r'(\d+)\s*d', r'(\d+)\s*dias?\s+útil', r'(\d+)\s*de\s+dias?',
+)]
+PADROES_PRAZO_MESES = [re.compile(p) for p in (
+    r'(\d+)\s*meses?', r'(\d+)\s*m', r'(\d+)\s*mês',
+)]
+
+# ---------- feedback do consumidor ----------
+
+PALAVRAS_SENTIMENTO = {
+    'positivo': ['bom', 'ótimo', 'excelente', 'satisfeito', 'conforme', 'eficiente', 'rápido'],
+    'negativo': ['ruim', 'lento', 'demorado', 'problema', 'dificuldade', 'insatisfeito'],
+}
+
+classificador_resposta = ConjuntoPadroes(PADROES_RESPOSTA)
+palavras_chave = ConjuntoPadroes({'chave': PALAVRAS_CHAVE}, literais=True)
+classificador_sentimento = ConjuntoPadroes(PALAVRAS_SENTIMENTO, literais=True)
+
+
+def extrair_prazo_pagamento(texto: str) -> Optional[int]:
+    """Prazo de pagamento oferecido em dias (texto já em minúsculas)"""
+    for padrao in PADROES_PRAZO_DIAS:
+        match = padrao.search(texto)
+        if match:
+            return min(int(match.group(1)), 365)  # Limitar a 1 ano
+    for padrao in PADROES_PRAZO_MESES:
+        match = padrao.search(texto)
+        if match:
+            return min(int(match.group(1)) * 30, 365)
+    return None
+
+
+def analisar_sentimento(texto: str) -> Dict[str, object]:
+    """Sentimento de um texto de feedback (POSITIVO, NEGATIVO ou NEUTRO)"""
+    contagem = classificador_sentimento.contar(texto)
+    positivos, negativos = contagem['positivo'], contagem['negativo']
+
+    if positivos > negativos:
+        sentimento = 'POSITIVO'
+        confianca = min(0.9, (positivos / max(len(texto.split()), 10)))
+    elif negativos > positivos:
+        sentimento = 'NEGATIVO'
+        confianca = min(0.9, (negativos / max(len(texto.split()), 10)))
+    else:
+        sentimento = 'NEUTRO'
+        confianca = 0.5
+
+    return {
+        'sentimento': sentimento,
+        'confianca': confianca,
+    }
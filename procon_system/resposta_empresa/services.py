@@ -4,7 +4,8 @@ Sistema Procon - Fase 4 - Fluxo Completo do Atendimento
 """
 
 import json
-import re
+import os
+from collections import Counter
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Tuple
 from django.utils import timezone
@@ -15,6 +16,8 @@ from django.conf import settings
 from cip_automatica.models import CIPAutomatica, RespostaEmpresa, TipoCIP
 from caixa_entrada.models import CaixaEntrada
 from logging_config import logger_manager, LoggedOperation, log_execution_time
+from core.lotes import agrupar, executar_em_lotes
+from .padroes import PADROES_RESPOSTA, classificador_resposta, extrair_prazo_pagamento, palavras_chave
 
 
 class AnaliseRespostaService:
@@ -23,29 +26,15 @@ class AnaliseRespostaService:
     def __init__(self):
         self.logger = logger_manager.get_logger('analise_resposta')
         
-        # Padrões para análise automatizada
-        self.padroes_aceitacao = [
-            r'\baceito\b', r'\baceita\b', r'\bconcordo\b', r'\bconcordamos\b',
-            r'\bpago\b', r'\bpagarei\b', r'\bpagar\s+(?:o\s+)?valor\b',
-            r'\breconhecemos?\b', r'\badmitimos?\b', r'\bassumimos?\b',
-            r'\bacordo\b', r'\bfavorável\b', r'\bpositivo\b'
-        ]
-        
-        self.padroes_recusa = [
-            r'\bnão\s+aceito\b', r'\bnão\s+aceita\b', r'\bnão\s+concordo\b',
-            r'\brecuso\b', r'\brecusamos?\b', r'\brejeito\b',
-            r'\bnão\s+responsável\b', r'\bnão\s+fomos\s+nos\b',
-            r'\binfrangido\b', r'\bdescabido\b', r'\binfundado\b',
-            r'\bnão\s+verdade\b', r'\bnão\s+responsabilid\w+\b',
-            r'\bcancelado\b', r'\brescindido\b'
-        ]
-        
-        self.padroes_mediacao = [
-            r'\bmedicação\b', r'\bconcíliação\b', r'\bconciliação\b',
-            r'\bnegociação\b', r'\bmediação\b', r'\bdialógo\b',
-            r'proposta\s+de', r'oferta\s+de', r'sugestão\s+de',
-            r'alternativa\s+de', r'solução\s+alternativa'
-        ]
+        # Padrões para análise automatizada (compilados em resposta_empresa/padroes.py)
+        self.padroes_aceitacao = PADROES_RESPOSTA['aceitacao']
+        self.padroes_recusa = PADROES_RESPOSTA['recusa']
+        self.padroes_mediacao = PADROES_RESPOSTA['mediacao']
+        
+        # Reanálise em lote
+        self.tamanho_lote = getattr(settings, 'RESPOSTA_ANALISE_LOTE_TAMANHO', 500)
+        self.max_workers = getattr(settings, 'RESPOSTA_ANALISE_MAX_WORKERS', os.cpu_count() or 1)
+        self.min_lotes_pool = getattr(settings, 'RESPOSTA_ANALISE_MIN_LOTES_POOL', 4)
     
     @log_execution_time('analisar_resposta_empresa')
     def analisar_resposta_recebida(self, cip_id: str, texto_resposta: str,
@@ -81,7 +70,8 @@ class AnaliseRespostaService:
                         valor_oferecido=valor_oferecido,
                         prazo_pagamento_oferecido=analise_ia.get('prazo_oferecido'),
                         responsavel_analise=usuario_analista,
-                        dados_análise_ia=analise_ia,
+                        dados_analise_ia=analise_ia,
+                        prazo_analise=timezone.now() + timedelta(days=5),
                     )
                     
                     # Atualizar status da CIP
@@ -111,15 +101,19 @@ class AnaliseRespostaService:
                            valor_solicitado: float) -> Dict[str, Any]:
         """Executa análise automatizada usando padrões e regras"""
         
+        return self.analisar_texto(texto, valor_oferecido, valor_solicitado)
+    
+    def analisar_texto(self, texto: str, valor_oferecido: Optional[float],
+                       valor_solicitado: float) -> Dict[str, Any]:
+        """Análise de uma resposta sem acesso ao banco (usada também pelos workers do lote)"""
+        
         texto_lower = texto.lower()
         
-        # Contagem de padrões
-        aceitacao_matches = sum(1 for pattern in self.padroes_aceitacao 
-                              if re.search(pattern, texto_lower, re.IGNORECASE))
-        recusa_matches = sum(1 for pattern in self.padroes_recusa 
-                            if re.search(pattern, texto_lower, re.IGNORECASE))
-        mediacao_matches = sum(1 for pattern in self.padroes_mediacao 
-                              if re.search(pattern, texto_lower, re.IGNORECASE))
+        # Contagem de padrões: uma passada pelo texto para as três categorias
+        contagem = classificador_resposta.contar(texto_lower)
+        aceitacao_matches = contagem['aceitacao']
+        recusa_matches = contagem['recusa']
+        mediacao_matches = contagem['mediacao']
         
         # Análise de sentimento básica
         sentimento_score = (aceitacao_matches * 2 - recusa_matches * 2 + mediacao_matches)
@@ -201,7 +195,9 @@ class AnaliseRespostaService:
                 'recomendacao': 'PEDIR_VALOR'
             }
         
-        percentual = (valor_oferecido / valor_solicitado) * 100
+        valor_oferecido = float(valor_oferecido)
+        valor_solicitado = float(valor_solicitado or 0)
+        percentual = (valor_oferecido / valor_solicitado) * 100 if valor_solicitado else 0
         
         if percentual >= 90:
             categoria = 'APROXIMADAMENTE_INTEGRAL'
@@ -236,52 +232,12 @@ class AnaliseRespostaService:
     def _extrair_prazo_pagamento(self, texto: str) -> Optional[int]:
         """Extrai prazo de pagamento oferecido em dias"""
         
-        # Padrões para prazo em dias
-        patterns = [
-            r'(\d+)\s*dias?',
-            r'(\d+)\s*d',
-            r'(\d+)\s*dias?\s+útil',
-            r'(\d+)\s*de\s+dias?',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, texto)
-            if match:
-                dias = int(match.group(1))
-                return min(dias, 365)  # Limitar a 1 ano
-        
-        # Padrões para prazo em meses
-        patterns_meses = [
-            r'(\d+)\s*meses?',
-            r'(\d+)\s*m',
-            r'(\d+)\s*mês',
-        ]
-        
-        for pattern in patterns_meses:
-            match = re.search(pattern, texto)
-            if match:
-                meses = int(match.group(1))
-                return min(meses * 30, 365)
-        
-        return None
+        return extrair_prazo_pagamento(texto)
     
     def _extrair_palavras_chave(self, texto: str) -> List[str]:
         """Extrai palavras-chave importantes da resposta"""
         
-        # Palavras importantes para análise
-        keywords_core = [
-            'contrato', 'garantia', 'reparo', 'devolução', 'manutenção',
-            'política', 'termo', 'condição', 'vigência', 'prazo',
-            'responsabilidade', 'obrigação', 'compromisso', 'acordo',
-            'multa', 'juros', 'correção', 'atualização',
-        ]
-        
-        palavras_encontradas = []
-        for keyword in keywords_core:
-            if keyword in texto:
-                palavras_encontradas.append(keyword)
-        
-        return palavras_encontradas[:10]  # Máximo 10 palavras-chave
+        return palavras_chave.termos(texto)[:10]  # Máximo 10 palavras-chave
     
     @log_execution_time('atualizar_status_cip')
     def _atualizar_status_cip(self, cip: CIPAutomatica, tipo_resposta: str, 
@@ -326,6 +282,59 @@ class AnaliseRespostaService:
             },
             usuario_responsavel=usuario,
         )
+    
+    def reanalisar_respostas(self, ids: Optional[List[int]] = None, incluir_decididas: bool = False,
+                             tamanho_lote: Optional[int] = None,
+                             max_workers: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Reanalisa respostas já gravadas (ex.: após ajuste dos padrões) em lotes
+        distribuídos em um pool de processos. Atualiza tipo_resposta, prazo
+        oferecido e dados da análise; status e CIP não são alterados.
+        """
+        queryset = RespostaEmpresa.objects.order_by('pk')
+        if ids is not None:
+            queryset = queryset.filter(pk__in=ids)
+        if not incluir_decididas:
+            queryset = queryset.filter(data_decisao__isnull=True)
+        
+        tamanho = tamanho_lote or self.tamanho_lote
+        linhas = queryset.values_list(
+            'id', 'texto_resposta', 'valor_oferecido', 'cip__valor_total', 'tipo_resposta'
+        ).iterator(chunk_size=tamanho)
+        
+        analisadas, alteradas, por_tipo = 0, 0, Counter()
+        with LoggedOperation('reanalisar_respostas', {'tamanho_lote': tamanho}):
+            for lote, resultados in executar_em_lotes(
+                _analisar_lote_respostas, agrupar(linhas, tamanho),
+                max_workers or self.max_workers, self.min_lotes_pool,
+            ):
+                respostas = []
+                for (resposta_id, *_, tipo_anterior), (tipo_resposta, analise_ia) in zip(lote, resultados):
+                    respostas.append(RespostaEmpresa(
+                        id=resposta_id,
+                        tipo_resposta=tipo_resposta,
+                        prazo_pagamento_oferecido=analise_ia.get('prazo_oferecido'),
+                        dados_analise_ia=analise_ia,
+                    ))
+                    alteradas += tipo_resposta != tipo_anterior
+                    por_tipo[tipo_resposta] += 1
+                RespostaEmpresa.objects.bulk_update(
+                    respostas, ['tipo_resposta', 'prazo_pagamento_oferecido', 'dados_analise_ia']
+                )
+                analisadas += len(respostas)
+        
+        resultado = {'analisadas': analisadas, 'alteradas': alteradas, 'por_tipo': dict(por_tipo)}
+        self.logger.log_operation('respostas_reanalisadas', resultado)
+        return resultado
+
+
+def _analisar_lote_respostas(lote: List[Tuple]) -> List[Tuple[str, Dict[str, Any]]]:
+    """Executado nos workers do pool de processos"""
+    resultados = []
+    for _, texto, valor_oferecido, valor_solicitado, _ in lote:
+        analise_ia = analise_service.analisar_texto(texto, valor_oferecido, valor_solicitado)
+        resultados.append((analise_service._determinar_tipo_resposta(texto, analise_ia), analise_ia))
+    return resultados
 
 
 class RelatorioRespostaService:
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+from decimal import Decimal
 from typing import Any
 
 import factory
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group, Permission
+from django.db import models
 from django.utils import timezone
 
 
@@ -84,3 +88,202 @@ except Exception:  # pragma: no cover - optional app
     pass
 
 
+# ---------------------------------------------------------------------------
+# Volume factories for the load benchmark (monitoring/benchmark_carga.py).
+# Values come from sequences and fixed pools instead of Faker so that millions
+# of rows can be built quickly; dates are spread deterministically over the
+# past year so that period filters and deadline sweeps see realistic slices.
+# ---------------------------------------------------------------------------
+
+PRIME_SPREAD = 7919
+
+
+def spread_minutes(n: int, span_days: int, offset_days: int = 0):
+    """Deterministic pseudo-random moment within `span_days` before now (+ offset)."""
+    minutes = (n * PRIME_SPREAD) % (span_days * 24 * 60)
+    return timezone.now() - timedelta(minutes=minutes) + timedelta(days=offset_days)
+
+
+def cycle(*values: Any) -> factory.Iterator:
+    return factory.Iterator(values)
+
+
+@contextmanager
+def explicit_dates(model: type[models.Model], sample: models.Model):
+    """
+    Let bulk_create keep the values given to auto_now/auto_now_add fields
+    (only those filled in on `sample`), restoring the flags afterwards.
+    """
+    fields = [
+        field for field in model._meta.concrete_fields
+        if (getattr(field, "auto_now", False) or getattr(field, "auto_now_add", False))
+        and getattr(sample, field.attname) is not None
+    ]
+    flags = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in flags:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def create_in_bulk(factory_class: type[factory.django.DjangoModelFactory], quantity: int,
+                   batch_size: int = 5000, **overrides: Any) -> list[Any]:
+    """
+    Build `quantity` objects with `factory_class` and insert them with
+    bulk_create in batches (no save() and no signals). The sequence continues
+    after the rows already in the table so repeated runs keep unique fields
+    unique. Returns the primary keys of the new rows.
+    """
+    model = factory_class._meta.get_model_class()
+    factory_class.reset_sequence(model.objects.count())
+    pks: list[Any] = []
+    for start in range(0, quantity, batch_size):
+        objects = factory_class.build_batch(min(batch_size, quantity - start), **overrides)
+        with explicit_dates(model, objects[0]):
+            created = model.objects.bulk_create(objects, batch_size=batch_size)
+        if created and created[0].pk is None:
+            # Backends without RETURNING (older MySQL): read the new pks back
+            created = model.objects.order_by("-pk")[:len(objects)][::-1]
+        pks.extend(obj.pk for obj in created)
+    return pks
+
+
+class EmpresaFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = "multas.Empresa"
+
+    razao_social = factory.Sequence(lambda n: f"Empresa Benchmark {n:07d} LTDA")
+    cnpj = factory.Sequence(lambda n: f"{n // 1000000 % 100:02d}.{n // 1000 % 1000:03d}.{n % 1000:03d}/0001-{n % 97:02d}")
+    endereco = factory.Sequence(lambda n: f"Rua {n % 300}, {n % 2000}")
+
+
+class AcessoRecursoFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = "auditoria.AcessoRecurso"
+
+    usuario = factory.Sequence(lambda n: f"usuario{n % 500:03d}")
+    recurso = cycle("/api/processos/", "/api/multas/", "/api/caixa-entrada/api/documentos/",
+                    "/api/protocolo-tramitacao/protocolos/", "/api/cobranca/boletos/", "/api/auth/login/")
+    acao = cycle("listar", "listar", "visualizar", "editar", "criar", "login")
+    metodo_http = cycle("GET", "GET", "GET", "PUT", "POST", "POST")
+    url_completa = factory.LazyAttribute(lambda o: f"{o.recurso}?page=1")
+    codigo_resposta = cycle(*([200] * 17), 403, 404, 500)
+    tempo_resposta = factory.Sequence(lambda n: 20 + (n * 37) % 1500)
+    ip_origem = factory.Sequence(lambda n: f"10.{n // 65536 % 256}.{n // 256 % 256}.{n % 256}")
+    timestamp = factory.Sequence(lambda n: spread_minutes(n, 365))
+
+
+class AutoInfracaoFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = "fiscalizacao.AutoInfracao"
+
+    numero = factory.Sequence(lambda n: f"{n:07d}/BENCH")
+    data_fiscalizacao = factory.Sequence(lambda n: spread_minutes(n, 365).date())
+    hora_fiscalizacao = "10:00"
+    razao_social = factory.Sequence(lambda n: f"Empresa Benchmark {n % 20000:07d} LTDA")
+    cnpj = factory.Sequence(lambda n: f"{n % 100:02d}.{n // 100 % 1000:03d}.222/0001-{n % 97:02d}")
+    endereco = factory.Sequence(lambda n: f"Av. {n % 300}, {n % 2000}")
+    relatorio = "Constatadas irregularidades na afixação de preços."
+    base_legal_cdc = "Art. 6º, III e Art. 31 do CDC"
+    valor_multa = factory.Sequence(lambda n: Decimal(500 + (n * 131) % 50000))
+    responsavel_nome = "Responsável"
+    responsavel_cpf = "111.111.111-11"
+    fiscal_nome = cycle("Fiscal A", "Fiscal B", "Fiscal C", "Fiscal D")
+    status = cycle("autuado", "autuado", "notificado", "em_defesa", "julgado", "pago", "cancelado")
+    criado_em = factory.LazyAttribute(lambda o: timezone.make_aware(datetime.combine(o.data_fiscalizacao, time(10))))
+    atualizado_em = factory.SelfAttribute("criado_em")
+
+
+class ProcessoFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = "fiscalizacao.Processo"
+
+    numero_processo = factory.Sequence(lambda n: f"PROC-{n:08d}/B")
+    autuado = factory.Sequence(lambda n: f"Empresa Benchmark {n % 20000:07d} LTDA")
+    cnpj = factory.Sequence(lambda n: f"{n % 100:02d}.{n // 100 % 1000:03d}.222/0001-{n % 97:02d}")
+    status = cycle("aguardando_defesa", "aguardando_defesa", "defesa_apresentada", "em_analise",
+                   "julgamento", "finalizado_procedente", "arquivado")
+    prioridade = cycle("normal", "normal", "alta", "baixa", "urgente")
+    prazo_defesa = factory.Sequence(lambda n: spread_minutes(n, 120, offset_days=30).date())
+    valor_multa = factory.Sequence(lambda n: Decimal(500 + (n * 131) % 50000))
+    fiscal_responsavel = cycle("Fiscal A", "Fiscal B", "Fiscal C", "Fiscal D")
+    criado_em = factory.Sequence(lambda n: spread_minutes(n, 365))
+    atualizado_em = factory.SelfAttribute("criado_em")
+
+
+class MultaFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = "multas.Multa"
+
+    valor = factory.Sequence(lambda n: Decimal(500 + (n * 131) % 50000))
+    data_emissao = factory.Sequence(lambda n: spread_minutes(n, 365).date())
+    data_vencimento = factory.LazyAttribute(lambda o: o.data_emissao + timedelta(days=30))
+    status = cycle("pendente", "pendente", "pendente", "paga", "paga", "vencida", "cancelada")
+    pago = factory.LazyAttribute(lambda o: o.status == "paga")
+    criado_em = factory.LazyAttribute(lambda o: timezone.make_aware(datetime.combine(o.data_emissao, time(9))))
+    atualizado_em = factory.SelfAttribute("criado_em")
+
+
+class BoletoMultaFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = "cobranca.BoletoMulta"
+
+    numero_boleto = factory.Sequence(lambda n: f"B{n:012d}")
+    nosso_numero = factory.Sequence(lambda n: f"{n:010d}")
+    pagador_nome = factory.Sequence(lambda n: f"Empresa Benchmark {n % 20000:07d} LTDA")
+    pagador_documento = factory.Sequence(lambda n: f"{n % 100:02d}.{n // 100 % 1000:03d}.222/0001-{n % 97:02d}")
+    pagador_endereco = "Rua do Comércio, 10"
+    valor_principal = factory.Sequence(lambda n: Decimal(500 + (n * 131) % 50000))
+    valor_total = factory.SelfAttribute("valor_principal")
+    data_emissao = factory.Sequence(lambda n: spread_minutes(n, 365).date())
+    data_vencimento = factory.LazyAttribute(lambda o: o.data_emissao + timedelta(days=30))
+    status = cycle("pendente", "enviado", "enviado", "pago", "pago", "vencido", "cancelado")
+    criado_em = factory.LazyAttribute(lambda o: timezone.make_aware(datetime.combine(o.data_emissao, time(9))))
+    atualizado_em = factory.SelfAttribute("criado_em")
+
+
+class TipoDocumentoFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = "protocolo_tramitacao.TipoDocumento"
+
+    nome = factory.Sequence(lambda n: f"Tipo de documento {n}")
+    prazo_resposta_dias = 30
+
+
+class ProtocoloDocumentoFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = "protocolo_tramitacao.ProtocoloDocumento"
+
+    numero_protocolo = factory.Sequence(lambda n: f"BENCH-{n:09d}")
+    origem = cycle("EXTERNO", "EXTERNO", "INTERNO", "FISCALIZACAO", "PETICIONAMENTO", "DIGITAL")
+    assunto = factory.Sequence(lambda n: f"{('Reclamação', 'Denúncia', 'Defesa', 'Recurso', 'Ofício')[n % 5]} {n}")
+    descricao = "Documento gerado para benchmark."
+    status = cycle("PROTOCOLADO", "EM_TRAMITACAO", "AGUARDANDO_ANALISE", "EM_ANALISE", "DECIDIDO", "ARQUIVADO")
+    prioridade = cycle("NORMAL", "NORMAL", "NORMAL", "ALTA", "BAIXA", "URGENTE")
+    remetente_nome = factory.Sequence(lambda n: f"Cidadão {n % 50000}")
+    remetente_documento = factory.Sequence(lambda n: f"{n:011d}")
+    data_protocolo = factory.Sequence(lambda n: spread_minutes(n, 365))
+    prazo_resposta = factory.Sequence(lambda n: spread_minutes(n, 90, offset_days=60))
+    criado_em = factory.SelfAttribute("data_protocolo")
+    atualizado_em = factory.SelfAttribute("data_protocolo")
+
+
+class CaixaEntradaFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = "caixa_entrada.CaixaEntrada"
+
+    numero_protocolo = factory.Sequence(lambda n: f"CX-BENCH-{n:09d}")
+    tipo_documento = cycle("RECLAMACAO", "RECLAMACAO", "DENUNCIA", "PETICAO", "RECURSO", "AUTO_INFRACAO", "MULTA")
+    assunto = factory.Sequence(lambda n: f"{('Cobrança indevida', 'Produto com defeito', 'Serviço não prestado', 'Propaganda enganosa')[n % 4]} {n}")
+    prioridade = cycle("NORMAL", "NORMAL", "NORMAL", "ALTA", "BAIXA", "URGENTE")
+    status = cycle("NAO_LIDO", "NAO_LIDO", "LIDO", "EM_ANALISE", "ENCAMINHADO", "RESPONDIDO", "ARQUIVADO")
+    remetente_nome = factory.Sequence(lambda n: f"Cidadão {n % 50000}")
+    remetente_documento = factory.Sequence(lambda n: f"{n:011d}")
+    empresa_nome = factory.Sequence(lambda n: f"Empresa Benchmark {n % 20000:07d} LTDA")
+    setor_destino = cycle("Atendimento", "Fiscalização", "Jurídico", "Financeiro", "Cobrança")
+    data_entrada = factory.Sequence(lambda n: spread_minutes(n, 180))
+    data_atualizacao = factory.SelfAttribute("data_entrada")
+    prazo_resposta = factory.Sequence(lambda n: spread_minutes(n, 60, offset_days=30))
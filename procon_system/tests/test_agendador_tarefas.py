@@ -0,0 +1,148 @@
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from fiscalizacao.models import AutoInfracao
+from monitoring.agendador import NOME_TAREFA_CELERY, TAREFAS_PADRAO, agendador_service
+from monitoring.models import ExecucaoTarefa
+from multas.models import Empresa, Multa
+from relatorios.models import Relatorio, RelatorioAgendado, TipoRelatorio
+
+
+pytestmark = pytest.mark.django_db
+
+
+def apenas_tarefas(settings, **tarefas):
+    settings.TAREFAS_PERIODICAS = {**{nome: {'ativo': False} for nome in TAREFAS_PADRAO}, **tarefas}
+
+
+def criar_agendamento(nome, proxima_execucao):
+    usuario = User.objects.get_or_create(username='analista')[0]
+    tipo = TipoRelatorio.objects.get_or_create(nome='Multas', descricao='Multas aplicadas', modulo='multas')[0]
+    return RelatorioAgendado.objects.create(
+        nome=nome, tipo_relatorio=tipo, frequencia='DIARIA', proxima_execucao=proxima_execucao, criado_por=usuario,
+    )
+
+
+def test_execucao_com_lock_e_historico():
+    vencido = criar_agendamento('Multas do dia', timezone.now() - timedelta(minutes=5))
+    criar_agendamento('Multas de amanhã', timezone.now() + timedelta(days=1))
+
+    resultado = agendador_service.executar('relatorios_agendados')
+
+    assert (resultado['status'], resultado['linhas']) == ('sucesso', 1)
+    relatorio = Relatorio.objects.get()
+    assert (relatorio.status, relatorio.solicitado_por.username) == ('PENDENTE', 'analista')
+    vencido.refresh_from_db()
+    assert vencido.proxima_execucao > timezone.now() + timedelta(hours=23)
+
+    execucao = ExecucaoTarefa.objects.get()
+    assert (execucao.tarefa, execucao.status, execucao.origem, execucao.linhas) == (
+        'relatorios_agendados', 'sucesso', 'manual', 1,
+    )
+    assert execucao.duracao > 0 and execucao.concluido_em
+    assert execucao.resultado['relatorios'] == [relatorio.pk]
+
+    # Outra instância com o lock: a execução é ignorada sem histórico
+    chave = agendador_service.PREFIXO_LOCK + 'relatorios_agendados'
+    assert agendador_service.cache.get(chave) is None
+    agendador_service.cache.add(chave, 'outro-worker', 60)
+    try:
+        assert agendador_service.executar('relatorios_agendados')['status'] == 'ignorada'
+    finally:
+        agendador_service.cache.delete(chave)
+    assert ExecucaoTarefa.objects.count() == 1
+
+
+def test_comando_executa_so_as_pendentes_e_registra_falhas(settings):
+    apenas_tarefas(
+        settings,
+        relatorios_agendados={'ativo': True, 'intervalo': 900},
+        quebrada={'funcao': 'monitoring.agendador.tarefa_inexistente', 'intervalo': 3600},
+    )
+    criar_agendamento('Multas do dia', timezone.now() - timedelta(minutes=5))
+
+    call_command('executar_tarefas_periodicas')
+    assert dict(ExecucaoTarefa.objects.values_list('tarefa', 'status')) == {
+        'relatorios_agendados': 'sucesso', 'quebrada': 'erro',
+    }
+    assert 'ImportError' in ExecucaoTarefa.objects.get(tarefa='quebrada').erro
+
+    # Dentro do intervalo nada roda de novo; --tarefa força a execução
+    assert agendador_service.pendentes() == []
+    call_command('executar_tarefas_periodicas')
+    call_command('executar_tarefas_periodicas', '--tarefa', 'relatorios_agendados')
+    assert ExecucaoTarefa.objects.filter(tarefa='relatorios_agendados', origem='comando').count() == 2
+    assert agendador_service.pendentes(agora=timezone.now() + timedelta(minutes=16)) == ['relatorios_agendados']
+
+    with pytest.raises(CommandError, match='desconhecida'):
+        call_command('executar_tarefas_periodicas', '--tarefa', 'varredura_prazos')
+
+    agenda = agendador_service.beat_schedule()
+    assert set(agenda) == {'tarefa_periodica:relatorios_agendados', 'tarefa_periodica:quebrada'}
+    assert agenda['tarefa_periodica:relatorios_agendados'] == {
+        'task': NOME_TAREFA_CELERY, 'schedule': 900.0, 'args': ('relatorios_agendados',), 'options': {'expires': 900.0},
+    }
+
+
+def test_listagem_de_vencidas_nao_atualiza_no_get(admin_client):
+    empresa = Empresa.objects.create(razao_social='Empresa A LTDA', cnpj='01.222.222/0001-22', endereco='Rua A, 1')
+    auto = AutoInfracao.objects.create(
+        numero='AUTO-AGD-001', data_fiscalizacao=date.today(), hora_fiscalizacao='10:00',
+        razao_social=empresa.razao_social, cnpj=empresa.cnpj, endereco='Rua A, 1',
+        base_legal_cdc='Art. 41 CDC', valor_multa=Decimal('1000.00'),
+        responsavel_nome='Responsável', responsavel_cpf='111.111.111-11', fiscal_nome='Fiscal',
+    )
+    multa = Multa.objects.create(processo=auto, empresa=empresa, valor=Decimal('1000.00'))
+    Multa.objects.update(data_vencimento=date.today() - timedelta(days=3), status='pendente')
+
+    resposta = admin_client.get(reverse('multas-vencidas'))
+
+    assert resposta.status_code == 200
+    assert [item['id'] for item in resposta.data] == [multa.pk]
+    multa.refresh_from_db()
+    assert multa.status == 'pendente'  # quem marca é a tarefa vencimento_multas
+
+
+def tarefa_mais_longa_que_o_lock():
+    time.sleep(0.5)
+    # O lock de 0,2 s já teria expirado sem a renovação
+    return {'linhas': 0, 'segunda_instancia': agendador_service.executar('lenta')['status']}
+
+
+def test_lock_renovado_durante_execucao_longa(settings):
+    apenas_tarefas(settings, lenta={
+        'funcao': 'tests.test_agendador_tarefas.tarefa_mais_longa_que_o_lock', 'intervalo': 60, 'lock_timeout': 0.2,
+    })
+
+    resultado = agendador_service.executar('lenta')
+
+    assert resultado['status'] == 'sucesso'
+    assert ExecucaoTarefa.objects.get().resultado['segunda_instancia'] == 'ignorada'
+    assert agendador_service.cache.get(agendador_service.PREFIXO_LOCK + 'lenta') is None
+
+
+def test_tarefas_de_retencao_usam_o_cleanup_manager(settings, monkeypatch):
+    from monitoring.cleanup_tasks import CleanupManager
+
+    chamadas = []
+    monkeypatch.setattr(CleanupManager, 'cleanup_old_warnings', lambda self, days=None: chamadas.append('logs') or {
+        'old_logs_processed': 2,
+    })
+    monkeypatch.setattr(CleanupManager, 'archive_old_data', lambda self, days=None, politicas=None: chamadas.append(
+        sorted(politicas)
+    ) or {'rows_archived': 3, 'cascade_rows': 1})
+    apenas_tarefas(settings, limpeza_auditoria={'ativo': True}, retencao_dados={'ativo': True})
+
+    assert agendador_service.executar('limpeza_auditoria')['linhas'] == 6
+    assert agendador_service.executar('retencao_dados')['linhas'] == 4
+    assert chamadas == [
+        'logs', ['acessos_recurso', 'logs_seguranca'],
+        ['execucoes_tarefas', 'historico_caixa_entrada', 'notificacoes'],
+    ]
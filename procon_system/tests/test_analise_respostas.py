@@ -0,0 +1,105 @@
+import re
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.utils import timezone
+
+from cip_automatica.models import CIPAutomatica, RespostaEmpresa, TipoCIP
+from portal_consumidor.models import FeedbackConsumidor
+from portal_consumidor.services import feedback_service
+from resposta_empresa.padroes import (
+    PADROES_RESPOSTA, PALAVRAS_CHAVE, ConjuntoPadroes, analisar_sentimento, classificador_resposta,
+    palavras_chave,
+)
+from resposta_empresa.services import analise_service
+
+
+TEXTOS = [
+    'Não aceito a reclamação: o pedido foi CANCELADO e a cobrança é infundada.',
+    'Concordamos em pagar o valor em 30 dias, conforme o contrato e a garantia.',
+    'A empresa aceitação parcial... proposta de acordo via conciliação ou mediação.',
+    'Reconhecemos o erro, assumimos a responsabilidade e não é verdade que houve multa.',
+    'Texto sem nenhum termo relevante.',
+    '',
+]
+
+
+def legado(texto):
+    texto = texto.lower()
+    return {
+        categoria: sum(1 for padrao in padroes if re.search(padrao, texto, re.IGNORECASE))
+        for categoria, padroes in PADROES_RESPOSTA.items()
+    }
+
+
+def test_motor_compilado_equivale_a_busca_padrao_a_padrao():
+    for texto in TEXTOS:
+        assert classificador_resposta.contar(texto) == legado(texto)
+        assert palavras_chave.termos(texto.lower()) == [p for p in PALAVRAS_CHAVE if p in texto.lower()]
+
+    # Padrões sobrepostos contam em ambas as categorias
+    assert classificador_resposta.contar('não aceito') == {'aceitacao': 1, 'recusa': 1, 'mediacao': 0}
+    # Fronteira de palavra continua valendo: "aceitação" não é "aceita"
+    assert classificador_resposta.contar('aceitação')['aceitacao'] == 0
+
+    conjunto = ConjuntoPadroes({'a': [r'\d+\s*dias', 'ab'], 'b': ['bc', r'(?:x|y)z']})
+    assert conjunto.contar('abc 10 dias yz') == {'a': 2, 'b': 2}
+
+
+def test_analise_de_resposta_e_sentimento():
+    analise = analise_service._executar_analise_ia(TEXTOS[1], Decimal('950'), Decimal('1000'))
+
+    assert analise['aceitacao_matches'] == 2
+    assert analise['prazo_oferecido'] == 30
+    assert analise['palavras_chave'] == ['contrato', 'garantia']
+    assert analise['analise_valor']['categoria'] == 'APROXIMADAMENTE_INTEGRAL'
+
+    assert analisar_sentimento('Atendimento RÁPIDO e eficiente')['sentimento'] == 'POSITIVO'
+    assert analisar_sentimento('processo lento, muito demorado')['sentimento'] == 'NEGATIVO'
+
+
+@pytest.mark.django_db
+def test_reanalise_em_lote_de_respostas_e_feedbacks(monkeypatch):
+    tipo = TipoCIP.objects.create(
+        nome='Genérico', codigo='GENERICO', template_cip='<p></p>', setor_responsavel='Jurídico'
+    )
+    respostas = []
+    for i, texto in enumerate(TEXTOS[:4]):
+        cip = CIPAutomatica.objects.create(
+            numero_protocolo=f'PROT-{i}', tipo_cip=tipo,
+            consumidor_nome='Maria', consumidor_cpf='12345678900', consumidor_email='maria@teste.com',
+            consumidor_telefone='92999999999', consumidor_endereco='Rua A', consumidor_cidade='Manaus',
+            consumidor_uf='AM', consumidor_cep='69000-000',
+            empresa_razao_social='Loja', empresa_cnpj='12.345.678/0001-90', empresa_endereco='Rua B',
+            empresa_cidade='Manaus', empresa_uf='AM',
+            assunto='Cobrança', descricao_fatos='Cobrança indevida', valor_indenizacao=Decimal('1000'),
+            prazo_resposta_empresa=timezone.now(), prazo_acordo_pagamento=timezone.now(),
+        )
+        respostas.append(RespostaEmpresa.objects.create(
+            cip=cip, tipo_resposta='PROPOSTA_CONTESTACAO', texto_resposta=texto,
+            valor_oferecido=Decimal('950') if i == 1 else None,
+            prazo_analise=timezone.now() + timedelta(days=5),
+            data_decisao=timezone.now() if i == 3 else None,
+        ))
+
+    # Lotes de um registro e pool de processos mesmo com poucos lotes
+    monkeypatch.setattr(analise_service, 'min_lotes_pool', 1)
+    resultado = analise_service.reanalisar_respostas(tamanho_lote=1, max_workers=2)
+
+    assert resultado['analisadas'] == 3  # a resposta já decidida fica de fora
+    assert sum(resultado['por_tipo'].values()) == 3
+    recusa = RespostaEmpresa.objects.get(pk=respostas[0].pk)
+    assert recusa.tipo_resposta == 'SOLICITA_PROVAS'  # recusa com baixa confiança (texto curto)
+    assert recusa.dados_analise_ia['recusa_matches'] == legado(TEXTOS[0])['recusa']
+    assert RespostaEmpresa.objects.get(pk=respostas[1].pk).prazo_pagamento_oferecido == 30
+    assert RespostaEmpresa.objects.get(pk=respostas[3].pk).dados_analise_ia == {}
+
+    FeedbackConsumidor.objects.create(tipo_feedback='USABILIDADE', nota_geral=9, aspecto_positivo='Portal ótimo')
+    FeedbackConsumidor.objects.create(tipo_feedback='USABILIDADE', nota_geral=2, aspecto_melhoria='Muito lento')
+    FeedbackConsumidor.objects.create(tipo_feedback='USABILIDADE', nota_geral=5)
+
+    resultado = feedback_service.reanalisar_feedbacks(max_workers=1)
+
+    assert resultado == {'analisados': 2, 'por_sentimento': {'POSITIVO': 1, 'NEGATIVO': 1}}
+    assert FeedbackConsumidor.objects.get(nota_geral=2).analise_sentimento == 'NEGATIVO'
@@ -0,0 +1,185 @@
+import json
+import threading
+import time
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from django.utils import timezone
+
+from apis_externas.models import (
+    EnvioDocumentoExterno, EventoIntegracao, MetricasIntegracao, OrgaoExterno,
+)
+from apis_externas.services import OutboxEnvioService
+
+
+pytestmark = pytest.mark.django_db
+
+
+class OrgaoStubHandler(BaseHTTPRequestHandler):
+    """Simula o endpoint de recebimento de um órgão externo"""
+
+    recebidos = []
+    simultaneos = 0
+    pico_simultaneos = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        tamanho = int(self.headers.get('Content-Length', 0))
+        payload = json.loads(self.rfile.read(tamanho) or b'{}')
+
+        with OrgaoStubHandler.lock:
+            OrgaoStubHandler.simultaneos += 1
+            OrgaoStubHandler.pico_simultaneos = max(
+                OrgaoStubHandler.pico_simultaneos, OrgaoStubHandler.simultaneos
+            )
+            OrgaoStubHandler.recebidos.append(payload)
+        time.sleep(0.05)
+        with OrgaoStubHandler.lock:
+            OrgaoStubHandler.simultaneos -= 1
+
+        if self.path.startswith('/indisponivel'):
+            status, corpo = 503, {'erro': 'manutencao'}
+        elif self.path.startswith('/rejeita'):
+            status, corpo = 422, {'erro': 'payload invalido'}
+        else:
+            status, corpo = 201, {'protocolo': f"EXT-{payload.get('id')}"}
+
+        dados = json.dumps(corpo).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def servidor_orgao():
+    OrgaoStubHandler.recebidos = []
+    OrgaoStubHandler.simultaneos = 0
+    OrgaoStubHandler.pico_simultaneos = 0
+    servidor = ThreadingHTTPServer(('127.0.0.1', 0), OrgaoStubHandler)
+    thread = threading.Thread(target=servidor.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{servidor.server_address[1]}'
+    servidor.shutdown()
+    servidor.server_close()
+
+
+def criar_orgao(codigo, endpoint, max_envios_simultaneos=2):
+    return OrgaoExterno.objects.create(
+        nome=f'Órgão {codigo}',
+        codigo_identificacao=codigo,
+        tipo_orgao='MINISTERIO_PUBLICO',
+        possui_api_integrada=True,
+        api_endpoint_base=endpoint,
+        timeout_segundos=5,
+        max_envios_simultaneos=max_envios_simultaneos,
+    )
+
+
+def criar_envios(orgao, quantidade, maximo_tentativas=5):
+    return [
+        EnvioDocumentoExterno.objects.create(
+            orgao_destino=orgao,
+            tipo_documento='RECLAMACAO_INICIAL',
+            protocolo_interno=f'{orgao.codigo_identificacao}-{i}',
+            payload_completo=json.dumps({'id': i}),
+            maximo_tentativas=maximo_tentativas,
+        )
+        for i in range(quantidade)
+    ]
+
+
+def test_entrega_lote_em_paralelo_respeitando_limite_por_orgao(servidor_orgao):
+    orgao = criar_orgao('MP_AM', f'{servidor_orgao}/recebe', max_envios_simultaneos=2)
+    criar_envios(orgao, 8)
+
+    totais = OutboxEnvioService(tamanho_lote=50, max_workers=8).processar_pendentes()
+
+    assert totais['enviados'] == 8
+    assert len(OrgaoStubHandler.recebidos) == 8
+    assert OrgaoStubHandler.pico_simultaneos <= 2
+    assert set(EnvioDocumentoExterno.objects.values_list('status_envio', flat=True)) == {'ENVIADO'}
+    envio = EnvioDocumentoExterno.objects.get(protocolo_interno='MP_AM-3')
+    assert envio.protocolo_externo == 'EXT-3'
+    assert envio.tentativas_envio == 1
+    assert EventoIntegracao.objects.filter(tipo_evento='ENVIO_SUCESSO').count() == 8
+
+    metricas = MetricasIntegracao.objects.get(orgao=orgao)
+    assert metricas.total_envios == 8
+    assert metricas.taxa_sucesso_percent == 100
+
+
+def test_falha_temporaria_reagenda_com_backoff_e_esgota_tentativas(servidor_orgao):
+    orgao = criar_orgao('TJ_AM', f'{servidor_orgao}/indisponivel')
+    envio, = criar_envios(orgao, 1, maximo_tentativas=2)
+    service = OutboxEnvioService(backoff_base_segundos=60)
+
+    antes = timezone.now()
+    assert service.processar_lote()['reagendados'] == 1
+    envio.refresh_from_db()
+    assert envio.status_envio == 'PENDENTE'
+    assert envio.tentativas_envio == 1
+    assert envio.proximo_envio_em >= antes + timedelta(seconds=60)
+
+    # Ainda dentro do backoff: nada a reivindicar
+    assert service.processar_lote()['processados'] == 0
+
+    EnvioDocumentoExterno.objects.filter(pk=envio.pk).update(proximo_envio_em=timezone.now())
+    assert service.processar_lote()['falhas_definitivas'] == 1
+    envio.refresh_from_db()
+    assert envio.status_envio == 'ERRO_ENVIO'
+    assert envio.tentativas_envio == 2
+    assert service.processar_lote()['processados'] == 0
+    assert EventoIntegracao.objects.filter(tipo_evento='ERROR_THRESHOLD').count() == 1
+
+
+def test_rejeicao_4xx_nao_e_retentada(servidor_orgao):
+    orgao = criar_orgao('DEF_AM', f'{servidor_orgao}/rejeita')
+    criar_envios(orgao, 1)
+
+    totais = OutboxEnvioService().processar_pendentes()
+
+    assert totais['falhas_definitivas'] == 1
+    envio = EnvioDocumentoExterno.objects.get()
+    assert envio.status_envio == 'REJEITADO'
+    assert envio.codigo_resposta_http == 422
+
+
+def test_reserva_expirada_volta_a_ser_elegivel(servidor_orgao):
+    orgao = criar_orgao('PC_AM', f'{servidor_orgao}/recebe')
+    envio, = criar_envios(orgao, 1)
+    service = OutboxEnvioService()
+
+    assert [e.pk for e in service.reivindicar_lote()] == [envio.pk]
+    assert service.reivindicar_lote() == []
+
+    EnvioDocumentoExterno.objects.filter(pk=envio.pk).update(
+        proximo_envio_em=timezone.now() - timedelta(seconds=1)
+    )
+    assert service.processar_lote()['enviados'] == 1
+    envio.refresh_from_db()
+    # A entrega abandonada conta como tentativa
+    assert envio.tentativas_envio == 2
+
+
+def test_reserva_expirada_sem_tentativas_restantes_vira_erro(servidor_orgao):
+    orgao = criar_orgao('SEFAZ_AM', f'{servidor_orgao}/recebe')
+    envio, = criar_envios(orgao, 1, maximo_tentativas=1)
+    service = OutboxEnvioService()
+
+    assert [e.tentativas_envio for e in service.reivindicar_lote()] == [1]
+
+    # O worker caiu antes de registrar o resultado
+    EnvioDocumentoExterno.objects.filter(pk=envio.pk).update(
+        proximo_envio_em=timezone.now() - timedelta(seconds=1)
+    )
+    assert service.processar_lote()['processados'] == 0
+    envio.refresh_from_db()
+    assert envio.status_envio == 'ERRO_ENVIO'
+    assert envio.proximo_envio_em is None
+    assert OrgaoStubHandler.recebidos == []
@@ -0,0 +1,158 @@
+import pytest
+
+from juridico import services as juridico_services
+from juridico.models import AnalistaJuridico, ParecerJuridico, RecursoAdministrativo
+from juridico.services import AssinaturaDigitalService
+from tests.factories import UserFactory
+
+
+@pytest.fixture(scope='module')
+def credenciais():
+    return AssinaturaDigitalService().gerar_certificado_digital(
+        'Analista Teste', 'analista@procon.am.gov.br', 'AM-12345'
+    )
+
+
+def criar_analista(credenciais):
+    chave_pem, certificado_pem = credenciais
+    return AnalistaJuridico.objects.create(
+        user=UserFactory(first_name='Analista', last_name='Teste'),
+        oab='AM-12345',
+        chave_privada_digital=chave_pem.decode(),
+        certificado_digital=certificado_pem.decode(),
+    )
+
+
+def criar_parecer(numero, analista):
+    recurso = RecursoAdministrativo.objects.create(
+        numero=f'REC-{numero}',
+        tipo_recurso='MULTA',
+        nome_recorrente='Empresa Teste',
+        cpf_cnpj_recorrente='12.345.678/0001-90',
+        fundamentacao='Cobrança indevida',
+        pedido='Cancelamento da multa',
+    )
+    return ParecerJuridico.objects.create(
+        recurso=recurso,
+        tipo_parecer='FINAL',
+        analista=analista,
+        fundamentacao_juridica='Art. 6º do CDC',
+        analise_fatos='Fatos comprovados',
+        conclusao='Deferir',
+        recomendacao='DEFERIR',
+    )
+
+
+def test_chave_privada_e_carregada_uma_vez(credenciais):
+    service = AssinaturaDigitalService()
+    service.limpar_cache_chaves()
+
+    for i in range(5):
+        service.assinar_documento(f'documento {i}', credenciais[0])
+
+    info = juridico_services._carregar_chave_privada.cache_info()
+    assert info.misses == 1
+    assert info.hits == 4
+
+
+def test_assinar_e_verificar_conteudos_em_pool_de_processos(credenciais):
+    chave_pem, certificado_pem = credenciais
+    service = AssinaturaDigitalService()
+    service.min_itens_pool_processos = 1
+    conteudos = [f'Parecer {i}' for i in range(8)]
+
+    resultados = service.assinar_conteudos(conteudos, chave_pem, max_workers=2)
+
+    assert all(resultado['sucesso'] for resultado in resultados)
+    assinaturas = [resultado['assinatura'] for resultado in resultados]
+    itens = [(c, a, certificado_pem) for c, a in zip(conteudos, assinaturas)]
+    assert service.verificar_conteudos(itens, max_workers=2) == [True] * 8
+
+    adulterado = [('Parecer alterado', assinaturas[0], certificado_pem)]
+    assert service.verificar_conteudos(adulterado, max_workers=2) == [False]
+
+
+@pytest.mark.django_db
+def test_assinar_lote_grava_assinaturas_no_banco(credenciais):
+    service = AssinaturaDigitalService()
+    analista = criar_analista(credenciais)
+    pareceres = [criar_parecer(i, analista) for i in range(3)]
+
+    resultado = service.assinar_lote(pareceres, analista, max_workers=1)
+
+    assert resultado == {'sucesso': True, 'assinados': 3, 'erros': []}
+    recarregados = list(
+        ParecerJuridico.objects.filter(pk__in=[p.pk for p in pareceres])
+        .select_related('recurso', 'assinado_por__user').order_by('pk')
+    )
+    assert all(p.assinado and p.assinado_por_id == analista.pk for p in recarregados)
+    assert all(p.assinatura_digital['hash_conteudo'] for p in recarregados)
+
+    sem_assinatura = criar_parecer(99, analista)
+    verificacoes = service.verificar_lote(recarregados + [sem_assinatura], max_workers=1)
+
+    assert [v['valido'] for v in verificacoes] == [True, True, True, False]
+    assert verificacoes[0]['assinante'] == 'Analista Teste'
+    assert verificacoes[3]['erro'] == 'Parecer não possui assinatura digital'
+
+    recarregados[0].conclusao = 'Indeferir'
+    assert service.verificar_lote(recarregados[:1], max_workers=1)[0]['valido'] is False
+
+
+@pytest.mark.django_db
+def test_assinar_parecer_individual_grava_no_banco(credenciais):
+    service = AssinaturaDigitalService()
+    analista = criar_analista(credenciais)
+    parecer = criar_parecer(1, analista)
+
+    assert service.assinar_parecer_juridico(parecer, analista)['sucesso'] is True
+
+    parecer = ParecerJuridico.objects.get(pk=parecer.pk)
+    assert parecer.assinado and parecer.data_assinatura
+    assert service.verificar_parecer_assinalado(parecer)['valido'] is True
+
+
+@pytest.mark.django_db
+def test_assinar_lote_exige_certificado(credenciais):
+    analista = criar_analista(credenciais)
+    analista.certificado_digital = ''
+    parecer = criar_parecer(1, analista)
+
+    resultado = AssinaturaDigitalService().assinar_lote([parecer], analista)
+
+    assert resultado['sucesso'] is False
+    assert resultado['assinados'] == 0
+    assert not ParecerJuridico.objects.get(pk=parecer.pk).assinado
+
+
+def test_chave_privada_gravada_cifrada(credenciais, settings):
+    chave_pem = credenciais[0]
+    assert b'BEGIN ENCRYPTED PRIVATE KEY' in chave_pem
+
+    service = AssinaturaDigitalService()
+    service.limpar_cache_chaves()
+    settings.ASSINATURA_CHAVE_SENHA = 'outra-senha'
+    with pytest.raises(ValueError):
+        service.assinar_documento('documento', chave_pem)
+
+
+@pytest.mark.django_db
+def test_migration_cifra_chaves_existentes(credenciais):
+    from importlib import import_module
+
+    from cryptography.hazmat.primitives import serialization
+    from django.apps import apps
+
+    chave = serialization.load_pem_private_key(credenciais[0], password=juridico_services._senha_chave())
+    aberta = chave.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption(),
+    )
+    analista = criar_analista((aberta, credenciais[1]))
+
+    migration = import_module('juridico.migrations.0003_cifrar_chaves_privadas')
+    migration.cifrar_chaves(apps, None)
+
+    analista.refresh_from_db()
+    assert 'BEGIN ENCRYPTED PRIVATE KEY' in analista.chave_privada_digital
+    parecer = criar_parecer(1, analista)
+    assert AssinaturaDigitalService().assinar_parecer_juridico(parecer, analista)['sucesso'] is True
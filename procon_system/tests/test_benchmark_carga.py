@@ -0,0 +1,61 @@
+import json
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+
+from caixa_entrada.models import CaixaEntrada
+from fiscalizacao.models import AutoInfracao
+from multas.models import Multa
+from monitoring.benchmark_carga import CENARIOS, GeradorDados, calcular_volumes, comparar
+
+
+pytestmark = [pytest.mark.django_db, pytest.mark.performance]
+
+
+def test_volumes_respeitam_dependencias():
+    volumes = calcular_volumes(0.0001, {'multas': 50})
+    assert volumes['autos'] == 20
+    assert volumes['multas'] == 20  # cada multa aponta para um auto distinto
+    assert volumes['boletos'] == 15
+
+
+def test_comparacao_com_baseline():
+    baseline = {'cenarios': {'a': {'duracao_p50_ms': 100.0, 'consultas': 4}}}
+    assert comparar({'a': {'duracao_p50_ms': 120.0, 'consultas': 4}}, baseline, 0.25, 5.0) == {}
+    assert comparar({'a': {'duracao_p50_ms': 20.0, 'consultas': 5}}, baseline, 0.25, 5.0) == {'a': ['consultas 4 → 5']}
+    assert list(comparar({'a': {'duracao_p50_ms': 130.0, 'consultas': 4}}, baseline, 0.25, 5.0)) == ['a']
+    assert comparar({'b': {'duracao_p50_ms': 999.0, 'consultas': 99}}, baseline, 0.25, 5.0) == {}
+
+
+def test_comando_gera_dados_mede_e_detecta_regressao(tmp_path):
+    caminho = tmp_path / 'baseline.json'
+    opcoes = {'fator': 0.0001, 'repeticoes': 1, 'baseline': str(caminho)}
+
+    call_command('benchmark_carga', salvar_baseline=True, **opcoes)
+
+    baseline = json.loads(caminho.read_text(encoding='utf-8'))
+    assert set(baseline['cenarios']) == set(CENARIOS)  # todos os cenários rodaram sem erro
+    assert baseline['volumes'] == calcular_volumes(0.0001)
+    # Os dados gerados são desfeitos ao final
+    assert not AutoInfracao.objects.exists() and not Multa.objects.exists() and not CaixaEntrada.objects.exists()
+
+    # Mesmas consultas e volumes: sem regressão (tempo não é comparado com piso alto)
+    call_command('benchmark_carga', cenario=['multas_vencidas'], **opcoes)
+
+    baseline['cenarios']['multas_vencidas']['consultas'] = 0
+    caminho.write_text(json.dumps(baseline), encoding='utf-8')
+    with pytest.raises(CommandError, match='regrediram'):
+        call_command('benchmark_carga', cenario=['multas_vencidas'], **opcoes)
+
+
+@pytest.mark.skipif(connection.vendor != 'sqlite', reason='estatísticas lidas de sqlite_stat1')
+def test_geracao_atualiza_estatisticas_das_tabelas_carregadas():
+    saida = []
+    GeradorDados(calcular_volumes(0.0001), saida=saida.append).gerar()
+
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT DISTINCT tbl FROM sqlite_stat1')
+        analisadas = {linha[0] for linha in cursor.fetchall()}
+    assert {AutoInfracao._meta.db_table, CaixaEntrada._meta.db_table, 'monitoring_prazomonitorado'} <= analisadas
+    assert saida[-1].startswith('estatísticas')
@@ -0,0 +1,87 @@
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+from protocolo.models import DocumentoProtocolo, Protocolo, StatusProtocolo, TipoProtocolo
+from protocolo.services import digitization_service, indexing_service
+
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def usuario():
+    return User.objects.create_user('protocolista', password='x')
+
+
+def criar_protocolo(usuario, assunto='Reclamação'):
+    return Protocolo.objects.create(
+        tipo_protocolo=TipoProtocolo.objects.get_or_create(nome='Reclamação', tipo='RECLAMACAO')[0],
+        status=StatusProtocolo.objects.get_or_create(nome='Aberto')[0],
+        assunto=assunto,
+        criado_por=usuario,
+    )
+
+
+def criar_documento(protocolo, titulo, texto):
+    return DocumentoProtocolo.objects.create(
+        protocolo=protocolo,
+        titulo=titulo,
+        arquivo=f'protocolos/{titulo}.pdf',
+        texto_extraido=texto,
+        enviado_por=protocolo.criado_por,
+    )
+
+
+def test_busca_ranqueada_com_trecho_sem_ler_arquivos(usuario, monkeypatch):
+    protocolo = criar_protocolo(usuario)
+    outro = criar_protocolo(usuario, 'Denúncia')
+    criar_documento(protocolo, 'Petição inicial', 'Cobrança indevida de tarifa bancária. ' * 3)
+    contestacao = criar_documento(protocolo, 'Contestação', 'A empresa nega a cobrança e junta a notificação enviada.')
+    criar_documento(outro, 'Resposta', 'Notificação de cobrança recebida pelo consumidor.')
+    criar_documento(protocolo, 'Anexo', 'Comprovante de pagamento.')
+
+    # Nenhuma extração de arquivo durante a busca
+    monkeypatch.setattr(indexing_service, 'index_document', lambda *a: pytest.fail('não deveria ler arquivos'))
+
+    resultados = indexing_service.search_documents('cobranca')  # sem acento: normalizado pelo índice
+    assert [r['titulo'] for r in resultados][0] == 'Petição inicial'
+    assert len(resultados) == 3
+    assert all('<mark>' in r['matched_content'] for r in resultados)
+
+    resultados = digitization_service.search_documents('notificação cobrança', protocolo)
+    assert [r['document_id'] for r in resultados] == [contestacao.id]
+
+    assert indexing_service.search_documents('"; DROP TABLE x --') == []
+
+
+def test_indice_acompanha_alteracao_e_exclusao(usuario):
+    protocolo = criar_protocolo(usuario)
+    documento = criar_documento(protocolo, 'Laudo', '')
+    assert indexing_service.search_documents('vistoria') == []
+
+    documento.texto_extraido = 'Laudo de vistoria técnica do veículo.'
+    documento.save()
+    assert [r['document_id'] for r in indexing_service.search_documents('vistoria')] == [documento.id]
+
+    documento.delete()
+    assert indexing_service.search_documents('vistoria') == []
+
+    criar_documento(protocolo, 'Laudo 2', 'Nova vistoria agendada.')
+    call_command('reindexar_texto_documentos')
+    assert len(indexing_service.search_documents('vistoria')) == 1
+
+
+def test_endpoint_buscar_texto(usuario):
+    protocolo = criar_protocolo(usuario)
+    documento = criar_documento(protocolo, 'Petição', 'Pedido de restituição em dobro.')
+    cliente = APIClient()
+    cliente.force_authenticate(usuario)
+
+    resposta = cliente.get('/api/protocolo/documentos/buscar_texto/', {'q': 'restituição', 'protocolo': protocolo.id})
+
+    assert resposta.status_code == 200
+    assert resposta.json()[0]['id'] == documento.id
+    assert '<mark>restituição</mark>' in resposta.json()[0]['trecho']
+    assert cliente.get('/api/protocolo/documentos/buscar_texto/', {'q': 'x', 'limite': 'abc'}).status_code == 400
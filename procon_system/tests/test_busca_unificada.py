@@ -0,0 +1,110 @@
+from datetime import date, timedelta
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+from fiscalizacao.models import AutoBanco, AutoPosto, AutoSupermercado, IndiceBuscaAuto
+from fiscalizacao.services import busca_unificada_service
+from tests.test_processos_lote import criar_processo
+
+
+pytestmark = pytest.mark.django_db
+
+
+def criar_auto(modelo, razao_social, cnpj, dias_atras=0, **campos):
+    return modelo.objects.create(
+        razao_social=razao_social,
+        atividade='Comércio',
+        endereco='Av. Eduardo Ribeiro, 100',
+        cep='69010-001',
+        municipio='Manaus',
+        cnpj=cnpj,
+        data_fiscalizacao=date.today() - timedelta(days=dias_atras),
+        hora_fiscalizacao='09:00',
+        **campos,
+    )
+
+
+def test_signals_mantem_indice_sincronizado():
+    auto = criar_auto(AutoBanco, 'Banco São João S/A', '11.222.333/0001-44')
+
+    entrada = IndiceBuscaAuto.objects.get(tipo='banco', objeto_id=auto.pk)
+    assert entrada.cnpj_digitos == '11222333000144'
+    assert 'banco sao joao s/a' in entrada.texto_busca
+
+    auto.razao_social = 'Banco Amazônia'
+    auto.save()
+    entrada.refresh_from_db()
+    assert 'banco amazonia' in entrada.texto_busca
+
+    auto.delete()
+    assert not IndiceBuscaAuto.objects.filter(tipo='banco', objeto_id=auto.pk).exists()
+
+
+def test_busca_entre_tipos_ordenada_e_limitada():
+    antigo = criar_auto(AutoPosto, 'Posto Açaí', '22.333.444/0001-55', dias_atras=10)
+    recente = criar_auto(AutoSupermercado, 'Supermercado Açaí', '33.444.555/0001-66', dias_atras=1)
+    criar_auto(AutoBanco, 'Banco Central', '44.555.666/0001-77')
+
+    resultados = busca_unificada_service.buscar('acai')
+    assert [(r['tipo'], r['id']) for r in resultados] == [
+        ('supermercado', recente.pk), ('posto', antigo.pk),
+    ]
+
+    assert len(busca_unificada_service.buscar('acai', limite=1)) == 1
+    assert busca_unificada_service.buscar('acai', tipo='posto')[0]['id'] == antigo.pk
+    assert busca_unificada_service.buscar('22.333.444')[0]['id'] == antigo.pk
+
+
+def test_reindexar_reconstroi_indice():
+    criar_auto(AutoBanco, 'Banco Um', '55.666.777/0001-88')
+    criar_auto(AutoPosto, 'Posto Dois', '66.777.888/0001-99')
+    IndiceBuscaAuto.objects.all().delete()
+
+    call_command('reindexar_busca', tipo=['banco', 'posto'])
+
+    assert set(IndiceBuscaAuto.objects.values_list('tipo', flat=True)) == {'banco', 'posto'}
+
+
+def test_endpoint_buscar_autos(admin_client):
+    auto = criar_auto(AutoBanco, 'Banco Rio Negro', '77.888.999/0001-00')
+
+    resposta = admin_client.get(reverse('fiscalizacao:buscar_autos'), {'q': 'rio negro'})
+
+    assert resposta.status_code == 200
+    assert resposta.data['total'] == 1
+    assert resposta.data['resultados'][0]['id'] == auto.pk
+    assert resposta.data['resultados'][0]['url'] == f'/fiscalizacao/bancos/{auto.pk}/'
+
+
+def test_busca_avancada_processos_usa_indice(admin_client):
+    processo = criar_processo(1, cnpj='88.999.000/0001-11')
+    processo.observacoes = 'Reincidência em cobrança indevida'
+    processo.save()
+    criar_processo(2, cnpj='99.000.111/0001-22')
+
+    resposta = admin_client.get(reverse('fiscalizacao:busca_avancada'), {'q': 'cobranca indevida'})
+
+    assert resposta.status_code == 200
+    assert resposta.data['total_encontrados'] == 1
+    assert resposta.data['resultados'][0]['id'] == processo.pk
+    assert admin_client.get(
+        reverse('fiscalizacao:busca_avancada'), {'q': '88999000'}
+    ).data['total_encontrados'] == 1
+
+
+def test_migration_popula_indice_existente():
+    from importlib import import_module
+
+    from django.apps import apps
+
+    auto = criar_auto(AutoPosto, 'Posto Açaí', '22.333.444/0001-55')
+    processo = criar_processo(1, cnpj='88.999.000/0001-11')
+    IndiceBuscaAuto.objects.all().delete()
+
+    migration = import_module('fiscalizacao.migrations.0005_popular_indice_busca')
+    migration.popular_indice(apps, None)
+
+    assert IndiceBuscaAuto.objects.get(tipo='posto', objeto_id=auto.pk).cnpj_digitos == '22333444000155'
+    assert IndiceBuscaAuto.objects.filter(tipo='processo', objeto_id=processo.pk).exists()
@@ -0,0 +1,86 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from django.utils import timezone
+
+from fiscalizacao.signals import calcular_prazo_defesa
+from monitoring.calendario import calendario_service, domingo_de_pascoa, feriados_nacionais
+from monitoring.models import Feriado
+from protocolo_tramitacao.models import ProtocoloDocumento, TipoDocumento
+
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def calendario_limpo():
+    # O rollback dos testes não dispara signals: descarta tabelas de outros testes
+    calendario_service.invalidar()
+    yield
+    calendario_service.invalidar()
+
+
+def test_feriados_nacionais_fixos_e_moveis():
+    assert domingo_de_pascoa(2026) == date(2026, 4, 5)
+    feriados = feriados_nacionais(2026)
+    assert feriados[date(2026, 4, 3)] == 'Sexta-feira Santa'
+    assert date(2026, 2, 16) in feriados and date(2026, 2, 17) in feriados
+    assert feriados[date(2026, 6, 4)] == 'Corpus Christi'
+    assert date(2026, 11, 20) in feriados
+    assert date(2023, 11, 20) not in feriados_nacionais(2023)
+
+
+def test_prazo_de_defesa_pula_feriados():
+    # 15 dias úteis a partir de 01/04/2026 passam pela Sexta-feira Santa e por Tiradentes
+    assert calcular_prazo_defesa(date(2026, 4, 1)) == date(2026, 4, 24)
+    assert calendario_service.dias_uteis_entre(date(2026, 4, 1), date(2026, 4, 24)) == 15
+    assert calendario_service.adicionar_dias_uteis(date(2026, 4, 24), -15) == date(2026, 4, 1)
+    # Início em dia não útil: o primeiro dia útil seguinte conta como o dia 1
+    assert calendario_service.adicionar_dias_uteis(date(2026, 4, 4), 1) == date(2026, 4, 6)
+    assert calendario_service.proximo_dia_util(date(2026, 4, 3)) == date(2026, 4, 6)
+
+
+def test_feriados_cadastrados_por_abrangencia():
+    Feriado.objects.create(
+        data=date(2020, 10, 24), nome='Aniversário de Manaus', abrangencia='municipal',
+        uf='AM', municipio='Manaus', recorrente=True,
+    )
+    Feriado.objects.create(data=date(2025, 10, 27), nome='Dedetização da sede', abrangencia='fechamento')
+
+    # Quinta 23/10/2025 + 1 dia útil: sexta é feriado municipal e segunda o órgão está fechado
+    assert calendario_service.adicionar_dias_uteis(date(2025, 10, 23), 1) == date(2025, 10, 28)
+    assert calendario_service.adicionar_dias_uteis(date(2025, 10, 23), 1, uf='SP', municipio='Santos') == date(2025, 10, 24)
+    assert not calendario_service.eh_dia_util(date(2031, 10, 24))  # recorrente
+
+    Feriado.objects.filter(abrangencia='fechamento').delete()  # signal invalida o calendário
+    assert calendario_service.adicionar_dias_uteis(date(2025, 10, 23), 1) == date(2025, 10, 27)
+
+
+def test_tabela_confere_com_contagem_dia_a_dia():
+    feriados = {}
+    for ano in range(2023, 2030):
+        feriados.update(feriados_nacionais(ano))
+
+    def somar_dia_a_dia(dia, dias):
+        while dias:
+            dia += timedelta(days=1)
+            if dia.weekday() < 5 and dia not in feriados:
+                dias -= 1
+        return dia
+
+    for inicio in (date(2024, 12, 20), date(2025, 2, 28), date(2026, 1, 1), date(2027, 3, 25)):
+        for dias in (1, 5, 15, 30, 250):
+            assert calendario_service.adicionar_dias_uteis(inicio, dias) == somar_dia_a_dia(inicio, dias)
+    # Fora da margem inicial de anos: a tabela é ampliada
+    assert calendario_service.adicionar_dias_uteis(date(2026, 1, 2), 2500) > date(2035, 1, 1)
+
+
+def test_prazo_de_resposta_do_protocolo_em_dias_uteis(monkeypatch):
+    agora = timezone.make_aware(datetime(2025, 12, 19, 14, 30))  # sexta-feira
+    monkeypatch.setattr(timezone, 'now', lambda: agora)
+    protocolo = ProtocoloDocumento(tipo_documento=TipoDocumento(nome='Ofício', prazo_resposta_dias=5))
+
+    prazo = protocolo.calcular_prazo_resposta()
+
+    # 22, 23, 24, (25 Natal), 26, 29
+    assert timezone.localtime(prazo) == timezone.localtime(agora) + timedelta(days=10)
@@ -0,0 +1,143 @@
+import hashlib
+import io
+
+import pytest
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from reportlab.pdfgen import canvas
+
+from caixa_entrada.models import AnexoCaixaEntrada, CaixaEntrada
+from fiscalizacao.models import AnexoAuto
+from protocolo.models import ConteudoArquivo, DocumentoProtocolo
+from protocolo.services import conteudo_service, digitization_service, ocr_service
+from tests.test_busca_documentos_protocolo import criar_protocolo
+
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def usuario():
+    return User.objects.create_user('arquivista', password='x')
+
+
+@pytest.fixture(autouse=True)
+def midia(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    caches['long_term'].clear()
+
+
+def pdf_bytes(texto):
+    saida = io.BytesIO()
+    pdf = canvas.Canvas(saida)
+    pdf.drawString(72, 720, texto)
+    pdf.save()
+    return saida.getvalue()
+
+
+def enviar_documento(protocolo, conteudo, nome='peticao.pdf'):
+    return DocumentoProtocolo.objects.create(
+        protocolo=protocolo, titulo=nome, arquivo=SimpleUploadedFile(nome, conteudo),
+        enviado_por=protocolo.criado_por,
+    )
+
+
+def test_hash_calculado_no_upload_dos_tres_modelos(usuario):
+    conteudo = pdf_bytes('Notificacao de cobranca indevida enviada ao consumidor.')
+    esperado = hashlib.sha256(conteudo).hexdigest()
+
+    documento = enviar_documento(criar_protocolo(usuario), conteudo)
+    caixa = CaixaEntrada.objects.create(
+        tipo_documento='PETICAO', assunto='Anexo', remetente_nome='Fulano', setor_destino='Juridico 1',
+    )
+    anexo_caixa = AnexoCaixaEntrada.objects.create(
+        documento=caixa, arquivo=SimpleUploadedFile('copia.pdf', conteudo),
+        nome_original='copia.pdf', tipo_mime='application/pdf', tamanho=len(conteudo),
+    )
+    anexo_auto = AnexoAuto.objects.create(
+        content_type=ContentType.objects.get_for_model(DocumentoProtocolo), object_id=documento.id,
+        arquivo=SimpleUploadedFile('auto.pdf', conteudo),
+    )
+
+    assert documento.hash_conteudo == anexo_caixa.hash_conteudo == anexo_auto.hash_conteudo == esperado
+    with documento.arquivo.open('rb') as arquivo:
+        assert arquivo.read() == conteudo  # o hash não consome o upload
+
+    # Arquivo substituído: hash recalculado
+    documento.arquivo = SimpleUploadedFile('peticao-v2.pdf', pdf_bytes('Outra versao'))
+    documento.save()
+    assert documento.hash_conteudo != esperado
+
+    DocumentoProtocolo.objects.filter(pk=documento.pk).update(hash_conteudo='')
+    call_command('calcular_hash_anexos')
+    assert DocumentoProtocolo.objects.get(pk=documento.pk).hash_conteudo == documento.hash_conteudo
+
+
+def test_extracao_reaproveitada_entre_protocolos_e_anexos(usuario, monkeypatch):
+    conteudo = pdf_bytes('Contrato de adesao com clausula de fidelidade abusiva.')
+    original = enviar_documento(criar_protocolo(usuario), conteudo)
+
+    resultado = digitization_service.process_document_upload(original)
+    assert not resultado['reused_content']
+    assert 'text_extraction' in resultado['processing_steps']
+    assert ConteudoArquivo.objects.get(hash_sha256=original.hash_conteudo).processado
+
+    monkeypatch.setattr(ocr_service, 'extract_text_from_path', lambda *a, **k: pytest.fail('não deveria reprocessar'))
+    reenvio = enviar_documento(criar_protocolo(usuario, 'Denúncia'), conteudo, 'reenvio.pdf')
+    resultado = digitization_service.process_document_upload(reenvio)
+
+    assert resultado['reused_content']
+    assert resultado['processing_steps'][0] == 'content_reuse'
+    assert resultado['quality_assessment']['success']
+    reenvio.refresh_from_db()
+    assert reenvio.indexado
+    assert reenvio.texto_extraido == 'Contrato de adesao com clausula de fidelidade abusiva.'
+    assert reenvio.tamanho_texto == len(reenvio.texto_extraido)
+
+    caixa = CaixaEntrada.objects.create(
+        tipo_documento='PETICAO', assunto='Anexo', remetente_nome='Fulano', setor_destino='Juridico 1',
+    )
+    anexo = AnexoCaixaEntrada.objects.create(
+        documento=caixa, arquivo=SimpleUploadedFile('anexo.pdf', conteudo),
+        nome_original='anexo.pdf', tipo_mime='application/pdf', tamanho=len(conteudo),
+    )
+    conteudo_arquivo, reaproveitado = conteudo_service.processar(anexo)
+    assert reaproveitado
+    assert ConteudoArquivo.objects.count() == 1
+
+
+def test_conteudo_sem_qualidade_completa_so_a_analise(usuario, monkeypatch):
+    conteudo = pdf_bytes('Fatura com cobranca em duplicidade.')
+    documento = enviar_documento(criar_protocolo(usuario), conteudo)
+    # Registro gravado pelo OCR em lote antes da análise de qualidade fazer parte dele
+    conteudo_service.registrar(documento.hash_conteudo, {'text': 'Fatura', 'pages': [{}], 'errors': []})
+
+    monkeypatch.setattr(ocr_service, 'extract_text_from_path', lambda *a, **k: pytest.fail('não deveria reprocessar'))
+    conteudo_arquivo, reaproveitado = conteudo_service.processar(documento)
+
+    assert reaproveitado
+    assert ConteudoArquivo.objects.get(pk=conteudo_arquivo.pk).qualidade['success']
+
+
+def test_estatisticas_em_um_aggregate(usuario, django_assert_num_queries):
+    protocolo = criar_protocolo(usuario)
+    conteudo = pdf_bytes('Comprovante')
+    for nome, texto in (('a.pdf', 'abc'), ('b.pdf', 'abcdefg'), ('c.pdf', '')):
+        documento = enviar_documento(protocolo, conteudo, nome)
+        documento.texto_extraido = texto
+        documento.indexado = bool(texto)
+        documento.save()
+    enviar_documento(protocolo, pdf_bytes('Outro'), 'd.pdf')
+
+    with django_assert_num_queries(3):  # aggregate + por tipo + por extensão
+        stats = digitization_service.get_document_statistics(protocolo)
+
+    assert stats['total_documents'] == 4
+    assert stats['indexed_documents'] == 2
+    assert stats['text_statistics'] == {
+        'total_text_length': 10, 'average_text_length': 5, 'documents_with_text': 2,
+    }
+    assert (stats['unique_contents'], stats['duplicate_documents']) == (2, 2)
@@ -0,0 +1,102 @@
+from datetime import date, datetime, time, timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from audiencia_calendario.disponibilidade import IndiceIntervalos, combinar, disponibilidade_service
+from audiencia_calendario.models import AgendamentoAudiencia, LocalAudiencia, Mediador
+from audiencia_calendario.services import calendario_service
+
+
+pytestmark = pytest.mark.django_db
+
+DIA = date(2026, 3, 16)  # segunda-feira
+
+
+def criar_mediador(registro, disponibilidade=None):
+    usuario = get_user_model().objects.create(username=f'mediador_{registro}')
+    return Mediador.objects.create(
+        usuario=usuario, numero_registro=registro, disponibilidade_semana=disponibilidade or {},
+    )
+
+
+def agendar(protocolo, inicio, duracao_horas=2, status='AGENDADA', **campos):
+    return AgendamentoAudiencia.objects.create(
+        numero_protocolo=protocolo,
+        data_agendamento=inicio,
+        duracao_estimada=timedelta(hours=duracao_horas),
+        status=status,
+        **campos,
+    )
+
+
+def test_indice_intervalos_detecta_sobreposicao():
+    base = datetime(2026, 3, 16, 8)
+    indice = IndiceIntervalos([
+        (base + timedelta(hours=2), base + timedelta(hours=3), 'B'),
+        (base, base + timedelta(hours=5), 'A'),
+    ])
+
+    assert indice.sobrepoe(base + timedelta(hours=4), base + timedelta(hours=6))
+    assert indice.conflitos(base + timedelta(hours=2, minutes=30), base + timedelta(hours=4)) == ['A', 'B']
+    assert not indice.sobrepoe(base + timedelta(hours=5), base + timedelta(hours=6))
+    assert not indice.sobrepoe(base - timedelta(hours=1), base)
+
+
+def test_verificacao_considera_duracao_e_dia_anterior():
+    mediador = criar_mediador('M-1')
+    agendar('AUD-1', combinar(DIA, time(9, 0)), duracao_horas=3, mediador=mediador)
+    agendar('AUD-CANC', combinar(DIA, time(14, 0)), mediador=mediador, status='CANCELADA')
+    agendar('AUD-NOITE', combinar(DIA - timedelta(days=1), time(23, 0)), duracao_horas=10, mediador=mediador)
+
+    # 11:00 ainda está dentro da audiência das 09:00 (3h)
+    ocupado = calendario_service._verificar_disponibilidade(combinar(DIA, time(11, 0)), mediador.id)
+    assert not ocupado['disponivel']
+    assert ocupado['conflitos'][0]['conflito_com'] == 'AUD-1'
+
+    assert calendario_service._verificar_disponibilidade(combinar(DIA, time(12, 0)), mediador.id)['disponivel']
+    assert calendario_service._verificar_disponibilidade(combinar(DIA, time(14, 0)), mediador.id)['disponivel']
+    # audiência iniciada na véspera ainda ocupa as 08:00
+    assert not calendario_service._verificar_disponibilidade(
+        combinar(DIA, time(8, 0)), mediador.id, duracao=timedelta(minutes=30)
+    )['disponivel']
+
+
+def test_horarios_livres_com_uma_consulta_por_periodo():
+    mediador = criar_mediador('M-2', {'segunda': [8, 12], 'terca': []})
+    local = LocalAudiencia.objects.create(nome='Sala 1', endereco='Centro', tipo_local='SALA_FISICA')
+    agendar('AUD-2', combinar(DIA, time(9, 0)), duracao_horas=1, mediador=mediador)
+    agendar('AUD-3', combinar(DIA, time(11, 0)), duracao_horas=1, local=local)
+
+    with CaptureQueriesContext(connection) as consultas:
+        livres = calendario_service.buscar_horarios_livres(
+            DIA, 1, mediador_id=mediador.id, local_id=local.id, data_fim=DIA + timedelta(days=1)
+        )
+    assert len(consultas) == 2  # mediador + agendamentos do período
+
+    assert [slot['formato_visual'] for slot in livres] == ['08:00', '10:00']
+    assert all(timezone.localdate(slot['inicio']) == DIA for slot in livres)  # terça sem expediente
+
+
+def test_horarios_livres_de_todos_os_recursos():
+    livre = criar_mediador('M-3')
+    ocupado = criar_mediador('M-4')
+    sala = LocalAudiencia.objects.create(nome='Sala 2', endereco='Centro', tipo_local='SALA_FISICA')
+    agendar('AUD-4', combinar(DIA, time(8, 0)), duracao_horas=10, mediador=ocupado, local=sala)
+
+    slots = disponibilidade_service.horarios_livres_recursos(DIA, timedelta(hours=2))
+
+    assert len(slots) == 17  # 08:00 a 16:00 de 30 em 30 minutos
+    assert all(slot['mediadores'] == [livre.id] and slot['locais'] == [] for slot in slots)
+
+
+def test_benchmark_disponibilidade_confere_resultados(capsys):
+    call_command('benchmark_disponibilidade', mediadores=2, locais=1, dias=1, por_dia=2)
+
+    saida = capsys.readouterr().out
+    assert 'combinações livres em ambos os cenários' in saida
+    assert not AgendamentoAudiencia.objects.exists()
@@ -0,0 +1,165 @@
+import io
+import zipfile
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from docx import Document
+from docx.oxml.ns import qn
+
+from fiscalizacao import tasks
+from fiscalizacao.models import AutoBanco, AutoDiversos, AutoPosto, NotaFiscalPosto
+from fiscalizacao.services import documento_auto_service
+from fiscalizacao.services import documento_service
+from fiscalizacao.services.documento_service import TemplateDocumento, obter_template
+
+
+pytestmark = pytest.mark.django_db
+
+
+def texto_docx(conteudo):
+    doc = Document(io.BytesIO(conteudo))
+    return ''.join(t.text or '' for t in doc.element.body.iter(qn('w:t')))
+
+
+def criar_auto(modelo, razao_social='Comercial Açaí & Cia', **campos):
+    return modelo.objects.create(
+        razao_social=razao_social,
+        atividade='Comércio',
+        endereco='Av. Sete de Setembro, 1000',
+        cep='69005-140',
+        municipio='Manaus',
+        cnpj='12.345.678/0001-90',
+        data_fiscalizacao=date(2026, 3, 15),
+        hora_fiscalizacao='14:30',
+        **campos,
+    )
+
+
+@pytest.fixture(autouse=True)
+def limpar_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def test_marcadores_quebrados_em_varios_runs_sao_unificados():
+    doc = Document()
+    paragrafo = doc.add_paragraph('Razão: ')
+    for trecho in ('{', '{razao', '_soc', 'ial}', '} fim'):
+        paragrafo.add_run(trecho).bold = True
+    buffer = io.BytesIO()
+    doc.save(buffer)
+
+    template = TemplateDocumento('teste', buffer.getvalue())
+
+    assert template.campos == {'razao_social'}
+    assert 'Razão: Loja <1> fim' in texto_docx(template.renderizar_docx({'razao_social': 'Loja <1>'}))
+
+
+def test_documentos_de_todos_os_tipos_sem_marcadores_pendentes():
+    diversos = criar_auto(AutoDiversos, advertencia=True, narrativa_fatos='Linha 1\nLinha 2')
+    posto = criar_auto(AutoPosto, preco_gasolina_comum=Decimal('6.499'))
+    NotaFiscalPosto.objects.create(
+        auto_posto=posto, tipo_nota='aumento', produto='gas_comum',
+        numero_nota='NF-77', data=date(2026, 3, 1), preco=Decimal('5.900'),
+    )
+    banco = criar_auto(AutoBanco, ausencia_profissional_libras=True)
+
+    for tipo, auto in (('diversos', diversos), ('posto', posto), ('banco', banco)):
+        texto = texto_docx(documento_auto_service.renderizar(tipo, auto))
+        assert '{{' not in texto
+        assert 'Comercial Açaí & Cia' in texto
+
+    texto_posto = texto_docx(documento_auto_service.renderizar('posto', posto))
+    assert '6,499' in texto_posto
+    assert 'NF-77' in texto_posto
+    assert 'Ausência de profissional de LIBRAS' in texto_docx(documento_auto_service.renderizar('banco', banco))
+
+    pdf = documento_auto_service.renderizar('diversos', diversos, formato='pdf')
+    assert pdf.startswith(b'%PDF')
+
+
+def test_reimpressao_vem_do_cache_e_alteracao_gera_novo_documento(monkeypatch):
+    auto = criar_auto(AutoDiversos)
+    template = obter_template('diversos')
+    chamadas = []
+    original = template.renderizar
+    monkeypatch.setattr(template, 'renderizar', lambda *a: chamadas.append(a) or original(*a))
+
+    primeiro = documento_auto_service.renderizar('diversos', auto)
+    assert documento_auto_service.renderizar('diversos', auto) == primeiro
+    assert len(chamadas) == 1
+
+    auto.nome_fantasia = 'Nova Fachada'
+    auto.save()
+    assert 'Nova Fachada' in texto_docx(documento_auto_service.renderizar('diversos', auto))
+    assert len(chamadas) == 2
+
+
+def test_lote_em_pool_de_processos_gera_zip(monkeypatch):
+    autos = [criar_auto(AutoDiversos, razao_social=f'Loja {i}') for i in range(4)]
+    monkeypatch.setattr(documento_auto_service, 'min_itens_pool_processos', 2)
+
+    conteudo = documento_auto_service.renderizar_lote(
+        'diversos', documento_auto_service.autos_lote('diversos', data=date(2026, 3, 15)), max_workers=2
+    )
+
+    with zipfile.ZipFile(io.BytesIO(conteudo)) as arquivo:
+        nomes = arquivo.namelist()
+        assert nomes == [documento_auto_service.nome_arquivo('diversos', auto) for auto in autos]
+        assert 'Loja 2' in texto_docx(arquivo.read(nomes[2]))
+
+    # Segunda chamada: tudo vem do cache, nada é renderizado
+    monkeypatch.setattr(documento_service, '_renderizar_item', lambda item: pytest.fail('não deveria renderizar'))
+    assert documento_auto_service.renderizar_lote('diversos', autos, max_workers=1)
+
+
+def test_endpoints_documento_e_lote(admin_client, settings):
+    # Sem broker: o ZIP do lote volta na própria resposta
+    del settings.CELERY_BROKER_URL
+    auto = criar_auto(AutoDiversos)
+
+    resposta = admin_client.get(reverse('fiscalizacao:gerar_documento_diversos', args=[auto.pk]))
+    assert resposta.status_code == 200
+    assert documento_auto_service.nome_arquivo('diversos', auto) in resposta['Content-Disposition']
+
+    lote = admin_client.get(reverse('fiscalizacao:gerar_documentos_lote'), {'tipo': 'diversos', 'data': '2026-03-15'})
+    assert lote.status_code == 200
+    assert lote['Content-Type'] == 'application/zip'
+
+    invalido = admin_client.get(reverse('fiscalizacao:gerar_documentos_lote'), {'tipo': 'diversos', 'formato': 'odt', 'ids': str(auto.pk)})
+    assert invalido.status_code == 400
+
+
+def test_lote_enfileirado_com_broker_e_inline_sem_pool(admin_client, settings, monkeypatch):
+    auto = criar_auto(AutoDiversos)
+    url = reverse('fiscalizacao:gerar_documentos_lote')
+    chamadas = []
+    renderizar_lote = documento_auto_service.renderizar_lote
+    monkeypatch.setattr(
+        documento_auto_service, 'renderizar_lote',
+        lambda tipo, autos, formato='docx', max_workers=None: chamadas.append(max_workers) or renderizar_lote(tipo, autos, formato, max_workers),
+    )
+
+    settings.CELERY_BROKER_URL = 'redis://localhost:6379/0'
+    enfileiradas = []
+    monkeypatch.setattr(
+        tasks.gerar_documentos_lote, 'delay',
+        lambda *args: enfileiradas.append(args) or SimpleNamespace(id='tarefa-1'),
+    )
+    resposta = admin_client.get(url, {'tipo': 'diversos', 'ids': str(auto.pk)})
+
+    assert resposta.status_code == 202
+    assert resposta.json()['task_id'] == 'tarefa-1'
+    tipo, formato, ids, caminho = enfileiradas[0]
+    assert (tipo, formato, ids) == ('diversos', 'docx', [auto.pk])
+    assert caminho.endswith('autos_diversos_selecionados.zip') and chamadas == []
+
+    # Sem broker o lote é renderizado na requisição, com um único processo
+    del settings.CELERY_BROKER_URL
+    assert admin_client.get(url, {'tipo': 'diversos', 'ids': str(auto.pk)}).status_code == 200
+    assert chamadas == [1]
@@ -0,0 +1,91 @@
+from datetime import date
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from fiscalizacao.models import AutoBanco, AutoDiversos, AutoPosto, AutoSupermercado
+from fiscalizacao.services import estatisticas_fiscalizacao_service
+from fiscalizacao.services.estatisticas_service import inicio_do_mes
+from tests.test_busca_unificada import criar_auto
+from tests.test_fila_infracao import criar_infracao
+
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def limpar_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def test_inicio_do_mes_usa_meses_de_calendario():
+    assert inicio_do_mes(date(2026, 3, 31), 1) == date(2026, 2, 1)
+    assert inicio_do_mes(date(2026, 1, 15), 2) == date(2025, 11, 1)
+
+
+def test_uma_consulta_por_modelo_e_resultado_mesclado():
+    banco = criar_auto(AutoBanco, 'Banco Irregular', '11.222.333/0001-44', origem='denuncia')
+    criar_auto(AutoBanco, 'Banco Regular', '11.222.333/0002-25', nada_consta=True)
+    criar_auto(AutoPosto, 'Posto Regular', '22.333.444/0001-55', sem_irregularidades=True)
+    criar_auto(AutoSupermercado, 'Supermercado', '33.444.555/0001-66', origem='forca_tarefa')
+    criar_auto(AutoDiversos, 'Loja', '44.555.666/0001-77')
+    criar_infracao(banco)
+    cache.clear()
+
+    with CaptureQueriesContext(connection) as consultas:
+        resultado = estatisticas_fiscalizacao_service.estatisticas()
+    assert len(consultas) == 5  # quatro modelos de auto + infrações
+
+    assert resultado['totais'] == {
+        'autos_banco': 2, 'autos_posto': 1, 'autos_supermercado': 1, 'autos_diversos': 1,
+        'total_autos': 5, 'total_infracoes': 1,
+    }
+    assert resultado['por_origem'] == {'acao_fiscalizatoria': 3, 'denuncia': 1, 'forca_tarefa': 1, 'outros': 0}
+    assert resultado['irregularidades']['bancos_com_irregularidades'] == 1
+    assert resultado['irregularidades']['postos_com_irregularidades'] == 0
+    assert resultado['irregularidades']['supermercados_com_irregularidades'] == 1
+    assert resultado['por_municipio'] == {'Manaus': 5}
+    assert resultado['infracoes_por_status'] == {'autuado': 1}
+
+    with CaptureQueriesContext(connection) as consultas:
+        assert estatisticas_fiscalizacao_service.estatisticas() == resultado
+    assert len(consultas) == 0
+
+
+def test_salvar_auto_invalida_cache():
+    assert estatisticas_fiscalizacao_service.estatisticas()['totais']['total_autos'] == 0
+    criar_auto(AutoDiversos, 'Loja', '44.555.666/0001-77')
+    assert estatisticas_fiscalizacao_service.estatisticas()['totais']['total_autos'] == 1
+
+
+def test_tendencias_por_mes_de_calendario():
+    hoje = date.today()
+    criar_auto(AutoPosto, 'Posto Antigo', '22.333.444/0001-55', dias_atras=(hoje - inicio_do_mes(hoje, 1)).days)
+    criar_auto(AutoPosto, 'Posto Atual', '22.333.444/0002-36')
+
+    tendencias = estatisticas_fiscalizacao_service.tendencias(6, hoje)
+
+    assert list(tendencias) == [inicio_do_mes(hoje, i).strftime('%Y-%m') for i in range(6)]
+    assert tendencias[hoje.strftime('%Y-%m')]['posto'] == 1
+    assert tendencias[inicio_do_mes(hoje, 1).strftime('%Y-%m')]['total'] == 1
+
+
+def test_endpoints_dashboard_e_estatisticas(admin_client):
+    criar_auto(AutoBanco, 'Banco Centro', '11.222.333/0001-44')
+
+    gerais = admin_client.get(reverse('fiscalizacao:estatisticas_gerais'), {'municipio': 'manaus'})
+    assert gerais.status_code == 200
+    assert gerais.data['totais']['autos_banco'] == 1
+    assert admin_client.get(
+        reverse('fiscalizacao:estatisticas_gerais'), {'data_inicio': '15/03/2026'}
+    ).status_code == 400
+
+    painel = admin_client.get(reverse('fiscalizacao:dashboard_stats'))
+    assert painel.status_code == 200
+    assert painel.data['autos']['total_bancos'] == 1
+    assert len(painel.data['tendencias']) == 6
@@ -0,0 +1,93 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from django.urls import reverse
+
+from fiscalizacao.models import AutoBanco, AutoInfracao, AutoPosto, AutoSupermercado, FilaAutoInfracao
+from fiscalizacao.services import fila_infracao_service
+from tests.test_busca_unificada import criar_auto
+
+
+pytestmark = pytest.mark.django_db
+
+
+def criar_infracao(auto, numero='INF-2026-001'):
+    return AutoInfracao.objects.create(
+        numero=numero,
+        data_fiscalizacao=date.today(),
+        hora_fiscalizacao='10:00',
+        razao_social=auto.razao_social,
+        cnpj=auto.cnpj,
+        endereco='Rua Teste, 123',
+        base_legal_cdc='Art. 34 CDC',
+        valor_multa=Decimal('1000.00'),
+        responsavel_nome='João Silva',
+        responsavel_cpf='123.456.789-00',
+        fiscal_nome='Pedro Santos',
+        content_type=ContentType.objects.get_for_model(auto),
+        object_id=auto.pk,
+    )
+
+
+def test_auto_irregular_entra_e_sai_da_fila():
+    auto = criar_auto(AutoBanco, 'Banco Irregular', '11.222.333/0001-44')
+    entrada = FilaAutoInfracao.objects.get(tipo='banco', objeto_id=auto.pk)
+    assert entrada.irregularidades == 'Diversas irregularidades bancárias'
+
+    auto.nada_consta = True
+    auto.save()
+    assert not FilaAutoInfracao.objects.filter(tipo='banco', objeto_id=auto.pk).exists()
+
+    criar_auto(AutoPosto, 'Posto Regular', '22.333.444/0001-55', sem_irregularidades=True)
+    assert not FilaAutoInfracao.objects.filter(tipo='posto').exists()
+
+
+def test_infracao_retira_auto_e_exclusao_devolve():
+    auto = criar_auto(AutoSupermercado, 'Supermercado Norte', '33.444.555/0001-66')
+    assert FilaAutoInfracao.objects.filter(tipo='supermercado', objeto_id=auto.pk).exists()
+
+    infracao = criar_infracao(auto)
+    assert not FilaAutoInfracao.objects.filter(tipo='supermercado', objeto_id=auto.pk).exists()
+
+    auto.save()  # salvar o auto novamente não o devolve à fila
+    assert not FilaAutoInfracao.objects.filter(tipo='supermercado', objeto_id=auto.pk).exists()
+
+    infracao.delete()
+    assert FilaAutoInfracao.objects.filter(tipo='supermercado', objeto_id=auto.pk).exists()
+
+
+def test_reconstruir_usa_not_exists():
+    com_infracao = criar_auto(AutoBanco, 'Banco Um', '44.555.666/0001-77')
+    sem_infracao = criar_auto(AutoBanco, 'Banco Dois', '55.666.777/0001-88')
+    criar_infracao(com_infracao)
+    FilaAutoInfracao.objects.all().delete()
+
+    call_command('reconstruir_fila_infracoes', tipo=['banco'])
+
+    assert list(FilaAutoInfracao.objects.values_list('objeto_id', flat=True)) == [sem_infracao.pk]
+    assert fila_infracao_service.contagens() == {'banco': 1, 'posto': 0, 'supermercado': 0}
+
+
+def test_endpoint_paginado_com_contagens(admin_client):
+    for i in range(3):
+        criar_auto(AutoBanco, f'Banco {i}', f'66.777.888/000{i}-99', dias_atras=i)
+    posto = criar_auto(AutoPosto, 'Posto Centro', '77.888.999/0001-00', dias_atras=10)
+
+    resposta = admin_client.get(reverse('fiscalizacao:autos_com_potencial_infracao'), {'page_size': 2, 'page': 2})
+
+    assert resposta.status_code == 200
+    assert resposta.data['total'] == 4
+    assert resposta.data['total_paginas'] == 2
+    assert [(r['tipo'], r['id']) for r in resposta.data['results']] == [
+        ('banco', AutoBanco.objects.get(razao_social='Banco 2').pk), ('posto', posto.pk),
+    ]
+    assert resposta.data['contagens'] == {'banco': 3, 'posto': 1, 'supermercado': 0}
+
+    filtrado = admin_client.get(reverse('fiscalizacao:autos_com_potencial_infracao'), {'tipo': 'posto'})
+    assert filtrado.data['total'] == 1
+    assert admin_client.get(
+        reverse('fiscalizacao:autos_com_potencial_infracao'), {'tipo': 'diversos'}
+    ).status_code == 400
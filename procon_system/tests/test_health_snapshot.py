@@ -0,0 +1,83 @@
+import threading
+import time
+
+import pytest
+from django.urls import reverse
+
+from health import views
+from health.services import SaudeService
+
+
+def servico(verificacoes, **configuracao):
+    saude = SaudeService(verificacoes)
+    saude.intervalo = 0  # sem thread de fundo nos testes
+    saude.ttl = configuracao.get('ttl', 60)
+    saude.timeouts.update(configuracao.get('timeouts', {}))
+    return saude
+
+
+def test_dependencia_lenta_nao_trava_o_snapshot():
+    liberar = threading.Event()
+    chamadas = []
+
+    def banco(timeout):
+        chamadas.append('database')
+        return 'healthy', 'Database connection OK', 'healthy'
+
+    def redis_travado(timeout):
+        liberar.wait(5)
+        return 'healthy', 'Redis connection OK', 'healthy'
+
+    saude = servico(
+        {'database': (banco, 'unhealthy'), 'redis': (redis_travado, 'degraded')},
+        timeouts={'database': 1, 'redis': 0.2},
+    )
+    inicio = time.monotonic()
+    snapshot = saude.snapshot()
+
+    assert time.monotonic() - inicio < 1.5
+    assert snapshot['status'] == 'degraded'
+    assert snapshot['checks']['database']['status'] == 'healthy'
+    assert snapshot['checks']['redis'] == {'status': 'timeout', 'message': 'Sem resposta em 0.2s'}
+
+    # Probes seguintes leem o snapshot sem verificar de novo
+    for _ in range(20):
+        saude.snapshot()
+    assert chamadas == ['database']
+
+    # Enquanto a verificação travada não termina, não é disparada outra
+    novo = saude.atualizar()
+    assert novo['checks']['redis']['message'] == 'Verificação anterior ainda em andamento'
+    liberar.set()
+
+
+def test_snapshot_expirado_e_refeito_e_falhas_viram_status():
+    def banco_fora(timeout):
+        raise ConnectionError('recusada')
+
+    saude = servico({'database': (banco_fora, 'unhealthy')}, ttl=0)
+    primeiro = saude.snapshot()
+    time.sleep(0.01)
+    segundo = saude.snapshot()
+
+    assert segundo['timestamp'] > primeiro['timestamp']
+    assert segundo['status'] == 'unhealthy'
+    assert segundo['checks']['database'] == {'status': 'unhealthy', 'message': 'database error: recusada'}
+
+
+@pytest.mark.parametrize('saudavel, status_http', [(True, 200), (False, 503)])
+def test_probes_leem_o_snapshot(client, monkeypatch, saudavel, status_http):
+    def banco(timeout):
+        if not saudavel:
+            raise ConnectionError('sem conexão')
+        return 'healthy', 'Database connection OK', 'healthy'
+
+    monkeypatch.setattr(views, 'saude_service', servico({'database': (banco, 'unhealthy')}))
+
+    pronto = client.get(reverse('health:readiness'))
+    detalhado = client.get(reverse('health:health_detailed'))
+
+    assert pronto.status_code == detalhado.status_code == status_http
+    assert pronto.json()['status'] == ('ready' if saudavel else 'not_ready')
+    assert 'snapshot_age_s' in detalhado.json()
+    assert detalhado.json()['checks']['database']['status'] == ('healthy' if saudavel else 'unhealthy')
@@ -0,0 +1,79 @@
+import random
+
+from monitoring.histogramas import (
+    ArmazenamentoArquivo, ArmazenamentoLocal, Histograma, RegistroHistogramas, registro_metricas,
+)
+from monitoring.metrics import MetricsCollector, PerformanceProfiler
+
+
+def registro_em(armazenamento_factory):
+    registro = RegistroHistogramas()
+    registro.intervalo_publicacao = 3600
+    registro.armazenamento = armazenamento_factory(registro.novo_histograma)
+    return registro
+
+
+def test_percentis_com_erro_relativo_limitado_e_memoria_fixa():
+    aleatorio = random.Random(42)
+    amostras = [aleatorio.lognormvariate(-3, 1.2) for _ in range(50000)]
+    histograma = Histograma(precisao=0.02)
+    for valor in amostras:
+        histograma.registrar(valor)
+
+    ordenadas = sorted(amostras)
+    for percentil in (50, 90, 95, 99):
+        exato = ordenadas[int(len(ordenadas) * percentil / 100)]
+        assert abs(histograma.percentil(percentil) - exato) / exato < 0.03
+    assert histograma.contagem == 50000
+    assert len(histograma.buckets) < 700  # independe da quantidade de amostras
+    assert histograma.percentil(0) == min(amostras) and histograma.percentil(100) == max(amostras)
+
+    # Mesclar partes equivale a registrar tudo em um só histograma
+    partes = [Histograma(precisao=0.02) for _ in range(3)]
+    for indice, valor in enumerate(amostras):
+        partes[indice % 3].registrar(valor)
+    mesclado = partes[0].mesclar(partes[1]).mesclar(partes[2])
+    assert mesclado.buckets == histograma.buckets
+    assert mesclado.percentil(99) == histograma.percentil(99)
+
+
+def test_workers_agregados_pelo_diretorio_compartilhado(tmp_path):
+    workers = [
+        registro_em(lambda novo, nome=nome: ArmazenamentoArquivo(novo, str(tmp_path), worker=nome))
+        for nome in ('worker-1', 'worker-2')
+    ]
+    profilers = [PerformanceProfiler(registro) for registro in workers]
+
+    for indice, profiler in enumerate(profilers):
+        consultar = profiler.time_operation('consulta_processos')(lambda: None)
+        for _ in range(10 * (indice + 1)):
+            consultar()
+    workers[0].publicar()
+
+    # Qualquer worker enxerga as 30 execuções dos dois
+    estatisticas = profilers[1].get_timing_stats('consulta_processos')
+    assert estatisticas['count'] == 30
+    assert 0 <= estatisticas['p50'] <= estatisticas['p99'] <= estatisticas['max']
+    assert profilers[0].get_timing_stats('outra_operacao')['count'] == 0
+    assert sorted(arquivo.name for arquivo in tmp_path.iterdir()) == ['worker-1.json', 'worker-2.json']
+
+
+def test_resumo_de_metrica_e_exposicao_prometheus(client, monkeypatch):
+    registro = registro_em(ArmazenamentoLocal)
+    monkeypatch.setattr(registro_metricas, '_armazenamento', registro.armazenamento)
+    coletor = MetricsCollector(registro_metricas)
+    for valor in (0.2, 0.4, 0.9):
+        coletor.record_metric('db_query_time', valor, {'operation': 'health_check'})
+    coletor.record_metric('total_users', 12)
+
+    resumo = coletor.get_metric_summary('db_query_time', hours=1)
+    assert resumo['count'] == 3 and resumo['latest'] == 0.9
+    assert abs(resumo['avg'] - 0.5) < 1e-9
+
+    resposta = client.get('/metrics/')
+    assert resposta.status_code == 200
+    texto = resposta.content.decode()
+    assert '# TYPE procon_db_query_time summary' in texto
+    assert 'procon_db_query_time{operation="health_check",quantile="0.5"} 0.4' in texto
+    assert 'procon_db_query_time_count{operation="health_check"} 3' in texto
+    assert 'procon_total_users_ultimo 12' in texto
@@ -0,0 +1,70 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from fiscalizacao.models import HistoricoProcesso, Processo
+from fiscalizacao.services import processo_lote_service
+from tests.test_processos_lote import criar_processo
+
+
+pytestmark = pytest.mark.django_db
+
+
+def consultas_historico(contexto):
+    return [q['sql'].split()[0] for q in contexto.captured_queries if 'fiscalizacao_historicoprocesso' in q['sql']]
+
+
+def test_save_registra_so_transicoes_reais_sem_consultar_historico():
+    processo = Processo.objects.get(pk=criar_processo(1).pk)
+    assert processo._status_carregado == 'aguardando_defesa'
+
+    processo.observacoes = 'Sem mudança de status'
+    with CaptureQueriesContext(connection) as contexto:
+        processo.save()
+    assert consultas_historico(contexto) == []
+
+    processo.status = 'em_analise'
+    with CaptureQueriesContext(connection) as contexto:
+        processo.save()
+    assert consultas_historico(contexto) == ['INSERT']  # nenhum SELECT no histórico
+    historico = HistoricoProcesso.objects.get(processo=processo)
+    assert (historico.status_anterior, historico.status_novo) == ('aguardando_defesa', 'em_analise')
+
+    processo.atualizar_status('defesa_apresentada', observacao='Defesa protocolada', usuario='analista')
+    ultimo = processo.historico.first()
+    assert (ultimo.status_anterior, ultimo.observacao, ultimo.usuario) == ('em_analise', 'Defesa protocolada', 'analista')
+    assert processo.historico.count() == 2
+
+
+def test_alteracao_de_status_por_queryset_auditavel(django_assert_max_num_queries):
+    processos = [criar_processo(numero) for numero in range(2, 12)]
+    Processo.objects.filter(pk=processos[0].pk).update(status='arquivado')
+
+    with django_assert_max_num_queries(12):  # inclui a sincronização do índice de prazos
+        resultado = processo_lote_service.alterar_status(
+            Processo.objects.filter(pk__in=[p.pk for p in processos]), 'arquivado', usuario='coordenacao',
+        )
+
+    assert resultado == {'afetados': 9, 'ignorados': 1}
+    historico = HistoricoProcesso.objects.filter(status_novo='arquivado')
+    assert historico.count() == 9
+    assert set(historico.values_list('usuario', flat=True)) == {'coordenacao'}
+    assert not Processo.objects.filter(pk__in=[p.pk for p in processos[1:]], data_finalizacao__isnull=True).exists()
+
+
+def test_alteracao_de_status_em_lote_sincroniza_indice_de_prazos():
+    from datetime import date, timedelta
+
+    from django.utils import timezone
+
+    from monitoring.models import PrazoMonitorado
+    from monitoring.prazos import varredura_prazos_service
+
+    processo = criar_processo(20, prazo_defesa=date.today() - timedelta(days=30))
+    varredura_prazos_service.reconstruir(['processo'])
+    assert PrazoMonitorado.objects.filter(tipo='processo', objeto_id=str(processo.pk)).exists()
+
+    processo_lote_service.alterar_status(Processo.objects.filter(pk=processo.pk), 'arquivado')
+
+    assert not PrazoMonitorado.objects.filter(tipo='processo', objeto_id=str(processo.pk)).exists()
+    assert varredura_prazos_service.varrer(agora=timezone.now(), notificar=False)['escalonado'] == 0
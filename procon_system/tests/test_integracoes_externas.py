@@ -0,0 +1,156 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from django.core.cache import cache
+
+from core.integracoes import CircuitBreaker, ClienteIntegracao, resetar_clientes
+from juridico.services import IntegracaoJuridicaAvancadaService
+from peticionamento.services import IntegracaoExternaService
+
+
+class ViaCepStubHandler(BaseHTTPRequestHandler):
+    chamadas = []
+
+    def do_GET(self):
+        cep = self.path.strip('/').split('/')[1]
+        ViaCepStubHandler.chamadas.append(cep)
+
+        if cep.startswith('5'):
+            self.send_response(503)
+            self.end_headers()
+            return
+
+        if cep == '00000000':
+            corpo = {'erro': True}
+        else:
+            corpo = {
+                'cep': f'{cep[:5]}-{cep[5:]}',
+                'logradouro': 'Rua Stub',
+                'bairro': 'Centro',
+                'localidade': 'Manaus',
+                'uf': 'AM',
+                'complemento': '',
+            }
+        dados = json.dumps(corpo).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def viacep_stub(settings):
+    ViaCepStubHandler.chamadas = []
+    servidor = ThreadingHTTPServer(('127.0.0.1', 0), ViaCepStubHandler)
+    thread = threading.Thread(target=servidor.serve_forever, daemon=True)
+    thread.start()
+
+    porta = servidor.server_address[1]
+    settings.VIACEP_URL = f'http://127.0.0.1:{porta}/ws/{{cep}}/json/'
+    settings.INTEGRACOES_EXTERNAS = {
+        'cep': {'timeout': 2, 'max_retries': 0, 'limite_falhas': 2, 'tempo_recuperacao': 60},
+    }
+    cache.clear()
+    resetar_clientes()
+
+    yield ViaCepStubHandler
+
+    servidor.shutdown()
+    servidor.server_close()
+    resetar_clientes()
+    cache.clear()
+
+
+def test_consultar_cep_usa_cache_por_cep_normalizado(viacep_stub):
+    service = IntegracaoExternaService()
+
+    primeiro = service.consultar_cep('69.000-000')
+    segundo = service.consultar_cep('69000000')
+
+    assert primeiro['sucesso'] is True
+    assert primeiro['dados']['municipio'] == 'Manaus'
+    assert segundo == primeiro
+    assert viacep_stub.chamadas == ['69000000']
+
+
+def test_consultar_cep_nao_cacheia_cep_inexistente(viacep_stub):
+    service = IntegracaoExternaService()
+
+    assert service.consultar_cep('00000-000') == {'sucesso': False, 'erro': 'CEP não encontrado'}
+    service.consultar_cep('00000-000')
+
+    assert viacep_stub.chamadas == ['00000000', '00000000']
+
+
+def test_consultar_cep_invalido_nao_chama_api(viacep_stub):
+    resultado = IntegracaoExternaService().consultar_cep('123')
+
+    assert resultado == {'sucesso': False, 'erro': 'CEP inválido'}
+    assert viacep_stub.chamadas == []
+
+
+def test_consultar_ceps_lote_resolve_concorrentemente_e_reaproveita_cache(viacep_stub):
+    service = IntegracaoExternaService()
+    service.consultar_cep('69000001')
+
+    ceps = [f'6900000{i}' for i in range(1, 8)] + ['69000-001']
+    resultados = service.consultar_ceps_lote(ceps)
+
+    assert set(resultados) == {f'6900000{i}' for i in range(1, 8)}
+    assert all(resultado['sucesso'] for resultado in resultados.values())
+    assert sorted(viacep_stub.chamadas) == [f'6900000{i}' for i in range(1, 8)]
+
+
+def test_circuit_breaker_abre_apos_falhas_consecutivas(viacep_stub):
+    service = IntegracaoExternaService()
+
+    assert service.consultar_cep('59000000')['erro'] == 'Erro na API: 503'
+    assert service.consultar_cep('59000001')['erro'] == 'Erro na API: 503'
+    resultado = service.consultar_cep('69000000')
+
+    assert resultado == {'sucesso': False, 'erro': 'Serviço de CEP temporariamente indisponível'}
+    assert viacep_stub.chamadas == ['59000000', '59000001']
+
+
+def test_circuit_breaker_semi_aberto_fecha_apos_sucesso():
+    breaker = CircuitBreaker(limite_falhas=1, tempo_recuperacao=0)
+
+    breaker.registrar_falha()
+    assert breaker.estado == CircuitBreaker.SEMI_ABERTO
+    assert breaker.permitir() is True
+
+    breaker.registrar_sucesso()
+    assert breaker.estado == CircuitBreaker.FECHADO
+
+
+def test_cliente_consultar_lote_sem_chaves():
+    assert ClienteIntegracao('vazio').consultar_lote([], lambda chave: {}) == {}
+
+
+def test_consultar_processo_tj_cacheia_por_numero_normalizado(settings):
+    settings.INTEGRACOES_EXTERNAS = {}
+    cache.clear()
+    resetar_clientes()
+    service = IntegracaoJuridicaAvancadaService()
+    chamadas = []
+    buscar_original = service._buscar_processo_tj
+
+    def buscar(numero):
+        chamadas.append(numero)
+        return buscar_original(numero)
+
+    service._buscar_processo_tj = buscar
+
+    primeiro = service.consultar_processo_tj('tj 0001234-55')
+    segundo = service.consultar_processo_tj('TJ0001234-55')
+
+    assert primeiro['sucesso'] is True
+    assert segundo == primeiro
+    assert chamadas == ['TJ0001234-55']
+    resetar_clientes()
@@ -0,0 +1,133 @@
+import io
+import json
+import logging
+import logging.handlers
+
+import logging_config
+from logging_config import FiltroAmostragem, FilaLogHandler, ProconLogger, StructuredFormatter
+
+
+def registro(mensagem, nivel=logging.INFO, nome='procon.operation', **extra):
+    record = logging.LogRecord(nome, nivel, __file__, 1, mensagem, None, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_fila_cheia_descarta_sem_bloquear_e_avisa():
+    handler = FilaLogHandler(tamanho=2)
+    for indice in range(5):
+        handler.handle(registro(f'operação {indice}'))
+
+    assert handler.descartados == 3
+    assert handler.queue.qsize() == 2
+
+    handler.queue.get_nowait()
+    handler.queue.get_nowait()
+    handler.handle(registro('depois da fila esvaziar'))
+    aviso = handler.queue.get_nowait(), handler.queue.get_nowait()
+    assert aviso[1].levelno == logging.WARNING
+    assert aviso[1].context == {'dropped': 3, 'dropped_total': 3}
+
+
+def test_listener_serializa_fora_do_thread_da_requisicao():
+    saida = io.StringIO()
+    destino = logging.StreamHandler(saida)
+    destino.setFormatter(StructuredFormatter())
+    handler = FilaLogHandler(tamanho=100)
+    listener = logging.handlers.QueueListener(handler.queue, destino)
+    logger = logging.getLogger('procon.teste_fila')
+    logger.addHandler(handler)
+    logger.propagate = False
+    listener.start()
+    try:
+        logger.warning('Processo %s atrasado', 'PROC-1', extra={'context': {'dias': 3}})
+        try:
+            raise ValueError('falha de teste')
+        except ValueError:
+            logger.error('Erro ao salvar', exc_info=True)
+    finally:
+        listener.stop()
+        logger.removeHandler(handler)
+
+    aviso, erro = [json.loads(linha) for linha in saida.getvalue().splitlines()]
+    assert aviso['message'] == 'Processo PROC-1 atrasado'
+    assert aviso['context'] == {'dias': 3}
+    assert erro['level'] == 'ERROR'
+    assert 'ValueError: falha de teste' in ''.join(erro['traceback'])
+
+
+def test_amostragem_de_categorias_de_alto_volume(monkeypatch):
+    filtro = FiltroAmostragem({'procon.operation': 0.0, 'procon.performance': 0.5})
+
+    assert not filtro.filter(registro('iniciada'))
+    assert not filtro.filter(registro('detalhe', nome='procon.operation.caixa'))  # categoria filha
+    assert filtro.filter(registro('falhou', nivel=logging.WARNING))  # avisos passam sempre
+    mantido = registro('lenta', nome='procon.performance')
+    monkeypatch.setattr(logging_config.random, 'random', lambda: 0.1)
+    assert filtro.filter(mantido) and mantido.sample_rate == 0.5
+    assert filtro.filter(registro('login', nome='procon.auth'))
+
+    # O ProconLogger nem monta o contexto dos registros descartados
+    monkeypatch.setattr(logging_config, 'amostragem', filtro)
+    logger = ProconLogger('operation')
+    chamadas = []
+    monkeypatch.setattr(logger.logger, 'info', lambda *args, **kwargs: chamadas.append(args))
+    logger.log_operation('consulta', {'status': 'started'})
+    assert chamadas == []
+
+
+def test_registros_do_procon_logger_sao_sorteados_uma_vez(monkeypatch):
+    filtro = FiltroAmostragem({'procon.operation': 0.5})
+    monkeypatch.setattr(logging_config, 'amostragem', filtro)
+    sorteios = iter([0.4, 0.9])  # mantido em _ativo; um segundo sorteio descartaria
+    monkeypatch.setattr(logging_config.random, 'random', lambda: next(sorteios))
+
+    destino = logging.handlers.BufferingHandler(10)
+    destino.addFilter(filtro)
+    logger = ProconLogger('operation')
+    logger.logger.addHandler(destino)
+    try:
+        logger.log_operation('consulta', {'status': 'started'})
+    finally:
+        logger.logger.removeHandler(destino)
+
+    assert [r.sample_rate for r in destino.buffer] == [0.5]
+
+    # Registros comuns: a decisão do primeiro handler vale para os demais
+    sorteios = iter([0.9, 0.1])
+    descartado = registro('detalhe')
+    assert not filtro.filter(descartado) and not filtro.filter(descartado)
+
+
+def test_processo_filho_recebe_listener_proprio(tmp_path, monkeypatch):
+    import os
+    import warnings
+
+    arquivo = tmp_path / 'filho.log'
+    destino = logging.FileHandler(arquivo)
+    handler = FilaLogHandler(tamanho=100)
+    listener = logging.handlers.QueueListener(handler.queue, destino)
+    monkeypatch.setattr(logging_config, 'fila_handler', handler)
+    monkeypatch.setattr(logging_config, 'fila_listener', listener)
+    logger = logging.getLogger('procon.teste_fork')
+    logger.addHandler(handler)
+    logger.propagate = False
+    listener.start()
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', DeprecationWarning)  # fork com threads ativos
+            pid = os.fork()
+        if pid == 0:
+            try:
+                for indice in range(3):
+                    logger.warning('registro do filho %s', indice)
+                logging_config.parar_fila_logging()
+            finally:
+                os._exit(0)
+        os.waitpid(pid, 0)
+    finally:
+        listener.stop()
+        logger.removeHandler(handler)
+        destino.close()
+
+    assert arquivo.read_text().splitlines() == [f'registro do filho {indice}' for indice in range(3)]
@@ -0,0 +1,80 @@
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.urls import reverse
+
+from monitoring import middleware
+from monitoring.histogramas import ArmazenamentoLocal, registro_metricas
+from monitoring.middleware import MedicaoRequisicao, OrcamentoConsultasExcedido, orcamento_consultas
+
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def metricas_isoladas(monkeypatch):
+    monkeypatch.setattr(registro_metricas, '_armazenamento', ArmazenamentoLocal(registro_metricas.novo_histograma))
+    monkeypatch.setattr(registro_metricas, '_pendentes', {})
+
+
+@pytest.fixture
+def cliente_admin(client):
+    client.force_login(User.objects.create_superuser('gestor', password='x'))
+    return client
+
+
+def linha_do_endpoint(resposta, endpoint):
+    return next(linha for linha in resposta.json()['endpoints'] if linha['endpoint'] == endpoint)
+
+
+def test_estatisticas_por_endpoint(cliente_admin):
+    url = reverse('monitoring:api_endpoints')
+    cliente_admin.get(url)
+    resposta = cliente_admin.get(url, {'horas': 2})
+
+    assert resposta.status_code == 200
+    linha = linha_do_endpoint(resposta, 'monitoring:api_endpoints')
+    assert linha['metodo'] == 'GET'
+    assert linha['requisicoes'] == 1  # a requisição atual é registrada depois da resposta
+    assert linha['consultas_media'] >= 1  # sessão e usuário
+    assert linha['duracao_p95_ms'] >= linha['duracao_p50_ms'] > 0
+    assert linha['orcamento_excedido'] == 0
+
+    # Requisições sem view resolvida (404) não viram endpoints
+    cliente_admin.get('/rota-inexistente/')
+    assert {linha['endpoint'] for linha in cliente_admin.get(url).json()['endpoints']} == {'monitoring:api_endpoints'}
+
+
+def test_orcamento_de_consultas_registra_ou_falha(cliente_admin, settings):
+    url = reverse('monitoring:api_endpoints')
+    settings.ORCAMENTO_CONSULTAS = {'monitoring:api_endpoints': 0}
+
+    settings.ORCAMENTO_CONSULTAS_MODO = 'log'
+    assert cliente_admin.get(url).status_code == 200
+    assert linha_do_endpoint(cliente_admin.get(url), 'monitoring:api_endpoints')['orcamento_excedido'] == 1
+
+    settings.ORCAMENTO_CONSULTAS_MODO = 'erro'
+    cliente_admin.handler.load_middleware()
+    with pytest.raises(OrcamentoConsultasExcedido, match='máximo 0'):
+        cliente_admin.get(url)
+
+
+def test_orcamento_declarado_na_view_e_contagem_de_cache(rf):
+    @orcamento_consultas(3)
+    def view(request):
+        return None
+
+    instancia = middleware.MetricasRequisicaoMiddleware(lambda request: None)
+    assert instancia.orcamento(rf.get('/'), view) == 3
+
+    medicao = MedicaoRequisicao()
+    token = middleware._requisicao_atual.set(medicao)
+    try:
+        cache.set('metricas_teste', 'valor')
+        assert cache.get('metricas_teste') == 'valor'
+        assert cache.get('metricas_ausente', 'padrão') == 'padrão'
+        cache.get_many(['metricas_teste', 'metricas_ausente'])
+    finally:
+        middleware._requisicao_atual.reset(token)
+        cache.delete('metricas_teste')
+    assert (medicao.cache_acertos, medicao.cache_falhas) == (2, 2)
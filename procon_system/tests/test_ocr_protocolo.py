@@ -0,0 +1,193 @@
+import importlib
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management import call_command
+from PIL import Image
+from reportlab.pdfgen import canvas
+
+from protocolo.models import DocumentoProtocolo
+from protocolo.services import digitization_service, ocr_service
+from tests.test_busca_documentos_protocolo import criar_protocolo
+
+
+pytestmark = pytest.mark.django_db
+
+# protocolo.services reexporta a instância com o mesmo nome do módulo
+modulo_ocr = importlib.import_module('protocolo.services.ocr_service')
+
+TEXTO_OCR = 'Texto reconhecido por OCR'
+
+
+@pytest.fixture
+def usuario():
+    return User.objects.create_user('digitalizador', password='x')
+
+
+@pytest.fixture(autouse=True)
+def ambiente_ocr(settings, tmp_path, monkeypatch):
+    settings.MEDIA_ROOT = tmp_path
+    (tmp_path / 'protocolos').mkdir()
+    caches['long_term'].clear()
+    # Poppler/Tesseract não estão disponíveis nos testes: renderização e reconhecimento simulados
+    monkeypatch.setattr(modulo_ocr, 'renderizar_pagina_pdf', lambda caminho, indice, dpi: Image.new('RGB', (60, 80), 'white'))
+    monkeypatch.setattr(modulo_ocr, 'reconhecer_texto', lambda imagem, idioma: (TEXTO_OCR, 87.5))
+    return tmp_path
+
+
+def gerar_pdf(caminho, paginas):
+    pdf = canvas.Canvas(str(caminho))
+    for texto in paginas:
+        if texto:
+            pdf.drawString(72, 720, texto)
+        pdf.showPage()
+    pdf.save()
+
+
+def criar_documento(protocolo, nome):
+    return DocumentoProtocolo.objects.create(
+        protocolo=protocolo, titulo=nome, arquivo=f'protocolos/{nome}', enviado_por=protocolo.criado_por,
+    )
+
+
+def test_pipeline_por_pagina_em_pool(usuario, ambiente_ocr):
+    protocolo = criar_protocolo(usuario)
+    pasta = ambiente_ocr / 'protocolos'
+    gerar_pdf(pasta / 'peticao.pdf', [
+        'Peticao inicial: cobranca indevida de tarifa bancaria.',
+        None,  # página escaneada, sem camada de texto
+        'Pedido de restituicao em dobro do valor cobrado.',
+    ])
+    imagens = [Image.new('RGB', (40, 40), cor) for cor in ('white', 'gray')]
+    imagens[0].save(pasta / 'anexo.tiff', save_all=True, append_images=imagens[1:])
+    (pasta / 'copia.pdf').write_bytes((pasta / 'peticao.pdf').read_bytes())
+    (pasta / 'planilha.xls').write_bytes(b'xls')
+
+    peticao, anexo, copia, planilha = [
+        criar_documento(protocolo, nome) for nome in ('peticao.pdf', 'anexo.tiff', 'copia.pdf', 'planilha.xls')
+    ]
+
+    relatorio = ocr_service.process_documents([peticao, anexo, copia, planilha], max_workers=2)
+
+    assert (relatorio['total'], relatorio['processados'], relatorio['falhas']) == (4, 3, 1)
+    assert relatorio['paginas'] == 5  # a cópia idêntica não é reprocessada
+    assert (relatorio['paginas_texto'], relatorio['paginas_ocr']) == (2, 3)
+    assert relatorio['paginas_por_segundo'] > 0
+
+    peticao.refresh_from_db()
+    assert peticao.indexado
+    assert peticao.texto_extraido.split('\n\n') == [
+        'Peticao inicial: cobranca indevida de tarifa bancaria.',
+        TEXTO_OCR,
+        'Pedido de restituicao em dobro do valor cobrado.',
+    ]
+    assert DocumentoProtocolo.objects.get(pk=copia.pk).texto_extraido == peticao.texto_extraido
+    assert DocumentoProtocolo.objects.get(pk=anexo.pk).texto_extraido == f'{TEXTO_OCR}\n\n{TEXTO_OCR}'
+    assert not DocumentoProtocolo.objects.get(pk=planilha.pk).indexado
+
+
+def test_resultado_em_cache_pelo_hash_do_arquivo(usuario, ambiente_ocr, monkeypatch):
+    protocolo = criar_protocolo(usuario)
+    pasta = ambiente_ocr / 'protocolos'
+    gerar_pdf(pasta / 'laudo.pdf', [None])
+    documento = criar_documento(protocolo, 'laudo.pdf')
+
+    assert ocr_service.extract_text_from_document(documento)['text'] == TEXTO_OCR
+
+    monkeypatch.setattr(modulo_ocr, 'reconhecer_texto', lambda *a: pytest.fail('não deveria refazer o OCR'))
+    resultado = digitization_service.batch_process_documents([documento], max_workers=1)
+
+    assert resultado['processed'] == 1
+    assert resultado['summary']['cached_documents'] == 1
+    assert DocumentoProtocolo.objects.get(pk=documento.pk).texto_extraido == TEXTO_OCR
+
+
+def test_comando_processa_pendentes_e_registra_erro_de_pagina(usuario, ambiente_ocr, monkeypatch):
+    protocolo = criar_protocolo(usuario)
+    pasta = ambiente_ocr / 'protocolos'
+    gerar_pdf(pasta / 'contrato.pdf', ['Contrato de prestacao de servicos de telefonia.', None])
+    documento = criar_documento(protocolo, 'contrato.pdf')
+
+    def falhar(imagem, idioma):
+        raise RuntimeError('imagem ilegível')
+
+    monkeypatch.setattr(modulo_ocr, 'reconhecer_texto', falhar)
+    call_command('processar_documentos_ocr', '--workers', '1')
+
+    documento.refresh_from_db()
+    assert documento.texto_extraido == 'Contrato de prestacao de servicos de telefonia.'
+    resultado = ocr_service.extract_text_from_path(str(pasta / 'contrato.pdf'))
+    assert resultado['errors'] == ['Página 2: imagem ilegível']
+    assert [p['metodo'] for p in resultado['pages']] == ['texto', 'erro']
+
+
+def test_lote_grava_qualidade_e_libera_copias_locais(usuario, ambiente_ocr, monkeypatch):
+    from contextlib import contextmanager
+
+    from protocolo.models import ConteudoArquivo
+
+    protocolo = criar_protocolo(usuario)
+    pasta = ambiente_ocr / 'protocolos'
+    gerar_pdf(pasta / 'recibo.pdf', ['Recibo de pagamento da fatura.'])
+    (pasta / 'recibo_copia.pdf').write_bytes((pasta / 'recibo.pdf').read_bytes())
+    documentos = [criar_documento(protocolo, nome) for nome in ('recibo.pdf', 'recibo_copia.pdf')]
+
+    eventos = []
+    arquivo_local = ocr_service.arquivo_local
+
+    @contextmanager
+    def rastrear(documento):
+        eventos.append(('abre', documento.pk))
+        with arquivo_local(documento) as caminho:
+            yield caminho
+        eventos.append(('fecha', documento.pk))
+
+    monkeypatch.setattr(ocr_service, 'arquivo_local', rastrear)
+    monkeypatch.setattr(
+        digitization_service, '_analyze_quality', lambda documento: pytest.fail('qualidade já armazenada')
+    )
+    resultado = digitization_service.batch_process_documents(documentos, max_workers=1)
+
+    conteudo = ConteudoArquivo.objects.get(hash_sha256=documentos[0].hash_conteudo)
+    assert conteudo.processado and conteudo.qualidade and conteudo.tamanho
+    assert sum(resultado['summary']['quality_distribution'].values()) == 2
+    # A cópia do documento repetido é liberada na hora; nenhuma sobra ao fim do lote
+    copia = documentos[1].pk
+    assert eventos[eventos.index(('abre', copia)) + 1] == ('fecha', copia)
+    assert sorted(e for e in eventos if e[0] == 'abre') == sorted(('abre', d.pk) for d in documentos)
+    assert len(eventos) == 4
+
+
+def test_endpoint_lote_enfileira_no_celery(usuario, ambiente_ocr, settings, monkeypatch):
+    from types import SimpleNamespace
+
+    from rest_framework.test import APIClient
+
+    from protocolo import tasks
+
+    cliente = APIClient()
+    cliente.force_authenticate(usuario)
+    url = '/api/protocolo/documentos/processar_lote/'
+    chamadas = []
+    monkeypatch.setattr(
+        digitization_service, 'batch_process_documents',
+        lambda documentos, max_workers=None: chamadas.append(max_workers) or {'processed': 0, 'total_documents': 0},
+    )
+
+    settings.CELERY_BROKER_URL = 'redis://localhost:6379/0'
+    enfileiradas = []
+    monkeypatch.setattr(
+        tasks.processar_documentos_lote, 'delay',
+        lambda *args: enfileiradas.append(args) or SimpleNamespace(id='tarefa-1'),
+    )
+    resposta = cliente.post(url, {'documento_ids': [1, 2]}, format='json')
+
+    assert resposta.status_code == 202
+    assert resposta.json()['task_id'] == 'tarefa-1'
+    assert enfileiradas == [([1, 2], False)] and chamadas == []
+
+    # Sem broker o lote roda na requisição, limitado a um processo
+    del settings.CELERY_BROKER_URL
+    assert cliente.post(url, {'documento_ids': [1]}, format='json').status_code == 200
+    assert chamadas == [1]
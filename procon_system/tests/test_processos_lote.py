@@ -0,0 +1,146 @@
+import csv
+import io
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from django.urls import reverse
+
+from fiscalizacao.models import AutoInfracao, HistoricoProcesso, Processo
+from fiscalizacao.services import processo_estatisticas_service, processo_lote_service
+from fiscalizacao.services.processo_service import OperacaoLoteError
+from monitoring.models import PrazoMonitorado
+from monitoring.prazos import fim_do_dia
+
+
+pytestmark = pytest.mark.django_db
+
+
+def criar_processo(numero, cnpj='12.345.678/0001-90', valor=Decimal('1000.00'), **campos):
+    auto = AutoInfracao.objects.create(
+        numero=f'AUTO-2026-{numero:03d}',
+        data_fiscalizacao=date.today(),
+        hora_fiscalizacao='10:00',
+        razao_social=f'Empresa {numero} LTDA',
+        cnpj=cnpj,
+        endereco='Rua Teste, 123',
+        base_legal_cdc='Art. 34 CDC',
+        valor_multa=valor,
+        responsavel_nome='João Silva',
+        responsavel_cpf='123.456.789-00',
+        fiscal_nome='Pedro Santos',
+    )
+    processo = Processo.objects.filter(auto_infracao=auto).first()
+    if processo is None:
+        processo = Processo.objects.create(
+            auto_infracao=auto,
+            numero_processo=f'PROC-{numero:03d}',
+            autuado=auto.razao_social,
+            cnpj=cnpj,
+            valor_multa=valor,
+        )
+    HistoricoProcesso.objects.filter(processo=processo).delete()
+    if campos:
+        Processo.objects.filter(pk=processo.pk).update(**campos)
+        processo.refresh_from_db()
+    return processo
+
+
+def test_alterar_status_em_lote_grava_historico():
+    hoje = date.today()
+    processos = [criar_processo(i, prazo_defesa=hoje + timedelta(days=5)) for i in range(3)]
+    processos[2].status = 'defesa_apresentada'
+    Processo.objects.filter(pk=processos[2].pk).update(status='defesa_apresentada')
+    ids = [p.pk for p in processos]
+
+    resultado = processo_lote_service.executar(
+        'alterar_status', ids + [999999], usuario='fiscal', novo_status='defesa_apresentada'
+    )
+
+    assert resultado == {'afetados': 2, 'ignorados': 1, 'nao_encontrados': [999999]}
+    assert set(Processo.objects.filter(pk__in=ids).values_list('status', flat=True)) == {'defesa_apresentada'}
+    processo = Processo.objects.get(pk=processos[0].pk)
+    assert processo.data_defesa == hoje
+    assert processo.prazo_recurso == hoje + timedelta(days=10)
+
+    historico = HistoricoProcesso.objects.filter(processo_id__in=ids)
+    assert historico.count() == 2
+    assert set(historico.values_list('usuario', 'status_novo')) == {('fiscal', 'defesa_apresentada')}
+
+
+def test_reatribuir_e_prorrogar_prazo():
+    hoje = date.today()
+    com_prazo = criar_processo(1, prazo_defesa=hoje)
+    sem_prazo = criar_processo(2, prazo_defesa=None)
+    ids = [com_prazo.pk, sem_prazo.pk]
+
+    reatribuidos = processo_lote_service.executar('reatribuir', ids, analista_responsavel='Ana')
+    prorrogados = processo_lote_service.executar('prorrogar_prazo', ids, dias='15')
+
+    assert reatribuidos['afetados'] == 2
+    assert set(Processo.objects.filter(pk__in=ids).values_list('analista_responsavel', flat=True)) == {'Ana'}
+    assert prorrogados == {'afetados': 1, 'ignorados': 1, 'nao_encontrados': []}
+    assert Processo.objects.get(pk=com_prazo.pk).prazo_defesa == hoje + timedelta(days=15)
+    assert Processo.objects.get(pk=sem_prazo.pk).prazo_defesa is None
+    assert HistoricoProcesso.objects.filter(processo_id=com_prazo.pk).count() == 2
+    # O UPDATE não passa pelos signals: o índice de prazos é sincronizado pelo serviço
+    assert PrazoMonitorado.objects.get(tipo='processo', objeto_id=str(com_prazo.pk)).vencimento == fim_do_dia(
+        hoje + timedelta(days=15)
+    )
+
+    with pytest.raises(OperacaoLoteError):
+        processo_lote_service.executar('prorrogar_prazo', ids, dias=0)
+    with pytest.raises(OperacaoLoteError):
+        processo_lote_service.executar('excluir', ids)
+
+
+def test_estatisticas_agrupadas():
+    hoje = date.today()
+    criar_processo(1, cnpj='11.111.111/0001-11', valor=Decimal('500.00'))
+    criar_processo(2, cnpj='11.111.111/0001-11', valor=Decimal('1500.00'),
+                   status='finalizado_procedente', data_finalizacao=hoje + timedelta(days=4))
+    criar_processo(3, cnpj='22.222.222/0001-22', valor=Decimal('1000.00'),
+                   status='aguardando_defesa', prazo_defesa=hoje - timedelta(days=1))
+
+    dados = processo_estatisticas_service.estatisticas(Processo.objects.all())
+
+    assert dados['resumo']['total'] == 3
+    assert dados['resumo']['finalizados'] == 1
+    assert dados['resumo']['prazo_vencido'] == 1
+    assert dados['resumo']['valor_total_multas'] == 3000.0
+    assert dados['resumo']['tempo_medio_tramitacao_dias'] == 4.0
+    assert dados['por_status']['finalizado_procedente'] == 1
+    assert sum(mes['abertos'] for mes in dados['evolucao_mensal']) == 3
+    assert dados['reincidentes'][0]['cnpj'] == '11.111.111/0001-11'
+    assert dados['reincidentes'][0]['total'] == 2
+
+
+def test_endpoints_exportacao_e_operacoes_lote(admin_client):
+    processos = [criar_processo(i) for i in range(2)]
+
+    resposta = admin_client.post(
+        reverse('fiscalizacao:operacoes_lote'),
+        {'operacao': 'alterar_status', 'processos': [p.pk for p in processos], 'novo_status': 'arquivado'},
+        format='json',
+    )
+    assert resposta.status_code == 200
+    assert resposta.data['afetados'] == 2
+
+    invalida = admin_client.post(
+        reverse('fiscalizacao:operacoes_lote'),
+        {'operacao': 'alterar_status', 'processos': [processos[0].pk], 'novo_status': 'inexistente'},
+        format='json',
+    )
+    assert invalida.status_code == 400
+
+    exportacao = admin_client.get(reverse('fiscalizacao:exportar_processos'), {'status': 'arquivado'})
+    assert exportacao.status_code == 200
+    conteudo = b''.join(exportacao.streaming_content).decode('utf-8-sig')
+    linhas = list(csv.reader(io.StringIO(conteudo), delimiter=';'))
+    assert linhas[0][0] == 'Número do Processo'
+    assert len(linhas) == 3
+    assert linhas[1][3] == 'Arquivado'
+
+    desempenho = admin_client.get(reverse('fiscalizacao:teste_performance', args=[processos[0].pk]))
+    assert desempenho.status_code == 200
+    assert desempenho.data['resultados']['simples']['consultas'] >= desempenho.data['resultados']['otimizada']['consultas'] > 0
@@ -0,0 +1,143 @@
+import gzip
+import json
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+
+from auditoria.models import AcessoRecurso
+from caixa_entrada.models import CaixaEntrada, HistoricoCaixaEntrada
+from monitoring.models import CheckpointRetencao
+from monitoring.retencao import retencao_service
+from notificacoes.models import LogNotificacao, Notificacao, TipoNotificacao
+from notificacoes.services import configuracao_service
+
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def diretorio_arquivo(tmp_path, monkeypatch):
+    monkeypatch.setattr(retencao_service, 'diretorio', str(tmp_path))
+    monkeypatch.setattr(retencao_service, 'pausa', 0)
+    return tmp_path
+
+
+def criar_acessos(quantidade, dias_atras):
+    AcessoRecurso.objects.bulk_create([
+        AcessoRecurso(
+            usuario=f'fiscal{i}', recurso='/api/processos/', acao='listar', metodo_http='GET',
+            url_completa='/api/processos/?page=1', codigo_resposta=200, tempo_resposta=35, ip_origem='10.0.0.1',
+        )
+        for i in range(quantidade)
+    ])
+    ultimos = AcessoRecurso.objects.order_by('-pk').values_list('pk', flat=True)[:quantidade]
+    AcessoRecurso.objects.filter(pk__in=list(ultimos)).update(timestamp=timezone.now() - timedelta(days=dias_atras))
+
+
+def linhas_arquivo(caminho):
+    with gzip.open(caminho, 'rt', encoding='utf-8') as arquivo:
+        return [json.loads(linha) for linha in arquivo]
+
+
+def test_expurgo_em_lotes_retomavel():
+    criar_acessos(25, dias_atras=200)
+    criar_acessos(5, dias_atras=10)
+
+    parcial = retencao_service.executar('acessos_recurso', tamanho_lote=10, max_lotes=2)
+    assert (parcial['linhas'], parcial['lotes'], parcial['concluido']) == (20, 2, False)
+    checkpoint = CheckpointRetencao.objects.get(politica='acessos_recurso')
+    assert checkpoint.status == 'em_andamento'
+    assert AcessoRecurso.objects.count() == 10
+
+    final = retencao_service.executar('acessos_recurso', tamanho_lote=10)
+    assert final['retomado'] and final['concluido']
+    assert (final['linhas'], final['total_linhas']) == (5, 25)
+    assert final['destino'] == checkpoint.arquivo  # o mesmo arquivo é continuado
+    assert final['bytes_liberados'] > 0
+
+    arquivadas = linhas_arquivo(checkpoint.arquivo)
+    assert len(arquivadas) == 25
+    assert len({linha['id'] for linha in arquivadas}) == 25
+    assert arquivadas[0]['recurso'] == '/api/processos/'
+    assert AcessoRecurso.objects.count() == 5  # registros recentes ficam
+
+    checkpoint.refresh_from_db()
+    assert checkpoint.status == 'concluido'
+    assert checkpoint.bytes_arquivo > 0
+
+    # Nova execução começa do zero, sem nada a remover
+    assert retencao_service.executar('acessos_recurso')['linhas'] == 0
+
+
+def test_destino_tabela_de_arquivo():
+    usuario = User.objects.create_user('protocolista', password='x')
+    documento = CaixaEntrada.objects.create(
+        tipo_documento='PETICAO', assunto='Reclamação', remetente_nome='Fulano', setor_destino='Atendimento',
+    )
+    antigos = [
+        HistoricoCaixaEntrada.objects.create(documento=documento, acao=acao, usuario=usuario, detalhes=detalhes).pk
+        for acao, detalhes in (('ENCAMINHADO', 'Enviado ao jurídico'), ('LIDO', 'Lido pelo analista'))
+    ]
+    HistoricoCaixaEntrada.objects.create(documento=documento, acao='ARQUIVADO', usuario=usuario)
+    HistoricoCaixaEntrada.objects.filter(pk__in=antigos).update(data_acao=timezone.now() - timedelta(days=400))
+
+    resultado = retencao_service.executar('historico_caixa_entrada', tamanho_lote=1)
+
+    assert (resultado['linhas'], resultado['lotes']) == (2, 2)
+    assert resultado['destino'] == 'arquivo_caixa_entrada_historicocaixaentrada'
+    assert not HistoricoCaixaEntrada.objects.filter(pk__in=antigos).exists()
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT id, detalhes FROM arquivo_caixa_entrada_historicocaixaentrada ORDER BY id')
+        assert cursor.fetchall() == [(antigos[0], 'Enviado ao jurídico'), (antigos[1], 'Lido pelo analista')]
+
+
+def test_tabela_de_arquivo_acompanha_colunas_novas():
+    usuario = User.objects.create_user('arquivista', password='x')
+    documento = CaixaEntrada.objects.create(
+        tipo_documento='PETICAO', assunto='Reclamação', remetente_nome='Fulano', setor_destino='Atendimento',
+    )
+    antigo = HistoricoCaixaEntrada.objects.create(
+        documento=documento, acao='LIDO', usuario=usuario, detalhes='Lido pelo analista',
+    )
+    HistoricoCaixaEntrada.objects.filter(pk=antigo.pk).update(data_acao=timezone.now() - timedelta(days=400))
+    # Arquivo criado antes de `detalhes` existir e com uma coluna que a original já não tem
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'CREATE TABLE arquivo_caixa_entrada_historicocaixaentrada AS '
+            'SELECT id, documento_id, acao, data_acao FROM caixa_entrada_historicocaixaentrada WHERE 1 = 0'
+        )
+        cursor.execute('ALTER TABLE arquivo_caixa_entrada_historicocaixaentrada ADD COLUMN coluna_antiga text')
+
+    assert retencao_service.executar('historico_caixa_entrada')['linhas'] == 1
+
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT id, detalhes, coluna_antiga FROM arquivo_caixa_entrada_historicocaixaentrada')
+        assert cursor.fetchall() == [(antigo.pk, 'Lido pelo analista', None)]
+
+
+def test_limpeza_de_notificacoes_com_cascata():
+    usuario = User.objects.create_user('consumidor', password='x')
+    tipo = TipoNotificacao.objects.create(nome='Aviso', codigo='aviso')
+    antigas = []
+    for status in ('enviada', 'lida', 'pendente'):
+        notificacao = Notificacao.objects.create(
+            tipo=tipo, destinatario=usuario, titulo=status, mensagem='...', status=status,
+        )
+        LogNotificacao.objects.create(notificacao=notificacao, canal='email', resultado='sucesso')
+        antigas.append(notificacao.pk)
+    Notificacao.objects.filter(pk__in=antigas).update(criado_em=timezone.now() - timedelta(days=120))
+    Notificacao.objects.create(tipo=tipo, destinatario=usuario, titulo='recente', mensagem='...', status='lida')
+
+    assert configuracao_service.limpar_notificacoes_antigas(90) == 2
+
+    assert set(Notificacao.objects.values_list('titulo', flat=True)) == {'pendente', 'recente'}
+    assert LogNotificacao.objects.count() == 1
+    checkpoint = CheckpointRetencao.objects.get(politica='notificacoes')
+    assert checkpoint.linhas_cascata == 2
+    assert sorted(linha['titulo'] for linha in linhas_arquivo(checkpoint.arquivo)) == ['enviada', 'lida']
+
+    call_command('aplicar_retencao', '--status')
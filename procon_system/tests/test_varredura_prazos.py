@@ -0,0 +1,199 @@
+import json
+from datetime import date, timedelta
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from caixa_entrada.models import CaixaEntrada
+from monitoring.models import PrazoMonitorado
+from monitoring.prazos import fim_do_dia, varredura_prazos_service
+from monitoring.views import run_sla_checks
+from notificacoes.models import Notificacao
+from tests.test_processos_lote import criar_processo
+
+
+pytestmark = pytest.mark.django_db
+
+
+def criar_documento(prazo, responsavel=None, setor='Fiscalização', **campos):
+    return CaixaEntrada.objects.create(
+        tipo_documento='PETICAO',
+        assunto='Reclamação de cobrança',
+        descricao='Cobrança indevida',
+        remetente_nome='Maria Souza',
+        remetente_documento='123.456.789-00',
+        setor_destino=setor,
+        responsavel_atual=responsavel,
+        prazo_resposta=prazo,
+        **campos,
+    )
+
+
+def entrada(objeto, tipo='caixa_entrada'):
+    return PrazoMonitorado.objects.filter(tipo=tipo, objeto_id=str(objeto.pk)).first()
+
+
+def test_signals_mantem_indice_de_prazos_ativos():
+    agora = timezone.now()
+    documento = criar_documento(agora + timedelta(days=2))
+    assert entrada(documento).vencimento == documento.prazo_resposta
+    assert entrada(documento).setor == 'Fiscalização'
+
+    documento.status = 'ARQUIVADO'
+    documento.save()
+    assert entrada(documento) is None
+
+    processo = criar_processo(1, prazo_defesa=date.today() + timedelta(days=4))
+    processo.save()
+    assert entrada(processo, 'processo').vencimento == fim_do_dia(processo.prazo_defesa)
+
+    processo.status = 'defesa_apresentada'
+    processo.save()
+    assert entrada(processo, 'processo') is None
+
+
+def test_varredura_promove_em_lote_notifica_e_escalona():
+    fiscal = User.objects.create_user('fiscal', password='x')
+    User.objects.create_superuser('chefe', 'chefe@procon.am.gov.br', 'x')
+    agora = timezone.now()
+    proximo = criar_documento(agora + timedelta(days=2), fiscal)
+    vencido = criar_documento(agora - timedelta(days=1), fiscal)
+    escalonado = criar_documento(agora - timedelta(days=10), fiscal)
+    em_dia = criar_documento(agora + timedelta(days=10), fiscal)
+
+    resultado = varredura_prazos_service.varrer(agora=agora)
+
+    assert resultado == {'proximo': 1, 'vencido': 1, 'escalonado': 1, 'notificacoes': 4}
+    assert entrada(proximo).estado == 'proximo'
+    assert entrada(vencido).estado == 'vencido'
+    assert entrada(escalonado).estado == 'escalonado'
+    assert entrada(em_dia).estado == 'em_dia'
+    assert Notificacao.objects.filter(destinatario__username='chefe').count() == 1
+
+    # Nada mudou de faixa: segunda execução não promove nem notifica
+    assert varredura_prazos_service.varrer(agora=agora) == {
+        'proximo': 0, 'vencido': 0, 'escalonado': 0, 'notificacoes': 0,
+    }
+
+    # O prazo próximo vence depois: só ele é promovido
+    depois = varredura_prazos_service.varrer(agora=agora + timedelta(days=3))
+    assert depois['vencido'] == 1
+    assert Notificacao.objects.count() == 5
+
+
+def test_novo_vencimento_reinicia_estado():
+    agora = timezone.now()
+    documento = criar_documento(agora - timedelta(days=1))
+    varredura_prazos_service.varrer(agora=agora, notificar=False)
+    assert entrada(documento).estado == 'vencido'
+
+    documento.prazo_resposta = agora + timedelta(days=15)
+    documento.save()
+    assert entrada(documento).estado == 'em_dia'
+
+
+def test_resumo_e_contadores_lidos_do_indice():
+    agora = timezone.now()
+    criar_documento(agora - timedelta(days=2), setor='Jurídico')
+    criar_documento(agora + timedelta(hours=2))
+    criar_documento(agora + timedelta(days=2))
+    criar_documento(agora + timedelta(days=20))
+
+    resumo = varredura_prazos_service.resumo('caixa_entrada', agora=agora)
+
+    assert resumo == {
+        'total': 4, 'vencidos': 1, 'criticos': 1, 'proximos': 1, 'proximas_4h': 2, 'escalonados': 0,
+    }
+    assert varredura_prazos_service.contar_ate('caixa_entrada', agora + timedelta(days=3)) == 3
+    assert varredura_prazos_service.vencidos_por_setor('caixa_entrada', agora=agora) == {'Jurídico': 1}
+
+
+def test_comando_reconstroi_e_varre(rf, admin_user):
+    agora = timezone.now()
+    documento = criar_documento(agora - timedelta(days=1))
+    PrazoMonitorado.objects.all().delete()
+
+    call_command('varrer_prazos', reconstruir=True, sem_notificacoes=True)
+    assert entrada(documento).estado == 'vencido'
+
+    request = rf.get(reverse('monitoring:sla_checks'))
+    request.user = admin_user
+    resposta = run_sla_checks(request)
+    assert resposta.status_code == 200
+    assert json.loads(resposta.content)['resumo']['vencidos'] == 1
+
+
+def test_reconstrucao_preserva_estado_e_sincroniza_por_ids():
+    agora = timezone.now()
+    vencido = criar_documento(agora - timedelta(days=1))
+    alterado = criar_documento(agora - timedelta(days=1))
+    varredura_prazos_service.varrer(agora=agora, notificar=False)
+
+    # Escritas em lote não passam pelos signals
+    CaixaEntrada.objects.filter(pk=alterado.pk).update(prazo_resposta=agora + timedelta(days=10))
+    CaixaEntrada.objects.filter(pk=vencido.pk).update(status='ARQUIVADO')
+    novo = CaixaEntrada.objects.bulk_create([CaixaEntrada(
+        tipo_documento='PETICAO', assunto='Novo', descricao='Novo', remetente_nome='João',
+        remetente_documento='111.111.111-11', numero_protocolo='CE-LOTE-1', prazo_resposta=agora + timedelta(days=1),
+    )])[0]
+    assert entrada(vencido) is not None and entrada(novo) is None
+
+    totais = varredura_prazos_service.reconstruir(['caixa_entrada'], ids=[alterado.pk, vencido.pk, novo.pk])
+
+    assert totais == {'caixa_entrada': 2}
+    assert entrada(vencido) is None
+    assert entrada(alterado).estado == 'em_dia'
+    assert entrada(novo).vencimento == novo.prazo_resposta
+
+    # Reconstrução completa mantém o estado já promovido: a varredura não notifica de novo
+    varredura_prazos_service.varrer(agora=agora + timedelta(days=2), notificar=False)
+    assert varredura_prazos_service.reconstruir() == {'cip': 0, 'processo': 0, 'caixa_entrada': 2}
+    assert entrada(novo).estado == 'vencido'
+    assert varredura_prazos_service.varrer(agora=agora + timedelta(days=2))['vencido'] == 0
+
+
+def test_verificacao_de_sla_e_somente_leitura(rf, admin_user):
+    documento = criar_documento(timezone.now() - timedelta(days=1))
+
+    request = rf.get(reverse('monitoring:sla_checks'))
+    request.user = admin_user
+    run_sla_checks(request)
+
+    assert entrada(documento).estado == 'em_dia'
+    assert not Notificacao.objects.exists()
+
+
+def test_migration_carrega_indice_existente():
+    from importlib import import_module
+    from types import SimpleNamespace
+
+    from django.apps import apps
+    from django.db import connection
+
+    documento = criar_documento(timezone.now() + timedelta(days=2))
+    PrazoMonitorado.objects.all().delete()
+
+    migration = import_module('monitoring.migrations.0005_carga_prazos_monitorados')
+    migration.carregar_prazos(apps, SimpleNamespace(connection=connection))
+
+    assert entrada(documento).vencimento == documento.prazo_resposta
+
+
+def test_reconstruir_regrava_apenas_entradas_alteradas():
+    agora = timezone.now()
+    inalterado = criar_documento(agora + timedelta(days=2))
+    alterado = criar_documento(agora + timedelta(days=3))
+    antes = {e.objeto_id: (e.pk, e.atualizado_em) for e in PrazoMonitorado.objects.all()}
+
+    CaixaEntrada.objects.filter(pk=alterado.pk).update(setor_destino='Jurídico')
+    varredura_prazos_service.reconstruir(['caixa_entrada'])
+
+    mantida = entrada(inalterado)
+    assert (mantida.pk, mantida.atualizado_em) == antes[str(inalterado.pk)]
+    atualizada = entrada(alterado)
+    assert atualizada.pk == antes[str(alterado.pk)][0]
+    assert atualizada.setor == 'Jurídico'
+    assert atualizada.atualizado_em > antes[str(alterado.pk)][1]
@@ -0,0 +1,121 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth.models import Group, User
+from django.core.management import call_command
+from django.utils import timezone
+
+from fiscalizacao.models import AutoInfracao
+from multas.models import Empresa, Multa
+from protocolo_tramitacao.models import Notificacao, ProtocoloDocumento
+from protocolo_tramitacao.notifications import GerenciadorNotificacoes
+from tests.test_workflow_service import criar_setor, criar_tipo_documento, criar_usuario
+
+
+pytestmark = pytest.mark.django_db
+
+
+def criar_protocolos(quantidade, responsavel, prazo):
+    tipo = criar_tipo_documento()
+    setor = criar_setor("VRF", "Verificação")
+    for indice in range(quantidade):
+        ProtocoloDocumento.objects.create(
+            numero_protocolo=f"VRF-{indice:04d}", tipo_documento=tipo, origem='EXTERNO',
+            assunto=f"Reclamação {indice}", descricao="...", remetente_nome="Cidadão",
+            remetente_documento=f"{indice:011d}", setor_atual=setor, setor_origem=setor,
+            protocolado_por=responsavel, responsavel_atual=responsavel, prazo_resposta=prazo,
+        )
+
+
+def criar_multas(quantidade, vencimento):
+    for indice in range(quantidade):
+        empresa = Empresa.objects.create(
+            razao_social=f'Empresa {indice} LTDA', cnpj=f'{indice:02d}.222.222/0001-22', endereco='Rua A, 1',
+        )
+        auto = AutoInfracao.objects.create(
+            numero=f'AUTO-VRF-{indice:03d}', data_fiscalizacao=date.today(), hora_fiscalizacao='10:00',
+            razao_social=empresa.razao_social, cnpj=empresa.cnpj, endereco='Rua A, 1',
+            base_legal_cdc='Art. 41 CDC', valor_multa=Decimal('1000.00'),
+            responsavel_nome='Responsável', responsavel_cpf='111.111.111-11', fiscal_nome='Fiscal',
+        )
+        Multa.objects.create(processo=auto, empresa=empresa, valor=Decimal('1000.00'))
+    # save() já marcaria como vencida: o vencimento passado é gravado direto
+    Multa.objects.update(data_vencimento=vencimento, status='pendente')
+
+
+def test_prazos_vencendo_em_consultas_constantes_e_sem_duplicar(django_assert_max_num_queries):
+    responsavel = criar_usuario("responsavel_prazos")
+    criar_protocolos(25, responsavel, timezone.now() + timedelta(days=2, hours=1))
+
+    with django_assert_max_num_queries(8):
+        criadas = GerenciadorNotificacoes.verificar_prazos_vencendo()
+
+    assert len(criadas) == 25
+    notificacao = Notificacao.objects.get(objeto_tipo='protocolo', titulo='Prazo vencendo - Protocolo VRF-0000')
+    assert notificacao.usuario == responsavel
+    assert 'vencendo em 2 dias' in notificacao.mensagem
+
+    # Segunda execução no mesmo dia não notifica de novo
+    assert GerenciadorNotificacoes.verificar_prazos_vencendo() == []
+    assert Notificacao.objects.count() == 25
+
+
+def test_multas_vencidas_com_um_update_e_chave_unica(django_assert_max_num_queries):
+    financeiro = Group.objects.create(name='Financeiro')
+    usuarios = [User.objects.create_user(f'financeiro{i}', password='x') for i in range(2)]
+    financeiro.user_set.add(*usuarios)
+    criar_multas(15, date.today() - timedelta(days=4))
+
+    with django_assert_max_num_queries(12):
+        criadas = GerenciadorNotificacoes.verificar_multas_vencidas()
+
+    assert len(criadas) == 30  # 15 multas x 2 usuários do financeiro
+    assert set(Multa.objects.values_list('status', flat=True)) == {'vencida'}
+    assert Notificacao.objects.filter(usuario=usuarios[0], objeto_tipo='multa').count() == 15
+    assert 'vencida há 4 dias' in Notificacao.objects.filter(objeto_tipo='multa').first().mensagem
+
+    # Execução concorrente: a multa volta a pendente, mas a chave do dia já existe
+    Multa.objects.update(status='pendente')
+    assert GerenciadorNotificacoes.verificar_multas_vencidas() == []
+    assert Notificacao.objects.filter(objeto_tipo='multa').count() == 30
+
+    call_command('verificar_prazos', '--apenas-multas')
+
+
+def test_gravar_retorna_so_as_linhas_inseridas(monkeypatch):
+    usuario = User.objects.create_user('concorrente', password='x')
+    tipo = GerenciadorNotificacoes.tipo_prazo_vencendo()
+    hoje = timezone.localdate()
+
+    def notificacao(objeto_id):
+        return Notificacao(
+            tipo=tipo, usuario=usuario, titulo=f'Prazo {objeto_id}', mensagem='...', objeto_tipo='protocolo',
+            objeto_id=objeto_id, chave_dedup=GerenciadorNotificacoes.chave_dedup('protocolo', objeto_id, tipo, usuario.pk, hoje),
+        )
+
+    # Outra execução grava a chave do protocolo 1 entre a verificação e o INSERT
+    bulk_create = Notificacao.objects.bulk_create
+
+    def execucao_concorrente(objs, **kwargs):
+        bulk_create([notificacao(1)])
+        return bulk_create(objs, **kwargs)
+
+    monkeypatch.setattr(Notificacao.objects, 'bulk_create', execucao_concorrente)
+    inseridas = GerenciadorNotificacoes.gravar_notificacoes([notificacao(1), notificacao(2), notificacao(2)])
+
+    assert [n.objeto_id for n in inseridas] == [2]
+    assert inseridas[0].pk == Notificacao.objects.get(objeto_id=2).pk
+    assert Notificacao.objects.count() == 2
+
+
+def test_texto_igual_na_notificacao_individual_e_em_lote():
+    responsavel = criar_usuario("responsavel_texto")
+    criar_protocolos(1, responsavel, timezone.now() + timedelta(days=2, hours=1))
+    protocolo = ProtocoloDocumento.objects.get()
+
+    individual = GerenciadorNotificacoes.criar_notificacao_prazo_vencimento(protocolo)
+    individual.delete()
+    em_lote, = GerenciadorNotificacoes.verificar_prazos_vencendo()
+
+    assert (em_lote.titulo, em_lote.mensagem) == (individual.titulo, individual.mensagem)
@@ -188,3 +188,124 @@ def test_finalizar_registra_decisao():
     assert decisao is not None
     assert decisao.usuario == decisor
     assert decisao.observacoes == "Processo concluído"
+
+
+def test_tramitar_em_lote_grava_tudo_em_consultas_constantes(django_assert_max_num_queries):
+    from caixa_entrada.models import CaixaEntrada, HistoricoCaixaEntrada
+    from monitoring.models import PrazoMonitorado
+    from protocolo_tramitacao.models import ProtocoloDocumento, TramitacaoDocumento
+
+    usuario = criar_usuario("protocolista_lote")
+    tipo = criar_tipo_documento("Redistribuição")
+    setor_origem = criar_setor("LTO", "Origem Lote", responsavel=usuario)
+    responsavel_destino = criar_usuario("responsavel_lote")
+    setor_destino = criar_setor("LTD", "Destino Lote", responsavel=responsavel_destino)
+
+    protocolos = [
+        workflow_service.protocolar(
+            tipo_documento=tipo,
+            origem="EXTERNO",
+            assunto=f"Reclamação {indice}",
+            descricao="Conteúdo",
+            remetente_nome="Cidadão",
+            remetente_documento=f"{indice:011d}",
+            setor_destino=setor_origem,
+            usuario=usuario,
+            observacoes="Observação inicial" if indice == 0 else "",
+        )
+        for indice in range(30)
+    ]
+    workflow_service.finalizar(protocolos[-1], usuario=usuario)
+    ids = [protocolo.pk for protocolo in protocolos]
+    caixa_antes = CaixaEntrada.objects.count()
+
+    # Inclui a reserva dos números (com a carga inicial da sequência do ano) e a sincronização do índice de prazos
+    with django_assert_max_num_queries(25):
+        resultado = workflow_service.tramitar_em_lote(
+            ids + [ids[0]],
+            setor_destino=setor_destino,
+            motivo="Redistribuição de acervo",
+            usuario=usuario,
+            prazo_dias=5,
+            observacoes="Redistribuído",
+        )
+
+    assert resultado == {'solicitados': 30, 'tramitados': 29, 'ignorados': 1, 'documentos_caixa': 29}
+
+    movidos = ProtocoloDocumento.objects.filter(pk__in=ids[:-1])
+    assert set(movidos.values_list('setor_atual', 'status', 'responsavel_atual')) == {
+        (setor_destino.pk, 'EM_TRAMITACAO', responsavel_destino.pk)
+    }
+    assert movidos.get(pk=ids[0]).observacoes == "Observação inicial\nRedistribuído"
+    assert movidos.get(pk=ids[1]).observacoes == "Redistribuído"
+    assert ProtocoloDocumento.objects.get(pk=ids[-1]).status == "DECIDIDO"
+
+    tramitacoes = TramitacaoDocumento.objects.filter(acao="ENCAMINHADO", protocolo_id__in=ids)
+    assert tramitacoes.count() == 29
+    tramitacao = tramitacoes.get(protocolo_id=ids[0])
+    # A sincronização com a caixa de entrada pode trocar o setor de origem por um homônimo
+    assert tramitacao.setor_origem.nome == "Origem Lote"
+    assert (tramitacao.setor_destino, tramitacao.prazo_dias) == (setor_destino, 5)
+    assert tramitacao.hash_tramitacao == tramitacao.gerar_hash_tramitacao()
+
+    assert CaixaEntrada.objects.count() == caixa_antes + 29
+    nova = CaixaEntrada.objects.get(protocolo_id=ids[0], documento_anterior__isnull=False)
+    assert (nova.setor_destino, nova.status, nova.versao) == ("Destino Lote", "NAO_LIDO", 2)
+    assert nova.responsavel_atual == responsavel_destino
+    assert nova.documento_anterior.status == "ENCAMINHADO"
+    numeros = CaixaEntrada.objects.values_list('numero_protocolo', flat=True)
+    assert len(set(numeros)) == len(numeros)
+    assert HistoricoCaixaEntrada.objects.filter(acao="ENCAMINHADO", documento__protocolo_id__in=ids).count() == 29
+
+    # Índice de prazos: versões encaminhadas saem, as novas entram
+    indexados = set(PrazoMonitorado.objects.filter(tipo='caixa_entrada').values_list('objeto_id', flat=True))
+    com_prazo = CaixaEntrada.objects.filter(protocolo_id__in=ids, prazo_resposta__isnull=False)
+    assert str(nova.documento_anterior.pk) not in indexados
+    assert indexados == {str(pk) for pk in com_prazo.filter(status='NAO_LIDO').values_list('pk', flat=True)}
+    assert str(nova.pk) in indexados
+
+    # Segunda chamada: todos já estão no destino
+    assert workflow_service.tramitar_em_lote(ids, setor_destino=setor_destino, motivo="x", usuario=usuario)['tramitados'] == 0
+
+
+def test_endpoint_tramitar_lote():
+    from rest_framework.test import APIClient
+
+    usuario = criar_usuario("protocolista_api_lote")
+    tipo = criar_tipo_documento("Ofício Lote")
+    setor_origem = criar_setor("APO", "Origem API")
+    setor_destino = criar_setor("APD", "Destino API")
+    protocolo = workflow_service.protocolar(
+        tipo_documento=tipo, origem="INTERNO", assunto="Ofício", descricao="Conteúdo",
+        remetente_nome="Servidor", remetente_documento="12312312312", setor_destino=setor_origem, usuario=usuario,
+    )
+
+    cliente = APIClient()
+    cliente.force_authenticate(usuario)
+    resposta = cliente.post(
+        '/api/protocolo-tramitacao/protocolos/tramitar_lote/',
+        {'protocolos': [protocolo.pk], 'setor_destino': setor_destino.pk, 'motivo': 'Redistribuição'},
+        format='json',
+    )
+
+    assert resposta.status_code == 200, resposta.content
+    assert resposta.json()['tramitados'] == 1
+
+
+def test_numeracao_da_caixa_compartilha_a_sequencia():
+    from caixa_entrada.models import CaixaEntrada, SequenciaProtocoloCaixa
+
+    documento = CaixaEntrada.objects.create(
+        tipo_documento='PETICAO', assunto='Avulso', descricao='Conteúdo',
+        remetente_nome='Cidadão', remetente_documento='12345678900',
+    )
+    sequencial = int(documento.numero_protocolo.rsplit('-', 1)[1])
+
+    # A reserva em lote continua de onde o save parou, e o save depois dela
+    lote = SequenciaProtocoloCaixa.reservar(3)
+    assert [int(numero.rsplit('-', 1)[1]) for numero in lote] == [sequencial + 1, sequencial + 2, sequencial + 3]
+    proximo = CaixaEntrada.objects.create(
+        tipo_documento='PETICAO', assunto='Avulso 2', descricao='Conteúdo',
+        remetente_nome='Cidadão', remetente_documento='12345678900',
+    )
+    assert int(proximo.numero_protocolo.rsplit('-', 1)[1]) == sequencial + 4